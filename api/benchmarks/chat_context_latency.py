@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Chat turn latency over a long session: unbounded history vs the bounded context policy.
+
+Drives a real react agent with a SQLite checkpointer through many turns of one
+session. The model is a fake whose latency grows with prompt size (a fixed cost
+plus a per-token cost), which is how hosted models behave. "unbounded" persists a
+system message with every turn and sends the whole thread, like the agent did
+before; "bounded" uses the state modifier and rolling summary from utils.chat_context.
+
+Usage:
+    python benchmarks/chat_context_latency.py [--turns 100] [--ms-per-1k-tokens 20]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from langgraph.prebuilt import create_react_agent
+
+from constants import ApplicationConstants
+from utils.chat_context import ChatAgentState, build_state_modifier, compact_thread, count_tokens
+
+SYSTEM_PROMPT = "You are a helpful flight booking assistant. " * 20
+
+
+class SimulatedChatModel(BaseChatModel):
+    """Fake model: sleeps base_ms plus ms_per_1k_tokens per thousand prompt tokens."""
+
+    base_ms: float = 5.0
+    ms_per_1k_tokens: float = 20.0
+    prompt_tokens: List[int] = []
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        raise NotImplementedError("async only")
+
+    async def _agenerate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        tokens = count_tokens(messages)
+        self.prompt_tokens.append(tokens)
+        await asyncio.sleep((self.base_ms + self.ms_per_1k_tokens * tokens / 1000) / 1000)
+        reply = "Here are the flights I found for you. " * 8
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=reply))])
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "SimulatedChatModel":
+        return self
+
+    @property
+    def _llm_type(self) -> str:
+        return "simulated"
+
+
+async def run_mode(mode: str, db_path: str, turns: int, ms_per_1k_tokens: float) -> dict:
+    """Run one session of `turns` turns and return per-turn latency and prompt size."""
+    model = SimulatedChatModel(ms_per_1k_tokens=ms_per_1k_tokens, prompt_tokens=[])
+    config = {"configurable": {"thread_id": "bench-session"}}
+    latencies, prompt_tokens = [], []
+
+    async with AsyncSqliteSaver.from_conn_string(db_path) as memory:
+        if mode == "bounded":
+            agent = create_react_agent(
+                model, tools=[], checkpointer=memory, state_schema=ChatAgentState,
+                state_modifier=build_state_modifier(SYSTEM_PROMPT, ApplicationConstants.DEFAULT_CHAT_CONTEXT_MAX_TOKENS)
+            )
+        else:
+            agent = create_react_agent(model, tools=[], checkpointer=memory)
+
+        for turn in range(turns):
+            content = f"Turn {turn}: find me flights from Madrid to Lisbon next week, economy, two passengers."
+            messages = [{"role": "user", "content": content}]
+            if mode == "unbounded":
+                messages.insert(0, {"role": "system", "content": SYSTEM_PROMPT})
+
+            started = time.perf_counter()
+            calls_before = len(model.prompt_tokens)
+            await agent.ainvoke({"messages": messages}, config)
+            if mode == "bounded":
+                await compact_thread(
+                    agent, model, config,
+                    trigger_tokens=ApplicationConstants.DEFAULT_CHAT_SUMMARY_TRIGGER_TOKENS,
+                    keep_tokens=ApplicationConstants.DEFAULT_CHAT_SUMMARY_KEEP_TOKENS,
+                    max_summary_words=250
+                )
+            latencies.append((time.perf_counter() - started) * 1000)
+            prompt_tokens.append(model.prompt_tokens[calls_before])
+
+    def window(values: list, start: int) -> float:
+        return statistics.fmean(values[start:start + 10])
+
+    return {
+        "mode": mode,
+        "first10_ms": window(latencies, 0),
+        "last10_ms": window(latencies, turns - 10),
+        "max_ms": max(latencies),
+        "first_prompt": prompt_tokens[0],
+        "last_prompt": prompt_tokens[-1],
+        "max_prompt": max(prompt_tokens),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=100)
+    parser.add_argument("--ms-per-1k-tokens", type=float, default=20.0)
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for mode in ("unbounded", "bounded"):
+            db_path = os.path.join(tmp_dir, f"{mode}.db")
+            results.append(asyncio.run(run_mode(mode, db_path, args.turns, args.ms_per_1k_tokens)))
+
+    print(f"{args.turns} turns, simulated model cost {args.ms_per_1k_tokens} ms per 1k prompt tokens")
+    print(f"{'mode':<10} {'first10 ms':>11} {'last10 ms':>10} {'max ms':>8} "
+          f"{'prompt@1':>9} {'prompt@N':>9} {'max prompt':>11}")
+    for r in results:
+        print(f"{r['mode']:<10} {r['first10_ms']:>11.1f} {r['last10_ms']:>10.1f} {r['max_ms']:>8.1f} "
+              f"{r['first_prompt']:>9} {r['last_prompt']:>9} {r['max_prompt']:>11}")
+    print("'bounded' latency includes the occasional summary call made after a turn")
+
+
+if __name__ == "__main__":
+    main()
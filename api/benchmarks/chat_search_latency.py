@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Chat history search benchmark: FTS5 index against LIKE.
+
+Fills a temporary database with chat turns spread over many users, one of them
+a heavy user holding a large share of all messages, with words drawn from a
+Zipf-distributed vocabulary like natural text. It then times a user's history
+search both ways: the FTS5 MATCH behind /chat/search, and the `LIKE '%word%'`
+scan over the user's messages that a substring search would otherwise need.
+Inserts go through the full-text triggers, so the load rate includes indexing.
+
+Usage:
+    python benchmarks/chat_search_latency.py [--messages 1000000] [--users 1000] [--repeat 20]
+"""
+
+import argparse
+import itertools
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from sqlalchemy import text
+
+from resources.database import DatabaseManager, DatabaseConfig
+from repository.chatbot_message import ChatbotMessageSqliteRepository
+
+WORDS = (
+    "flight flights book booking cancel seat window aisle baggage luggage price cheap fare morning evening "
+    "delay delayed gate terminal airport airline refund change date return one way round trip direct "
+    "connection layover business economy upgrade meal passport check online boarding pass time next week"
+).split()
+CITIES = ["Madrid", "Lisbon", "Paris", "London", "Berlin", "Rome", "Tokyo", "Sydney", "Toronto", "Chicago",
+          "Miami", "Dubai", "Singapore", "Zurich", "Vienna", "Prague", "Oslo", "Helsinki", "Dublin", "Athens"]
+# Words that appear in few messages, so the index has little to read while LIKE still scans everything
+RARE_WORDS = ["kangaroo", "volcano", "saxophone", "marathon", "origami"]
+SYLLABLES = "ka lo mi ne ru sa te vo di pa ge ho ju bi fe".split()
+VOCABULARY_SIZE = 5000
+HEAVY_USER_SHARE = 0.1
+BATCH_SIZE = 50_000
+
+LIKE_SEARCH = text(
+    "SELECT id FROM chatbot_messages WHERE user_id = :user_id AND ("
+    + " AND ".join(f"(user_message LIKE :term{i} OR bot_response LIKE :term{i})" for i in range(2))
+    + ") ORDER BY created_at DESC LIMIT :limit"
+)
+
+
+def build_vocabulary(rng: random.Random) -> List[str]:
+    """Travel words and cities mixed into filler words, most frequent first."""
+    filler = ["".join(syllables) for length in (2, 3) for syllables in itertools.product(SYLLABLES, repeat=length)]
+    rng.shuffle(filler)
+    words = filler[:VOCABULARY_SIZE - len(WORDS) - len(CITIES)]
+    for word in WORDS + CITIES:
+        words.insert(rng.randrange(20, len(words)), word)
+    return words
+
+
+def sentence(rng: random.Random, vocabulary: List[str], weights: List[float], length: int) -> str:
+    words = rng.choices(vocabulary, cum_weights=weights, k=length)
+    words[rng.randrange(length)] = rng.choice(CITIES)
+    if rng.random() < 0.001:
+        words[rng.randrange(length)] = rng.choice(RARE_WORDS)
+    return " ".join(words)
+
+
+def load(manager: DatabaseManager, messages: int, users: int, seed: int) -> None:
+    rng = random.Random(seed)
+    vocabulary = build_vocabulary(rng)
+    # Zipf's law: the n-th most frequent word occurs about 1/n as often as the first
+    weights = list(itertools.accumulate(1 / rank for rank in range(1, len(vocabulary) + 1)))
+    insert = text(
+        "INSERT INTO chatbot_messages (user_id, session_id, user_message, bot_response, created_at) "
+        "VALUES (:user_id, :session_id, :user_message, :bot_response, :created_at)"
+    )
+    for start in range(0, messages, BATCH_SIZE):
+        rows = []
+        for number in range(start, min(start + BATCH_SIZE, messages)):
+            user_id = 1 if rng.random() < HEAVY_USER_SHARE else rng.randint(2, users)
+            rows.append({
+                "user_id": user_id,
+                "session_id": f"{user_id}_{rng.randrange(20)}",
+                "user_message": sentence(rng, vocabulary, weights, rng.randint(5, 15)),
+                "bot_response": sentence(rng, vocabulary, weights, rng.randint(15, 60)),
+                "created_at": f"2026-01-01 00:00:{number % 60:02d}.{number:06d}",
+            })
+        with manager.engine.begin() as conn:
+            conn.execute(insert, rows)
+
+
+def percentiles(func: Callable[[], int], repeat: int) -> List[float]:
+    timings, hits = [], 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        hits = func()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return [statistics.median(timings), timings[int(len(timings) * 0.95) - 1 if len(timings) > 1 else 0], hits]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        manager = DatabaseManager(DatabaseConfig(database_url=f"sqlite:///{os.path.join(directory, 'chat.db')}"))
+        manager.create_tables()
+
+        started = time.perf_counter()
+        load(manager, args.messages, args.users, args.seed)
+        elapsed = time.perf_counter() - started
+        print(f"loaded {args.messages} messages for {args.users} users in {elapsed:.1f} s "
+              f"({args.messages / elapsed:,.0f} rows/s including full-text indexing)")
+
+        db = manager.get_session()
+        repo = ChatbotMessageSqliteRepository(db)
+        cases = [
+            ("heavy user, common word", 1, ["madrid"]),
+            ("heavy user, two words", 1, ["refund", "lisbon"]),
+            ("heavy user, rare word", 1, ["kangaroo"]),
+            ("typical user, common word", 2, ["madrid"]),
+            ("typical user, two words", 2, ["refund", "lisbon"]),
+        ]
+
+        def like(user_id: int, terms: List[str]) -> int:
+            # The second condition repeats the first term for one-word searches
+            params = {"user_id": user_id, "limit": args.limit,
+                      "term0": f"%{terms[0]}%", "term1": f"%{terms[-1]}%"}
+            return len(db.execute(LIKE_SEARCH, params).all())
+
+        print(f"{'search':<28} {'LIKE p50':>9} {'LIKE p95':>9} {'FTS p50':>9} {'FTS p95':>9} {'speedup':>8} {'hits':>5}")
+        for name, user_id, terms in cases:
+            like_p50, like_p95, like_hits = percentiles(lambda: like(user_id, terms), args.repeat)
+            fts_p50, fts_p95, fts_hits = percentiles(
+                lambda: len(repo.search(user_id, terms, limit=args.limit)), args.repeat
+            )
+            print(f"{name:<28} {like_p50:>7.2f}ms {like_p95:>7.2f}ms {fts_p50:>7.2f}ms {fts_p95:>7.2f}ms "
+                  f"{like_p50 / fts_p50:>7.1f}x {fts_hits:>2}/{like_hits:<2}")
+
+        with manager.engine.connect() as conn:
+            pages = conn.execute(text("PRAGMA page_count")).scalar()
+            page_size = conn.execute(text("PRAGMA page_size")).scalar()
+        print(f"database size: {pages * page_size / 1024 / 1024:.0f} MiB (messages and full-text index)")
+        db.close()
+        manager.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Request latency benchmark: logging off vs synchronous file logging vs queued file logging.
+
+Runs an in-process FastAPI app whose endpoint logs like our routers and services
+do (a few INFO lines plus DEBUG lines per request) and reports latency percentiles
+for each logging mode.
+
+Usage:
+    python benchmarks/logging_latency.py [--requests 3000] [--concurrency 16]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import httpx
+from fastapi import FastAPI
+
+from resources.logging import LoggingManager, LoggingConfig
+
+
+def build_app(logger: logging.Logger) -> FastAPI:
+    """Build an app with an endpoint that logs at a realistic per-request volume."""
+    app = FastAPI()
+
+    @app.get("/bookings/user")
+    async def bookings():
+        logger.debug("Retrieving bookings for user 42 with status filter: None, page: 1, size: 10")
+        logger.info("Authenticated user john.doe@example.com for endpoint: /bookings/user")
+        logger.info("Successfully retrieved 10 bookings for user john.doe@example.com (total: 37)")
+        logger.debug("Retrieved booking IDs: [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]")
+        logger.info("Request completed for user john.doe@example.com")
+        return {"items": [], "total": 0}
+
+    return app
+
+
+async def run_load(app: FastAPI, total_requests: int, concurrency: int) -> list:
+    """Fire requests at the app and return per-request latencies in milliseconds."""
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one_request():
+            async with semaphore:
+                started = time.perf_counter()
+                await client.get("/bookings/user")
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        await asyncio.gather(*(one_request() for _ in range(total_requests)))
+    return latencies
+
+
+def run_mode(mode: str, log_dir: str, total_requests: int, concurrency: int) -> dict:
+    """Configure logging for a mode, run the load, and summarize latencies."""
+    config = LoggingConfig(
+        log_level="CRITICAL" if mode == "off" else "INFO",
+        log_file=os.path.join(log_dir, f"{mode}.log"),
+        error_log_file=os.path.join(log_dir, f"{mode}-errors.log"),
+        console_colors=False,
+        async_logging=(mode == "queued"),
+    )
+    manager = LoggingManager(config)
+    manager.initialize()
+    logger = manager.get_logger("bench")
+    app = build_app(logger)
+
+    # Warm up, then measure
+    asyncio.run(run_load(app, 200, concurrency))
+    started = time.perf_counter()
+    latencies = asyncio.run(run_load(app, total_requests, concurrency))
+    wall = time.perf_counter() - started
+
+    manager.shutdown()
+    latencies.sort()
+    return {
+        "mode": mode,
+        "p50": statistics.median(latencies),
+        "p99": latencies[int(len(latencies) * 0.99) - 1],
+        "mean": statistics.fmean(latencies),
+        "rps": total_requests / wall,
+        "dropped": manager.get_dropped_count(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    real_stdout, real_stderr = sys.stdout, sys.stderr
+    results = []
+    with tempfile.TemporaryDirectory() as log_dir, open(os.devnull, "w") as devnull:
+        # Console handlers bind to sys.stdout/sys.stderr at initialization; keep them off the terminal
+        sys.stdout, sys.stderr = devnull, devnull
+        try:
+            for mode in ("off", "sync", "queued"):
+                results.append(run_mode(mode, log_dir, args.requests, args.concurrency))
+        finally:
+            sys.stdout, sys.stderr = real_stdout, real_stderr
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}")
+    print(f"{'mode':<8} {'p50 ms':>8} {'p99 ms':>8} {'mean ms':>8} {'req/s':>9} {'dropped':>8}")
+    for r in results:
+        print(f"{r['mode']:<8} {r['p50']:>8.3f} {r['p99']:>8.3f} {r['mean']:>8.3f} {r['rps']:>9.0f} {r['dropped']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Metrics registry overhead benchmark.
+
+Measures the per-call cost of the recording hot path (counter increments and
+histogram observations, with and without labels) from one and several threads,
+plus the cost of rendering /metrics with a realistic number of series.
+
+Usage:
+    python benchmarks/metrics_overhead.py [--ops 1000000] [--threads 4]
+"""
+
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from resources.metrics import MetricsRegistry
+
+
+def time_ops(func, ops: int, threads: int) -> float:
+    """Run func ops times on each thread and return nanoseconds per call."""
+    def worker():
+        for _ in range(ops):
+            func()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    started = time.perf_counter()
+    for worker_thread in workers:
+        worker_thread.start()
+    for worker_thread in workers:
+        worker_thread.join()
+    return (time.perf_counter() - started) / (ops * threads) * 1e9
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ops", type=int, default=1_000_000)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    registry = MetricsRegistry()
+    counter = registry.counter("bench_total", "Benchmark counter", ("result",))
+    histogram = registry.histogram("bench_seconds", "Benchmark histogram", ("method", "route", "status"))
+    unlabelled = registry.histogram("bench_plain_seconds", "Benchmark histogram without labels")
+    counter_child = counter.labels("hit")
+    histogram_child = histogram.labels("GET", "/bookings/user", 200)
+
+    cases = [
+        ("baseline (empty call)", lambda: None),
+        ("counter.labels().inc()", lambda: counter.labels("hit").inc()),
+        ("counter child .inc()", counter_child.inc),
+        ("histogram.labels().observe()", lambda: histogram.labels("GET", "/bookings/user", 200).observe(0.012)),
+        ("histogram child .observe()", lambda: histogram_child.observe(0.012)),
+        ("unlabelled histogram .observe()", lambda: unlabelled.observe(0.012)),
+    ]
+
+    print(f"{args.ops} ops per thread")
+    print(f"{'operation':<34} {'1 thread ns/op':>15} {f'{args.threads} threads ns/op':>17}")
+    for name, func in cases:
+        single = time_ops(func, args.ops, 1)
+        multi = time_ops(func, args.ops // args.threads, args.threads)
+        print(f"{name:<34} {single:>15.0f} {multi:>17.0f}")
+
+    # Render cost with ~30 routes x 3 statuses, as /metrics would see in production
+    for route in range(30):
+        for status in (200, 404, 500):
+            histogram.labels("GET", f"/route/{route}", status).observe(0.01)
+    started = time.perf_counter()
+    for _ in range(100):
+        output = registry.render()
+    render_ms = (time.perf_counter() - started) / 100 * 1000
+    print(f"render: {render_ms:.2f} ms for {output.count(chr(10))} lines")
+
+
+if __name__ == "__main__":
+    main()
@@ -28,10 +28,17 @@ class SecurityConstants:
         "/openapi.json", 
         "/redoc",
         "/health",
+        "/health/live",
+        "/health/ready",
+        "/metrics",
         "/users/register",
         "/users/login",
         "/flights/search",  # Public flight search
-        "/flights/list"     # Public flight listing
+        "/flights/list",    # Public flight listing
+        "/flights/search/batch",  # Public multi-route search
+        "/flights/fare-calendar",  # Public cheapest-fare calendar
+        "/flights/connections",  # Public connecting itinerary search
+        "/airports/autocomplete"  # Public airport suggestions for search boxes
     ]
 
 class TimeConstants:
@@ -52,6 +59,64 @@ class ApplicationConstants:
     DEFAULT_LOG_FILE = "logs/flights-chatbot.log"
     DEFAULT_DATABASE_URL = "sqlite:///./flights.db"
     DEFAULT_CHAT_CHECKPOINT_DB = "sqlite+aiosqlite:///./chat_checkpoints.db"
+    DEFAULT_CHAT_CONTEXT_MAX_TOKENS = 4000
+    DEFAULT_CHAT_SUMMARY_TRIGGER_TOKENS = 8000
+    DEFAULT_CHAT_SUMMARY_KEEP_TOKENS = 2000
+    DEFAULT_CHECKPOINT_KEEP_PER_THREAD = 10
+    DEFAULT_CHECKPOINT_RETENTION_INTERVAL_SECONDS = 3600
+    DEFAULT_CHECKPOINT_VACUUM_PAGES = 5000
+    DEFAULT_FFMPEG_PROBE_REFRESH_SECONDS = 300
+    # /health?deep=true is public, so a forced probe reuses one younger than this
+    DEFAULT_FFMPEG_PROBE_MIN_FORCED_INTERVAL_SECONDS = 10
+    DEFAULT_HEALTH_REFRESH_INTERVAL_SECONDS = 15
+    DEFAULT_HEALTH_CHECK_TIMEOUT_SECONDS = 2
+    # Threads for readiness checks; a check still running from an earlier refresh is skipped, not started again
+    HEALTH_CHECK_WORKERS = 8
+    
+    # Batch booking endpoints
+    MAX_BOOKING_BATCH_SIZE = 10
+    
+    # Seats on a flight created without an explicit capacity
+    DEFAULT_FLIGHT_CAPACITY = 180
+    
+    # Fare calendar window (days from the start date)
+    DEFAULT_FARE_CALENDAR_DAYS = 30
+    MAX_FARE_CALENDAR_DAYS = 92
+    
+    # Airport autocomplete suggestions per query
+    DEFAULT_AIRPORT_AUTOCOMPLETE_RESULTS = 10
+    MAX_AIRPORT_AUTOCOMPLETE_RESULTS = 20
+    
+    # Chat history search: hits per page and excerpt length in tokens, matches wrapped in Markdown bold
+    DEFAULT_CHAT_SEARCH_RESULTS = 20
+    MAX_CHAT_SEARCH_RESULTS = 100
+    CHAT_SEARCH_SNIPPET_TOKENS = 16
+    CHAT_SEARCH_HIGHLIGHT_START = "**"
+    CHAT_SEARCH_HIGHLIGHT_END = "**"
+    
+    # In-memory columnar flight catalog for flight search (off unless FLIGHT_CATALOG_ENABLED is set)
+    DEFAULT_FLIGHT_CATALOG_ENABLED = False
+    
+    # Flexible-date search: days searched on each side of the departure date
+    MAX_FLEXIBLE_SEARCH_DAYS = 3
+    
+    # Batch flight search: routes per request and flights returned per route
+    MAX_FLIGHT_SEARCH_BATCH_SIZE = 10
+    DEFAULT_FLIGHT_SEARCH_BATCH_RESULTS = 10
+    
+    # Connection search (itineraries with stops)
+    MAX_CONNECTION_STOPS = 2
+    DEFAULT_MIN_LAYOVER_MINUTES = 45
+    DEFAULT_MAX_LAYOVER_MINUTES = 360
+    MAX_LAYOVER_MINUTES = 1440
+    DEFAULT_CONNECTION_RESULTS = 10
+    MAX_CONNECTION_RESULTS = 50
+    # Itineraries requested from the route graph per result, since some may have sold-out legs
+    CONNECTION_OVERFETCH_FACTOR = 2
+    
+    # Request tracing
+    REQUEST_ID_HEADER = "X-Request-ID"
+    MAX_REQUEST_ID_LENGTH = 128
 
 class EnvironmentKeys:
     """Environment variable keys."""
@@ -64,9 +129,20 @@ class EnvironmentKeys:
     ERROR_LOG_FILE = "ERROR_LOG_FILE"
     DATABASE_URL = "DATABASE_URL"
     CHAT_CHECKPOINT_DB = "CHAT_CHECKPOINT_DB"
+    CHAT_CONTEXT_MAX_TOKENS = "CHAT_CONTEXT_MAX_TOKENS"
+    CHAT_SUMMARY_TRIGGER_TOKENS = "CHAT_SUMMARY_TRIGGER_TOKENS"
+    CHAT_SUMMARY_KEEP_TOKENS = "CHAT_SUMMARY_KEEP_TOKENS"
+    CHECKPOINT_KEEP_PER_THREAD = "CHECKPOINT_KEEP_PER_THREAD"
+    CHECKPOINT_RETENTION_INTERVAL_SECONDS = "CHECKPOINT_RETENTION_INTERVAL_SECONDS"
+    CHECKPOINT_VACUUM_PAGES = "CHECKPOINT_VACUUM_PAGES"
     AZURE_SPEECH_KEY = "AZURE_SPEECH_KEY"
     AZURE_SPEECH_REGION = "AZURE_SPEECH_REGION"
     AZURE_SPEECH_ENDPOINT = "AZURE_SPEECH_ENDPOINT"
+    FFMPEG_PROBE_REFRESH_SECONDS = "FFMPEG_PROBE_REFRESH_SECONDS"
+    FFMPEG_PROBE_MIN_FORCED_INTERVAL_SECONDS = "FFMPEG_PROBE_MIN_FORCED_INTERVAL_SECONDS"
+    HEALTH_REFRESH_INTERVAL_SECONDS = "HEALTH_REFRESH_INTERVAL_SECONDS"
+    HEALTH_CHECK_TIMEOUT_SECONDS = "HEALTH_CHECK_TIMEOUT_SECONDS"
+    FLIGHT_CATALOG_ENABLED = "FLIGHT_CATALOG_ENABLED"
 
 def get_env_int(key: str, default: int) -> int:
     """Get an integer value from environment variables with a default fallback."""
@@ -78,10 +154,32 @@ def get_env_int(key: str, default: int) -> int:
     except (ValueError, TypeError):
         return default
 
+def get_env_float(key: str, default: float) -> float:
+    """Get a float value from environment variables with a default fallback."""
+    try:
+        value = os.getenv(key)
+        if value is not None:
+            return float(value)
+        return default
+    except (ValueError, TypeError):
+        return default
+
 def get_env_str(key: str, default: str) -> str:
     """Get a string value from environment variables with a default fallback."""
     return os.getenv(key, default)
 
+def get_env_bool(key: str, default: bool) -> bool:
+    """Get a boolean value (1/true/yes/on or 0/false/no/off) from environment variables with a default fallback."""
+    value = os.getenv(key)
+    if value is None:
+        return default
+    value = value.strip().lower()
+    if value in ("1", "true", "yes", "on"):
+        return True
+    if value in ("0", "false", "no", "off"):
+        return False
+    return default
+
 def get_access_token_expire_minutes() -> int:
     """Get the access token expiration time in minutes from environment or default."""
     return get_env_int(
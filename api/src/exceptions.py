@@ -17,9 +17,11 @@ class ErrorCode(Enum):
     # Flight errors
     FLIGHT_NOT_FOUND = "FLIGHT_NOT_FOUND"
     FLIGHT_NOT_AVAILABLE = "FLIGHT_NOT_AVAILABLE"
+    FLIGHT_SOLD_OUT = "FLIGHT_SOLD_OUT"
     INVALID_DATE_FORMAT = "INVALID_DATE_FORMAT"
     INVALID_FLIGHT_TIMES = "INVALID_FLIGHT_TIMES"
     INVALID_FLIGHT_PRICE = "INVALID_FLIGHT_PRICE"
+    INVALID_LAYOVER_WINDOW = "INVALID_LAYOVER_WINDOW"
     
     # Booking errors
     BOOKING_NOT_FOUND = "BOOKING_NOT_FOUND"
@@ -31,6 +33,8 @@ class ErrorCode(Enum):
     # Chat errors
     CHAT_MESSAGE_SAVE_FAILED = "CHAT_MESSAGE_SAVE_FAILED"
     AGENT_INVOCATION_FAILED = "AGENT_INVOCATION_FAILED"
+    INVALID_SEARCH_QUERY = "INVALID_SEARCH_QUERY"
+    INVALID_SEARCH_CURSOR = "INVALID_SEARCH_CURSOR"
     
     # Speech errors
     SPEECH_SERVICE_NOT_CONFIGURED = "SPEECH_SERVICE_NOT_CONFIGURED"
@@ -103,6 +107,15 @@ class FlightNotAvailableError(ApiException):
         )
 
 
+class FlightSoldOutError(ApiException):
+    def __init__(self, flight_id: int):
+        super().__init__(
+            ErrorCode.FLIGHT_SOLD_OUT,
+            f"Flight {flight_id} has no seats left",
+            {"flight_id": flight_id}
+        )
+
+
 class InvalidDateFormatError(ApiException):
     def __init__(self, date_string: str):
         super().__init__(
@@ -130,6 +143,15 @@ class InvalidFlightPriceError(ApiException):
         )
 
 
+class InvalidLayoverWindowError(ApiException):
+    def __init__(self, min_layover_minutes: int, max_layover_minutes: int):
+        super().__init__(
+            ErrorCode.INVALID_LAYOVER_WINDOW,
+            f"Minimum layover ({min_layover_minutes} min) must not exceed maximum layover ({max_layover_minutes} min)",
+            {"min_layover_minutes": min_layover_minutes, "max_layover_minutes": max_layover_minutes}
+        )
+
+
 # Booking-related exceptions
 class BookingNotFoundError(ApiException):
     def __init__(self, booking_id: int):
@@ -195,6 +217,24 @@ class AgentInvocationFailedError(ApiException):
         )
 
 
+class InvalidSearchQueryError(ApiException):
+    def __init__(self, query: str):
+        super().__init__(
+            ErrorCode.INVALID_SEARCH_QUERY,
+            "Search query must contain at least one word",
+            {"query": query}
+        )
+
+
+class InvalidSearchCursorError(ApiException):
+    def __init__(self, cursor: str):
+        super().__init__(
+            ErrorCode.INVALID_SEARCH_CURSOR,
+            "Invalid search cursor. Use the next_cursor returned by the previous page",
+            {"cursor": cursor}
+        )
+
+
 # Speech-related exceptions
 class SpeechServiceNotConfiguredError(ApiException):
     def __init__(self):
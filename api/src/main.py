@@ -1,8 +1,11 @@
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
-from routers import users_router, flights_router, bookings_router, chat_router, health_check_router, speech_router
+from routers import users_router, flights_router, bookings_router, chat_router, health_check_router, speech_router, metrics_router, airports_router
 from resources.app_resources import app_resources
+from services.health import health_monitor
+from services.checkpoint_retention import checkpoint_retention
 from middleware.auth import JWTAuthMiddleware
+from middleware.request_context import RequestContextMiddleware
 from constants import get_excluded_paths
 
 
@@ -18,12 +21,20 @@ async def lifespan(app: FastAPI):
         
         # Store reference for shutdown
         app.state.app_resources = app_resources
+        
+        # Keep the readiness snapshot fresh in the background
+        await health_monitor.start()
+        
+        # Keep the agent checkpoint database from growing without bound
+        await checkpoint_retention.start()
         logger.info("Application startup completed successfully")
         
         yield
         
         # Shutdown cleanup
         logger.info("Starting application shutdown...")
+        await checkpoint_retention.stop()
+        await health_monitor.stop()
         app_resources.shutdown_all()
         logger.info("Application shutdown completed")
         
@@ -49,6 +60,9 @@ app = FastAPI(
 # Add JWT Authentication Middleware
 app.add_middleware(JWTAuthMiddleware, excluded_paths=get_excluded_paths())
 
+# Outermost middleware: correlation id and request duration cover auth and routing too
+app.add_middleware(RequestContextMiddleware)
+
 # Include routers
 app.include_router(users_router)
 app.include_router(flights_router)
@@ -56,6 +70,8 @@ app.include_router(bookings_router)
 app.include_router(chat_router)
 app.include_router(health_check_router)
 app.include_router(speech_router)
+app.include_router(metrics_router)
+app.include_router(airports_router)
 
 
 @app.get("/")
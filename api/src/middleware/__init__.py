@@ -4,8 +4,10 @@ Contains authentication and other middleware components.
 """
 
 from .auth import JWTAuthMiddleware, create_auth_middleware
+from .request_context import RequestContextMiddleware
 
 __all__ = [
     "JWTAuthMiddleware",
-    "create_auth_middleware"
+    "create_auth_middleware",
+    "RequestContextMiddleware"
 ]
@@ -7,11 +7,14 @@ from fastapi import Request, Response, HTTPException
 from fastapi.security.utils import get_authorization_scheme_param
 from starlette.middleware.base import BaseHTTPMiddleware
 from typing import List, Optional
+import logging
 import re
+import time
 from resources.crypto import crypto_manager
 from resources.database import get_database_session
 from repository.user import UserSqliteRepository
 from resources.logging import get_logger
+from resources.metrics import AUTH_REQUESTS, AUTH_USER_LOOKUP_DURATION
 
 logger = get_logger("auth_middleware")
 
@@ -31,10 +34,17 @@ class JWTAuthMiddleware(BaseHTTPMiddleware):
             "/openapi.json",
             "/redoc",
             "/health",
+            "/health/live",
+            "/health/ready",
+            "/metrics",
             "/users/register",
             "/users/login",
             "/flights/search",  # Public flight search
-            "/flights/list"     # Public flight listing
+            "/flights/list",    # Public flight listing
+            "/flights/search/batch",  # Public multi-route search
+            "/flights/fare-calendar",  # Public cheapest-fare calendar
+            "/flights/connections",  # Public connecting itinerary search
+            "/airports/autocomplete"  # Public airport suggestions for search boxes
         ]
         # Compile regex patterns for excluded paths using a helper method
         self.excluded_patterns = [self._compile_path_pattern(pattern) for pattern in self.excluded_paths]
@@ -47,7 +57,8 @@ class JWTAuthMiddleware(BaseHTTPMiddleware):
         # Escape all regex special characters except for '*'
         escaped = re.escape(pattern)
         # Replace escaped '*' (which is '\*') with '.*' to match any characters
-        regex_pattern = f"^{escaped.replace(r'\*', '.*')}$"
+        body = escaped.replace(r'\*', '.*')
+        regex_pattern = f"^{body}$"
         return re.compile(regex_pattern)
     
     async def dispatch(self, request: Request, call_next):
@@ -58,26 +69,34 @@ class JWTAuthMiddleware(BaseHTTPMiddleware):
         try:
             # Check if the path is excluded from authentication
             if self._is_path_excluded(request.url.path):
-                logger.debug(f"Path {request.url.path} is excluded from authentication")
+                AUTH_REQUESTS.labels("excluded").inc()
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Path %s is excluded from authentication", request.url.path)
                 return await call_next(request)
             
             # Extract JWT token from request
             token = self._extract_token(request)
             if not token:
+                AUTH_REQUESTS.labels("missing_token").inc()
                 logger.warning(f"No token provided for protected endpoint: {request.url.path}")
                 return self._create_unauthorized_response("No authentication token provided")
             
             # Validate token and get user
+            lookup_started = time.perf_counter()
             user = await self._validate_token_and_get_user(token)
+            AUTH_USER_LOOKUP_DURATION.observe(time.perf_counter() - lookup_started)
             if not user:
+                AUTH_REQUESTS.labels("invalid_token").inc()
                 logger.warning(f"Invalid token for endpoint: {request.url.path}")
                 return self._create_unauthorized_response("Invalid or expired token")
             
             # Store user information in request state for use in endpoints
             request.state.current_user = user
             request.state.jwt_token = token
+            AUTH_REQUESTS.labels("authenticated").inc()
             
-            logger.debug(f"Authenticated user {user.email} for endpoint: {request.url.path}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Authenticated user %s for endpoint: %s", user.email, request.url.path)
             
             # Continue to the next middleware or endpoint
             response = await call_next(request)
@@ -125,7 +144,8 @@ class JWTAuthMiddleware(BaseHTTPMiddleware):
             # Validate token using crypto manager
             email = crypto_manager.get_token_subject(token)
             if not email:
-                logger.debug("Token validation failed: no email in token")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Token validation failed: no email in token")
                 return None
             
             # Get user from database
@@ -135,10 +155,12 @@ class JWTAuthMiddleware(BaseHTTPMiddleware):
                 user = user_repository.find_by_email(email)
                 
                 if not user:
-                    logger.debug(f"User not found in database: {email}")
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("User not found in database: %s", email)
                     return None
                 
-                logger.debug(f"Successfully validated user: {email}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Successfully validated user: %s", email)
                 return user
                 
             finally:
@@ -0,0 +1,94 @@
+"""
+Request context middleware for the Flights Chatbot Assistant API.
+Assigns every HTTP request a correlation id, exposes it to log records through
+a context variable, echoes it in the response headers, logs the request duration
+and records per-route latency and database usage metrics.
+"""
+
+import re
+import time
+import uuid
+from typing import Optional
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from constants import ApplicationConstants
+from resources.logging import get_logger, correlation_id_var
+from resources.metrics import (
+    HTTP_REQUEST_DURATION, HTTP_REQUEST_DB_QUERIES, HTTP_REQUEST_DB_DURATION,
+    RequestDbStats, request_db_stats_var
+)
+
+logger = get_logger("request")
+
+# Caller-supplied ids are reused only if they cannot break a log line
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]+$")
+
+
+class RequestContextMiddleware:
+    """
+    Plain ASGI middleware, so it neither spawns a task nor buffers the response
+    the way BaseHTTPMiddleware does.
+    """
+    
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.header_name = ApplicationConstants.REQUEST_ID_HEADER.lower().encode("latin-1")
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        correlation_id = self._get_incoming_request_id(scope) or uuid.uuid4().hex
+        token = correlation_id_var.set(correlation_id)
+        db_stats = RequestDbStats()
+        db_stats_token = request_db_stats_var.set(db_stats)
+        started = time.perf_counter()
+        status_code = 500
+        
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((self.header_name, correlation_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            elapsed = time.perf_counter() - started
+            duration_ms = round(elapsed * 1000, 2)
+            self._record_metrics(scope, status_code, elapsed, db_stats)
+            logger.info(
+                "%s %s -> %s in %sms", scope["method"], scope["path"], status_code, duration_ms,
+                extra={
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status_code": status_code,
+                    "duration_ms": duration_ms,
+                    "db_queries": db_stats.queries
+                }
+            )
+            request_db_stats_var.reset(db_stats_token)
+            correlation_id_var.reset(token)
+    
+    def _record_metrics(self, scope: Scope, status_code: int, elapsed: float, db_stats: RequestDbStats) -> None:
+        """Record latency and database usage under the matched route template."""
+        route = scope.get("route")
+        # Label by template, not raw path, so path parameters cannot explode the series count
+        route_path = getattr(route, "path", None) or "unmatched"
+        method = scope["method"]
+        HTTP_REQUEST_DURATION.labels(method, route_path, status_code).observe(elapsed)
+        HTTP_REQUEST_DB_QUERIES.labels(method, route_path).observe(db_stats.queries)
+        HTTP_REQUEST_DB_DURATION.labels(method, route_path).observe(db_stats.seconds)
+    
+    def _get_incoming_request_id(self, scope: Scope) -> Optional[str]:
+        """Return the caller's request id header if it is safe to reuse."""
+        for name, value in scope.get("headers", []):
+            if name == self.header_name:
+                request_id = value.decode("latin-1")
+                if len(request_id) <= ApplicationConstants.MAX_REQUEST_ID_LENGTH and _VALID_REQUEST_ID.match(request_id):
+                    return request_id
+                return None
+        return None
@@ -1,10 +1,16 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
-from sqlalchemy.orm import declarative_base, relationship
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Text, JSON, Index, DDL, event, text, func
+from sqlalchemy.orm import declarative_base, relationship, query_expression
 import datetime
+from constants import ApplicationConstants
 
 Base = declarative_base()
 
 
+def _initial_seats_available(context) -> int:
+    """A new flight starts with every seat available."""
+    return context.get_current_parameters()["capacity"]
+
+
 class User(Base):
     __tablename__ = 'users'
     id = Column(Integer, primary_key=True, index=True)
@@ -13,23 +19,92 @@ class User(Base):
     password_hash = Column(String, nullable=False)
     phone = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.datetime.now(datetime.timezone.utc))
-    token_expiration = Column(DateTime, nullable=True)
+    token_expiration = Column(DateTime, nullable=True, index=True)
     bookings = relationship('Booking', back_populates='user')
     chatbot_messages = relationship('ChatbotMessage', back_populates='user')
     chat_sessions = relationship('ChatSession', back_populates='user')
 
 
+class Airport(Base):
+    """Reference airport, identified by its IATA code."""
+    __tablename__ = 'airports'
+    code = Column(String(3), primary_key=True)
+    city = Column(String, nullable=False)
+    country = Column(String, nullable=False)
+    aliases = relationship('AirportAlias', back_populates='airport', cascade='all, delete-orphan')
+
+
+class AirportAlias(Base):
+    """
+    Every name an airport is looked up by: its code, its city and other aliases, stored normalized
+    (see airport_key), so a typed name resolves to codes with a primary key lookup.
+    """
+    __tablename__ = 'airport_aliases'
+    alias = Column(String, primary_key=True)
+    code = Column(String(3), ForeignKey('airports.code'), primary_key=True, index=True)
+    airport = relationship('Airport', back_populates='aliases')
+
+
 class Flight(Base):
     __tablename__ = 'flights'
     id = Column(Integer, primary_key=True, index=True)
     origin = Column(String, nullable=False)
     destination = Column(String, nullable=False)
+    # Airports the free-text origin and destination resolve to; NULL when they match no single airport
+    origin_code = Column(String(3), ForeignKey('airports.code'), nullable=True)
+    destination_code = Column(String(3), ForeignKey('airports.code'), nullable=True)
     departure_time = Column(DateTime, nullable=False)
     arrival_time = Column(DateTime, nullable=False)
     airline = Column(String, nullable=False)
     status = Column(String, default='scheduled')
     bookings = relationship('Booking', back_populates='flight')
     price = Column(Integer, nullable=False)
+    # Seat inventory: booking takes a seat and cancelling gives it back in the same transaction.
+    # Nullable only so existing databases can gain the columns; startup backfills them
+    capacity = Column(Integer, nullable=True, default=ApplicationConstants.DEFAULT_FLIGHT_CAPACITY)
+    seats_available = Column(Integer, nullable=True, default=_initial_seats_available)
+    # Bumped by the triggers below on every write so readers that cache flights can fetch only what changed
+    version = Column(Integer, nullable=True, index=True)
+    __table_args__ = (
+        # Search: scheduled flights, optionally within a departure window
+        Index('ix_flights_status_departure_time', 'status', 'departure_time'),
+        # Search sorted by price: the cheapest flights come straight off the index with LIMIT, no sort step
+        Index('ix_flights_status_price', 'status', 'price'),
+        # Search by resolved airport: an exact code lookup instead of a substring scan
+        Index('ix_flights_origin_code_departure_time', 'origin_code', 'departure_time'),
+        Index('ix_flights_destination_code_departure_time', 'destination_code', 'departure_time'),
+    )
+
+
+# Flight length in days. Searches sorted by duration order by this exact expression so its index serves them
+FLIGHT_DURATION = func.julianday(Flight.arrival_time) - func.julianday(Flight.departure_time)
+Index('ix_flights_status_duration', Flight.status, FLIGHT_DURATION)
+
+# Triggers rather than repository code, so seat updates issued as Core statements are versioned too.
+# Writers are serialized by SQLite, so MAX + 1 hands out increasing versions in commit order
+_NEXT_FLIGHT_VERSION = "UPDATE flights SET version = (SELECT COALESCE(MAX(version), 0) + 1 FROM flights) WHERE id = NEW.id;"
+FLIGHT_VERSION_TRIGGERS = [
+    f"CREATE TRIGGER IF NOT EXISTS trg_flights_version_insert AFTER INSERT ON flights "
+    f"BEGIN {_NEXT_FLIGHT_VERSION} END",
+    f"CREATE TRIGGER IF NOT EXISTS trg_flights_version_update AFTER UPDATE OF "
+    f"origin, destination, origin_code, destination_code, departure_time, arrival_time, airline, status, price, capacity, "
+    f"seats_available ON flights "
+    f"BEGIN {_NEXT_FLIGHT_VERSION} END",
+]
+for _trigger in FLIGHT_VERSION_TRIGGERS:
+    event.listen(Flight.__table__, "after_create", DDL(_trigger))
+
+
+class FareCalendarDay(Base):
+    """Cheapest scheduled fare per route and departure day, kept in step with flights by the flight repository."""
+    __tablename__ = 'fare_calendar'
+    # Airport codes of the route, or the free text of flights without a code;
+    # NOCASE so route lookups match flights however the city or code was capitalized
+    origin = Column(String(collation='NOCASE'), primary_key=True)
+    destination = Column(String(collation='NOCASE'), primary_key=True)
+    day = Column(Date, primary_key=True)
+    min_price = Column(Integer, nullable=False)
+    flight_count = Column(Integer, nullable=False)
 
 
 class Booking(Base):
@@ -42,6 +117,17 @@ class Booking(Base):
     cancelled_at = Column(DateTime, nullable=True)
     user = relationship('User', back_populates='bookings')
     flight = relationship('Flight', back_populates='bookings')
+    # User-facing status (booked, completed, cancelled), filled in by queries that select it
+    computed_status = query_expression()
+    __table_args__ = (
+        # A user's bookings, newest first
+        Index('ix_bookings_user_id_booked_at', 'user_id', 'booked_at'),
+        # At most one active booking per user and flight; cancelled bookings are kept as history
+        Index(
+            'uq_bookings_user_id_flight_id_booked', 'user_id', 'flight_id',
+            unique=True, sqlite_where=text("status = 'booked'")
+        ),
+    )
 
 
 class ChatSession(Base):
@@ -53,6 +139,10 @@ class ChatSession(Base):
     updated_at = Column(DateTime, default=datetime.datetime.now(datetime.timezone.utc), onupdate=datetime.datetime.now(datetime.timezone.utc))
     user = relationship('User', back_populates='chat_sessions')
     messages = relationship('ChatbotMessage', back_populates='session')
+    __table_args__ = (
+        # Session list: a user's sessions, most recently updated first
+        Index('ix_chat_sessions_user_id_updated_at', 'user_id', 'updated_at'),
+    )
 
 
 class ChatbotMessage(Base):
@@ -62,6 +152,38 @@ class ChatbotMessage(Base):
     session_id = Column(String, ForeignKey('chat_sessions.id'), nullable=False)
     user_message = Column(Text, nullable=False)
     bot_response = Column(Text, nullable=True)
+    trace = Column(JSON, nullable=True)  # Compact agent trace summary for the turn
     created_at = Column(DateTime, default=datetime.datetime.now(datetime.timezone.utc))
     user = relationship('User', back_populates='chatbot_messages')
     session = relationship('ChatSession', back_populates='messages')
+    __table_args__ = (
+        # Session history in order, counts and deletes per (user, session)
+        Index('ix_chatbot_messages_user_id_session_id_created_at', 'user_id', 'session_id', 'created_at'),
+    )
+
+# Full-text index over chat turns for history search. External content: the text lives only in
+# chatbot_messages and the triggers below keep the index in step with it. user_id is indexed as a
+# token so a search is scoped to one user inside the MATCH instead of filtering every hit afterwards
+CHAT_MESSAGE_SEARCH_TABLE = "chatbot_messages_fts"
+_CHAT_MESSAGE_SEARCH_COLUMNS = "user_message, bot_response, user_id"
+CHAT_MESSAGE_SEARCH_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {CHAT_MESSAGE_SEARCH_TABLE} USING fts5("
+    f"{_CHAT_MESSAGE_SEARCH_COLUMNS}, content='chatbot_messages', content_rowid='id', "
+    f"tokenize='unicode61 remove_diacritics 2')",
+    # Rank by BM25 over the text columns only; the user_id token matches every row of a user
+    f"INSERT INTO {CHAT_MESSAGE_SEARCH_TABLE}({CHAT_MESSAGE_SEARCH_TABLE}, rank) VALUES ('rank', 'bm25(1.0, 1.0, 0.0)')",
+    f"CREATE TRIGGER IF NOT EXISTS trg_chatbot_messages_fts_insert AFTER INSERT ON chatbot_messages "
+    f"BEGIN INSERT INTO {CHAT_MESSAGE_SEARCH_TABLE}(rowid, {_CHAT_MESSAGE_SEARCH_COLUMNS}) "
+    f"VALUES (NEW.id, NEW.user_message, NEW.bot_response, NEW.user_id); END",
+    f"CREATE TRIGGER IF NOT EXISTS trg_chatbot_messages_fts_delete AFTER DELETE ON chatbot_messages "
+    f"BEGIN INSERT INTO {CHAT_MESSAGE_SEARCH_TABLE}({CHAT_MESSAGE_SEARCH_TABLE}, rowid, {_CHAT_MESSAGE_SEARCH_COLUMNS}) "
+    f"VALUES ('delete', OLD.id, OLD.user_message, OLD.bot_response, OLD.user_id); END",
+    f"CREATE TRIGGER IF NOT EXISTS trg_chatbot_messages_fts_update AFTER UPDATE OF "
+    f"{_CHAT_MESSAGE_SEARCH_COLUMNS} ON chatbot_messages "
+    f"BEGIN INSERT INTO {CHAT_MESSAGE_SEARCH_TABLE}({CHAT_MESSAGE_SEARCH_TABLE}, rowid, {_CHAT_MESSAGE_SEARCH_COLUMNS}) "
+    f"VALUES ('delete', OLD.id, OLD.user_message, OLD.bot_response, OLD.user_id); "
+    f"INSERT INTO {CHAT_MESSAGE_SEARCH_TABLE}(rowid, {_CHAT_MESSAGE_SEARCH_COLUMNS}) "
+    f"VALUES (NEW.id, NEW.user_message, NEW.bot_response, NEW.user_id); END",
+]
+for _statement in CHAT_MESSAGE_SEARCH_DDL:
+    event.listen(ChatbotMessage.__table__, "after_create", DDL(_statement))
@@ -1,9 +1,12 @@
 from .user import UserRepository, UserSqliteRepository, create_user_repository
 from .flight import FlightRepository, FlightSqliteRepository, create_flight_repository
 from .booking import BookingRepository, BookingSqliteRepository, create_booking_repository
-from .chatbot_message import ChatbotMessageRepository, ChatbotMessageSqliteRepository, create_chatbot_message_repository
+from .chatbot_message import (
+    ChatbotMessageRepository, ChatbotMessageSqliteRepository, ChatMessageSearchHit, create_chatbot_message_repository
+)
 from .chat_session import ChatSessionRepository, ChatSessionSqliteRepository, create_chat_session_repository
-from models import User, Flight, Booking, ChatbotMessage, ChatSession, Base
+from .airport import AirportRepository, AirportSqliteRepository, create_airport_repository
+from models import User, Flight, Booking, ChatbotMessage, ChatSession, Airport, Base
 
 __all__ = [
     "UserRepository",
@@ -17,14 +20,19 @@ __all__ = [
     "create_booking_repository",
     "ChatbotMessageRepository",
     "ChatbotMessageSqliteRepository",
+    "ChatMessageSearchHit",
     "create_chatbot_message_repository",
     "ChatSessionRepository",
     "ChatSessionSqliteRepository",
     "create_chat_session_repository",
+    "AirportRepository",
+    "AirportSqliteRepository",
+    "create_airport_repository",
     "User",
     "Flight",
     "Booking",
     "ChatbotMessage",
     "ChatSession",
+    "Airport",
     "Base"
 ]
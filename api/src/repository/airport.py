@@ -0,0 +1,65 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session, selectinload
+from fastapi import Depends
+from resources.database import get_database_session
+from resources.airport_data import airport_key
+from models import Airport, AirportAlias
+
+
+class AirportRepository(ABC):
+    """Abstract base class for Airport repository operations."""
+
+    @abstractmethod
+    def find_all(self) -> List[Airport]:
+        """Get all airports with their aliases."""
+        pass
+
+    @abstractmethod
+    def find_by_code(self, code: str) -> Optional[Airport]:
+        """Find an airport by IATA code."""
+        pass
+
+    @abstractmethod
+    def resolve_codes(self, names: List[str]) -> Dict[str, List[str]]:
+        """
+        Map each name to the codes of the airports whose code, city or alias it is exactly, ignoring case
+        and surrounding spaces. Names that match no airport map to an empty list.
+        """
+        pass
+
+
+class AirportSqliteRepository(AirportRepository):
+    """SQLite implementation of AirportRepository."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def find_all(self) -> List[Airport]:
+        """Get all airports with their aliases."""
+        return self.db.query(Airport).options(selectinload(Airport.aliases)).order_by(Airport.code).all()
+
+    def find_by_code(self, code: str) -> Optional[Airport]:
+        """Find an airport by IATA code."""
+        return self.db.query(Airport).filter(Airport.code == code.strip().upper()).first()
+
+    def resolve_codes(self, names: List[str]) -> Dict[str, List[str]]:
+        """
+        Map each name to the codes of the airports whose code, city or alias it is exactly, ignoring case
+        and surrounding spaces. Names that match no airport map to an empty list.
+        """
+        keys = {airport_key(name) for name in names}
+        if not keys:
+            return {}
+        codes_by_alias: Dict[str, List[str]] = {}
+        # One primary key lookup per name, in a single query
+        for alias, code in self.db.query(AirportAlias.alias, AirportAlias.code).filter(
+            AirportAlias.alias.in_(keys)
+        ).order_by(AirportAlias.alias, AirportAlias.code).all():
+            codes_by_alias.setdefault(alias, []).append(code)
+        return {name: codes_by_alias.get(airport_key(name), []) for name in names}
+
+
+def create_airport_repository(db: Session = Depends(get_database_session)) -> AirportRepository:
+    """Dependency injection function to create AirportRepository instance."""
+    return AirportSqliteRepository(db)
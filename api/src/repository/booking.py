@@ -1,12 +1,28 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional, Tuple
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_, func
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session, joinedload, with_expression
+from sqlalchemy import or_, case, func, select, update, literal, bindparam, text, DateTime, Integer, String
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 import datetime
 from fastapi import Depends
 from resources.database import get_database_session
+from repository.flight import refresh_fare_calendar_day
 from models import Booking, Flight
 
+# Statuses shown to users; "completed" is a booking whose flight has departed
+BOOKING_STATUSES = ("booked", "completed", "cancelled")
+
+
+def booking_status_expression(now: Optional[datetime.datetime] = None):
+    """SQL CASE deriving the user-facing booking status. Queries using it must join Flight."""
+    if now is None:
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+    return case(
+        (Booking.status == "cancelled", "cancelled"),
+        (Flight.departure_time <= now, "completed"),
+        else_="booked"
+    )
+
 
 class BookingRepository(ABC):
     """Abstract base class for Booking repository operations."""
@@ -16,21 +32,65 @@ class BookingRepository(ABC):
         """Create a new booking."""
         pass
     
+    @abstractmethod
+    def create_if_available(self, user_id: int, flight_id: int) -> Optional[Booking]:
+        """
+        Atomically book a scheduled flight for a user and take one of its seats.
+        Returns None when the flight is not scheduled, is sold out or the user already has an active booking for it.
+        """
+        pass
+    
+    @abstractmethod
+    def create_many_if_available(self, user_id: int, flight_ids: List[int]) -> List[Booking]:
+        """
+        Book several scheduled flights for a user in one transaction, all or nothing, taking a seat on each.
+        Returns an empty list, booking nothing, if any flight is not scheduled, sold out or already booked by the user.
+        """
+        pass
+    
     @abstractmethod
     def find_by_id(self, booking_id: int) -> Optional[Booking]:
         """Find a booking by ID."""
         pass
     
+    @abstractmethod
+    def find_by_ids(self, booking_ids: List[int]) -> List[Booking]:
+        """Find bookings by ID, in no particular order."""
+        pass
+    
     @abstractmethod
     def find_existing_booking(self, user_id: int, flight_id: int) -> Optional[Booking]:
         """Find existing active booking for user and flight."""
         pass
     
+    @abstractmethod
+    def find_existing_bookings(self, user_id: int, flight_ids: List[int]) -> List[Booking]:
+        """Find the user's active bookings on any of the flights, in no particular order."""
+        pass
+    
     @abstractmethod
     def update_status(self, booking_id: int, status: str, cancelled_at: Optional[datetime.datetime] = None) -> Booking:
         """Update booking status and cancelled_at timestamp."""
         pass
     
+    @abstractmethod
+    def cancel_if_allowed(self, booking_id: int, user_id: int, cancelled_at: datetime.datetime) -> Optional[Booking]:
+        """
+        Atomically cancel a user's active booking whose flight has not departed, giving its seat back.
+        Returns the cancelled booking with its flight, or None when the booking does not match,
+        without telling which condition failed.
+        """
+        pass
+    
+    @abstractmethod
+    def cancel_many_if_allowed(self, booking_ids: List[int], user_id: int, cancelled_at: datetime.datetime) -> List[Booking]:
+        """
+        Cancel several bookings in one transaction, all or nothing, under the same conditions as cancel_if_allowed.
+        Returns the cancelled bookings with their flights in no particular order, or an empty list,
+        cancelling nothing, if any booking does not match.
+        """
+        pass
+    
     @abstractmethod
     def find_by_user_id(self, user_id: int, status_filter: Optional[str] = None) -> List[Booking]:
         """Find all bookings for a user with optional status filter."""
@@ -39,8 +99,19 @@ class BookingRepository(ABC):
     @abstractmethod
     def find_by_user_id_paginated(self, user_id: int, status_filter: Optional[str] = None, 
                                  booked_date: Optional[str] = None, departure_date: Optional[str] = None, 
-                                 page: int = 1, size: int = 10) -> Tuple[List[Booking], int]:
-        """Find all bookings for a user with optional filters and pagination. Returns (bookings, total_count)."""
+                                 page: int = 1, size: int = 10,
+                                 booked_from: Optional[str] = None, booked_to: Optional[str] = None,
+                                 departure_from: Optional[str] = None, departure_to: Optional[str] = None
+                                 ) -> Tuple[List[Booking], int]:
+        """
+        Find all bookings for a user with optional filters and pagination. Returns (bookings, total_count).
+        Date filters take YYYY-MM-DD strings; *_from/*_to bounds are inclusive days and either may be omitted.
+        """
+        pass
+    
+    @abstractmethod
+    def count_by_status(self, user_id: int) -> Dict[str, int]:
+        """Count a user's bookings per computed status (booked, completed, cancelled)."""
         pass
     
     @abstractmethod
@@ -67,9 +138,124 @@ class BookingSqliteRepository(BookingRepository):
         self.db.refresh(booking)
         return booking
     
+    def create_if_available(self, user_id: int, flight_id: int) -> Optional[Booking]:
+        """
+        Atomically book a scheduled flight for a user and take one of its seats.
+        Returns None when the flight is not scheduled, is sold out or the user already has an active booking for it.
+        """
+        if not self._take_seats([flight_id]):
+            self.db.rollback()
+            return None
+        stmt = self._book_scheduled_flight_statement(user_id).returning(Booking.id)
+        booking_id = self.db.execute(stmt, {"flight_id": flight_id}).scalar()
+        if booking_id is None:
+            # Rolling back also returns the seat taken above
+            self.db.rollback()
+            return None
+        self.db.commit()
+        
+        return self.db.query(Booking).options(joinedload(Booking.flight)).filter(Booking.id == booking_id).first()
+    
+    def create_many_if_available(self, user_id: int, flight_ids: List[int]) -> List[Booking]:
+        """
+        Book several scheduled flights for a user in one transaction, all or nothing, taking a seat on each.
+        Returns an empty list, booking nothing, if any flight is not scheduled, sold out or already booked by the user.
+        """
+        if not flight_ids:
+            return []
+        if not self._take_seats(flight_ids):
+            self.db.rollback()
+            return []
+        # The same conditional insert as create_if_available, executed once for all flights
+        stmt = self._book_scheduled_flight_statement(user_id)
+        inserted = self.db.execute(stmt, [{"flight_id": flight_id} for flight_id in flight_ids]).rowcount
+        if inserted != len(flight_ids):
+            self.db.rollback()
+            return []
+        self.db.commit()
+        
+        return self.db.query(Booking).options(joinedload(Booking.flight)).filter(
+            Booking.user_id == user_id,
+            Booking.flight_id.in_(flight_ids),
+            Booking.status == "booked"
+        ).all()
+    
+    def _take_seats(self, flight_ids: List[int]) -> bool:
+        """
+        Take one seat on each scheduled flight with a conditional decrement.
+        Returns False if any flight is not scheduled or has no seat left; the caller must roll back.
+        """
+        flights = Flight.__table__
+        stmt = (
+            update(flights)
+            .where(flights.c.id == bindparam("seat_flight_id"), flights.c.status == "scheduled",
+                   flights.c.seats_available > 0)
+            .values(seats_available=flights.c.seats_available - 1)
+        )
+        taken = self.db.execute(stmt, [{"seat_flight_id": flight_id} for flight_id in flight_ids]).rowcount
+        if taken != len(flight_ids):
+            return False
+        self._refresh_fare_calendar(Flight.id.in_(flight_ids), seats_left=0)
+        return True
+    
+    def _release_seats(self, flight_ids: List[int]) -> Dict[int, Flight]:
+        """
+        Give back one seat on each flight, in the caller's transaction, and refresh the fare calendar
+        of the flights that are back on sale. Returns the updated flights by ID, read from RETURNING.
+        A user has at most one active booking per flight, so each flight is released once.
+        """
+        flights = Flight.__table__
+        rows = self.db.execute(
+            update(flights)
+            .where(flights.c.id.in_(flight_ids))
+            .values(seats_available=flights.c.seats_available + 1)
+            .returning(*flights.c)
+        ).all()
+        # Detached copies: the session's own instances would be expired by the caller's commit
+        released = {row.id: Flight(**row._mapping) for row in rows}
+        for flight in released.values():
+            if flight.seats_available == 1:
+                refresh_fare_calendar_day(self.db, flight)
+        return released
+    
+    def _refresh_fare_calendar(self, flight_clause, seats_left: int) -> None:
+        """
+        Refresh the fare calendar day of each flight matching flight_clause that now has seats_left seats:
+        0 after taking a seat means it just sold out, 1 after releasing one means it is back on sale.
+        """
+        crossed = self.db.query(
+            Flight.origin, Flight.destination, Flight.origin_code, Flight.destination_code, Flight.departure_time
+        ).filter(flight_clause, Flight.seats_available == seats_left).all()
+        for flight in crossed:
+            refresh_fare_calendar_day(self.db, flight)
+    
+    def _book_scheduled_flight_statement(self, user_id: int):
+        """
+        INSERT ... SELECT that books the flight bound as :flight_id only if it is scheduled.
+        The partial unique index turns a concurrent duplicate into a no-op instead of a second booking.
+        """
+        scheduled_flight = select(
+            literal(user_id, Integer),
+            Flight.id,
+            literal("booked", String),
+            literal(datetime.datetime.now(datetime.timezone.utc), DateTime)
+        ).where(Flight.id == bindparam("flight_id"), Flight.status == "scheduled")
+        return (
+            sqlite_insert(Booking.__table__)
+            .from_select(["user_id", "flight_id", "status", "booked_at"], scheduled_flight)
+            .on_conflict_do_nothing(index_elements=["user_id", "flight_id"], index_where=text("status = 'booked'"))
+        )
+    
     def find_by_id(self, booking_id: int) -> Optional[Booking]:
         """Find a booking by ID."""
-        return self.db.query(Booking).filter(Booking.id == booking_id).first()
+        # Callers build responses from the flight, so load it in the same query
+        return self.db.query(Booking).options(joinedload(Booking.flight)).filter(Booking.id == booking_id).first()
+    
+    def find_by_ids(self, booking_ids: List[int]) -> List[Booking]:
+        """Find bookings by ID, in no particular order."""
+        if not booking_ids:
+            return []
+        return self.db.query(Booking).options(joinedload(Booking.flight)).filter(Booking.id.in_(booking_ids)).all()
     
     def find_existing_booking(self, user_id: int, flight_id: int) -> Optional[Booking]:
         """Find existing active booking for user and flight."""
@@ -79,6 +265,16 @@ class BookingSqliteRepository(BookingRepository):
             Booking.status == "booked"
         ).first()
     
+    def find_existing_bookings(self, user_id: int, flight_ids: List[int]) -> List[Booking]:
+        """Find the user's active bookings on any of the flights, in no particular order."""
+        if not flight_ids:
+            return []
+        return self.db.query(Booking).filter(
+            Booking.user_id == user_id,
+            Booking.flight_id.in_(flight_ids),
+            Booking.status == "booked"
+        ).all()
+    
     def update_status(self, booking_id: int, status: str, cancelled_at: Optional[datetime.datetime] = None) -> Booking:
         """Update booking status and cancelled_at timestamp."""
         booking = self.db.query(Booking).filter(Booking.id == booking_id).first()
@@ -93,6 +289,51 @@ class BookingSqliteRepository(BookingRepository):
         self.db.refresh(booking)
         return booking
     
+    def cancel_if_allowed(self, booking_id: int, user_id: int, cancelled_at: datetime.datetime) -> Optional[Booking]:
+        """
+        Atomically cancel a user's active booking whose flight has not departed, giving its seat back.
+        Returns the cancelled booking with its flight, or None when the booking does not match,
+        without telling which condition failed.
+        """
+        cancelled = self._cancel_where(user_id, cancelled_at, Booking.id == booking_id, expected=1)
+        return cancelled[0] if cancelled else None
+    
+    def cancel_many_if_allowed(self, booking_ids: List[int], user_id: int, cancelled_at: datetime.datetime) -> List[Booking]:
+        """
+        Cancel several bookings in one transaction, all or nothing, under the same conditions as cancel_if_allowed.
+        Returns the cancelled bookings with their flights in no particular order, or an empty list,
+        cancelling nothing, if any booking does not match.
+        """
+        if not booking_ids:
+            return []
+        return self._cancel_where(user_id, cancelled_at, Booking.id.in_(booking_ids), expected=len(set(booking_ids)))
+    
+    def _cancel_where(self, user_id: int, cancelled_at: datetime.datetime, id_clause, expected: int) -> List[Booking]:
+        """
+        Run one conditional UPDATE ... RETURNING; give the seats back and commit only if exactly `expected`
+        bookings were cancelled. The bookings and their flights come from RETURNING, so nothing is read back.
+        """
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        upcoming_flight = select(Flight.id).where(Flight.id == Booking.flight_id, Flight.departure_time > now).exists()
+        stmt = (
+            update(Booking)
+            .where(
+                id_clause,
+                Booking.user_id == user_id,
+                Booking.status == "booked",
+                upcoming_flight
+            )
+            .values(status="cancelled", cancelled_at=cancelled_at)
+            .returning(*Booking.__table__.c)
+        )
+        rows = self.db.execute(stmt).all()
+        if len(rows) != expected:
+            self.db.rollback()
+            return []
+        flights = self._release_seats([row.flight_id for row in rows])
+        self.db.commit()
+        return [Booking(**row._mapping, flight=flights[row.flight_id]) for row in rows]
+    
     def find_by_user_id(self, user_id: int, status_filter: Optional[str] = None) -> List[Booking]:
         """Find all bookings for a user with optional status filter."""
         query = self.db.query(Booking).filter(Booking.user_id == user_id)
@@ -121,54 +362,32 @@ class BookingSqliteRepository(BookingRepository):
     
     def find_by_user_id_paginated(self, user_id: int, status_filter: Optional[str] = None, 
                                  booked_date: Optional[str] = None, departure_date: Optional[str] = None, 
-                                 page: int = 1, size: int = 10) -> Tuple[List[Booking], int]:
-        """Find all bookings for a user with optional filters and pagination. Returns (bookings, total_count)."""
-        query = self.db.query(Booking).join(Flight).filter(Booking.user_id == user_id)
-        
-        # Apply status filter
-        if status_filter:
-            now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
-            if status_filter == "booked":
-                # Show active bookings for upcoming flights
-                query = query.filter(
-                    and_(
-                        Booking.status == "booked",
-                        Flight.departure_time > now
-                    )
-                )
-            elif status_filter == "completed":
-                # Show booked flights that have already departed
-                query = query.filter(
-                    and_(
-                        Booking.status == "booked",
-                        Flight.departure_time <= now
-                    )
-                )
-            elif status_filter == "cancelled":
-                # Show cancelled bookings
-                query = query.filter(Booking.status == "cancelled")
+                                 page: int = 1, size: int = 10,
+                                 booked_from: Optional[str] = None, booked_to: Optional[str] = None,
+                                 departure_from: Optional[str] = None, departure_to: Optional[str] = None
+                                 ) -> Tuple[List[Booking], int]:
+        """
+        Find all bookings for a user with optional filters and pagination. Returns (bookings, total_count).
+        Date filters take YYYY-MM-DD strings; *_from/*_to bounds are inclusive days and either may be omitted.
+        """
+        # The computed status is selected with the rows, so filtering and conversion agree on it
+        status_expr = booking_status_expression()
+        query = (
+            self.db.query(Booking)
+            .join(Flight)
+            .filter(Booking.user_id == user_id)
+            .options(with_expression(Booking.computed_status, status_expr))
+        )
         
-        # Apply booking date filter
-        if booked_date:
-            try:
-                # Parse the date string (expected format: YYYY-MM-DD)
-                filter_date = datetime.datetime.strptime(booked_date, "%Y-%m-%d").date()
-                # Filter by the date part of booked_at
-                query = query.filter(func.date(Booking.booked_at) == filter_date)
-            except ValueError:
-                # If date parsing fails, ignore the filter
-                pass
+        # Apply status filter; unknown values are ignored
+        if status_filter in BOOKING_STATUSES:
+            query = query.filter(status_expr == status_filter)
         
-        # Apply departure date filter
-        if departure_date:
-            try:
-                # Parse the date string (expected format: YYYY-MM-DD)
-                filter_date = datetime.datetime.strptime(departure_date, "%Y-%m-%d").date()
-                # Filter by the date part of flight departure_time
-                query = query.filter(func.date(Flight.departure_time) == filter_date)
-            except ValueError:
-                # If date parsing fails, ignore the filter
-                pass
+        # Date filters are half-open datetime ranges on the raw columns, so they stay index-friendly
+        query = self._filter_days(query, Booking.booked_at, booked_date, booked_date)
+        query = self._filter_days(query, Booking.booked_at, booked_from, booked_to)
+        query = self._filter_days(query, Flight.departure_time, departure_date, departure_date)
+        query = self._filter_days(query, Flight.departure_time, departure_from, departure_to)
         
         # Get total count before pagination
         total = query.count()
@@ -179,12 +398,49 @@ class BookingSqliteRepository(BookingRepository):
         
         return bookings, total
     
+    def count_by_status(self, user_id: int) -> Dict[str, int]:
+        """Count a user's bookings per computed status (booked, completed, cancelled)."""
+        status_expr = booking_status_expression()
+        rows = (
+            self.db.query(status_expr, func.count(Booking.id))
+            .select_from(Booking)
+            .join(Flight)
+            .filter(Booking.user_id == user_id)
+            .group_by(status_expr)
+            .all()
+        )
+        counts = dict.fromkeys(BOOKING_STATUSES, 0)
+        counts.update({status: count for status, count in rows})
+        return counts
+    
+    @staticmethod
+    def _parse_day(value: Optional[str]) -> Optional[datetime.datetime]:
+        """Parse a YYYY-MM-DD string to midnight of that day; invalid dates are ignored."""
+        if not value:
+            return None
+        try:
+            return datetime.datetime.strptime(value, "%Y-%m-%d")
+        except ValueError:
+            return None
+    
+    def _filter_days(self, query, column, first_day: Optional[str], last_day: Optional[str]):
+        """Restrict column to [first_day 00:00, last_day + 1 day 00:00) without wrapping it in a function."""
+        start = self._parse_day(first_day)
+        end = self._parse_day(last_day)
+        if start:
+            query = query.filter(column >= start)
+        if end:
+            query = query.filter(column < end + datetime.timedelta(days=1))
+        return query
+    
     def delete_by_id(self, booking_id: int) -> bool:
         """Delete a booking by ID. Returns True if deleted, False if not found."""
         booking = self.db.query(Booking).filter(Booking.id == booking_id).first()
         if not booking:
             return False
         
+        if booking.status == "booked":
+            self._release_seats([booking.flight_id])
         self.db.delete(booking)
         self.db.commit()
         return True
@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import List, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, func
+from sqlalchemy import and_, desc, func
 from fastapi import Depends
 from resources.database import get_database_session
 from models import ChatSession, ChatbotMessage
@@ -26,6 +26,11 @@ class ChatSessionRepository(ABC):
         """Find all chat sessions for a user."""
         pass
     
+    @abstractmethod
+    def find_all_ids(self) -> List[str]:
+        """Get the IDs of all chat sessions."""
+        pass
+    
     @abstractmethod
     def find_by_user_and_session(self, user_id: int, session_id: str) -> Optional[ChatSession]:
         """Find a specific session for a user."""
@@ -77,6 +82,10 @@ class ChatSessionSqliteRepository(ChatSessionRepository):
             ChatSession.user_id == user_id
         ).order_by(desc(ChatSession.updated_at)).all()
     
+    def find_all_ids(self) -> List[str]:
+        """Get the IDs of all chat sessions."""
+        return [row[0] for row in self.db.query(ChatSession.id).all()]
+    
     def find_by_user_and_session(self, user_id: int, session_id: str) -> Optional[ChatSession]:
         """Find a specific session for a user."""
         return self.db.query(ChatSession).filter(
@@ -108,7 +117,11 @@ class ChatSessionSqliteRepository(ChatSessionRepository):
             ChatSession,
             func.count(ChatbotMessage.id).label('message_count')
         ).outerjoin(
-            ChatbotMessage, ChatSession.id == ChatbotMessage.session_id
+            # Joining on user_id too lets each session's count use the (user_id, session_id) message index
+            ChatbotMessage, and_(
+                ChatbotMessage.user_id == ChatSession.user_id,
+                ChatbotMessage.session_id == ChatSession.id
+            )
         ).filter(
             ChatSession.user_id == user_id
         ).group_by(
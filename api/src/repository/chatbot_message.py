@@ -1,19 +1,42 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, text, DateTime
 import datetime
 from fastapi import Depends
 from resources.database import get_database_session
-from models import ChatbotMessage
+from models import ChatbotMessage, CHAT_MESSAGE_SEARCH_TABLE
+from constants import ApplicationConstants
+
+
+class ChatMessageSearchHit(NamedTuple):
+    """One chat turn matching a history search, with highlighted excerpts of the message and response."""
+    id: int
+    session_id: str
+    session_alias: Optional[str]
+    created_at: datetime.datetime
+    rank: float
+    message_snippet: str
+    response_snippet: str
+
+
+def _match_expression(user_id: int, terms: List[str]) -> str:
+    """
+    FTS5 query for the user's turns containing every term in the message or the response. Terms are quoted
+    so they are never read as query syntax. Whole words only: a prefix term cannot seek through the index
+    and reads every matching word's postings across all users.
+    """
+    phrases = ['"' + term.replace('"', '""') + '"' for term in terms]
+    return f'user_id:"{user_id}" AND {{user_message bot_response}}: ({" ".join(phrases)})'
 
 
 class ChatbotMessageRepository(ABC):
     """Abstract base class for ChatbotMessage repository operations."""
     
     @abstractmethod
-    def create(self, user_id: int, session_id: str, message: str, response: str) -> ChatbotMessage:
-        """Create a new chatbot message with session ID."""
+    def create(self, user_id: int, session_id: str, message: str, response: str,
+               trace: Optional[Dict[str, Any]] = None) -> ChatbotMessage:
+        """Create a new chatbot message with session ID and optional agent trace."""
         pass
     
     @abstractmethod
@@ -50,6 +73,16 @@ class ChatbotMessageRepository(ABC):
     def get_user_sessions(self, user_id: int) -> List[str]:
         """Get all unique session IDs for a user."""
         pass
+    
+    @abstractmethod
+    def search(self, user_id: int, terms: List[str], limit: int = 20,
+               after: Optional[Tuple[float, int]] = None) -> List[ChatMessageSearchHit]:
+        """
+        Search a user's messages and responses across sessions for turns containing every term, best match
+        first. Pass the (rank, id) of the last hit of a page as after to get the next page; the page resumes
+        after that hit's current rank, so rank changes from other users' writes do not skip or repeat hits.
+        """
+        pass
 
 
 class ChatbotMessageSqliteRepository(ChatbotMessageRepository):
@@ -58,13 +91,15 @@ class ChatbotMessageSqliteRepository(ChatbotMessageRepository):
     def __init__(self, db: Session):
         self.db = db
     
-    def create(self, user_id: int, session_id: str, message: str, response: str) -> ChatbotMessage:
-        """Create a new chatbot message with session ID."""
+    def create(self, user_id: int, session_id: str, message: str, response: str,
+               trace: Optional[Dict[str, Any]] = None) -> ChatbotMessage:
+        """Create a new chatbot message with session ID and optional agent trace."""
         chat_message = ChatbotMessage(
             user_id=user_id,
             session_id=session_id,
             user_message=message,
             bot_response=response,
+            trace=trace,
             created_at=datetime.datetime.now(datetime.UTC)
         )
         self.db.add(chat_message)
@@ -123,6 +158,47 @@ class ChatbotMessageSqliteRepository(ChatbotMessageRepository):
             ChatbotMessage.user_id == user_id
         ).distinct().all()
         return [row[0] for row in result]
+    
+    def search(self, user_id: int, terms: List[str], limit: int = 20,
+               after: Optional[Tuple[float, int]] = None) -> List[ChatMessageSearchHit]:
+        """
+        Search a user's messages and responses across sessions for turns containing every term, best match
+        first. Pass the (rank, id) of the last hit of a page as after to get the next page; the page resumes
+        after that hit's current rank, so rank changes from other users' writes do not skip or repeat hits.
+        """
+        if not terms or limit < 1:
+            return []
+        fts = CHAT_MESSAGE_SEARCH_TABLE
+        tokens = ApplicationConstants.CHAT_SEARCH_SNIPPET_TOKENS
+        # Keyset on (rank, id), no OFFSET rows to skip on deep pages. bm25 ranks use corpus-wide statistics, so
+        # every write, by any user, shifts them between pages: resume from the last hit's rank as this statement
+        # sees it, and from its old rank only once it stops matching. Not a snapshot: a shift in the average
+        # message length can still reorder two hits of different lengths and repeat or skip one of them.
+        anchor = (f"COALESCE((SELECT rank FROM {fts} WHERE {fts} MATCH :match AND rowid = :after_id), "
+                  f":after_rank)")
+        keyset = f"AND ({fts}.rank > {anchor} OR ({fts}.rank = {anchor} AND m.id > :after_id)) " if after else ""
+        statement = text(
+            f"SELECT m.id, m.session_id, s.alias AS session_alias, m.created_at, {fts}.rank, "
+            f"snippet({fts}, 0, :mark_start, :mark_end, :ellipsis, {tokens}) AS message_snippet, "
+            f"snippet({fts}, 1, :mark_start, :mark_end, :ellipsis, {tokens}) AS response_snippet "
+            f"FROM {fts} "
+            f"JOIN chatbot_messages AS m ON m.id = {fts}.rowid "
+            f"LEFT JOIN chat_sessions AS s ON s.id = m.session_id "
+            f"WHERE {fts} MATCH :match AND m.user_id = :user_id {keyset}"
+            f"ORDER BY {fts}.rank, m.id LIMIT :limit"
+        ).columns(created_at=DateTime)
+        params = {
+            "match": _match_expression(user_id, terms), "user_id": user_id, "limit": limit,
+            "mark_start": ApplicationConstants.CHAT_SEARCH_HIGHLIGHT_START,
+            "mark_end": ApplicationConstants.CHAT_SEARCH_HIGHLIGHT_END, "ellipsis": "…",
+        }
+        if after:
+            params["after_rank"], params["after_id"] = after
+        return [
+            ChatMessageSearchHit(row.id, row.session_id, row.session_alias, row.created_at, row.rank,
+                                 row.message_snippet or "", row.response_snippet or "")
+            for row in self.db.execute(statement, params)
+        ]
 
 
 def create_chatbot_message_repository(db: Session = Depends(get_database_session)) -> ChatbotMessageRepository:
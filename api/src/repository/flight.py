@@ -1,10 +1,65 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
+from sqlalchemy import func, delete, and_, or_, cast, Integer
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from datetime import date, datetime, timedelta
 from fastapi import Depends
 from resources.database import get_database_session
-from models import Flight
+from resources.flight_catalog import FlightCatalog, flight_catalog
+from repository.airport import AirportSqliteRepository
+from models import Flight, FareCalendarDay, FLIGHT_DURATION
+from constants import ApplicationConstants
+
+# Search orders end on id so pages are stable; each one is served by an index that starts with status
+SEARCH_ORDERS = {
+    "departure": (Flight.departure_time, Flight.id),
+    "price": (Flight.price, Flight.id),
+    "duration": (FLIGHT_DURATION, Flight.id),
+}
+
+
+def refresh_fare_calendar_day(db: Session, flight) -> None:
+    """
+    Recompute the fare calendar row of a flight's route and departure day, in the caller's transaction.
+    Routes are keyed on airport codes, or on the free text where a flight has no code. Like search, only
+    scheduled flights with free seats count, so seat changes that sell a flight out or put it back on sale
+    must refresh the day as well.
+    """
+    db.flush()
+    origin = flight.origin_code or flight.origin
+    destination = flight.destination_code or flight.destination
+    day = flight.departure_time.date()
+    start = datetime.combine(day, datetime.min.time())
+    min_price, flight_count = db.query(func.min(Flight.price), func.count(Flight.id)).filter(
+        Flight.status == "scheduled",
+        Flight.seats_available > 0,
+        Flight.departure_time >= start,
+        Flight.departure_time < start + timedelta(days=1),
+        _calendar_route_end(Flight.origin, Flight.origin_code, flight.origin, flight.origin_code),
+        _calendar_route_end(Flight.destination, Flight.destination_code, flight.destination, flight.destination_code)
+    ).one()
+    
+    calendar = FareCalendarDay.__table__
+    if not flight_count:
+        db.execute(delete(calendar).where(
+            calendar.c.origin == origin, calendar.c.destination == destination, calendar.c.day == day
+        ))
+        return
+    stmt = sqlite_insert(calendar).values(
+        origin=origin, destination=destination, day=day, min_price=min_price, flight_count=flight_count
+    )
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["origin", "destination", "day"],
+        set_={"min_price": stmt.excluded.min_price, "flight_count": stmt.excluded.flight_count}
+    ))
+
+
+def _calendar_route_end(name_column, code_column, name: str, code: Optional[str]):
+    """Flights sharing a calendar route end: the same airport code, or the same text among flights without one."""
+    if code:
+        return code_column == code
+    return and_(code_column.is_(None), name_column.collate("NOCASE") == name)
 
 
 class FlightRepository(ABC):
@@ -12,8 +67,9 @@ class FlightRepository(ABC):
     
     @abstractmethod
     def create(self, origin: str, destination: str, departure_time: datetime, 
-               arrival_time: datetime, airline: str, price: int, status: str = "scheduled") -> Flight:
-        """Create a new flight."""
+               arrival_time: datetime, airline: str, price: int, status: str = "scheduled",
+               capacity: Optional[int] = None) -> Flight:
+        """Create a new flight with all seats available; capacity defaults to the standard aircraft."""
         pass
     
     @abstractmethod
@@ -23,8 +79,27 @@ class FlightRepository(ABC):
     
     @abstractmethod
     def search_flights(self, origin: Optional[str] = None, destination: Optional[str] = None, 
-                      departure_date: Optional[str] = None, page: int = 1, size: int = 10) -> tuple[List[Flight], int]:
-        """Search for flights by origin, destination, and departure date with pagination."""
+                      departure_date: Optional[str] = None, page: int = 1, size: int = 10,
+                      min_price: Optional[float] = None, max_price: Optional[float] = None, airline: Optional[str] = None,
+                      departure_hour_from: Optional[int] = None, departure_hour_to: Optional[int] = None,
+                      sort_by: str = "departure") -> tuple[List[Flight], int]:
+        """
+        Search for scheduled flights with free seats by origin, destination, departure date, price range, airline
+        and departure hour, sorted by departure, price or duration, with pagination.
+        """
+        pass
+    
+    @abstractmethod
+    def search_flights_between(self, origin: Optional[str], destination: Optional[str], first_day: date, last_day: date,
+                               min_price: Optional[float] = None, max_price: Optional[float] = None,
+                               airline: Optional[str] = None, departure_hour_from: Optional[int] = None,
+                               departure_hour_to: Optional[int] = None, sort_by: str = "departure") -> List[Flight]:
+        """Search scheduled flights with free seats departing from first_day through last_day, with the search filters."""
+        pass
+    
+    @abstractmethod
+    def search_flights_many(self, routes: List[tuple[str, str, date]]) -> List[List[Flight]]:
+        """Search scheduled flights with free seats for several (origin, destination, day) routes in one query."""
         pass
     
     @abstractmethod
@@ -36,6 +111,36 @@ class FlightRepository(ABC):
     def find_available_by_id(self, flight_id: int) -> Optional[Flight]:
         """Find an available (scheduled) flight by ID."""
         pass
+    
+    @abstractmethod
+    def find_available_by_ids(self, flight_ids: List[int]) -> List[Flight]:
+        """Find the available (scheduled) flights among the given IDs."""
+        pass
+    
+    @abstractmethod
+    def find_scheduled_departing_after(self, after: datetime) -> List[Flight]:
+        """Find all scheduled flights departing at or after the given time, ordered by departure."""
+        pass
+    
+    @abstractmethod
+    def resolve_airport_codes(self, names: List[str]) -> Dict[str, List[str]]:
+        """Map each name to the codes of the airports it is the code, city or alias of; empty for other names."""
+        pass
+    
+    @abstractmethod
+    def get_latest_version(self) -> int:
+        """Get the newest flight version, 0 when no flight has been written."""
+        pass
+    
+    @abstractmethod
+    def find_written_after(self, version: int) -> List[Flight]:
+        """Find the flights created or changed after the given version, whatever their status."""
+        pass
+    
+    @abstractmethod
+    def get_fare_calendar(self, origin: str, destination: str, first_day: date, last_day: date) -> List[FareCalendarDay]:
+        """Get the cheapest fare and number of bookable flights per day on a route, for days that have any."""
+        pass
 
 
 class FlightSqliteRepository(FlightRepository):
@@ -43,20 +148,30 @@ class FlightSqliteRepository(FlightRepository):
     
     def __init__(self, db: Session):
         self.db = db
+        self.airports = AirportSqliteRepository(db)
     
     def create(self, origin: str, destination: str, departure_time: datetime, 
-               arrival_time: datetime, airline: str, price: int, status: str = "scheduled") -> Flight:
-        """Create a new flight."""
+               arrival_time: datetime, airline: str, price: int, status: str = "scheduled",
+               capacity: Optional[int] = None) -> Flight:
+        """
+        Create a new flight with all seats available; capacity defaults to the standard aircraft.
+        Origin and destination get the code of the one airport they name, if any.
+        """
+        codes = self.airports.resolve_codes([origin, destination])
         flight = Flight(
             origin=origin,
             destination=destination,
+            origin_code=codes[origin][0] if len(codes[origin]) == 1 else None,
+            destination_code=codes[destination][0] if len(codes[destination]) == 1 else None,
             departure_time=departure_time,
             arrival_time=arrival_time,
             airline=airline,
             price=price,
-            status=status
+            status=status,
+            capacity=capacity or ApplicationConstants.DEFAULT_FLIGHT_CAPACITY
         )
         self.db.add(flight)
+        refresh_fare_calendar_day(self.db, flight)
         self.db.commit()
         self.db.refresh(flight)
         return flight
@@ -66,16 +181,20 @@ class FlightSqliteRepository(FlightRepository):
         return self.db.query(Flight).filter(Flight.id == flight_id).first()
     
     def search_flights(self, origin: Optional[str] = None, destination: Optional[str] = None, 
-                      departure_date: Optional[str] = None, page: int = 1, size: int = 10) -> tuple[List[Flight], int]:
-        """Search for flights by origin, destination, and departure date with pagination."""
-        query = self.db.query(Flight).filter(Flight.status == "scheduled")
+                      departure_date: Optional[str] = None, page: int = 1, size: int = 10,
+                      min_price: Optional[float] = None, max_price: Optional[float] = None, airline: Optional[str] = None,
+                      departure_hour_from: Optional[int] = None, departure_hour_to: Optional[int] = None,
+                      sort_by: str = "departure") -> tuple[List[Flight], int]:
+        """
+        Search for scheduled flights with free seats by origin, destination, departure date, price range, airline
+        and departure hour, sorted by departure, price or duration, with pagination.
+        """
+        # Sold-out flights are filtered on the seat counter, not by counting bookings
+        query = self.db.query(Flight).filter(Flight.status == "scheduled", Flight.seats_available > 0)
         
         # Apply filters only if parameters are provided
-        if origin:
-            query = query.filter(Flight.origin.ilike(f"%{origin}%"))
-        
-        if destination:
-            query = query.filter(Flight.destination.ilike(f"%{destination}%"))
+        query = self._apply_search_filters(query, origin, destination, min_price, max_price, airline,
+                                           departure_hour_from, departure_hour_to)
         
         if departure_date:
             try:
@@ -90,12 +209,98 @@ class FlightSqliteRepository(FlightRepository):
         # Get total count before applying pagination
         total = query.count()
         
-        # Apply pagination
+        # Apply pagination; with an index in the sort order the first page is read straight off it
         offset = (page - 1) * size
-        flights = query.offset(offset).limit(size).all()
+        flights = query.order_by(*SEARCH_ORDERS[sort_by]).offset(offset).limit(size).all()
         
         return flights, total
     
+    def search_flights_between(self, origin: Optional[str], destination: Optional[str], first_day: date, last_day: date,
+                               min_price: Optional[float] = None, max_price: Optional[float] = None,
+                               airline: Optional[str] = None, departure_hour_from: Optional[int] = None,
+                               departure_hour_to: Optional[int] = None, sort_by: str = "departure") -> List[Flight]:
+        """Search scheduled flights with free seats departing from first_day through last_day, with the search filters."""
+        # One range over the status/departure index covers the whole window
+        query = self.db.query(Flight).filter(
+            Flight.status == "scheduled",
+            Flight.departure_time >= datetime.combine(first_day, datetime.min.time()),
+            Flight.departure_time < datetime.combine(last_day + timedelta(days=1), datetime.min.time()),
+            Flight.seats_available > 0
+        )
+        query = self._apply_search_filters(query, origin, destination, min_price, max_price, airline,
+                                           departure_hour_from, departure_hour_to)
+        return query.order_by(*SEARCH_ORDERS[sort_by]).all()
+    
+    def _apply_search_filters(self, query, origin: Optional[str], destination: Optional[str],
+                              min_price: Optional[float], max_price: Optional[float], airline: Optional[str],
+                              departure_hour_from: Optional[int], departure_hour_to: Optional[int]):
+        """Add the optional search filters shared by the flight searches to a query."""
+        codes = self.airports.resolve_codes([name for name in (origin, destination) if name])
+        if origin:
+            query = query.filter(self._airport_condition(Flight.origin, Flight.origin_code, origin, codes[origin]))
+        if destination:
+            query = query.filter(self._airport_condition(
+                Flight.destination, Flight.destination_code, destination, codes[destination]
+            ))
+        if min_price is not None:
+            query = query.filter(Flight.price >= min_price)
+        if max_price is not None:
+            query = query.filter(Flight.price <= max_price)
+        if airline:
+            query = query.filter(Flight.airline.ilike(f"%{airline}%"))
+        if departure_hour_from is not None or departure_hour_to is not None:
+            hour = cast(func.strftime("%H", Flight.departure_time), Integer)
+            first_hour = 0 if departure_hour_from is None else departure_hour_from
+            last_hour = 23 if departure_hour_to is None else departure_hour_to
+            if first_hour <= last_hour:
+                query = query.filter(hour.between(first_hour, last_hour))
+            else:
+                # A window such as 22-5 runs past midnight
+                query = query.filter(or_(hour >= first_hour, hour <= last_hour))
+        return query
+    
+    def _airport_condition(self, name_column, code_column, name: str, codes: List[str]):
+        """Exact code lookup when name is an airport code, city or alias; substring match on the free text otherwise."""
+        if codes:
+            return code_column.in_(codes)
+        return name_column.ilike(f"%{name}%")
+    
+    def search_flights_many(self, routes: List[tuple[str, str, date]]) -> List[List[Flight]]:
+        """Search scheduled flights with free seats for several (origin, destination, day) routes in one query."""
+        if not routes:
+            return []
+        
+        codes = self.airports.resolve_codes([name for origin, destination, _ in routes for name in (origin, destination)])
+        conditions = []
+        for origin, destination, day in routes:
+            start = datetime.combine(day, datetime.min.time())
+            # Status and day stay in every branch so each one is a range on the status/departure index
+            conditions.append(and_(
+                Flight.status == "scheduled",
+                Flight.departure_time >= start,
+                Flight.departure_time < start + timedelta(days=1),
+                self._airport_condition(Flight.origin, Flight.origin_code, origin, codes[origin]),
+                self._airport_condition(Flight.destination, Flight.destination_code, destination, codes[destination])
+            ))
+        flights = self.db.query(Flight).filter(
+            or_(*conditions), Flight.seats_available > 0
+        ).order_by(Flight.departure_time, Flight.id).all()
+        
+        def matches(name: str, airport_codes: List[str], text: str, code: Optional[str]) -> bool:
+            # Same match as the query: airport code when resolved, case-insensitive substring otherwise
+            return code in airport_codes if airport_codes else name.lower() in text.lower()
+        
+        # Hand each flight to every route it matches
+        results = []
+        for origin, destination, day in routes:
+            results.append([
+                flight for flight in flights
+                if flight.departure_time.date() == day
+                and matches(origin, codes[origin], flight.origin, flight.origin_code)
+                and matches(destination, codes[destination], flight.destination, flight.destination_code)
+            ])
+        return results
+    
     def list_all(self, page: int = 1, size: int = 10) -> tuple[List[Flight], int]:
         """Get all flights with pagination."""
         query = self.db.query(Flight)
@@ -115,8 +320,96 @@ class FlightSqliteRepository(FlightRepository):
             Flight.id == flight_id, 
             Flight.status == "scheduled"
         ).first()
+    
+    def find_available_by_ids(self, flight_ids: List[int]) -> List[Flight]:
+        """Find the available (scheduled) flights among the given IDs."""
+        if not flight_ids:
+            return []
+        return self.db.query(Flight).filter(
+            Flight.id.in_(flight_ids),
+            Flight.status == "scheduled"
+        ).all()
+    
+    def find_scheduled_departing_after(self, after: datetime) -> List[Flight]:
+        """Find all scheduled flights departing at or after the given time, ordered by departure."""
+        return self.db.query(Flight).filter(
+            Flight.status == "scheduled",
+            Flight.departure_time >= after
+        ).order_by(Flight.departure_time).all()
+    
+    def resolve_airport_codes(self, names: List[str]) -> Dict[str, List[str]]:
+        """Map each name to the codes of the airports it is the code, city or alias of; empty for other names."""
+        return self.airports.resolve_codes(names)
+    
+    def get_latest_version(self) -> int:
+        """Get the newest flight version, 0 when no flight has been written."""
+        return self.db.query(func.max(Flight.version)).scalar() or 0
+    
+    def find_written_after(self, version: int) -> List[Flight]:
+        """Find the flights created or changed after the given version, whatever their status."""
+        return self.db.query(Flight).filter(Flight.version > version).all()
+    
+    def get_fare_calendar(self, origin: str, destination: str, first_day: date, last_day: date) -> List[FareCalendarDay]:
+        """
+        Get the cheapest fare and number of bookable flights per day on a route, for days that have any.
+        Origin and destination match the codes of the airports they name, and the text of flights without codes.
+        """
+        codes = self.airports.resolve_codes([origin, destination])
+        # Range reads on the rollup's primary key instead of a search per day. A city with several
+        # airports spans several calendar routes, which are merged per day
+        days = self.db.query(
+            FareCalendarDay.day, func.min(FareCalendarDay.min_price), func.sum(FareCalendarDay.flight_count)
+        ).filter(
+            FareCalendarDay.origin.in_(codes[origin] + [origin]),
+            FareCalendarDay.destination.in_(codes[destination] + [destination]),
+            FareCalendarDay.day >= first_day,
+            FareCalendarDay.day <= last_day
+        ).group_by(FareCalendarDay.day).order_by(FareCalendarDay.day).all()
+        return [
+            FareCalendarDay(origin=origin, destination=destination, day=day, min_price=min_price, flight_count=flight_count)
+            for day, min_price, flight_count in days
+        ]
+
+
+class FlightCatalogSqliteRepository(FlightSqliteRepository):
+    """
+    FlightSqliteRepository that serves search_flights and list_all from the in-memory flight catalog.
+    Those two return read-only CatalogFlight snapshots; every other method reads and writes SQLite.
+    """
+    
+    def __init__(self, db: Session, catalog: FlightCatalog = flight_catalog):
+        super().__init__(db)
+        self.catalog = catalog
+    
+    def search_flights(self, origin: Optional[str] = None, destination: Optional[str] = None, 
+                      departure_date: Optional[str] = None, page: int = 1, size: int = 10,
+                      min_price: Optional[float] = None, max_price: Optional[float] = None, airline: Optional[str] = None,
+                      departure_hour_from: Optional[int] = None, departure_hour_to: Optional[int] = None,
+                      sort_by: str = "departure") -> tuple[List[Flight], int]:
+        """Search scheduled flights with free seats in the catalog, after catching it up with flight writes."""
+        self._refresh_catalog()
+        codes = self.airports.resolve_codes([name for name in (origin, destination) if name])
+        return self.catalog.search(origin, destination, departure_date, page, size, min_price, max_price, airline,
+                                   departure_hour_from, departure_hour_to, sort_by,
+                                   codes.get(origin), codes.get(destination))
+    
+    def list_all(self, page: int = 1, size: int = 10) -> tuple[List[Flight], int]:
+        """Get all flights from the catalog with pagination."""
+        self._refresh_catalog()
+        return self.catalog.list_all(page, size)
+    
+    def _refresh_catalog(self) -> None:
+        """Catch the catalog up with the newest flight version; a no-op read of the version index when nothing changed."""
+        self.catalog.refresh(self.get_latest_version(), self._flights_written_after)
+    
+    def _flights_written_after(self, version: Optional[int]) -> Iterable[Flight]:
+        if version is None:
+            return self.db.query(Flight).all()
+        return self.find_written_after(version)
 
 
 def create_flight_repository(db: Session = Depends(get_database_session)) -> FlightRepository:
     """Dependency injection function to create FlightRepository instance."""
+    if flight_catalog.is_enabled():
+        return FlightCatalogSqliteRepository(db)
     return FlightSqliteRepository(db)
@@ -0,0 +1,62 @@
+"""
+Reference airports loaded into the airports table on startup: (IATA code, city, country, aliases).
+The code and the city are always lookup names; aliases add other names travellers use.
+Every layer matches lookup names through airport_key.
+"""
+
+
+def airport_key(name: str) -> str:
+    """Normalized lookup name of an airport, under which codes, cities and aliases are matched."""
+    return name.strip().lower()
+
+
+REFERENCE_AIRPORTS = [
+    ("ATL", "Atlanta", "United States", ["Hartsfield-Jackson"]),
+    ("LAX", "Los Angeles", "United States", ["LA"]),
+    ("ORD", "Chicago", "United States", ["O'Hare"]),
+    ("DFW", "Dallas", "United States", ["Dallas Fort Worth", "Fort Worth"]),
+    ("DEN", "Denver", "United States", []),
+    ("JFK", "New York", "United States", ["New York City", "NYC", "Kennedy"]),
+    ("SFO", "San Francisco", "United States", ["SF"]),
+    ("SEA", "Seattle", "United States", ["Seattle-Tacoma"]),
+    ("MIA", "Miami", "United States", []),
+    ("BOS", "Boston", "United States", ["Logan"]),
+    ("AUS", "Austin", "United States", []),
+    ("YYZ", "Toronto", "Canada", ["Pearson"]),
+    ("YVR", "Vancouver", "Canada", []),
+    ("MEX", "Mexico City", "Mexico", ["Ciudad de Mexico", "Ciudad de México"]),
+    ("GRU", "São Paulo", "Brazil", ["Sao Paulo", "Guarulhos"]),
+    ("EZE", "Buenos Aires", "Argentina", ["Ezeiza"]),
+    ("BOG", "Bogotá", "Colombia", ["Bogota"]),
+    ("LIM", "Lima", "Peru", []),
+    ("LHR", "London", "United Kingdom", ["Heathrow"]),
+    ("CDG", "Paris", "France", ["Charles de Gaulle"]),
+    ("FRA", "Frankfurt", "Germany", []),
+    ("MUC", "Munich", "Germany", ["München", "Munchen"]),
+    ("AMS", "Amsterdam", "Netherlands", ["Schiphol"]),
+    ("MAD", "Madrid", "Spain", ["Barajas"]),
+    ("BCN", "Barcelona", "Spain", ["El Prat"]),
+    ("LIS", "Lisbon", "Portugal", ["Lisboa"]),
+    ("OPO", "Porto", "Portugal", ["Oporto"]),
+    ("FCO", "Rome", "Italy", ["Roma", "Fiumicino"]),
+    ("ZRH", "Zurich", "Switzerland", ["Zürich"]),
+    ("VIE", "Vienna", "Austria", ["Wien"]),
+    ("CPH", "Copenhagen", "Denmark", ["København"]),
+    ("DUB", "Dublin", "Ireland", []),
+    ("IST", "Istanbul", "Turkey", []),
+    ("DXB", "Dubai", "United Arab Emirates", []),
+    ("DOH", "Doha", "Qatar", []),
+    ("CAI", "Cairo", "Egypt", []),
+    ("JNB", "Johannesburg", "South Africa", ["Joburg"]),
+    ("DEL", "Delhi", "India", ["New Delhi"]),
+    ("BOM", "Mumbai", "India", ["Bombay"]),
+    ("SIN", "Singapore", "Singapore", ["Changi"]),
+    ("BKK", "Bangkok", "Thailand", ["Suvarnabhumi"]),
+    ("HKG", "Hong Kong", "Hong Kong", []),
+    ("PEK", "Beijing", "China", ["Peking"]),
+    ("HND", "Tokyo", "Japan", ["Haneda"]),
+    ("ICN", "Seoul", "South Korea", ["Incheon"]),
+    ("SYD", "Sydney", "Australia", []),
+    ("MEL", "Melbourne", "Australia", []),
+    ("AKL", "Auckland", "New Zealand", []),
+]
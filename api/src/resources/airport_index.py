@@ -0,0 +1,104 @@
+"""
+In-memory prefix trie over airport codes, cities and aliases for autocomplete.
+
+Every lookup name of an airport is inserted normalized, so "mad", "madr" and
+"barajas" all lead to MAD. The trie is loaded from the airports table at startup;
+airports are reference data, so it is only rebuilt by loading it again.
+"""
+
+import threading
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+from .logging import get_logger
+from .airport_data import airport_key
+
+logger = get_logger("airport_index")
+
+
+class AirportEntry(NamedTuple):
+    """Snapshot of one airport returned by the index."""
+    code: str
+    city: str
+    country: str
+
+
+class _TrieNode:
+    __slots__ = ("children", "codes")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, "_TrieNode"] = {}
+        # Codes of the airports with a lookup name ending at this node
+        self.codes: List[str] = []
+
+
+def airport_names(airport) -> List[str]:
+    """Normalized lookup names of an airport: its code, its city and its aliases, without duplicates."""
+    names = [airport.code, airport.city] + [alias if isinstance(alias, str) else alias.alias
+                                            for alias in airport.aliases]
+    return list(dict.fromkeys(airport_key(name) for name in names if name and name.strip()))
+
+
+class AirportIndex:
+    """Prefix trie from lookup names to airports."""
+
+    def __init__(self) -> None:
+        self._root = _TrieNode()
+        self._airports: Dict[str, AirportEntry] = {}
+        self._lock = threading.Lock()
+        self._is_loaded: bool = False
+
+    def is_loaded(self) -> bool:
+        """Check whether the index has been loaded."""
+        return self._is_loaded
+
+    def load(self, airports: Iterable) -> int:
+        """Rebuild the trie from airports with their aliases. Returns the number of airports indexed."""
+        root = _TrieNode()
+        entries: Dict[str, AirportEntry] = {}
+        for airport in airports:
+            entries[airport.code] = AirportEntry(airport.code, airport.city, airport.country)
+            for name in airport_names(airport):
+                node = root
+                for char in name:
+                    node = node.children.setdefault(char, _TrieNode())
+                if airport.code not in node.codes:
+                    node.codes.append(airport.code)
+        with self._lock:
+            self._root = root
+            self._airports = entries
+            self._is_loaded = True
+        logger.info(f"Airport index loaded with {len(entries)} airports")
+        return len(entries)
+
+    def ensure_loaded(self, loader: Callable[[], Iterable]) -> None:
+        """Load the trie from loader() unless it has been loaded already."""
+        if self._is_loaded:
+            return
+        self.load(loader())
+
+    def autocomplete(self, prefix: str, limit: int = 10) -> List[AirportEntry]:
+        """
+        Airports with a lookup name starting with prefix, at most limit of them.
+        Names are visited in order, so an exact match comes before longer names sharing the prefix.
+        """
+        key = airport_key(prefix)
+        if not key or limit < 1:
+            return []
+        with self._lock:
+            node: Optional[_TrieNode] = self._root
+            for char in key:
+                node = node.children.get(char)
+                if node is None:
+                    return []
+            codes: List[str] = []
+            stack = [node]
+            while stack and len(codes) < limit:
+                node = stack.pop()
+                for code in node.codes:
+                    if code not in codes:
+                        codes.append(code)
+                stack.extend(node.children[char] for char in sorted(node.children, reverse=True))
+            return [self._airports[code] for code in codes[:limit]]
+
+
+# Global instance - Singleton pattern
+airport_index = AirportIndex()
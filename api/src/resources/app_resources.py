@@ -2,6 +2,8 @@ from .database import db_manager, DatabaseManager, DatabaseConfig
 from .chat import chat_manager, ChatManager, ChatConfig
 from .crypto import crypto_manager, CryptoManager, CryptoConfig
 from .logging import logging_manager, LoggingManager, LoggingConfig
+from .ffmpeg import ffmpeg_probe, FfmpegProbe, FfmpegConfig
+from .airport_index import airport_index, AirportIndex
 from sqlalchemy.orm import Session
 from typing import Optional
 from pydantic import BaseModel, Field
@@ -13,6 +15,7 @@ class AppResourcesConfig(BaseModel):
     database: DatabaseConfig = Field(default_factory=DatabaseConfig)
     chat: ChatConfig = Field(default_factory=ChatConfig)
     crypto: CryptoConfig = Field(default_factory=CryptoConfig)
+    ffmpeg: FfmpegConfig = Field(default_factory=FfmpegConfig)
     auto_seed_database: bool = Field(default=True, description="Auto-seed database if empty")
 
 
@@ -25,6 +28,8 @@ class AppResources:
         self.database: DatabaseManager = db_manager
         self.chat: ChatManager = chat_manager
         self.crypto: CryptoManager = crypto_manager
+        self.ffmpeg: FfmpegProbe = ffmpeg_probe
+        self.airports: AirportIndex = airport_index
         self._is_initialized: bool = False
     
     def initialize_all(self) -> None:
@@ -56,14 +61,22 @@ class AppResources:
                 logger.debug("Auto-seeding database...")
                 self.database.seed_database()
             
-            # 5. Initialize chat components
+            # 5. Load the airport autocomplete index
+            logger.debug("Loading airport index...")
+            self._load_airport_index()
+            
+            # 6. Initialize chat components
             logger.debug("Initializing chat components...")
             self.chat.initialize()
             
-            # 6. Initialize crypto components
+            # 7. Initialize crypto components
             logger.debug("Initializing crypto components...")
             self.crypto.initialize()
             
+            # 8. Probe ffmpeg once and keep the result fresh in the background
+            logger.debug("Initializing ffmpeg probe...")
+            self.ffmpeg.initialize()
+            
             self._is_initialized = True
             logger.info("All application resources initialized successfully")
             
@@ -71,11 +84,22 @@ class AppResources:
             logger.error(f"Error initializing application resources: {e}", exc_info=True)
             raise
     
+    def _load_airport_index(self) -> None:
+        """Load the airports and their aliases into the autocomplete index."""
+        from repository.airport import AirportSqliteRepository
+        db = self.database.get_session()
+        try:
+            self.airports.load(AirportSqliteRepository(db).find_all())
+        finally:
+            db.close()
+    
     def shutdown_all(self) -> None:
         """Shutdown all application resources."""
         logger = self.logging.get_logger("app_resources")
         logger.info("Shutting down application resources...")
+        self.ffmpeg.shutdown()
         logger.info("Application resources shutdown completed")
+        self.logging.shutdown()
     
     def get_database_session(self) -> Session:
         """Get a database session."""
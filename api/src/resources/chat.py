@@ -4,13 +4,20 @@ from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
 from langgraph.prebuilt import create_react_agent
 from langgraph.graph.state import CompiledStateGraph
 from utils.chatbot_tools import create_faqs_retriever_tool, create_chatbot_tools
-from typing import Optional, List
+from utils.chat_context import ChatAgentState, build_state_modifier, compact_thread
+from utils import agent_tracing  # Module import: agent_tracing imports resources, so names resolve at call time
+from typing import Optional, List, Dict
 from pydantic import BaseModel, Field
+from sqlalchemy import desc
+import asyncio
 import re
 import os
-import aiosqlite
+import time
 from .logging import get_logger
-from constants import ApplicationConstants, EnvironmentKeys, get_env_str
+from .checkpoint_store import CheckpointStore
+from .database import db_manager
+from models import ChatSession
+from constants import ApplicationConstants, EnvironmentKeys, get_env_str, get_env_int
 
 logger = get_logger("chat")
 
@@ -26,6 +33,31 @@ class ChatConfig(BaseModel):
         ),
         description="SQLite database path for chat checkpoints"
     )
+    context_max_tokens: int = Field(
+        default_factory=lambda: get_env_int(
+            EnvironmentKeys.CHAT_CONTEXT_MAX_TOKENS,
+            ApplicationConstants.DEFAULT_CHAT_CONTEXT_MAX_TOKENS
+        ),
+        ge=1,
+        description="Token budget for conversation history sent with each model call"
+    )
+    summary_trigger_tokens: int = Field(
+        default_factory=lambda: get_env_int(
+            EnvironmentKeys.CHAT_SUMMARY_TRIGGER_TOKENS,
+            ApplicationConstants.DEFAULT_CHAT_SUMMARY_TRIGGER_TOKENS
+        ),
+        ge=1,
+        description="Thread size at which older turns are folded into the rolling summary"
+    )
+    summary_keep_tokens: int = Field(
+        default_factory=lambda: get_env_int(
+            EnvironmentKeys.CHAT_SUMMARY_KEEP_TOKENS,
+            ApplicationConstants.DEFAULT_CHAT_SUMMARY_KEEP_TOKENS
+        ),
+        ge=1,
+        description="Recent history kept verbatim when the thread is summarized"
+    )
+    summary_max_words: int = Field(default=250, ge=1, description="Length limit for the rolling summary")
     system_context: str = Field(
         default="""
             You are a helpful flight booking assistant. You have access to several tools:
@@ -35,6 +67,11 @@ class ChatConfig(BaseModel):
             4. book_flight: Use this to make flight reservations
             5. get_my_bookings: Use this to show user's current bookings
             6. cancel_booking: Use this to cancel existing bookings
+            7. get_my_booking_counts: Use this to tell users how many bookings they have per status
+            8. book_flights: Use this to book several flights at once, e.g. all legs of a trip
+            9. get_fare_calendar: Use this to find the cheapest day to fly a route or compare prices across dates
+            10. search_connections: Use this to find itineraries with connections when there is no direct flight, or the cheapest or fastest way to get somewhere
+            11. search_flights_batch: Use this to compare several routes or dates in one step instead of calling search_flights repeatedly
             You can also help users with travel-related recommendations, trip planning, and general advice for their journeys. However, please clarify to users that any information or suggestions outside the scope of these tools may be outdated or inaccurate, and they should verify such details independently.
             Always be helpful and provide accurate information. If you need to search for flights or manage bookings, use the appropriate API tools. For general questions about flight policies or procedures, use the flight_faqs tool.
             Use Markdown formatting for responses when appropriate, such as:
@@ -49,6 +86,24 @@ class ChatConfig(BaseModel):
     )
 
 
+class TracingAsyncSqliteSaver(AsyncSqliteSaver):
+    """AsyncSqliteSaver that reports checkpoint write timings to the active agent trace."""
+    
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        started = time.perf_counter()
+        try:
+            return await super().aput(config, checkpoint, metadata, new_versions)
+        finally:
+            agent_tracing.record_checkpoint_write("put", started)
+    
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        started = time.perf_counter()
+        try:
+            return await super().aput_writes(config, writes, task_id, task_path)
+        finally:
+            agent_tracing.record_checkpoint_write("put_writes", started)
+
+
 class ChatManager:
     """Manages chat model initialization and configuration."""
     
@@ -60,6 +115,7 @@ class ChatManager:
         self.agent: Optional[object] = None  # The react agent
         self._is_initialized: bool = False
         self._memory_context = None  # Store the context manager
+        self._compactions: Dict[str, asyncio.Task] = {}  # Background summaries by session ID
     
     def initialize(self) -> None:
         """Initialize the chat model and related components (sync part only)."""
@@ -73,7 +129,7 @@ class ChatManager:
             self.faq_tool = create_faqs_retriever_tool()
             
             # Initialize chat model
-            logger.debug(f"Initializing chat model: {self.config.model_name}")
+            logger.debug("Initializing chat model: %s", self.config.model_name)
             self.response_model = init_chat_model(
                 self.config.model_name, 
                 temperature=self.config.temperature
@@ -91,35 +147,33 @@ class ChatManager:
         if self.memory is not None:
             return
             
-        logger.debug(f"Initializing AsyncSQLite checkpointer: {self.config.checkpoint_db_path}")
+        logger.debug("Initializing AsyncSQLite checkpointer: %s", self.config.checkpoint_db_path)
         
-        # Extract the database path from the connection string
-        db_path = self.config.checkpoint_db_path
-        if db_path.startswith("sqlite+aiosqlite:///"):
-            db_path = db_path.replace("sqlite+aiosqlite:///", "")
-        elif db_path.startswith("sqlite:///"):
-            db_path = db_path.replace("sqlite:///", "")
-        
-        # Convert relative path to absolute path
-        if not os.path.isabs(db_path):
-            db_path = os.path.abspath(db_path)
+        db_path = self.get_checkpoint_db_path()
         
         # Ensure the directory exists for the database file
         db_dir = os.path.dirname(db_path)
         if db_dir and not os.path.exists(db_dir):
             os.makedirs(db_dir, exist_ok=True)
-            logger.debug(f"Created directory for SQLite database: {db_dir}")
+            logger.debug("Created directory for SQLite database: %s", db_dir)
         
         # Use AsyncSqliteSaver.from_conn_string() as a context manager manually
         # Store the context manager for later cleanup
         # Note: from_conn_string expects just the file path, not a connection URI
-        self._memory_context = AsyncSqliteSaver.from_conn_string(db_path)
+        self._memory_context = TracingAsyncSqliteSaver.from_conn_string(db_path)
         self.memory = await self._memory_context.__aenter__()
         
         logger.debug("AsyncSQLite checkpointer initialized successfully")
     
     async def cleanup(self) -> None:
         """Clean up resources, specifically close the AsyncSqliteSaver context manager."""
+        # An interrupted summary is retried after the session's next turn
+        pending = [task for task in self._compactions.values() if not task.done()]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        self._compactions.clear()
+        
         if self._memory_context and self.memory:
             try:
                 await self._memory_context.__aexit__(None, None, None)
@@ -131,8 +185,12 @@ class ChatManager:
         self._memory_context = None
         self._is_initialized = False
     
-    async def create_agent(self, user_token: str, user_id: int, session_id: Optional[str] = None) -> CompiledStateGraph:
-        """Create and return a configured react agent for the user with optional session ID."""
+    async def create_agent(self, user_token: str, user_id: int, session_id: Optional[str] = None,
+                           system_prompt: Optional[str] = None) -> CompiledStateGraph:
+        """
+        Create and return a configured react agent for the user with optional session ID.
+        The system prompt is injected on every model call instead of being stored in the thread.
+        """
         if not self._is_initialized:
             self.initialize()
         
@@ -143,7 +201,7 @@ class ChatManager:
             api_base_port = get_env_int(EnvironmentKeys.PORT, ApplicationConstants.DEFAULT_PORT)
             api_base_url = f"http://localhost:{api_base_port}"
             
-            logger.debug(f"Creating chatbot tools for user {user_id}")
+            logger.debug("Creating chatbot tools for user %s", user_id)
             chatbot_tools = create_chatbot_tools(
                 user_token=user_token,
                 user_id=user_id,
@@ -161,7 +219,12 @@ class ChatManager:
             agent = create_react_agent(
                 tools=chatbot_tools,
                 model=self.response_model,
-                checkpointer=self.memory
+                checkpointer=self.memory,
+                state_schema=ChatAgentState,
+                state_modifier=build_state_modifier(
+                    system_prompt or self.get_system_context(),
+                    self.config.context_max_tokens
+                )
             )
             
             return agent
@@ -170,6 +233,49 @@ class ChatManager:
             logger.error(f"Error creating agent for user {user_id}: {e}", exc_info=True)
             raise
     
+    async def compact_context(self, agent: CompiledStateGraph, session_id: str) -> bool:
+        """Fold older turns of a session into its rolling summary once the thread grows too large."""
+        compacted = await compact_thread(
+            agent,
+            self.get_response_model(),
+            {"configurable": {"thread_id": session_id}},
+            trigger_tokens=self.config.summary_trigger_tokens,
+            keep_tokens=self.config.summary_keep_tokens,
+            max_summary_words=self.config.summary_max_words
+        )
+        if compacted:
+            logger.info(f"Summarized older turns of session {session_id}")
+        return compacted
+    
+    def schedule_compaction(self, agent: CompiledStateGraph, session_id: str) -> None:
+        """Run compact_context in a background task so the summary call doesn't delay the turn's response."""
+        running = self._compactions.get(session_id)
+        if running is not None and not running.done():
+            return
+        task = asyncio.create_task(self._compact_in_background(agent, session_id))
+        self._compactions[session_id] = task
+        task.add_done_callback(lambda done: self._forget_compaction(session_id, done))
+    
+    async def wait_for_compaction(self, session_id: str) -> None:
+        """Wait for a pending summary of the session, so the next turn doesn't race its checkpoint write."""
+        task = self._compactions.get(session_id)
+        if task is not None and not task.done():
+            # Shielded: a cancelled turn must not cancel the summary it was waiting for
+            await asyncio.shield(task)
+    
+    async def _compact_in_background(self, agent: CompiledStateGraph, session_id: str) -> None:
+        """Background body of schedule_compaction; a failed summary never surfaces to a turn."""
+        try:
+            await self.compact_context(agent, session_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Failed to summarize context for session {session_id}: {e}")
+    
+    def _forget_compaction(self, session_id: str, task: asyncio.Task) -> None:
+        if self._compactions.get(session_id) is task:
+            del self._compactions[session_id]
+    
     def get_response_model(self) -> BaseChatModel:
         """Get the initialized response model."""
         if not self._is_initialized:
@@ -189,6 +295,26 @@ class ChatManager:
         await self.ensure_memory_initialized()
         return self.memory
     
+    def get_checkpoint_db_path(self) -> str:
+        """Get the absolute file path of the checkpoint database."""
+        # Extract the database path from the connection string
+        db_path = self.config.checkpoint_db_path
+        if db_path.startswith("sqlite+aiosqlite:///"):
+            db_path = db_path.replace("sqlite+aiosqlite:///", "")
+        elif db_path.startswith("sqlite:///"):
+            db_path = db_path.replace("sqlite:///", "")
+        
+        # Convert relative path to absolute path
+        if not os.path.isabs(db_path):
+            db_path = os.path.abspath(db_path)
+        return db_path
+    
+    def delete_thread(self, session_id: str) -> int:
+        """Delete every checkpoint of a session's agent thread. Blocking; call from a worker thread."""
+        deleted = CheckpointStore(self.get_checkpoint_db_path()).delete_thread(session_id)
+        logger.debug("Deleted %s checkpoints of session %s", deleted, session_id)
+        return deleted
+    
     def get_system_context(self) -> str:
         """Get the normalized system context."""
         return re.sub(r"\s+", " ", self.config.system_context).strip()
@@ -200,49 +326,24 @@ class ChatManager:
         return f"{user_id}_{clean_name}"
     
     async def get_user_sessions(self, user_id: int) -> List[str]:
-        """Get all session IDs for a specific user from the checkpoint database."""
-        if not self._is_initialized:
-            self.initialize()
-        
-        await self.ensure_memory_initialized()
-        
+        """Get a user's session IDs, most recently updated first, from the chat_sessions registry."""
+        # The SQLAlchemy session is blocking, so the query runs off the event loop
+        return await asyncio.to_thread(self._query_user_sessions, user_id)
+    
+    def _query_user_sessions(self, user_id: int) -> List[str]:
+        db = db_manager.get_session()
         try:
-            # Get all sessions from the checkpointer that belong to this user
-            prefix = f"{user_id}_"
-            sessions = []
-            
-            # Extract the database path from the connection string
-            db_path = self.config.checkpoint_db_path
-            if db_path.startswith("sqlite+aiosqlite:///"):
-                db_path = db_path.replace("sqlite+aiosqlite:///", "")
-            elif db_path.startswith("sqlite:///"):
-                db_path = db_path.replace("sqlite:///", "")
-            
-            # Convert relative path to absolute path
-            if not os.path.isabs(db_path):
-                db_path = os.path.abspath(db_path)
-            
-            # Query the database directly for sessions
-            async with aiosqlite.connect(db_path) as conn:
-                cursor = await conn.cursor()
-                # Check if the checkpoints table exists
-                await cursor.execute("""
-                    SELECT name FROM sqlite_master 
-                    WHERE type='table' AND name='checkpoints'
-                """)
-                if await cursor.fetchone():
-                    await cursor.execute("""
-                        SELECT DISTINCT thread_id FROM checkpoints 
-                        WHERE thread_id LIKE ?
-                    """, (f"{prefix}%",))
-                    rows = await cursor.fetchall()
-                    sessions = [row[0] for row in rows]
-            
-            return sessions
+            # An index lookup on (user_id, updated_at), independent of the checkpoint database size
+            rows = db.query(ChatSession.id).filter(
+                ChatSession.user_id == user_id
+            ).order_by(desc(ChatSession.updated_at)).all()
+            return [row[0] for row in rows]
             
         except Exception as e:
             logger.error(f"Error getting sessions for user {user_id}: {e}", exc_info=True)
             return []
+        finally:
+            db.close()
 
 
 # Global instance - Singleton pattern
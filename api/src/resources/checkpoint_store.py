@@ -0,0 +1,181 @@
+"""
+Maintenance operations on the LangGraph SQLite checkpoint database.
+
+AsyncSqliteSaver keeps every checkpoint of every thread. These operations run on
+their own short-lived sqlite3 connection (the database is in WAL mode, so the
+saver's connection keeps working) and are meant to be called from a worker thread.
+"""
+
+import os
+import sqlite3
+import time
+from contextlib import closing
+from typing import Any, Callable, Dict, Iterable, List, Set
+from .logging import get_logger
+
+logger = get_logger("checkpoint_store")
+
+# SQLite limits the number of bound parameters per statement
+_DELETE_CHUNK_SIZE = 500
+
+_PRUNE_CHECKPOINTS_SQL = """
+    DELETE FROM checkpoints WHERE rowid IN (
+        SELECT rowid FROM (
+            SELECT rowid, ROW_NUMBER() OVER (
+                PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC
+            ) AS position
+            FROM checkpoints
+        ) WHERE position > ?
+    )
+"""
+
+# Pending writes are always recorded against an existing checkpoint, so writes
+# without one belong to a pruned checkpoint
+_PRUNE_WRITES_SQL = """
+    DELETE FROM writes WHERE NOT EXISTS (
+        SELECT 1 FROM checkpoints c
+        WHERE c.thread_id = writes.thread_id
+          AND c.checkpoint_ns = writes.checkpoint_ns
+          AND c.checkpoint_id = writes.checkpoint_id
+    )
+"""
+
+
+class CheckpointStore:
+    """Retention and space reclamation for one checkpoint database file."""
+
+    def __init__(self, db_path: str, busy_timeout_seconds: float = 30.0) -> None:
+        self.db_path = db_path
+        self.busy_timeout_seconds = busy_timeout_seconds
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode: transactions are explicit and VACUUM cannot run inside one.
+        # Use with closing(): sqlite3's own context manager does not close the connection
+        return sqlite3.connect(self.db_path, timeout=self.busy_timeout_seconds, isolation_level=None)
+
+    def exists(self) -> bool:
+        """Check whether the saver has created its tables yet."""
+        if not os.path.exists(self.db_path):
+            return False
+        with closing(self._connect()) as conn:
+            return self._has_tables(conn)
+
+    def list_thread_ids(self) -> Set[str]:
+        """Get the IDs of all threads that have checkpoints."""
+        if not self.exists():
+            return set()
+        with closing(self._connect()) as conn:
+            return {row[0] for row in conn.execute("SELECT DISTINCT thread_id FROM checkpoints")}
+
+    def delete_threads(self, thread_ids: Iterable[str]) -> int:
+        """Delete all checkpoints and writes of the given threads. Returns the checkpoints deleted."""
+        ids = list(thread_ids)
+        if not ids or not self.exists():
+            return 0
+        deleted = 0
+        with closing(self._connect()) as conn:
+            for start in range(0, len(ids), _DELETE_CHUNK_SIZE):
+                chunk = ids[start:start + _DELETE_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    deleted += conn.execute(
+                        f"DELETE FROM checkpoints WHERE thread_id IN ({placeholders})", chunk
+                    ).rowcount
+                    conn.execute(f"DELETE FROM writes WHERE thread_id IN ({placeholders})", chunk)
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+        return deleted
+
+    def delete_thread(self, thread_id: str) -> int:
+        """Delete all checkpoints and writes of one thread."""
+        return self.delete_threads([thread_id])
+
+    def prune(self, keep_per_thread: int) -> Dict[str, int]:
+        """Keep only the latest keep_per_thread checkpoints of each thread (and their writes)."""
+        if not self.exists():
+            return {"checkpoints": 0, "writes": 0}
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                checkpoints = conn.execute(_PRUNE_CHECKPOINTS_SQL, (keep_per_thread,)).rowcount
+                writes = conn.execute(_PRUNE_WRITES_SQL).rowcount
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return {"checkpoints": checkpoints, "writes": writes}
+
+    def vacuum(self, max_pages: int) -> Dict[str, int]:
+        """
+        Return free pages to the filesystem with incremental vacuum.
+        A database created without auto_vacuum is converted once with a full VACUUM.
+        max_pages <= 0 frees every free page.
+        """
+        if not os.path.exists(self.db_path):
+            return {"reclaimed_bytes": 0, "file_bytes": 0}
+        with closing(self._connect()) as conn:
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+            pages_before = conn.execute("PRAGMA page_count").fetchone()[0]
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                logger.info(f"Enabling incremental auto-vacuum on {self.db_path} (one-time full VACUUM)")
+                conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                conn.execute("VACUUM")
+            else:
+                # The pragma returns a row per freed page; fetch them all so it runs to completion
+                conn.execute(f"PRAGMA incremental_vacuum({max(max_pages, 0)})").fetchall()
+            # Copy the WAL back into the main file and truncate it, so the freed space shows on disk
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+            pages_after = conn.execute("PRAGMA page_count").fetchone()[0]
+        return {
+            "reclaimed_bytes": max(pages_before - pages_after, 0) * page_size,
+            "file_bytes": self.file_bytes(),
+        }
+
+    def file_bytes(self) -> int:
+        """Size of the database file plus its WAL."""
+        total = 0
+        for path in (self.db_path, f"{self.db_path}-wal"):
+            if os.path.exists(path):
+                total += os.path.getsize(path)
+        return total
+
+    def apply_retention(self, live_thread_ids_loader: Callable[[], Iterable[str]], keep_per_thread: int,
+                        vacuum_pages: int) -> Dict[str, Any]:
+        """
+        Delete orphaned threads, prune old checkpoints and vacuum. Returns a report.
+        live_thread_ids_loader is called after the existing threads are listed: a thread's
+        session is always created before its first checkpoint, so a thread seen here whose
+        session is missing from the later load really was deleted.
+        """
+        started = time.perf_counter()
+        file_bytes_before = self.file_bytes()
+        candidates = self.list_thread_ids()
+        live_ids = set(live_thread_ids_loader()) if candidates else set()
+        orphans: List[str] = sorted(candidates - live_ids)
+
+        orphan_checkpoints = self.delete_threads(orphans)
+        pruned = self.prune(keep_per_thread)
+        vacuumed = self.vacuum(vacuum_pages)
+
+        return {
+            "threads": len(candidates) - len(orphans),
+            "orphaned_threads_deleted": len(orphans),
+            "orphaned_checkpoints_deleted": orphan_checkpoints,
+            "checkpoints_pruned": pruned["checkpoints"],
+            "writes_pruned": pruned["writes"],
+            "reclaimed_bytes": vacuumed["reclaimed_bytes"],
+            "file_bytes_before": file_bytes_before,
+            "file_bytes": vacuumed["file_bytes"],
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+    @staticmethod
+    def _has_tables(conn: sqlite3.Connection) -> bool:
+        rows = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ('checkpoints', 'writes')"
+        ).fetchall()
+        return len(rows) == 2
+
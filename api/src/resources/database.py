@@ -1,12 +1,18 @@
 from collections.abc import Generator
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy import create_engine, Engine
+from sqlalchemy import create_engine, Engine, inspect, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
 from typing import Optional
 from pydantic import BaseModel, Field
 import os
 
-from models import Base, User
+from models import (
+    Base, User, Airport, AirportAlias, FLIGHT_VERSION_TRIGGERS, CHAT_MESSAGE_SEARCH_TABLE, CHAT_MESSAGE_SEARCH_DDL
+)
+from .airport_data import REFERENCE_AIRPORTS, airport_key
 from .logging import get_logger
+from .metrics import instrument_engine
 from constants import ApplicationConstants, EnvironmentKeys, get_env_str
 
 logger = get_logger("database")
@@ -40,11 +46,12 @@ class DatabaseManager:
         if self._is_initialized:
             return
             
-        logger.debug(f"Initializing database with URL: {self.config.database_url}")
+        logger.debug("Initializing database with URL: %s", self.config.database_url)
         self.engine = create_engine(
             self.config.database_url, 
             connect_args={"check_same_thread": self.config.check_same_thread}
         )
+        instrument_engine(self.engine)
         self.SessionLocal = sessionmaker(
             autocommit=self.config.autocommit, 
             autoflush=self.config.autoflush, 
@@ -59,8 +66,153 @@ class DatabaseManager:
             self.initialize()
         logger.debug("Creating database tables...")
         Base.metadata.create_all(bind=self.engine)
+        self._add_missing_columns()
+        self._add_missing_triggers()
+        self._add_chat_message_search()
+        self._seed_reference_airports()
+        self._backfill_airport_codes()
+        self._backfill_seat_inventory()
+        self._backfill_fare_calendar()
+        self._add_missing_indexes()
         logger.info("Database tables created successfully")
     
+    def _add_missing_columns(self) -> None:
+        """
+        Add nullable columns introduced after a table was first created.
+        create_all() only creates missing tables, it never alters existing ones.
+        """
+        inspector = inspect(self.engine)
+        with self.engine.begin() as conn:
+            for table in Base.metadata.sorted_tables:
+                if not inspector.has_table(table.name):
+                    continue
+                existing = {column["name"] for column in inspector.get_columns(table.name)}
+                for column in table.columns:
+                    if column.name in existing or not column.nullable:
+                        continue
+                    column_type = column.type.compile(dialect=self.engine.dialect)
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                    logger.info(f"Added column {table.name}.{column.name}")
+    
+    def _add_missing_triggers(self) -> None:
+        """Create the flight version triggers on databases whose flights table predates them."""
+        with self.engine.begin() as conn:
+            for trigger in FLIGHT_VERSION_TRIGGERS:
+                conn.execute(text(trigger))
+    
+    def _add_chat_message_search(self) -> None:
+        """Create the chat message full-text index on databases that predate it and index the existing messages."""
+        with self.engine.begin() as conn:
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {"name": CHAT_MESSAGE_SEARCH_TABLE}
+            ).first()
+            for statement in CHAT_MESSAGE_SEARCH_DDL:
+                conn.execute(text(statement))
+            if exists:
+                return
+            conn.execute(text(f"INSERT INTO {CHAT_MESSAGE_SEARCH_TABLE}({CHAT_MESSAGE_SEARCH_TABLE}) VALUES ('rebuild')"))
+            indexed = conn.execute(text("SELECT COUNT(*) FROM chatbot_messages")).scalar()
+        logger.info(f"Built chat message search index over {indexed} messages")
+    
+    def _seed_reference_airports(self) -> None:
+        """Insert the reference airports and their lookup names that the database does not have yet."""
+        airports = [{"code": code, "city": city, "country": country} for code, city, country, _ in REFERENCE_AIRPORTS]
+        aliases = [
+            {"alias": alias, "code": code}
+            for code, city, _, names in REFERENCE_AIRPORTS
+            for alias in dict.fromkeys(airport_key(name) for name in [code, city] + names)
+        ]
+        with self.engine.begin() as conn:
+            conn.execute(sqlite_insert(Airport).on_conflict_do_nothing(), airports)
+            conn.execute(sqlite_insert(AirportAlias).on_conflict_do_nothing(), aliases)
+    
+    def _backfill_airport_codes(self) -> None:
+        """Give flights without airport codes the code of the one airport their origin or destination names."""
+        with self.engine.begin() as conn:
+            codes_by_alias = {}
+            for alias, code in conn.execute(text("SELECT alias, code FROM airport_aliases")):
+                codes_by_alias.setdefault(alias, []).append(code)
+            
+            def resolve(name):
+                codes = codes_by_alias.get(airport_key(name), [])
+                return codes[0] if len(codes) == 1 else None
+            
+            updates = []
+            for flight_id, origin, destination, origin_code, destination_code in conn.execute(text(
+                "SELECT id, origin, destination, origin_code, destination_code FROM flights "
+                "WHERE origin_code IS NULL OR destination_code IS NULL"
+            )).all():
+                resolved = (origin_code or resolve(origin), destination_code or resolve(destination))
+                if resolved != (origin_code, destination_code):
+                    updates.append({"id": flight_id, "origin_code": resolved[0], "destination_code": resolved[1]})
+            if updates:
+                conn.execute(text(
+                    "UPDATE flights SET origin_code = :origin_code, destination_code = :destination_code WHERE id = :id"
+                ), updates)
+                # The fare calendar is keyed on these codes; emptying it has it rebuilt by _backfill_fare_calendar
+                conn.execute(text("DELETE FROM fare_calendar"))
+        if updates:
+            logger.info(f"Backfilled airport codes for {len(updates)} flights")
+    
+    def _backfill_seat_inventory(self) -> None:
+        """Give flights created before seat tracking a capacity and subtract their active bookings."""
+        with self.engine.begin() as conn:
+            conn.execute(
+                text("UPDATE flights SET capacity = :capacity WHERE capacity IS NULL"),
+                {"capacity": ApplicationConstants.DEFAULT_FLIGHT_CAPACITY}
+            )
+            updated = conn.execute(text(
+                "UPDATE flights SET seats_available = MAX(capacity - ("
+                "SELECT COUNT(*) FROM bookings "
+                "WHERE bookings.flight_id = flights.id AND bookings.status = 'booked'"
+                "), 0) WHERE seats_available IS NULL"
+            )).rowcount
+        if updated:
+            logger.info(f"Backfilled seat inventory for {updated} flights")
+    
+    def _backfill_fare_calendar(self) -> None:
+        """
+        Fill an empty fare calendar from the flights table. The flight repository keeps it up to date
+        afterwards; this covers databases that predate the calendar and flights inserted by the seeder.
+        """
+        with self.engine.begin() as conn:
+            if conn.execute(text("SELECT 1 FROM fare_calendar LIMIT 1")).first():
+                return
+            inserted = conn.execute(text(
+                "INSERT INTO fare_calendar (origin, destination, day, min_price, flight_count) "
+                "SELECT MIN(COALESCE(origin_code, origin)), MIN(COALESCE(destination_code, destination)), "
+                "date(departure_time), MIN(price), COUNT(*) "
+                "FROM flights WHERE status = 'scheduled' AND seats_available > 0 "
+                "GROUP BY COALESCE(origin_code, origin) COLLATE NOCASE, "
+                "COALESCE(destination_code, destination) COLLATE NOCASE, date(departure_time)"
+            )).rowcount
+        if inserted:
+            logger.info(f"Backfilled fare calendar with {inserted} route days")
+    
+    def _add_missing_indexes(self) -> None:
+        """Create indexes introduced after a table was first created; create_all() skips existing tables."""
+        inspector = inspect(self.engine)
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            # Read names from the schema table: reflection skips expression indexes
+            with self.engine.connect() as conn:
+                existing = set(conn.execute(
+                    text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table"),
+                    {"table": table.name}
+                ).scalars())
+            for index in table.indexes:
+                if index.name in existing:
+                    continue
+                try:
+                    with self.engine.begin() as conn:
+                        index.create(conn)
+                    logger.info(f"Created index {index.name} on {table.name}")
+                except IntegrityError as e:
+                    # Existing rows violate a new unique index; keep serving and surface it loudly
+                    logger.error(f"Could not create unique index {index.name} on {table.name}: {e}")
+    
     def get_session(self) -> Session:
         """Get a database session."""
         if not self._is_initialized:
@@ -72,7 +224,7 @@ class DatabaseManager:
         db = self.get_session()
         try:
             user_count = db.query(User).count()
-            logger.debug(f"Database user count: {user_count}")
+            logger.debug("Database user count: %s", user_count)
             return user_count == 0
         except Exception as e:
             logger.error(f"Error checking if database is empty: {e}")
@@ -91,6 +243,7 @@ class DatabaseManager:
             from .seed_data import DataSeeder
             seeder = DataSeeder(self)
             seeder.seed_all()
+            self._backfill_fare_calendar()
             logger.info("Database seeding completed successfully")
         except Exception as e:
             logger.error(f"Error during database seeding: {e}", exc_info=True)
@@ -0,0 +1,162 @@
+import subprocess
+import threading
+import datetime
+import time
+from typing import Dict, Any, Optional
+from pydantic import BaseModel, Field
+from .logging import get_logger
+from constants import ApplicationConstants, EnvironmentKeys, get_env_int, get_env_float
+
+logger = get_logger("ffmpeg")
+
+
+class FfmpegConfig(BaseModel):
+    """ffmpeg availability probe configuration with Pydantic validation."""
+    refresh_interval_seconds: int = Field(
+        default_factory=lambda: get_env_int(
+            EnvironmentKeys.FFMPEG_PROBE_REFRESH_SECONDS,
+            ApplicationConstants.DEFAULT_FFMPEG_PROBE_REFRESH_SECONDS
+        ),
+        ge=1,
+        description="Seconds between background ffmpeg probes (env: FFMPEG_PROBE_REFRESH_SECONDS)"
+    )
+    probe_timeout_seconds: int = Field(default=5, ge=1, description="Timeout for a single ffmpeg probe")
+    min_forced_interval_seconds: float = Field(
+        default_factory=lambda: get_env_float(
+            EnvironmentKeys.FFMPEG_PROBE_MIN_FORCED_INTERVAL_SECONDS,
+            ApplicationConstants.DEFAULT_FFMPEG_PROBE_MIN_FORCED_INTERVAL_SECONDS
+        ),
+        ge=0,
+        description="A forced probe reuses a result younger than this (env: FFMPEG_PROBE_MIN_FORCED_INTERVAL_SECONDS)"
+    )
+
+
+class FfmpegProbe:
+    """
+    Caches the result of probing the ffmpeg binary.
+    The probe runs once on initialization and then periodically on a background
+    thread, so health checks can read the cached snapshot without spawning processes.
+    Forced probes are rate limited: one requested within min_forced_interval_seconds of
+    the last probe is served from the cache, and concurrent forced probes share one process.
+    """
+
+    def __init__(self, config: Optional[FfmpegConfig] = None) -> None:
+        self.config: FfmpegConfig = config or FfmpegConfig()
+        self._status: Optional[Dict[str, Any]] = None
+        self._probed_monotonic: float = 0.0
+        self._lock = threading.Lock()
+        # Held while a forced probe runs, so a burst of them spawns a single process
+        self._forced_probe_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._refresh_thread: Optional[threading.Thread] = None
+        self._is_initialized: bool = False
+
+    def initialize(self) -> None:
+        """Run the first probe and start the background refresh thread."""
+        if self._is_initialized:
+            return
+
+        self.refresh()
+        self._stop_event.clear()
+        self._refresh_thread = threading.Thread(
+            target=self._refresh_loop,
+            name="ffmpeg-probe-refresh",
+            daemon=True
+        )
+        self._refresh_thread.start()
+        self._is_initialized = True
+        logger.info(f"ffmpeg probe initialized (refresh every {self.config.refresh_interval_seconds}s)")
+
+    def shutdown(self) -> None:
+        """Stop the background refresh thread."""
+        self._stop_event.set()
+        if self._refresh_thread and self._refresh_thread.is_alive():
+            self._refresh_thread.join(timeout=self.config.probe_timeout_seconds + 1)
+        self._refresh_thread = None
+        self._is_initialized = False
+        logger.debug("ffmpeg probe background refresh stopped")
+
+    def get_status(self, force_refresh: bool = False) -> Dict[str, Any]:
+        """
+        Get the cached ffmpeg status, probing now if never probed, or if forced
+        and the last probe is older than min_forced_interval_seconds.
+        """
+        if self._status is None:
+            return self.refresh()
+        if force_refresh:
+            with self._forced_probe_lock:
+                if time.monotonic() - self._probed_monotonic >= self.config.min_forced_interval_seconds:
+                    return self.refresh()
+        with self._lock:
+            return dict(self._status)
+
+    def refresh(self) -> Dict[str, Any]:
+        """Probe ffmpeg now and update the cached status."""
+        status = self._probe()
+        status["checked_at"] = datetime.datetime.now(datetime.UTC).isoformat()
+        with self._lock:
+            self._status = status
+            self._probed_monotonic = time.monotonic()
+        logger.debug("ffmpeg probe refreshed: %s", status['status'])
+        return dict(status)
+
+    def is_initialized(self) -> bool:
+        """Check if the ffmpeg probe is initialized."""
+        return self._is_initialized
+
+    def _refresh_loop(self) -> None:
+        """Background loop that re-probes ffmpeg until shutdown is requested."""
+        while not self._stop_event.wait(self.config.refresh_interval_seconds):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"Background ffmpeg probe failed: {e}")
+
+    def _probe(self) -> Dict[str, Any]:
+        """Check if ffmpeg is available on the system."""
+        try:
+            # Check for ffmpeg binary
+            result = subprocess.run(
+                ["ffmpeg", "-version"],
+                capture_output=True,
+                text=True,
+                timeout=self.config.probe_timeout_seconds
+            )
+
+            if result.returncode == 0:
+                # Extract version info from output
+                version_line = result.stdout.split('\n')[0] if result.stdout else "Unknown version"
+                return {
+                    "available": True,
+                    "version": version_line,
+                    "status": "installed"
+                }
+            else:
+                return {
+                    "available": False,
+                    "status": "command_failed",
+                    "error": result.stderr or "Unknown error"
+                }
+
+        except subprocess.TimeoutExpired:
+            return {
+                "available": False,
+                "status": "timeout",
+                "error": "ffmpeg command timed out"
+            }
+        except FileNotFoundError:
+            return {
+                "available": False,
+                "status": "not_found",
+                "error": "ffmpeg command not found"
+            }
+        except Exception as e:
+            return {
+                "available": False,
+                "status": "check_failed",
+                "error": str(e)
+            }
+
+
+# Global instance - Singleton pattern
+ffmpeg_probe = FfmpegProbe()
@@ -0,0 +1,251 @@
+"""
+Columnar in-memory catalog of flights for the public flight search.
+
+Flights are snapshotted into NumPy column arrays (interned origin, destination, airline
+and status codes, departure/arrival times, price, free seats) kept sorted by departure
+time, so a search is a `searchsorted` on the departure column plus vectorized masks
+instead of a SQLite query. Every write to the flights table bumps its `version`
+column, and the catalog refreshes by fetching only the rows with a version newer than
+the one it has loaded.
+"""
+
+import re
+import string
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+import numpy as np
+from pydantic import BaseModel, Field
+from .logging import get_logger
+from constants import ApplicationConstants, EnvironmentKeys, get_env_bool
+
+logger = get_logger("flight_catalog")
+
+_ONE_DAY = np.timedelta64(1, "D")
+_ONE_HOUR_US = 3600 * 1000000
+# SQLite's LIKE only folds ASCII letters
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+class FlightCatalogConfig(BaseModel):
+    """Flight catalog configuration with Pydantic validation."""
+    enabled: bool = Field(
+        default_factory=lambda: get_env_bool(
+            EnvironmentKeys.FLIGHT_CATALOG_ENABLED,
+            ApplicationConstants.DEFAULT_FLIGHT_CATALOG_ENABLED
+        ),
+        description="Serve flight search and listing from the in-memory catalog (env: FLIGHT_CATALOG_ENABLED)"
+    )
+
+
+class CatalogFlight(NamedTuple):
+    """Read-only snapshot of one flight row, with the attributes the flight responses read."""
+    id: int
+    origin: str
+    destination: str
+    origin_code: Optional[str]
+    destination_code: Optional[str]
+    departure_time: datetime
+    arrival_time: datetime
+    airline: str
+    status: str
+    price: int
+    seats_available: Optional[int]
+
+
+def _snapshot(flight) -> CatalogFlight:
+    return CatalogFlight(
+        id=flight.id, origin=flight.origin, destination=flight.destination,
+        origin_code=flight.origin_code, destination_code=flight.destination_code,
+        departure_time=flight.departure_time, arrival_time=flight.arrival_time,
+        airline=flight.airline, status=flight.status, price=flight.price,
+        seats_available=flight.seats_available
+    )
+
+
+def _like_matcher(term: str) -> Callable[[str], bool]:
+    """Match values the way SQLite matches `value ILIKE '%term%'`, wildcards included."""
+    pattern = "".join(
+        ".*" if char == "%" else "." if char == "_" else re.escape(char)
+        for char in term.translate(_ASCII_LOWER)
+    )
+    regex = re.compile(pattern, re.DOTALL)
+    return lambda value: regex.search(value.translate(_ASCII_LOWER)) is not None
+
+
+class FlightCatalog:
+    """Column arrays of all flights in (departure time, id) order, refreshed incrementally by flight version."""
+
+    def __init__(self, config: Optional[FlightCatalogConfig] = None) -> None:
+        self.config: FlightCatalogConfig = config or FlightCatalogConfig()
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        self._rows: List[CatalogFlight] = []
+        self._position_by_id: Dict[int, int] = {}
+        self._codes: Dict[str, int] = {}
+        self._values: List[str] = []
+        self._build_columns()
+
+    def is_enabled(self) -> bool:
+        """Check whether flight search should be served from the catalog."""
+        return self.config.enabled
+
+    def is_loaded(self) -> bool:
+        """Check whether the catalog has been loaded."""
+        return self._version is not None
+
+    def version(self) -> Optional[int]:
+        """Newest flight version loaded, or None before the first load."""
+        return self._version
+
+    def refresh(self, latest_version: int, load_flights: Callable[[Optional[int]], Iterable]) -> None:
+        """
+        Bring the catalog up to latest_version. load_flights(None) returns every flight and
+        load_flights(version) the flights written after that version.
+        """
+        with self._lock:
+            if self._version is None:
+                flights = list(load_flights(None))
+                self._load(flights)
+                self._version = max([latest_version] + [flight.version or 0 for flight in flights])
+                logger.info(f"Flight catalog loaded with {len(self._rows)} flights at version {self._version}")
+            elif latest_version > self._version:
+                flights = list(load_flights(self._version))
+                self._apply(flights)
+                self._version = max([latest_version] + [flight.version or 0 for flight in flights])
+                logger.debug("Flight catalog refreshed with %d changed flights", len(flights))
+
+    def _load(self, flights: Iterable) -> None:
+        """Replace all rows and rebuild the columns."""
+        self._rows = [_snapshot(flight) for flight in flights]
+        self._build_columns()
+
+    def _apply(self, flights: List) -> None:
+        """Patch changed rows in place; new or rescheduled flights need a re-sort and rebuild the columns."""
+        rows = {flight.id: _snapshot(flight) for flight in flights}
+        needs_rebuild = False
+        for flight_id, row in rows.items():
+            position = self._position_by_id.get(flight_id)
+            if position is None or self._rows[position].departure_time != row.departure_time:
+                needs_rebuild = True
+                break
+        if needs_rebuild:
+            by_id = {row.id: row for row in self._rows}
+            by_id.update(rows)
+            self._rows = list(by_id.values())
+            self._build_columns()
+            return
+        for flight_id, row in rows.items():
+            position = self._position_by_id[flight_id]
+            self._rows[position] = row
+            self._origin[position] = self._code(row.origin)
+            self._destination[position] = self._code(row.destination)
+            self._origin_code[position] = self._code(row.origin_code or "")
+            self._destination_code[position] = self._code(row.destination_code or "")
+            self._airline[position] = self._code(row.airline)
+            self._status[position] = self._code(row.status)
+            self._arrival[position] = np.datetime64(row.arrival_time, "us")
+            self._price[position] = row.price
+            self._seats[position] = row.seats_available or 0
+
+    def _code(self, value: str) -> int:
+        """Intern a string column value."""
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self._values)
+            self._values.append(value)
+        return code
+
+    def _build_columns(self) -> None:
+        self._rows.sort(key=lambda row: (row.departure_time, row.id))
+        rows = self._rows
+        self._position_by_id = {row.id: position for position, row in enumerate(rows)}
+        self._ids = np.array([row.id for row in rows], dtype=np.int64)
+        self._origin = np.array([self._code(row.origin) for row in rows], dtype=np.int64)
+        self._destination = np.array([self._code(row.destination) for row in rows], dtype=np.int64)
+        self._origin_code = np.array([self._code(row.origin_code or "") for row in rows], dtype=np.int64)
+        self._destination_code = np.array([self._code(row.destination_code or "") for row in rows], dtype=np.int64)
+        self._airline = np.array([self._code(row.airline) for row in rows], dtype=np.int64)
+        self._status = np.array([self._code(row.status) for row in rows], dtype=np.int64)
+        self._departure = np.array([row.departure_time for row in rows], dtype="datetime64[us]")
+        self._arrival = np.array([row.arrival_time for row in rows], dtype="datetime64[us]")
+        self._price = np.array([row.price for row in rows], dtype=np.int64)
+        self._seats = np.array([row.seats_available or 0 for row in rows], dtype=np.int64)
+        self._id_order = np.argsort(self._ids, kind="stable")
+
+    def _matching_codes(self, term: str) -> np.ndarray:
+        """Codes of the interned values containing term, matched like the SQL search."""
+        matches = _like_matcher(term)
+        return np.array([code for code, value in enumerate(self._values) if matches(value)], dtype=np.int64)
+
+    def _airport_mask(self, names: np.ndarray, codes: np.ndarray, name: str,
+                      airport_codes: Optional[List[str]]) -> np.ndarray:
+        if airport_codes:
+            return np.isin(codes, [self._codes[code] for code in airport_codes if code in self._codes])
+        return np.isin(names, self._matching_codes(name))
+
+    def search(self, origin: Optional[str] = None, destination: Optional[str] = None,
+               departure_date: Optional[str] = None, page: int = 1, size: int = 10,
+               min_price: Optional[float] = None, max_price: Optional[float] = None, airline: Optional[str] = None,
+               departure_hour_from: Optional[int] = None, departure_hour_to: Optional[int] = None,
+               sort_by: str = "departure", origin_codes: Optional[List[str]] = None,
+               destination_codes: Optional[List[str]] = None) -> Tuple[List[CatalogFlight], int]:
+        """
+        Same contract as FlightRepository.search_flights, answered from the column arrays. Pass the airport
+        codes origin and destination resolve to, if any, and they are matched by code like the SQL search does.
+        """
+        with self._lock:
+            first, last = 0, len(self._rows)
+            if departure_date:
+                try:
+                    day = np.datetime64(datetime.strptime(departure_date, "%Y-%m-%d").date(), "D")
+                except ValueError:
+                    raise ValueError("Invalid date format. Use YYYY-MM-DD")
+                first, last = np.searchsorted(self._departure, [day, day + _ONE_DAY], side="left")
+            window = slice(first, last)
+
+            scheduled = self._codes.get("scheduled", -1)
+            mask = (self._status[window] == scheduled) & (self._seats[window] > 0)
+            if origin:
+                mask &= self._airport_mask(self._origin[window], self._origin_code[window], origin, origin_codes)
+            if destination:
+                mask &= self._airport_mask(
+                    self._destination[window], self._destination_code[window], destination, destination_codes
+                )
+            if airline:
+                mask &= np.isin(self._airline[window], self._matching_codes(airline))
+            if min_price is not None:
+                mask &= self._price[window] >= min_price
+            if max_price is not None:
+                mask &= self._price[window] <= max_price
+            if departure_hour_from is not None or departure_hour_to is not None:
+                hour = (self._departure[window].astype(np.int64) // _ONE_HOUR_US) % 24
+                first_hour = 0 if departure_hour_from is None else departure_hour_from
+                last_hour = 23 if departure_hour_to is None else departure_hour_to
+                if first_hour <= last_hour:
+                    mask &= (hour >= first_hour) & (hour <= last_hour)
+                else:
+                    # A window such as 22-5 runs past midnight
+                    mask &= (hour >= first_hour) | (hour <= last_hour)
+
+            # Positions are already in (departure, id) order
+            positions = np.flatnonzero(mask) + first
+            if sort_by == "price":
+                positions = positions[np.lexsort((self._ids[positions], self._price[positions]))]
+            elif sort_by == "duration":
+                duration = self._arrival[positions] - self._departure[positions]
+                positions = positions[np.lexsort((self._ids[positions], duration))]
+
+            offset = (page - 1) * size
+            return [self._rows[position] for position in positions[offset:offset + size]], len(positions)
+
+    def list_all(self, page: int = 1, size: int = 10) -> Tuple[List[CatalogFlight], int]:
+        """All flights in id order with pagination."""
+        with self._lock:
+            offset = (page - 1) * size
+            positions = self._id_order[offset:offset + size]
+            return [self._rows[position] for position in positions], len(self._rows)
+
+
+# Global instance - Singleton pattern
+flight_catalog = FlightCatalog()
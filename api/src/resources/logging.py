@@ -6,20 +6,40 @@ This module provides structured logging with:
 - File and console output
 - Color-coded console output
 - Proper separation of INFO/WARNING to stdout and ERROR to stderr
-- JSON formatting for production use
+- JSON formatting for production use: one JSON object per line, serialized once
+  (orjson when installed) and stamped with the request correlation id
+- Non-blocking delivery: handlers run behind a bounded queue on a background
+  listener thread that batches writes and sheds low-severity records under overload
+- Lazy message formatting: pass %-style arguments and wrap expensive values in
+  lazy() so nothing is built unless the record is actually emitted
 """
 
 import logging
 import logging.handlers
+import atexit
+import datetime
+import json
+import queue
 import sys
+import threading
 import os
-from typing import Optional
+from contextvars import ContextVar
+from typing import Any, Callable, Optional, List
 from pathlib import Path
 import colorlog
 from pydantic import BaseModel, Field
 from opencensus.ext.azure.log_exporter import AzureLogHandler 
 from constants import ApplicationConstants, EnvironmentKeys, get_env_str
 
+try:
+    import orjson
+except ImportError:  # Optional speedup; the standard library encoder is used otherwise
+    orjson = None
+
+
+# Correlation id of the request being handled, set by RequestContextMiddleware
+correlation_id_var: ContextVar[Optional[str]] = ContextVar("correlation_id", default=None)
+
 
 class LoggingConfig(BaseModel):
     """Configuration for logging system."""
@@ -54,6 +74,230 @@ class LoggingConfig(BaseModel):
         default_factory=lambda: os.getenv("LOG_JSON_FORMAT", "false").lower() in ("true", "1", "yes"),
         description="Use JSON formatting for production (env: LOG_JSON_FORMAT)"
     )
+    async_logging: bool = Field(
+        default_factory=lambda: os.getenv("LOG_ASYNC", "true").lower() in ("true", "1", "yes"),
+        description="Deliver records to handlers on a background thread (env: LOG_ASYNC)"
+    )
+    queue_size: int = Field(
+        default_factory=lambda: int(os.getenv("LOG_QUEUE_SIZE", "10000")),
+        ge=1,
+        description="Max records buffered for the background listener (env: LOG_QUEUE_SIZE)"
+    )
+    batch_size: int = Field(default=256, ge=1, description="Max records written per listener wake-up before flushing")
+    overload_threshold: float = Field(
+        default=0.8, gt=0.0, le=1.0,
+        description="Queue fill ratio above which records below WARNING are sampled"
+    )
+    overload_sample_rate: int = Field(
+        default=10, ge=1,
+        description="Keep 1 in N records below WARNING while the queue is over the overload threshold"
+    )
+
+
+class LazyArg:
+    """Log argument that is only computed when the record is formatted."""
+    
+    __slots__ = ("_func", "_args")
+    
+    def __init__(self, func: Callable[..., Any], *args: Any) -> None:
+        self._func = func
+        self._args = args
+    
+    def __str__(self) -> str:
+        return str(self._func(*self._args))
+    
+    def __repr__(self) -> str:
+        return repr(self._func(*self._args))
+
+
+def lazy(func: Callable[..., Any], *args: Any) -> LazyArg:
+    """
+    Defer an expensive log argument, e.g.
+    logger.debug("Booking IDs: %s", lazy(lambda: [b.id for b in bookings])).
+    """
+    return LazyArg(func, *args)
+
+
+# Attributes every LogRecord has; anything else on a record came from `extra=`
+_STANDARD_RECORD_ATTRS = frozenset(
+    vars(logging.LogRecord("", 0, "", 0, "", None, None))
+) | {"message", "asctime", "correlation_id", "taskName"}
+
+
+def _dumps(payload: dict) -> str:
+    """Serialize a log payload to a single JSON line."""
+    if orjson is not None:
+        return orjson.dumps(payload, default=str).decode()
+    return json.dumps(payload, default=str, ensure_ascii=False, separators=(",", ":"))
+
+
+class CorrelationIdFilter(logging.Filter):
+    """
+    Stamp records with the current correlation id.
+    Runs on the thread that logged the record, so the context var is still in scope
+    even when the record is formatted later by the queue listener.
+    """
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "correlation_id"):
+            record.correlation_id = correlation_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line, including any `extra=` fields."""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "timestamp": datetime.datetime.fromtimestamp(
+                record.created, tz=datetime.timezone.utc
+            ).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "function": record.funcName,
+            "line": record.lineno,
+        }
+        correlation_id = getattr(record, "correlation_id", None)
+        if correlation_id:
+            payload["correlation_id"] = correlation_id
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_RECORD_ATTRS:
+                payload[key] = value
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exception"] = record.exc_text
+        if record.stack_info:
+            payload["stack"] = self.formatStack(record.stack_info)
+        return _dumps(payload)
+
+
+class OverloadSheddingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that never blocks the caller on a full queue.
+    Above the overload threshold records below WARNING are sampled; when the queue
+    is full they are dropped. ERROR and above wait briefly for space before being dropped.
+    """
+    
+    def __init__(self, log_queue: queue.Queue, overload_threshold: float, sample_rate: int,
+                 error_put_timeout: float = 0.05) -> None:
+        super().__init__(log_queue)
+        self.high_water_mark = max(1, int(log_queue.maxsize * overload_threshold)) if log_queue.maxsize > 0 else 0
+        self.sample_rate = sample_rate
+        self.error_put_timeout = error_put_timeout
+        self.dropped_count = 0
+        self._sample_counter = 0
+        # Records arrive from every logging thread; the counters are read at shutdown
+        self._counter_lock = threading.Lock()
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Merge the message arguments so later mutation of args cannot change the record.
+        The queue never leaves the process, so the record is neither copied nor pre-formatted.
+        """
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+    
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Enqueue a record, shedding low-severity records under pressure."""
+        if (self.high_water_mark and record.levelno < logging.WARNING
+                and self.queue.qsize() >= self.high_water_mark):
+            with self._counter_lock:
+                self._sample_counter += 1
+                sampled = self._sample_counter % self.sample_rate == 0
+            if not sampled:
+                self._count_drop()
+                return
+        
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+        
+        if record.levelno >= logging.ERROR:
+            try:
+                self.queue.put(record, timeout=self.error_put_timeout)
+                return
+            except queue.Full:
+                pass
+        self._count_drop()
+    
+    def _count_drop(self) -> None:
+        """Count a shed record."""
+        with self._counter_lock:
+            self.dropped_count += 1
+
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    """
+    QueueListener that drains up to batch_size records per wake-up and flushes
+    its handlers once per batch instead of once per record.
+    """
+    
+    def __init__(self, log_queue: queue.Queue, *handlers: logging.Handler, batch_size: int = 256,
+                 stop_timeout: float = 5.0) -> None:
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.batch_size = batch_size
+        self.stop_timeout = stop_timeout
+    
+    def enqueue_sentinel(self) -> None:
+        """
+        Wait up to stop_timeout for room for the stop sentinel. The base class uses put_nowait, which raises
+        queue.Full on a bounded queue that is full at shutdown and leaves the listener thread running.
+        """
+        self.queue.put(self._sentinel, timeout=self.stop_timeout)
+    
+    def _monitor(self) -> None:
+        """Drain the queue in batches until the stop sentinel is seen."""
+        log_queue = self.queue
+        has_task_done = hasattr(log_queue, "task_done")
+        while True:
+            batch = [self.dequeue(True)]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.dequeue(False))
+                except queue.Empty:
+                    break
+            
+            stop = False
+            for record in batch:
+                if record is self._sentinel:
+                    stop = True
+                else:
+                    self.handle(record)
+                if has_task_done:
+                    log_queue.task_done()
+            
+            for handler in self.handlers:
+                try:
+                    handler.flush()
+                except (OSError, ValueError):
+                    # Stream already closed (e.g. interpreter shutdown); keep draining
+                    pass
+            if stop:
+                break
+
+
+class BatchFlushRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """RotatingFileHandler that leaves flushing to the listener's batch boundary."""
+    
+    def emit(self, record: logging.LogRecord) -> None:
+        """Write the record without flushing the stream."""
+        try:
+            if self.shouldRollover(record):
+                self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(self.format(record) + self.terminator)
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
 
 
 class LoggingManager:
@@ -63,6 +307,8 @@ class LoggingManager:
         self.config: LoggingConfig = config or LoggingConfig()
         self._is_initialized: bool = False
         self.main_logger: Optional[logging.Logger] = None
+        self.queue_handler: Optional[OverloadSheddingQueueHandler] = None
+        self.listener: Optional[BatchingQueueListener] = None
     
     def initialize(self) -> None:
         """Initialize the logging system."""
@@ -82,11 +328,7 @@ class LoggingManager:
         
         # Create formatters
         if self.config.json_format:
-            file_formatter = logging.Formatter(
-                '{"timestamp": "%(asctime)s", "level": "%(levelname)s", '
-                '"logger": "%(name)s", "message": "%(message)s", '
-                '"module": "%(module)s", "function": "%(funcName)s", "line": %(lineno)d}'
-            )
+            file_formatter = JsonFormatter()
         else:
             file_formatter = logging.Formatter(
                 '%(asctime)s - %(name)s - %(levelname)s - %(module)s:%(funcName)s:%(lineno)d - %(message)s'
@@ -111,8 +353,14 @@ class LoggingManager:
                 datefmt='%Y-%m-%d %H:%M:%S'
             )
         
+        # File handlers only flush per batch when a listener drives them
+        file_handler_class = (
+            BatchFlushRotatingFileHandler if self.config.async_logging
+            else logging.handlers.RotatingFileHandler
+        )
+        
         # File handler for all logs (rotating)
-        file_handler = logging.handlers.RotatingFileHandler(
+        file_handler = file_handler_class(
             self.config.log_file,
             maxBytes=self.config.max_file_size,
             backupCount=self.config.backup_count
@@ -121,7 +369,7 @@ class LoggingManager:
         file_handler.setFormatter(file_formatter)
         
         # File handler for errors only (rotating)
-        error_file_handler = logging.handlers.RotatingFileHandler(
+        error_file_handler = file_handler_class(
             self.config.error_log_file,
             maxBytes=self.config.max_file_size,
             backupCount=self.config.backup_count
@@ -140,18 +388,38 @@ class LoggingManager:
         stderr_handler.setLevel(logging.ERROR)
         stderr_handler.setFormatter(console_formatter)
         
-        # Add handlers to root logger
-        root_logger.addHandler(file_handler)
-        root_logger.addHandler(error_file_handler)
-        root_logger.addHandler(stdout_handler)
-        root_logger.addHandler(stderr_handler)
+        handlers: List[logging.Handler] = [file_handler, error_file_handler, stdout_handler, stderr_handler]
 
         # NUEVO: Azure Application Insights handler
         app_insights_conn_str = os.getenv("APPINSIGHTS_CONNECTION_STRING")
         if app_insights_conn_str:
             azure_handler = AzureLogHandler(connection_string=app_insights_conn_str)
             azure_handler.setLevel(logging.INFO)
-            root_logger.addHandler(azure_handler)
+            handlers.append(azure_handler)
+        
+        # Stamp correlation ids before records can leave the logging thread
+        correlation_filter = CorrelationIdFilter()
+        for handler in handlers:
+            handler.addFilter(correlation_filter)
+        
+        # Add handlers to root logger, behind a queue when async logging is enabled
+        if self.config.async_logging:
+            log_queue: queue.Queue = queue.Queue(maxsize=self.config.queue_size)
+            self.queue_handler = OverloadSheddingQueueHandler(
+                log_queue,
+                overload_threshold=self.config.overload_threshold,
+                sample_rate=self.config.overload_sample_rate
+            )
+            self.queue_handler.addFilter(correlation_filter)
+            self.listener = BatchingQueueListener(log_queue, *handlers, batch_size=self.config.batch_size)
+            self.listener.start()
+            root_logger.addHandler(self.queue_handler)
+            atexit.register(self.shutdown)
+        else:
+            for handler in handlers:
+                root_logger.addHandler(handler)
+        
+        if app_insights_conn_str:
             root_logger.info("Azure Application Insights logging is enabled.")
         else:
             root_logger.warning("APPINSIGHTS_CONNECTION_STRING not set; skipping AzureLogHandler.")
@@ -165,6 +433,34 @@ class LoggingManager:
         self.main_logger.info(f"Log level: {self.config.log_level}")
         self.main_logger.info(f"Main log file: {self.config.log_file}")
         self.main_logger.info(f"Error log file: {self.config.error_log_file}")
+        self.main_logger.info(f"Async logging: {self.config.async_logging}")
+    
+    def shutdown(self) -> None:
+        """
+        Stop the background listener, flushing any queued records.
+        Handlers are re-attached to the root logger so late records are still delivered synchronously.
+        If the listener cannot be stopped, the queue handler stays attached and shutdown can be retried.
+        """
+        if self.listener is None:
+            return
+        listener = self.listener
+        try:
+            listener.stop()
+        except queue.Full:
+            sys.stderr.write(f"Logging listener did not stop: queue still full after {listener.stop_timeout}s\n")
+            return
+        self.listener = None
+        atexit.unregister(self.shutdown)
+        
+        root_logger = logging.getLogger()
+        for handler in listener.handlers:
+            root_logger.addHandler(handler)
+        if self.queue_handler in root_logger.handlers:
+            root_logger.removeHandler(self.queue_handler)
+    
+    def get_dropped_count(self) -> int:
+        """Get the number of records shed by the queue handler under overload."""
+        return self.queue_handler.dropped_count if self.queue_handler else 0
     
     def get_logger(self, name: str) -> logging.Logger:
         """Get a logger with the specified name."""
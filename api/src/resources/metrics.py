@@ -0,0 +1,370 @@
+"""
+In-process metrics registry for the Flights Chatbot Assistant API.
+
+Counters and histograms are rendered in the Prometheus text exposition format
+by the /metrics endpoint. The recording hot path takes no lock: every thread
+writes to its own shard of each labelled series, and shards are only summed
+when the registry is rendered.
+"""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import Engine, event
+
+# Latency buckets in seconds, from sub-millisecond DB work up to slow LLM calls
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+COUNT_BUCKETS: Tuple[float, ...] = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape_label_value(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _CounterShard:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+
+class _HistogramShard:
+    __slots__ = ("counts", "sum")
+
+    def __init__(self, size: int) -> None:
+        self.counts = [0] * size
+        self.sum = 0.0
+
+
+class _ShardedSeries(ABC):
+    """One labelled series; each recording thread owns a shard, so writes never contend."""
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+        self._shards: List[Any] = []
+        self._lock = threading.Lock()
+
+    def _shard(self) -> Any:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._new_shard()
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    @abstractmethod
+    def _new_shard(self) -> Any:
+        """Create the empty shard a new recording thread writes to."""
+        pass
+
+    def _all_shards(self) -> List[Any]:
+        with self._lock:
+            return list(self._shards)
+
+
+class CounterChild(_ShardedSeries):
+    """A single counter series."""
+
+    def _new_shard(self) -> _CounterShard:
+        return _CounterShard()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._shard().value += amount
+
+    def get(self) -> float:
+        return sum(shard.value for shard in self._all_shards())
+
+
+class HistogramChild(_ShardedSeries):
+    """A single histogram series."""
+
+    def __init__(self, upper_bounds: Tuple[float, ...]) -> None:
+        super().__init__()
+        self.upper_bounds = upper_bounds
+
+    def _new_shard(self) -> _HistogramShard:
+        # One slot per bucket plus the +Inf overflow slot
+        return _HistogramShard(len(self.upper_bounds) + 1)
+
+    def observe(self, value: float) -> None:
+        shard = self._shard()
+        shard.counts[bisect_left(self.upper_bounds, value)] += 1
+        shard.sum += value
+
+    def get(self) -> Dict[str, Any]:
+        """Return cumulative bucket counts, sum and count across all shards."""
+        counts = [0] * (len(self.upper_bounds) + 1)
+        total = 0.0
+        for shard in self._all_shards():
+            for i, count in enumerate(shard.counts):
+                counts[i] += count
+            total += shard.sum
+        cumulative, running = [], 0
+        for count in counts:
+            running += count
+            cumulative.append(running)
+        return {"buckets": cumulative, "sum": total, "count": running}
+
+
+class _Metric(ABC):
+    """Base class for a metric family with a fixed set of label names."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        # Same series keyed by the caller's raw values (e.g. 200 and "200"), so the hot path skips str()
+        self._lookup: Dict[Tuple[Any, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: Any) -> Any:
+        """Get the series for the given label values, creating it on first use."""
+        child = self._lookup.get(values)
+        if child is None:
+            child = self._create_child(values)
+        return child
+
+    def _create_child(self, values: Tuple[Any, ...]) -> Any:
+        key = tuple(str(value) for value in values)
+        if len(key) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+        with self._lock:
+            child = self._children.get(key)
+            if child is None:
+                child = self._children[key] = self._new_child()
+            self._lookup[values] = child
+        return child
+
+    @abstractmethod
+    def _new_child(self) -> Any:
+        """Create the series for a new set of label values."""
+        pass
+
+    def _series(self) -> List[Tuple[Tuple[str, ...], Any]]:
+        with self._lock:
+            return sorted(self._children.items())
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._render_samples())
+        return lines
+
+    @abstractmethod
+    def _render_samples(self) -> List[str]:
+        """Render the sample lines of every series in the exposition format."""
+        pass
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+
+    kind = "counter"
+
+    def _new_child(self) -> CounterChild:
+        return CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def _render_samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.get())}"
+            for key, child in self._series()
+        ]
+
+
+class Histogram(_Metric):
+    """Histogram with fixed upper bounds."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.upper_bounds = tuple(sorted(buckets))
+
+    def _new_child(self) -> HistogramChild:
+        return HistogramChild(self.upper_bounds)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def _render_samples(self) -> List[str]:
+        lines = []
+        for key, child in self._series():
+            data = child.get()
+            for bound, count in zip(self.upper_bounds + (float("inf"),), data["buckets"]):
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(data['sum'])}")
+            lines.append(f"{self.name}_count{labels} {data['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metric families and renders them in the Prometheus text format."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric: _Metric) -> Any:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} already registered with a different shape")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Global instance - Singleton pattern
+metrics_registry = MetricsRegistry()
+
+# HTTP
+HTTP_REQUEST_DURATION = metrics_registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template",
+    ("method", "route", "status")
+)
+HTTP_REQUEST_DB_QUERIES = metrics_registry.histogram(
+    "http_request_db_queries", "Database queries issued per HTTP request",
+    ("method", "route"), buckets=COUNT_BUCKETS
+)
+HTTP_REQUEST_DB_DURATION = metrics_registry.histogram(
+    "http_request_db_duration_seconds", "Database time spent per HTTP request",
+    ("method", "route")
+)
+
+# Database
+DB_QUERY_DURATION = metrics_registry.histogram(
+    "db_query_duration_seconds", "Duration of individual database statements"
+)
+
+# Chat agent
+CHAT_AGENT_DURATION = metrics_registry.histogram(
+    "chat_agent_duration_seconds", "End-to-end agent invocation time", ("outcome",)
+)
+LLM_CALL_DURATION = metrics_registry.histogram(
+    "llm_call_duration_seconds", "Duration of individual LLM calls", ("outcome",)
+)
+TOOL_CALL_DURATION = metrics_registry.histogram(
+    "tool_call_duration_seconds", "Duration of agent tool calls", ("tool", "outcome")
+)
+CHECKPOINT_WRITE_DURATION = metrics_registry.histogram(
+    "checkpoint_write_duration_seconds", "Duration of agent checkpoint writes", ("operation",)
+)
+CHECKPOINT_RETENTION_DURATION = metrics_registry.histogram(
+    "checkpoint_retention_duration_seconds", "Duration of checkpoint retention runs", ("outcome",)
+)
+CHECKPOINT_ROWS_DELETED = metrics_registry.counter(
+    "checkpoint_rows_deleted_total", "Checkpoints deleted by retention", ("reason",)
+)
+CHECKPOINT_RECLAIMED_BYTES = metrics_registry.counter(
+    "checkpoint_reclaimed_bytes_total", "Bytes returned to the filesystem by checkpoint vacuum"
+)
+
+# Authentication
+AUTH_REQUESTS = metrics_registry.counter(
+    "auth_requests_total", "Authentication middleware outcomes", ("result",)
+)
+AUTH_USER_LOOKUP_DURATION = metrics_registry.histogram(
+    "auth_user_lookup_duration_seconds", "Time to validate a token and load its user"
+)
+
+# Speech
+SPEECH_TRANSCODE_DURATION = metrics_registry.histogram(
+    "speech_transcode_duration_seconds", "Audio to WAV transcoding time", ("outcome",)
+)
+
+
+class RequestDbStats:
+    """Database work attributed to the current request."""
+
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.seconds = 0.0
+
+
+# Stats of the request being handled, set by RequestContextMiddleware.
+# The object is shared with threadpool workers, which inherit the context.
+request_db_stats_var: ContextVar[Optional[RequestDbStats]] = ContextVar("request_db_stats", default=None)
+
+_QUERY_START_KEY = "metrics_query_start"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault(_QUERY_START_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    starts = conn.info.get(_QUERY_START_KEY)
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    DB_QUERY_DURATION.observe(elapsed)
+    stats = request_db_stats_var.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.seconds += elapsed
+
+
+def _handle_error(context) -> None:
+    # A failed statement never reaches after_cursor_execute; drop its start time
+    if context.connection is not None:
+        starts = context.connection.info.get(_QUERY_START_KEY)
+        if starts:
+            starts.pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Time every statement executed on the engine."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
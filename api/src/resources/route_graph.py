@@ -0,0 +1,199 @@
+"""
+In-memory route graph for multi-leg flight searches.
+
+Scheduled flights are indexed by origin airport code, or by the origin text of flights
+without one, and kept sorted by departure time, so the onward legs that fit a layover
+window are found with a binary search instead of a query per airport. The index is
+loaded from the database on first use and then caught up with the flights written
+since, by any worker, using the flight version counter.
+"""
+
+import bisect
+import heapq
+import itertools
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from .airport_data import airport_key
+from .logging import get_logger
+
+logger = get_logger("route_graph")
+
+# Upper bound on partial itineraries expanded by one search, so a busy hub cannot make it unbounded
+_MAX_EXPANSIONS = 20000
+
+
+class FlightLeg(NamedTuple):
+    """One scheduled flight as an edge of the graph. Sorts by departure time."""
+    departure_time: datetime
+    arrival_time: datetime
+    flight_id: int
+    origin: str
+    destination: str
+    price: int
+
+
+def _leg_from_flight(flight) -> FlightLeg:
+    return FlightLeg(
+        departure_time=flight.departure_time,
+        arrival_time=flight.arrival_time,
+        flight_id=flight.id,
+        origin=airport_key(flight.origin_code or flight.origin),
+        destination=airport_key(flight.destination_code or flight.destination),
+        price=flight.price
+    )
+
+
+def _search_keys(name: str, codes: Optional[Iterable[str]]) -> Set[str]:
+    """Keys a searched origin or destination matches: its airports' codes and its own text."""
+    return {airport_key(code) for code in codes or ()} | {airport_key(name)}
+
+
+def _itinerary_cost(path: Tuple[FlightLeg, ...], sort_by: str) -> Tuple[float, float]:
+    """Objective of a partial itinerary; both objectives only grow as legs are added."""
+    price = sum(leg.price for leg in path)
+    duration = (path[-1].arrival_time - path[0].departure_time).total_seconds()
+    return (price, duration) if sort_by == "price" else (duration, price)
+
+
+class RouteGraph:
+    """Adjacency index of scheduled flights per origin with a time-dependent itinerary search."""
+
+    def __init__(self, max_expansions: int = _MAX_EXPANSIONS) -> None:
+        self.max_expansions = max_expansions
+        self._legs_by_origin: Dict[str, List[FlightLeg]] = {}
+        self._legs_by_id: Dict[int, FlightLeg] = {}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._is_loaded: bool = False
+        self._version: Optional[int] = None
+
+    def is_loaded(self) -> bool:
+        """Check whether the index has been loaded."""
+        return self._is_loaded
+
+    def load(self, flights: Iterable) -> int:
+        """Rebuild the index from scheduled flights. Returns the number of legs indexed."""
+        legs_by_origin: Dict[str, List[FlightLeg]] = {}
+        legs_by_id: Dict[int, FlightLeg] = {}
+        for flight in flights:
+            leg = _leg_from_flight(flight)
+            legs_by_origin.setdefault(leg.origin, []).append(leg)
+            legs_by_id[leg.flight_id] = leg
+        for legs in legs_by_origin.values():
+            legs.sort()
+        with self._lock:
+            self._legs_by_origin = legs_by_origin
+            self._legs_by_id = legs_by_id
+            self._is_loaded = True
+        logger.info(f"Route graph loaded with {len(legs_by_id)} flights from {len(legs_by_origin)} origins")
+        return len(legs_by_id)
+
+    def version(self) -> Optional[int]:
+        """Newest flight version indexed by refresh, or None before its first load."""
+        return self._version
+
+    def refresh(self, latest_version: int, load_flights: Callable[[Optional[int]], Iterable]) -> None:
+        """
+        Bring the index up to latest_version. load_flights(None) returns the flights to index from
+        scratch and load_flights(version) the flights written after that version, whatever their status.
+        """
+        with self._refresh_lock:
+            if self._version is None:
+                flights = list(load_flights(None))
+                self.load(flights)
+            elif latest_version > self._version:
+                flights = list(load_flights(self._version))
+                for flight in flights:
+                    self.upsert(flight)
+                logger.debug("Route graph refreshed with %d changed flights", len(flights))
+            else:
+                return
+            self._version = max([latest_version] + [flight.version or 0 for flight in flights])
+
+    def upsert(self, flight) -> None:
+        """Index a flight after it was written; flights that are not scheduled are removed."""
+        if not self._is_loaded:
+            # Nothing to keep in step yet; the first search loads every flight
+            return
+        with self._lock:
+            self._remove(flight.id)
+            if flight.status == "scheduled":
+                leg = _leg_from_flight(flight)
+                bisect.insort(self._legs_by_origin.setdefault(leg.origin, []), leg)
+                self._legs_by_id[leg.flight_id] = leg
+
+    def remove(self, flight_id: int) -> None:
+        """Drop a flight from the index."""
+        with self._lock:
+            self._remove(flight_id)
+
+    def _remove(self, flight_id: int) -> None:
+        leg = self._legs_by_id.pop(flight_id, None)
+        if leg is None:
+            return
+        legs = self._legs_by_origin[leg.origin]
+        del legs[bisect.bisect_left(legs, leg)]
+
+    def _departures(self, origin: str, earliest: datetime, latest: datetime) -> List[FlightLeg]:
+        """Legs leaving origin with earliest <= departure_time <= latest."""
+        legs = self._legs_by_origin.get(origin, [])
+        start = bisect.bisect_left(legs, (earliest,))
+        end = bisect.bisect_right(legs, (latest, datetime.max))
+        return legs[start:end]
+
+    def search(self, origin: str, destination: str, earliest_departure: datetime, latest_departure: datetime,
+               min_layover: timedelta, max_layover: timedelta, max_stops: int = 2,
+               sort_by: str = "price", limit: int = 10, origin_codes: Optional[List[str]] = None,
+               destination_codes: Optional[List[str]] = None) -> List[List[FlightLeg]]:
+        """
+        Find up to `limit` itineraries from origin to destination whose first leg departs in
+        [earliest_departure, latest_departure], with at most max_stops connections and every
+        layover within [min_layover, max_layover]. origin_codes and destination_codes are the
+        airports the names resolve to; a city with several airports is searched from or to all of them.
+
+        Best-first (Dijkstra-style) search over partial itineraries: each onward leg is a
+        time-dependent edge that is only usable if it departs within the layover window after
+        the previous arrival. Costs never decrease as legs are added, so itineraries reach the
+        destination in objective order and the search stops after `limit` of them.
+        """
+        start_keys, end_keys = _search_keys(origin, origin_codes), _search_keys(destination, destination_codes)
+        if start_keys & end_keys:
+            return []
+
+        counter = itertools.count()
+        results: List[List[FlightLeg]] = []
+        expansions = 0
+        with self._lock:
+            heap = [
+                (_itinerary_cost((leg,), sort_by), next(counter), (leg,))
+                for start_key in start_keys
+                for leg in self._departures(start_key, earliest_departure, latest_departure)
+            ]
+            heapq.heapify(heap)
+            while heap and len(results) < limit and expansions < self.max_expansions:
+                _, _, path = heapq.heappop(heap)
+                last = path[-1]
+                if last.destination in end_keys:
+                    results.append(list(path))
+                    continue
+                if len(path) > max_stops:
+                    continue
+                expansions += 1
+                visited = {leg.origin for leg in path}
+                for leg in self._departures(last.destination, last.arrival_time + min_layover,
+                                            last.arrival_time + max_layover):
+                    if leg.destination in visited:
+                        continue
+                    next_path = path + (leg,)
+                    heapq.heappush(heap, (_itinerary_cost(next_path, sort_by), next(counter), next_path))
+
+        if expansions >= self.max_expansions:
+            logger.warning(f"Route search from {origin} to {destination} stopped after {expansions} expansions")
+        logger.debug("Route search from %s to %s found %s itineraries in %s expansions",
+                     origin, destination, len(results), expansions)
+        return results
+
+
+# Global instance - Singleton pattern
+route_graph = RouteGraph()
@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from models import User, Flight, Booking
 from .crypto import crypto_manager
+from .airport_data import REFERENCE_AIRPORTS
 from faker import Faker
 import random
 import datetime
@@ -71,15 +72,13 @@ class DataSeeder:
         return users
     
     def create_fake_flights(self, db: Session, n: int = None) -> List[Flight]:
-        """Create fake flights for testing."""
+        """Create fake flights for testing between reference airports."""
         if n is None:
             n = self.config.num_fake_flights
+        codes = [airport[0] for airport in REFERENCE_AIRPORTS]
         flights: List[Flight] = []
         for _ in range(n):
-            origin = self.fake.city()[:3].upper()
-            destination = self.fake.city()[:3].upper()
-            while destination == origin:
-                destination = self.fake.city()[:3].upper()
+            origin, destination = random.sample(codes, 2)
             
             departure = self.fake.date_time_between(start_date="+1d", end_date="+30d")
             arrival = departure + datetime.timedelta(hours=random.randint(2, 12))
@@ -87,6 +86,8 @@ class DataSeeder:
             flight = Flight(
                 origin=origin,
                 destination=destination,
+                origin_code=origin,
+                destination_code=destination,
                 departure_time=departure,
                 arrival_time=arrival,
                 airline=self.fake.company(),
@@ -104,17 +105,21 @@ class DataSeeder:
         """Create fake bookings for testing."""
         if n is None:
             n = self.config.num_fake_bookings
+        # Pending bookings are not flushed before the lookup below, so pairs picked in this batch are tracked here
+        booked = set()
         for _ in range(n):
             user = random.choice(users)
             flight = random.choice(flights)
-            exists = db.query(Booking).filter_by(user_id=user.id, flight_id=flight.id).first()
-            if not exists:
+            exists = (user.id, flight.id) in booked or db.query(Booking).filter_by(user_id=user.id, flight_id=flight.id).first()
+            if not exists and flight.seats_available > 0:
+                booked.add((user.id, flight.id))
                 booking = Booking(
                     user_id=user.id,
                     flight_id=flight.id,
                     status="booked"
                 )
                 db.add(booking)
+                flight.seats_available -= 1
         db.commit()
     
     def seed_all(self) -> None:
@@ -129,13 +134,13 @@ class DataSeeder:
                 self.create_default_user(db)
             
             # Create fake data
-            logger.debug(f"Creating {self.config.num_fake_users} fake users...")
+            logger.debug("Creating %s fake users...", self.config.num_fake_users)
             users = self.create_fake_users(db)
             
-            logger.debug(f"Creating {self.config.num_fake_flights} fake flights...")
+            logger.debug("Creating %s fake flights...", self.config.num_fake_flights)
             flights = self.create_fake_flights(db)
             
-            logger.debug(f"Creating {self.config.num_fake_bookings} fake bookings...")
+            logger.debug("Creating %s fake bookings...", self.config.num_fake_bookings)
             self.create_fake_bookings(db, users, flights)
             
             # Log results
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List
+from schemas import AirportResponse
+from resources.logging import get_logger
+from services import AirportService, create_airport_service
+from constants import ApplicationConstants
+
+router = APIRouter(prefix="/airports", tags=["airports"])
+logger = get_logger("airports_router")
+
+@router.get("/autocomplete", response_model=List[AirportResponse])
+def autocomplete_airports(
+    q: str = Query(..., min_length=1, description="Start of an airport code, city name or alias"),
+    limit: int = Query(ApplicationConstants.DEFAULT_AIRPORT_AUTOCOMPLETE_RESULTS, ge=1,
+                       le=ApplicationConstants.MAX_AIRPORT_AUTOCOMPLETE_RESULTS, description="Maximum number of suggestions"),
+    airport_service: AirportService = Depends(create_airport_service)
+):
+    try:
+        return airport_service.autocomplete(q, limit)
+        
+    except Exception as e:
+        logger.error(f"Error autocompleting airports for '{q}': {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error autocompleting airports: {str(e)}"
+        )
@@ -1,7 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from typing import Optional
+from typing import List, Optional
 from repository import User
-from schemas import BookingCreate, BookingResponse, BookingUpdate, PaginatedResponse
+from schemas import (
+    BookingCreate, BookingResponse, BookingUpdate, BookingBatchCreate, BookingBatchUpdate,
+    BookingStatusCounts, PaginatedResponse
+)
 from resources.dependencies import get_current_user
 from resources.logging import get_logger
 from services import BookingService, create_booking_service
@@ -31,6 +34,45 @@ def create_booking(
             detail=f"Error creating booking: {str(e)}"
         )
 
+# Batch routes are registered before /{booking_id} so "batch" is not parsed as an ID
+@router.post("/batch", response_model=List[BookingResponse])
+def create_bookings(
+    batch: BookingBatchCreate, 
+    current_user: User = Depends(get_current_user), 
+    booking_service: BookingService = Depends(create_booking_service)
+):
+    try:
+        return booking_service.create_bookings(current_user, batch)
+        
+    except ApiException as e:
+        logger.warning(f"Business logic error for user {current_user.email}: {e.error_code.value}")
+        raise api_exception_to_http_exception(e)
+    except Exception as e:
+        logger.error(f"Error creating bookings for user {current_user.email}: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error creating bookings: {str(e)}"
+        )
+
+@router.patch("/batch", response_model=List[BookingResponse])
+def cancel_bookings(
+    batch: BookingBatchUpdate, 
+    current_user: User = Depends(get_current_user), 
+    booking_service: BookingService = Depends(create_booking_service)
+):
+    try:
+        return booking_service.cancel_bookings(current_user, batch)
+        
+    except ApiException as e:
+        logger.warning(f"Business logic error for user {current_user.email}: {e.error_code.value}")
+        raise api_exception_to_http_exception(e)
+    except Exception as e:
+        logger.error(f"Error cancelling bookings for user {current_user.email}: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error cancelling bookings: {str(e)}"
+        )
+
 @router.patch("/{booking_id}", response_model=BookingResponse)
 def update_booking(
     booking_id: int, 
@@ -77,13 +119,21 @@ def get_user_bookings(
     status: Optional[str] = Query(None, description="Filter by status: booked, cancelled, completed"), 
     booked_date: Optional[str] = Query(None, description="Filter by booking date (YYYY-MM-DD format)"),
     departure_date: Optional[str] = Query(None, description="Filter by departure date (YYYY-MM-DD format)"),
+    booked_from: Optional[str] = Query(None, description="Booked on or after this date (YYYY-MM-DD format)"),
+    booked_to: Optional[str] = Query(None, description="Booked on or before this date (YYYY-MM-DD format)"),
+    departure_from: Optional[str] = Query(None, description="Departing on or after this date (YYYY-MM-DD format)"),
+    departure_to: Optional[str] = Query(None, description="Departing on or before this date (YYYY-MM-DD format)"),
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(10, ge=1, le=50, description="Page size"),
     current_user: User = Depends(get_current_user), 
     booking_service: BookingService = Depends(create_booking_service)
 ):  
     try:
-        bookings = booking_service.get_user_bookings(current_user, status, booked_date, departure_date, page, size)
+        bookings = booking_service.get_user_bookings(
+            current_user, status, booked_date, departure_date, page, size,
+            booked_from=booked_from, booked_to=booked_to,
+            departure_from=departure_from, departure_to=departure_to
+        )
         return bookings
         
     except Exception as e:
@@ -92,3 +142,18 @@ def get_user_bookings(
             status_code=500,
             detail=f"Error retrieving bookings: {str(e)}"
         )
+
+@router.get("/user/status-counts", response_model=BookingStatusCounts)
+def get_booking_status_counts(
+    current_user: User = Depends(get_current_user), 
+    booking_service: BookingService = Depends(create_booking_service)
+):
+    try:
+        return booking_service.get_booking_status_counts(current_user)
+        
+    except Exception as e:
+        logger.error(f"Error counting bookings for user {current_user.email}: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error counting bookings: {str(e)}"
+        )
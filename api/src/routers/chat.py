@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from typing import Optional
 from repository import User
-from schemas import ChatRequest, ChatResponse, ChatHistoryResponse, ChatSessionsResponse, DeleteSessionResponse, CreateSessionRequest, CreateSessionResponse, UpdateSessionAliasRequest, UpdateSessionAliasResponse
+from schemas import ChatRequest, ChatResponse, ChatHistoryResponse, ChatSearchResponse, ChatSessionsResponse, DeleteSessionResponse, CreateSessionRequest, CreateSessionResponse, UpdateSessionAliasRequest, UpdateSessionAliasResponse
 from resources.dependencies import get_current_user
 from resources.logging import get_logger
 from services import ChatService, create_chat_service
 from exceptions import ApiException
 from utils.error_handlers import api_exception_to_http_exception
+from constants import ApplicationConstants
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 logger = get_logger("chat_router")
@@ -18,7 +20,7 @@ async def chat_endpoint(
     chat_service: ChatService = Depends(create_chat_service)
 ):
     try:
-        logger.debug(f"Processing chat request for user {user.id}")
+        logger.debug("Processing chat request for user %s", user.id)
         
         # Get JWT token from request state (set by auth middleware)
         jwt_token = getattr(req.state, 'jwt_token', None)
@@ -29,10 +31,12 @@ async def chat_endpoint(
         response = await chat_service.process_chat_request(user, request, jwt_token)
         
         # Save to database through service
-        await chat_service.save_chat_message(user.id, response.session_id, request.content, response.response)
+        await chat_service.save_chat_message(
+            user.id, response.session_id, request.content, response.response, trace=response.trace
+        )
         
         logger.info(f"Successfully processed chat request for user {user.email} with session {response.session_id}")
-        logger.debug(f"Response length: {len(response.response)} characters")
+        logger.debug("Response length: %s characters", len(response.response))
         
         return response
         
@@ -51,6 +55,7 @@ def get_chat_history(
     session_id: str = Query(..., description="Session ID to filter history"),
     limit: int = Query(50, ge=1, le=100, description="Number of messages to retrieve"),
     offset: int = Query(0, ge=0, description="Number of messages to skip"),
+    include_trace: bool = Query(False, description="Include each turn's agent trace (LLM, tool and checkpoint timings)"),
     user: User = Depends(get_current_user),
     chat_service: ChatService = Depends(create_chat_service)
 ):
@@ -58,7 +63,9 @@ def get_chat_history(
     Get chat history for the current user for a specific session.
     """
     try:
-        history = chat_service.get_chat_history(user.id, session_id=session_id, limit=limit, offset=offset)
+        history = chat_service.get_chat_history(
+            user.id, session_id=session_id, limit=limit, offset=offset, include_trace=include_trace
+        )
         
         logger.info(f"Retrieved {len(history.messages)} chat messages for user {user.email} (total: {history.total_count})")
         
@@ -94,6 +101,35 @@ def clear_chat_history(
             detail=f"Error clearing chat history: {str(e)}"
         )
 
+@router.get("/search", response_model=ChatSearchResponse)
+def search_chat_history(
+    q: str = Query(..., min_length=1, description="Words to find in past messages and responses"),
+    limit: int = Query(ApplicationConstants.DEFAULT_CHAT_SEARCH_RESULTS, ge=1,
+                       le=ApplicationConstants.MAX_CHAT_SEARCH_RESULTS, description="Number of results to retrieve"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    user: User = Depends(get_current_user),
+    chat_service: ChatService = Depends(create_chat_service)
+):
+    """
+    Search the current user's chat history across all sessions, best match first.
+    """
+    try:
+        results = chat_service.search_chat_history(user.id, q, limit=limit, cursor=cursor)
+        
+        logger.info(f"Found {len(results.results)} chat messages matching search for user {user.email}")
+        
+        return results
+        
+    except ApiException as e:
+        logger.warning(f"Invalid chat search for user {user.email}: {e.message}")
+        raise api_exception_to_http_exception(e)
+    except Exception as e:
+        logger.error(f"Error searching chat history for user {user.email}: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error searching chat history: {str(e)}"
+        )
+
 @router.get("/sessions", response_model=ChatSessionsResponse)
 async def get_user_sessions(
     user: User = Depends(get_current_user),
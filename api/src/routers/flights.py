@@ -1,27 +1,47 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from typing import Optional
+from typing import List, Literal, Optional
 from repository import User
-from schemas import FlightResponse, FlightCreate, PaginatedResponse
+from schemas import (
+    FlightResponse, FlightCreate, PaginatedResponse, FareCalendarResponse, ItineraryResponse,
+    FlightSearchBatch, FlightSearchBatchResult, FlightSearchResponse, FlightSearchFilters
+)
 from resources.dependencies import get_current_user
 from resources.logging import get_logger
 from services import FlightService, create_flight_service
 from exceptions import ApiException
 from utils.error_handlers import api_exception_to_http_exception
+from constants import ApplicationConstants
 
 router = APIRouter(prefix="/flights", tags=["flights"])
 logger = get_logger("flights_router")
 
-@router.get("/search", response_model=PaginatedResponse[FlightResponse])
+@router.get("/search", response_model=FlightSearchResponse)
 def search_flights(
     origin: Optional[str] = Query(None, description="Origin airport code or city name"),
     destination: Optional[str] = Query(None, description="Destination airport code or city name"), 
     departure_date: Optional[str] = Query(None, description="Departure date in YYYY-MM-DD format"),
     page: int = Query(1, ge=1, description="Page number for pagination"),
     size: int = Query(10, ge=1, le=100, description="Number of items per page"),
+    flexible_days: int = Query(0, ge=0, le=ApplicationConstants.MAX_FLEXIBLE_SEARCH_DAYS,
+                               description="Also search this many days before and after departure_date"),
+    min_price: Optional[float] = Query(None, ge=0, description="Lowest price to include"),
+    max_price: Optional[float] = Query(None, ge=0, description="Highest price to include"),
+    airline: Optional[str] = Query(None, description="Airline name"),
+    departure_hour_from: Optional[int] = Query(None, ge=0, le=23, description="Earliest departure hour (0-23)"),
+    departure_hour_to: Optional[int] = Query(None, ge=0, le=23, description="Latest departure hour (0-23), may wrap past midnight"),
+    sort_by: Literal["departure", "price", "duration"] = Query("departure", description="Order by departure time, price or flight duration"),
     flight_service: FlightService = Depends(create_flight_service)
 ):
     try:
-        flights = flight_service.search_flights(origin, destination, departure_date, page, size)
+        filters = FlightSearchFilters(
+            min_price=min_price,
+            max_price=max_price,
+            airline=airline,
+            departure_hour_from=departure_hour_from,
+            departure_hour_to=departure_hour_to,
+            sort_by=sort_by
+        )
+        flights = flight_service.search_flights(origin, destination, departure_date, page, size, flexible_days, filters)
         return flights
         
     except ApiException as e:
@@ -34,6 +54,24 @@ def search_flights(
             detail=f"Error searching flights: {str(e)}"
         )
 
+@router.post("/search/batch", response_model=List[FlightSearchBatchResult])
+def search_flights_batch(
+    batch: FlightSearchBatch,
+    flight_service: FlightService = Depends(create_flight_service)
+):
+    try:
+        return flight_service.search_flights_batch(batch)
+        
+    except ApiException as e:
+        logger.warning(f"Invalid batch search parameters: {e.message}")
+        raise api_exception_to_http_exception(e)
+    except Exception as e:
+        logger.error(f"Error searching {len(batch.searches)} routes in batch: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error searching flights: {str(e)}"
+        )
+
 @router.post("", response_model=FlightResponse)
 def create_flight(
     flight: FlightCreate,
@@ -67,3 +105,55 @@ def list_flights(
             status_code=500,
             detail=f"Error retrieving flights: {str(e)}"
         )
+
+@router.get("/fare-calendar", response_model=FareCalendarResponse)
+def get_fare_calendar(
+    origin: str = Query(..., description="Origin airport code or city name"),
+    destination: str = Query(..., description="Destination airport code or city name"),
+    start_date: Optional[str] = Query(None, description="First day in YYYY-MM-DD format (defaults to today)"),
+    days: int = Query(ApplicationConstants.DEFAULT_FARE_CALENDAR_DAYS, ge=1,
+                      le=ApplicationConstants.MAX_FARE_CALENDAR_DAYS, description="Number of days to include"),
+    flight_service: FlightService = Depends(create_flight_service)
+):
+    try:
+        return flight_service.get_fare_calendar(origin, destination, start_date, days)
+        
+    except ApiException as e:
+        logger.warning(f"Invalid fare calendar parameters - origin: {origin}, destination: {destination}, start_date: {start_date}")
+        raise api_exception_to_http_exception(e)
+    except Exception as e:
+        logger.error(f"Error retrieving fare calendar from {origin} to {destination}: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error retrieving fare calendar: {str(e)}"
+        )
+
+@router.get("/connections", response_model=List[ItineraryResponse])
+def search_connections(
+    origin: str = Query(..., description="Origin airport code or city name"),
+    destination: str = Query(..., description="Destination airport code or city name"),
+    departure_date: str = Query(..., description="Departure date in YYYY-MM-DD format"),
+    max_stops: int = Query(ApplicationConstants.MAX_CONNECTION_STOPS, ge=0,
+                           le=ApplicationConstants.MAX_CONNECTION_STOPS, description="Maximum number of connections"),
+    min_layover_minutes: int = Query(ApplicationConstants.DEFAULT_MIN_LAYOVER_MINUTES, ge=0,
+                                     le=ApplicationConstants.MAX_LAYOVER_MINUTES, description="Shortest layover allowed"),
+    max_layover_minutes: int = Query(ApplicationConstants.DEFAULT_MAX_LAYOVER_MINUTES, ge=0,
+                                     le=ApplicationConstants.MAX_LAYOVER_MINUTES, description="Longest layover allowed"),
+    sort_by: Literal["price", "duration"] = Query("price", description="Order by total price or total travel time"),
+    limit: int = Query(ApplicationConstants.DEFAULT_CONNECTION_RESULTS, ge=1,
+                       le=ApplicationConstants.MAX_CONNECTION_RESULTS, description="Maximum number of itineraries"),
+    flight_service: FlightService = Depends(create_flight_service)
+):
+    try:
+        return flight_service.search_connections(origin, destination, departure_date, max_stops,
+                                                 min_layover_minutes, max_layover_minutes, sort_by, limit)
+        
+    except ApiException as e:
+        logger.warning(f"Invalid connection search parameters - origin: {origin}, destination: {destination}, departure_date: {departure_date}")
+        raise api_exception_to_http_exception(e)
+    except Exception as e:
+        logger.error(f"Error searching connections from {origin} to {destination}: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error searching connections: {str(e)}"
+        )
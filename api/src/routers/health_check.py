@@ -1,7 +1,7 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, status
 from fastapi.responses import JSONResponse
 from resources.logging import get_logger
-from services import HealthService, create_health_service
+from services import HealthService, create_health_service, HealthMonitor, get_health_monitor
 import datetime
 
 router = APIRouter(prefix="/health", tags=["health"])
@@ -10,16 +10,19 @@ logger = get_logger("health_check_router")
 
 @router.get("")
 def health_check(
+    deep: bool = Query(False, description="Force fresh probes instead of serving cached results, "
+                                          "at most once per FFMPEG_PROBE_MIN_FORCED_INTERVAL_SECONDS"),
     health_service: HealthService = Depends(create_health_service)
 ) -> JSONResponse:
     """
     Health check endpoint that provides detailed information about
     application resources and their initialization status.
+    Expensive probes are served from a cached snapshot unless deep=true.
     """
     try:
-        logger.debug("Health check requested")
+        logger.debug("Health check requested (deep: %s)", deep)
         
-        health_status = health_service.get_health_status()
+        health_status = health_service.get_health_status(deep=deep)
         
         # Log the health check result and return appropriate response
         if health_status["status"] == "ok":
@@ -44,3 +47,33 @@ def health_check(
             }
         }
         return JSONResponse(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, content=error_response)
+
+
+
+@router.get("/live")
+def liveness_check() -> JSONResponse:
+    """
+    Liveness probe. Answers in constant time without touching any dependency,
+    so it only fails when the process itself cannot serve requests.
+    """
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={"status": "alive", "timestamp": datetime.datetime.now(datetime.UTC).isoformat()}
+    )
+
+
+@router.get("/ready")
+def readiness_check(
+    health_monitor: HealthMonitor = Depends(get_health_monitor)
+) -> JSONResponse:
+    """
+    Readiness probe. Serves the latest snapshot refreshed in the background,
+    including per-check timings, without running any checks on the request path.
+    """
+    snapshot = health_monitor.get_snapshot()
+    
+    if snapshot["status"] == "ok":
+        return JSONResponse(status_code=status.HTTP_200_OK, content=snapshot)
+    
+    logger.info(f"Readiness check - status: {snapshot['status']}")
+    return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content=snapshot)
@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+from resources.metrics import metrics_registry, CONTENT_TYPE
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics")
+def metrics() -> Response:
+    """Expose application metrics in the Prometheus text exposition format."""
+    return Response(content=metrics_registry.render(), media_type=CONTENT_TYPE)
@@ -24,8 +24,8 @@ async def speech_to_text(
 ):
     """Convert speech audio file to text using Azure Speech Services."""
     try:
-        logger.debug(f"Processing speech-to-text request for user {user.id}")
-        logger.debug(f"Audio file: {audio.filename}, content_type: {audio.content_type}")
+        logger.debug("Processing speech-to-text request for user %s", user.id)
+        logger.debug("Audio file: %s, content_type: %s", audio.filename, audio.content_type)
         
         # Convert speech to text
         text, confidence = await speech_service.speech_to_text(audio)
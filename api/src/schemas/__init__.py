@@ -1,12 +1,17 @@
 from .user import UserCreate, UserLogin, UserResponse, Token
-from .flight import FlightSearch, FlightResponse, FlightCreate, PaginatedResponse
-from .booking import BookingCreate, BookingResponse, BookingUpdate
+from .flight import (
+    FlightSearch, FlightResponse, FlightCreate, PaginatedResponse,
+    FlightSearchFilters, RouteSearch, FlightSearchBatch, FlightSearchBatchResult, FlightSearchDay, FlightSearchResponse,
+    FareCalendarDayResponse, FareCalendarResponse, ItineraryResponse
+)
+from .booking import BookingCreate, BookingResponse, BookingUpdate, BookingBatchCreate, BookingBatchUpdate, BookingStatusCounts
 from .chat import (
-    ChatRequest, ChatResponse, ChatMessageResponse, ChatHistoryResponse, 
+    ChatRequest, ChatResponse, ChatMessageResponse, ChatHistoryResponse, ChatSearchResult, ChatSearchResponse,
     ChatSessionsResponse, DeleteSessionResponse, ChatSessionInfo,
     CreateSessionRequest, CreateSessionResponse, UpdateSessionAliasRequest, UpdateSessionAliasResponse
 )
 from .speech import SpeechToTextResponse
+from .airport import AirportResponse
 
 __all__ = [
     "UserCreate",
@@ -14,16 +19,30 @@ __all__ = [
     "UserResponse",
     "Token",
     "FlightSearch",
+    "FlightSearchFilters",
+    "RouteSearch",
+    "FlightSearchBatch",
+    "FlightSearchBatchResult",
+    "FlightSearchDay",
+    "FlightSearchResponse",
     "FlightResponse",
     "FlightCreate",
+    "FareCalendarDayResponse",
+    "FareCalendarResponse",
+    "ItineraryResponse",
     "PaginatedResponse",
     "BookingCreate",
     "BookingResponse",
     "BookingUpdate",
+    "BookingBatchCreate",
+    "BookingBatchUpdate",
+    "BookingStatusCounts",
     "ChatRequest",
     "ChatResponse",
     "ChatMessageResponse",
     "ChatHistoryResponse",
+    "ChatSearchResult",
+    "ChatSearchResponse",
     "ChatSessionsResponse",
     "DeleteSessionResponse",
     "ChatSessionInfo",
@@ -31,5 +50,6 @@ __all__ = [
     "CreateSessionResponse",
     "UpdateSessionAliasRequest",
     "UpdateSessionAliasResponse",
-    "SpeechToTextResponse"
+    "SpeechToTextResponse",
+    "AirportResponse"
 ]
@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+
+
+class AirportResponse(BaseModel):
+    code: str
+    city: str
+    country: str
+
+    class Config:
+        from_attributes = True
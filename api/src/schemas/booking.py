@@ -1,6 +1,7 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Literal, Optional
 import datetime
+from constants import ApplicationConstants
 from .flight import FlightResponse
 
 class BookingCreate(BaseModel):
@@ -18,4 +19,27 @@ class BookingResponse(BaseModel):
         from_attributes = True
 
 class BookingUpdate(BaseModel):
-    status: str
+    # Only cancellation: rebooking creates a new booking, which takes a seat
+    status: Literal["cancelled"]
+
+def _unique_ids(ids: List[int]) -> List[int]:
+    if len(set(ids)) != len(ids):
+        raise ValueError("IDs must be unique")
+    return ids
+
+class BookingBatchCreate(BaseModel):
+    flight_ids: List[int] = Field(min_length=1, max_length=ApplicationConstants.MAX_BOOKING_BATCH_SIZE)
+
+    _check_unique = field_validator("flight_ids")(_unique_ids)
+
+class BookingBatchUpdate(BaseModel):
+    booking_ids: List[int] = Field(min_length=1, max_length=ApplicationConstants.MAX_BOOKING_BATCH_SIZE)
+    status: Literal["cancelled"] = "cancelled"  # Only cancellation is supported in bulk
+
+    _check_unique = field_validator("booking_ids")(_unique_ids)
+
+class BookingStatusCounts(BaseModel):
+    booked: int = 0
+    completed: int = 0
+    cancelled: int = 0
+    total: int = 0
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
 import datetime
 
 
@@ -13,6 +13,7 @@ class ChatResponse(BaseModel):
     response: str
     session_id: str  # Return the session ID used
     session_alias: str  # Return the session alias
+    trace: Optional[Dict[str, Any]] = Field(default=None, exclude=True)  # Agent trace summary, stored but not returned
 
 
 class ChatSessionInfo(BaseModel):
@@ -29,6 +30,7 @@ class ChatMessageResponse(BaseModel):
     response: str
     session_id: str
     created_at: datetime.datetime
+    trace: Optional[Dict[str, Any]] = None  # Only populated when history is requested with include_trace
 
 
 class ChatHistoryResponse(BaseModel):
@@ -37,6 +39,20 @@ class ChatHistoryResponse(BaseModel):
     session_alias: str
 
 
+class ChatSearchResult(BaseModel):
+    message_id: int
+    session_id: str
+    session_alias: Optional[str] = None
+    created_at: datetime.datetime
+    message_snippet: str  # Excerpts with the matched words wrapped in **
+    response_snippet: str
+
+
+class ChatSearchResponse(BaseModel):
+    results: List[ChatSearchResult]
+    next_cursor: Optional[str] = None  # Pass back as cursor for the next page; None on the last page
+
+
 class ChatSessionsResponse(BaseModel):
     sessions: List[ChatSessionInfo]
     total_count: int
@@ -1,6 +1,7 @@
-from pydantic import BaseModel
-from typing import Optional, List, Generic, TypeVar
+from pydantic import BaseModel, Field
+from typing import Optional, List, Literal, Generic, TypeVar
 import datetime
+from constants import ApplicationConstants
 
 T = TypeVar('T')
 
@@ -9,6 +10,23 @@ class FlightSearch(BaseModel):
     destination: Optional[str] = None
     departure_date: Optional[str] = None  # YYYY-MM-DD format
 
+class FlightSearchFilters(BaseModel):
+    min_price: Optional[float] = Field(default=None, ge=0)
+    max_price: Optional[float] = Field(default=None, ge=0)
+    airline: Optional[str] = None
+    departure_hour_from: Optional[int] = Field(default=None, ge=0, le=23)
+    departure_hour_to: Optional[int] = Field(default=None, ge=0, le=23)  # Before departure_hour_from wraps past midnight
+    sort_by: Literal["departure", "price", "duration"] = "departure"
+
+class RouteSearch(BaseModel):
+    origin: str = Field(min_length=1)
+    destination: str = Field(min_length=1)
+    departure_date: str  # YYYY-MM-DD format
+
+class FlightSearchBatch(BaseModel):
+    searches: List[RouteSearch] = Field(min_length=1, max_length=ApplicationConstants.MAX_FLIGHT_SEARCH_BATCH_SIZE)
+    size: int = Field(default=ApplicationConstants.DEFAULT_FLIGHT_SEARCH_BATCH_RESULTS, ge=1, le=100)  # Flights per search
+
 class PaginationParams(BaseModel):
     page: int = 1
     size: int = 10
@@ -20,6 +38,11 @@ class PaginatedResponse(BaseModel, Generic[T]):
     size: int
     pages: int
 
+class FlightSearchDay(BaseModel):
+    date: datetime.date
+    min_price: float
+    flight_count: int
+
 class FlightCreate(BaseModel):
     origin: str
     destination: str
@@ -28,6 +51,7 @@ class FlightCreate(BaseModel):
     airline: str
     status: Optional[str] = "scheduled"
     price: float
+    capacity: Optional[int] = Field(default=None, gt=0)  # Defaults to the standard aircraft
 
 class FlightResponse(BaseModel):
     id: int
@@ -38,6 +62,37 @@ class FlightResponse(BaseModel):
     airline: str
     status: str
     price: float
+    seats_available: Optional[int] = None
 
     class Config:
         from_attributes = True
+
+class FlightSearchResponse(PaginatedResponse[FlightResponse]):
+    days: List[FlightSearchDay] = Field(default_factory=list)  # Per-day summary of a flexible-date search
+
+class FlightSearchBatchResult(BaseModel):
+    origin: str
+    destination: str
+    departure_date: str
+    items: List[FlightResponse]  # Earliest departures first, at most `size`
+    total: int
+
+class FareCalendarDayResponse(BaseModel):
+    date: datetime.date
+    min_price: float
+    flight_count: int
+
+class FareCalendarResponse(BaseModel):
+    origin: str
+    destination: str
+    start_date: datetime.date
+    end_date: datetime.date
+    days: List[FareCalendarDayResponse]  # Only days with scheduled flights that have free seats
+
+class ItineraryResponse(BaseModel):
+    legs: List[FlightResponse]
+    stops: int
+    total_price: float
+    departure_time: datetime.datetime
+    arrival_time: datetime.datetime
+    duration_minutes: int
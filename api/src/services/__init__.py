@@ -2,8 +2,10 @@ from .chat import ChatService, AgentChatService, create_chat_service
 from .booking import BookingService, BookingBusinessService, create_booking_service
 from .flight import FlightService, FlightBusinessService, create_flight_service
 from .user import UserService, UserBusinessService, create_user_service
-from .health import HealthService, SystemHealthService, create_health_service
+from .health import HealthService, SystemHealthService, create_health_service, HealthMonitor, get_health_monitor
 from .speech import SpeechService, AzureSpeechService, create_speech_service
+from .checkpoint_retention import CheckpointRetention, CheckpointRetentionConfig
+from .airport import AirportService, AirportBusinessService, create_airport_service
 
 __all__ = [
     "ChatService",
@@ -21,7 +23,14 @@ __all__ = [
     "HealthService",
     "SystemHealthService",
     "create_health_service",
+    "HealthMonitor",
+    "get_health_monitor",
     "SpeechService",
     "AzureSpeechService",
-    "create_speech_service"
+    "create_speech_service",
+    "CheckpointRetention",
+    "CheckpointRetentionConfig",
+    "AirportService",
+    "AirportBusinessService",
+    "create_airport_service"
 ]
@@ -0,0 +1,42 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional
+from fastapi import Depends
+from schemas import AirportResponse
+from repository import AirportRepository, create_airport_repository
+from resources.airport_index import AirportIndex, airport_index
+from resources.logging import get_logger
+from constants import ApplicationConstants
+
+logger = get_logger("airport_service")
+
+
+class AirportService(ABC):
+    """Abstract base class for Airport service operations."""
+
+    @abstractmethod
+    def autocomplete(self, query: str, limit: int = ApplicationConstants.DEFAULT_AIRPORT_AUTOCOMPLETE_RESULTS) -> List[AirportResponse]:
+        """Suggest airports whose code, city or alias starts with query."""
+        pass
+
+
+class AirportBusinessService(AirportService):
+    """Business logic implementation of AirportService."""
+
+    def __init__(self, airport_repo: AirportRepository, index: Optional[AirportIndex] = None):
+        self.airport_repo = airport_repo
+        self.airport_index = index or airport_index
+
+    def autocomplete(self, query: str, limit: int = ApplicationConstants.DEFAULT_AIRPORT_AUTOCOMPLETE_RESULTS) -> List[AirportResponse]:
+        """Suggest airports whose code, city or alias starts with query."""
+        # Loaded at startup; the fallback covers processes that skipped it
+        self.airport_index.ensure_loaded(self.airport_repo.find_all)
+        airports = self.airport_index.autocomplete(query, limit)
+        logger.debug("Airport autocomplete '%s' returned %d airports", query, len(airports))
+        return [AirportResponse(code=airport.code, city=airport.city, country=airport.country) for airport in airports]
+
+
+def create_airport_service(
+    airport_repo: AirportRepository = Depends(create_airport_repository)
+) -> AirportService:
+    """Dependency injection function to create AirportService instance."""
+    return AirportBusinessService(airport_repo)
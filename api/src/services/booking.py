@@ -1,12 +1,18 @@
 from abc import ABC, abstractmethod
+import logging
 from typing import List, Optional, Dict
 from fastapi import Depends
 from repository import User, Booking
-from schemas import BookingCreate, BookingUpdate, BookingResponse, FlightResponse, PaginatedResponse
+from schemas import (
+    BookingCreate, BookingUpdate, BookingBatchCreate, BookingBatchUpdate, BookingResponse,
+    BookingStatusCounts, FlightResponse, PaginatedResponse
+)
 from repository import BookingRepository, FlightRepository, create_booking_repository, create_flight_repository
 from resources.logging import get_logger
 from exceptions import (
+    ApiException,
     FlightNotAvailableError, 
+    FlightSoldOutError,
     BookingAlreadyExistsError, 
     BookingNotFoundError,
     AccessDeniedError,
@@ -28,7 +34,7 @@ class BookingService(ABC):
     
     @abstractmethod
     def update_booking(self, user: User, booking_id: int, booking_update: BookingUpdate) -> BookingResponse:
-        """Update a booking for a user."""
+        """Update a booking for a user; cancelling it is the only supported change."""
         pass
     
     @abstractmethod
@@ -36,13 +42,31 @@ class BookingService(ABC):
         """Delete/cancel a booking for a user."""
         pass
     
+    @abstractmethod
+    def create_bookings(self, user: User, batch: BookingBatchCreate) -> List[BookingResponse]:
+        """Book several flights for a user at once; either all are booked or none."""
+        pass
+    
+    @abstractmethod
+    def cancel_bookings(self, user: User, batch: BookingBatchUpdate) -> List[BookingResponse]:
+        """Cancel several bookings for a user at once; either all are cancelled or none."""
+        pass
+    
     @abstractmethod
     def get_user_bookings(self, user: User, status: Optional[str] = None, 
                          booked_date: Optional[str] = None, departure_date: Optional[str] = None, 
-                         page: int = 1, size: int = 10) -> PaginatedResponse[BookingResponse]:
+                         page: int = 1, size: int = 10,
+                         booked_from: Optional[str] = None, booked_to: Optional[str] = None,
+                         departure_from: Optional[str] = None, departure_to: Optional[str] = None
+                         ) -> PaginatedResponse[BookingResponse]:
         """Get all bookings for a user with optional filters and pagination."""
         pass
     
+    @abstractmethod
+    def get_booking_status_counts(self, user: User) -> BookingStatusCounts:
+        """Get the number of bookings a user has in each status."""
+        pass
+    
     @abstractmethod
     def get_computed_booking_status(self, booking: Booking) -> str:
         """Get the computed status for a booking (considering flight departure time)."""
@@ -67,11 +91,12 @@ class BookingBusinessService(BookingService):
             arrival_time=booking.flight.arrival_time,
             airline=booking.flight.airline,
             status=booking.flight.status,
-            price=booking.flight.price
+            price=booking.flight.price,
+            seats_available=booking.flight.seats_available
         )
         
-        # Determine computed status
-        computed_status = self.get_computed_booking_status(booking)
+        # Use the status computed by the query when it was selected
+        computed_status = booking.computed_status or self.get_computed_booking_status(booking)
         
         # Convert booking to BookingResponse
         return BookingResponse(
@@ -85,99 +110,133 @@ class BookingBusinessService(BookingService):
     
     def create_booking(self, user: User, booking: BookingCreate) -> BookingResponse:
         """Create a new booking for a user."""
-        logger.debug(f"Creating booking for user {user.id}, flight {booking.flight_id}")
-        
-        # Check if flight exists and is available
-        flight = self.flight_repo.find_available_by_id(booking.flight_id)
-        if not flight:
-            logger.warning(f"Flight {booking.flight_id} not found or not available for user {user.email}")
-            raise FlightNotAvailableError(booking.flight_id)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Creating booking for user %s, flight %s", user.id, booking.flight_id)
         
-        # Check if user already has a booking for this flight
-        existing_booking = self.booking_repo.find_existing_booking(user.id, booking.flight_id)
-        if existing_booking:
+        # Book in one statement; availability and uniqueness are enforced by the database
+        new_booking = self.booking_repo.create_if_available(user.id, booking.flight_id)
+        if not new_booking:
+            # Nothing was inserted: find out why with a single probe
+            flight = self.flight_repo.find_available_by_id(booking.flight_id)
+            if not flight:
+                logger.warning(f"Flight {booking.flight_id} not found or not available for user {user.email}")
+                raise FlightNotAvailableError(booking.flight_id)
+            if flight.seats_available <= 0:
+                logger.warning(f"Flight {booking.flight_id} is sold out for user {user.email}")
+                raise FlightSoldOutError(booking.flight_id)
             logger.warning(f"User {user.email} already has a booking for flight {booking.flight_id}")
             raise BookingAlreadyExistsError(user.id, booking.flight_id)
         
-        # Create new booking
-        new_booking = self.booking_repo.create(user.id, booking.flight_id)
-        
+        flight = new_booking.flight
         logger.info(f"Successfully created booking {new_booking.id} for user {user.email} on flight {flight.origin} to {flight.destination}")
         
         # Convert Booking model to BookingResponse schema
         return self._convert_booking_to_response(new_booking)
     
     def update_booking(self, user: User, booking_id: int, booking_update: BookingUpdate) -> BookingResponse:
-        """Update a booking for a user."""
-        logger.debug(f"Updating booking {booking_id} for user {user.id} to status {booking_update.status}")
-        
-        # Get the booking
-        booking = self.booking_repo.find_by_id(booking_id)
-        if not booking:
-            logger.warning(f"Booking {booking_id} not found for user {user.email}")
-            raise BookingNotFoundError(booking_id)
+        """Update a booking for a user; cancelling it is the only supported change."""
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Updating booking %s for user %s to status %s", booking_id, user.id, booking_update.status)
         
-        # Ensure user owns this booking
-        if booking.user_id != user.id:
-            logger.warning(f"User {user.email} attempted to access booking {booking_id} owned by user {booking.user_id}")
-            raise AccessDeniedError("booking", booking_id, user.id)
-        
-        # Check if booking can be cancelled (only upcoming flights)
-        if booking_update.status == "cancelled":
-            if booking.status != "booked":
-                logger.warning(f"User {user.email} attempted to cancel booking {booking_id} with status {booking.status}")
-                raise BookingCannotBeCancelledError(booking_id, booking.status)
-            
-            flight = self.flight_repo.find_by_id(booking.flight_id)
-            # Ensure timezone-aware comparison by treating departure_time as UTC
-            departure_time_utc = flight.departure_time.replace(tzinfo=datetime.timezone.utc) if flight.departure_time.tzinfo is None else flight.departure_time
-            if departure_time_utc <= datetime.datetime.now(datetime.timezone.utc):
-                logger.warning(f"User {user.email} attempted to cancel past flight booking {booking_id}")
-                raise PastFlightCannotBeCancelledError(booking_id, flight.id)
-            
-            cancelled_at = datetime.datetime.now(datetime.timezone.utc)
-            updated_booking = self.booking_repo.update_status(booking_id, "cancelled", cancelled_at)
-            logger.info(f"User {user.email} cancelled booking {booking_id} for flight {flight.origin} to {flight.destination}")
-        else:
-            updated_booking = self.booking_repo.update_status(booking_id, booking_update.status)
-            logger.info(f"User {user.email} updated booking {booking_id} status to {booking_update.status}")
-        
-        # Convert Booking model to BookingResponse schema
+        updated_booking = self._cancel_booking(user, booking_id, "cancel")
+        logger.info(f"User {user.email} cancelled booking {booking_id} for flight {updated_booking.flight.origin} to {updated_booking.flight.destination}")
         return self._convert_booking_to_response(updated_booking)
     
     def delete_booking(self, user: User, booking_id: int) -> Dict[str, str]:
         """Delete/cancel a booking for a user."""
-        logger.debug(f"Deleting booking {booking_id} for user {user.id}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Deleting booking %s for user %s", booking_id, user.id)
+        
+        # Mark as cancelled instead of deleting
+        self._cancel_booking(user, booking_id, "delete")
+        
+        logger.info(f"User {user.email} successfully deleted/cancelled booking {booking_id}")
+        return {"message": "Booking cancelled successfully"}
+    
+    def create_bookings(self, user: User, batch: BookingBatchCreate) -> List[BookingResponse]:
+        """Book several flights for a user at once; either all are booked or none."""
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Creating bookings for user %s, flights %s", user.id, batch.flight_ids)
+        
+        new_bookings = self.booking_repo.create_many_if_available(user.id, batch.flight_ids)
+        if not new_bookings:
+            # Nothing was booked: two IN queries tell unavailable or sold-out flights apart from existing bookings
+            available = {flight.id: flight for flight in self.flight_repo.find_available_by_ids(batch.flight_ids)}
+            for flight_id in batch.flight_ids:
+                if flight_id not in available:
+                    logger.warning(f"Flight {flight_id} not found or not available for user {user.email}")
+                    raise FlightNotAvailableError(flight_id)
+                if available[flight_id].seats_available <= 0:
+                    logger.warning(f"Flight {flight_id} is sold out for user {user.email}")
+                    raise FlightSoldOutError(flight_id)
+            booked = {booking.flight_id for booking in self.booking_repo.find_existing_bookings(user.id, batch.flight_ids)}
+            booked_flight_id = next((flight_id for flight_id in batch.flight_ids if flight_id in booked), batch.flight_ids[0])
+            logger.warning(f"User {user.email} already has a booking for flight {booked_flight_id}")
+            raise BookingAlreadyExistsError(user.id, booked_flight_id)
+        
+        logger.info(f"Successfully created {len(new_bookings)} bookings for user {user.email} on flights {batch.flight_ids}")
+        
+        # Return in the order the flights were requested
+        by_flight = {booking.flight_id: booking for booking in new_bookings}
+        return [self._convert_booking_to_response(by_flight[flight_id]) for flight_id in batch.flight_ids]
+    
+    def cancel_bookings(self, user: User, batch: BookingBatchUpdate) -> List[BookingResponse]:
+        """Cancel several bookings for a user at once; either all are cancelled or none."""
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Cancelling bookings %s for user %s", batch.booking_ids, user.id)
+        
+        cancelled_at = datetime.datetime.now(datetime.timezone.utc)
+        cancelled = {booking.id: booking for booking in
+                     self.booking_repo.cancel_many_if_allowed(batch.booking_ids, user.id, cancelled_at)}
+        if not cancelled:
+            bookings = {booking.id: booking for booking in self.booking_repo.find_by_ids(batch.booking_ids)}
+            for booking_id in batch.booking_ids:
+                error = self._cancellation_error(user, booking_id, bookings.get(booking_id), "cancel")
+                if error:
+                    raise error
+            # Every booking looked cancellable again by the time it was read back
+            raise BookingCannotBeCancelledError(batch.booking_ids[0], bookings[batch.booking_ids[0]].status)
+        
+        logger.info(f"User {user.email} cancelled bookings {batch.booking_ids}")
+        return [self._convert_booking_to_response(cancelled[booking_id]) for booking_id in batch.booking_ids]
+    
+    def _cancel_booking(self, user: User, booking_id: int, action: str) -> Booking:
+        """
+        Cancel an upcoming booking owned by the user with one conditional update and return it.
+        When nothing was cancelled, a single probe finds the reason and raises the matching error.
+        """
+        cancelled_at = datetime.datetime.now(datetime.timezone.utc)
+        cancelled = self.booking_repo.cancel_if_allowed(booking_id, user.id, cancelled_at)
+        if cancelled:
+            return cancelled
         
-        # Get the booking
         booking = self.booking_repo.find_by_id(booking_id)
+        error = self._cancellation_error(user, booking_id, booking, action)
+        # Without an error the booking became cancellable after the update ran
+        raise error or BookingCannotBeCancelledError(booking_id, booking.status)
+    
+    def _cancellation_error(self, user: User, booking_id: int, booking: Optional[Booking], action: str) -> Optional[ApiException]:
+        """Explain why a booking cannot be cancelled by the user, or return None if it can."""
         if not booking:
             logger.warning(f"Booking {booking_id} not found for user {user.email}")
-            raise BookingNotFoundError(booking_id)
+            return BookingNotFoundError(booking_id)
         
         # Ensure user owns this booking
         if booking.user_id != user.id:
-            logger.warning(f"User {user.email} attempted to delete booking {booking_id} owned by user {booking.user_id}")
-            raise AccessDeniedError("booking", booking_id, user.id)
+            logger.warning(f"User {user.email} attempted to {action} booking {booking_id} owned by user {booking.user_id}")
+            return AccessDeniedError("booking", booking_id, user.id)
         
-        # Check if booking can be cancelled (only upcoming flights)
+        # Only active bookings can be cancelled
         if booking.status != "booked":
-            logger.warning(f"User {user.email} attempted to delete booking {booking_id} with status {booking.status}")
-            raise BookingCannotBeCancelledError(booking_id, booking.status)
+            logger.warning(f"User {user.email} attempted to {action} booking {booking_id} with status {booking.status}")
+            return BookingCannotBeCancelledError(booking_id, booking.status)
         
-        flight = self.flight_repo.find_by_id(booking.flight_id)
-        # Ensure timezone-aware comparison by treating departure_time as UTC
-        departure_time_utc = flight.departure_time.replace(tzinfo=datetime.timezone.utc) if flight.departure_time.tzinfo is None else flight.departure_time
-        if departure_time_utc <= datetime.datetime.now(datetime.timezone.utc):
-            logger.warning(f"User {user.email} attempted to delete past flight booking {booking_id}")
-            raise PastFlightCannotBeCancelledError(booking_id, flight.id)
-        
-        # Mark as cancelled instead of deleting
-        cancelled_at = datetime.datetime.now(datetime.timezone.utc)
-        self.booking_repo.update_status(booking_id, "cancelled", cancelled_at)
+        # Only upcoming flights can be cancelled
+        if self.get_computed_booking_status(booking) == "completed":
+            logger.warning(f"User {user.email} attempted to {action} past flight booking {booking_id}")
+            return PastFlightCannotBeCancelledError(booking_id, booking.flight_id)
         
-        logger.info(f"User {user.email} successfully deleted/cancelled booking {booking_id} for flight {flight.origin} to {flight.destination}")
-        return {"message": "Booking cancelled successfully"}
+        return None
     
     def get_computed_booking_status(self, booking: Booking) -> str:
         """Get the computed status for a booking (considering flight departure time)."""
@@ -195,16 +254,26 @@ class BookingBusinessService(BookingService):
     
     def get_user_bookings(self, user: User, status: Optional[str] = None, 
                          booked_date: Optional[str] = None, departure_date: Optional[str] = None, 
-                         page: int = 1, size: int = 10) -> PaginatedResponse[BookingResponse]:
+                         page: int = 1, size: int = 10,
+                         booked_from: Optional[str] = None, booked_to: Optional[str] = None,
+                         departure_from: Optional[str] = None, departure_to: Optional[str] = None
+                         ) -> PaginatedResponse[BookingResponse]:
         """Get all bookings for a user with optional filters and pagination."""
-        logger.debug(f"Retrieving bookings for user {user.id} with status filter: {status}, booked_date: {booked_date}, departure_date: {departure_date}, page: {page}, size: {size}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Retrieving bookings for user %s with status filter: %s, booked_date: %s, departure_date: %s, "
+                         "booked range: %s..%s, departure range: %s..%s, page: %s, size: %s",
+                         user.id, status, booked_date, departure_date, booked_from, booked_to,
+                         departure_from, departure_to, page, size)
         
         bookings, total = self.booking_repo.find_by_user_id_paginated(
-            user.id, status, booked_date, departure_date, page, size
+            user.id, status, booked_date, departure_date, page, size,
+            booked_from=booked_from, booked_to=booked_to,
+            departure_from=departure_from, departure_to=departure_to
         )
         
         logger.info(f"Successfully retrieved {len(bookings)} bookings for user {user.email} (total: {total})")
-        logger.debug(f"Retrieved booking IDs: {[booking.id for booking in bookings]}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Retrieved booking IDs: %s", [booking.id for booking in bookings])
         
         # Convert Booking models to BookingResponse schemas
         booking_responses = [self._convert_booking_to_response(booking) for booking in bookings]
@@ -219,6 +288,15 @@ class BookingBusinessService(BookingService):
             size=size,
             pages=pages
         )
+    
+    def get_booking_status_counts(self, user: User) -> BookingStatusCounts:
+        """Get the number of bookings a user has in each status."""
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Counting bookings per status for user %s", user.id)
+        
+        counts = self.booking_repo.count_by_status(user.id)
+        
+        return BookingStatusCounts(**counts, total=sum(counts.values()))
 
 
 def create_booking_service(
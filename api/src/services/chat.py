@@ -1,9 +1,10 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, List
+import logging
+from typing import Dict, Any, Optional, List, Tuple
 from fastapi import Depends, Request
 from repository import User
 from schemas import (
-    ChatRequest, ChatResponse, ChatHistoryResponse, ChatSessionsResponse, 
+    ChatRequest, ChatResponse, ChatHistoryResponse, ChatSessionsResponse, ChatSearchResult, ChatSearchResponse,
     DeleteSessionResponse, ChatMessageResponse, ChatSessionInfo,
     CreateSessionRequest, CreateSessionResponse, UpdateSessionAliasRequest, UpdateSessionAliasResponse
 )
@@ -14,7 +15,15 @@ from repository import (
 )
 from resources.logging import get_logger
 from resources.chat import chat_manager
-from exceptions import AgentInvocationFailedError, ChatMessageSaveFailedError
+from resources.metrics import CHAT_AGENT_DURATION
+from utils.agent_tracing import AgentTrace, AgentTraceCallbackHandler, agent_trace_var
+from exceptions import (
+    AgentInvocationFailedError, ChatMessageSaveFailedError, InvalidSearchQueryError, InvalidSearchCursorError
+)
+from constants import ApplicationConstants
+import base64
+import binascii
+import re
 import uuid
 
 logger = get_logger("chat_service")
@@ -29,12 +38,14 @@ class ChatService(ABC):
         pass
     
     @abstractmethod
-    async def save_chat_message(self, user_id: int, session_id: str, message: str, response: str) -> None:
-        """Save chat message to database."""
+    async def save_chat_message(self, user_id: int, session_id: str, message: str, response: str,
+                                trace: Optional[Dict[str, Any]] = None) -> None:
+        """Save chat message, with its optional agent trace summary, to database."""
         pass
     
     @abstractmethod
-    def get_chat_history(self, user_id: int, session_id: str, limit: int = 50, offset: int = 0) -> ChatHistoryResponse:
+    def get_chat_history(self, user_id: int, session_id: str, limit: int = 50, offset: int = 0,
+                         include_trace: bool = False) -> ChatHistoryResponse:
         """Get chat history for a specific session (session_id is now required)."""
         pass
     
@@ -43,6 +54,13 @@ class ChatService(ABC):
         """Clear chat history for a specific session (session_id is now required)."""
         pass
     
+    @abstractmethod
+    def search_chat_history(self, user_id: int, query: str,
+                            limit: int = ApplicationConstants.DEFAULT_CHAT_SEARCH_RESULTS,
+                            cursor: Optional[str] = None) -> ChatSearchResponse:
+        """Search all of a user's sessions for turns containing every word of query, best match first."""
+        pass
+    
     @abstractmethod
     async def get_user_sessions(self, user_id: int) -> ChatSessionsResponse:
         """Get all chat sessions for a user."""
@@ -74,7 +92,8 @@ class AgentChatService(ChatService):
     
     async def process_chat_request(self, user: User, request: ChatRequest, jwt_token: str) -> ChatResponse:
         """Process a chat request using the agent with session management."""
-        logger.debug(f"Processing chat request for user {user.id}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Processing chat request for user %s", user.id)
         
         # Session ID should always be provided by the frontend
         session_id = request.session_id
@@ -95,60 +114,88 @@ class AgentChatService(ChatService):
             if not session:
                 raise ValueError(f"Session {session_id} not found")
             
+            # A summary scheduled after the previous turn must land before this turn reads the thread
+            await chat_manager.wait_for_compaction(session_id)
+            
             # Get the agent with session support
             agent = await chat_manager.create_agent(
                 user_token=jwt_token,
                 user_id=user.id,
-                session_id=session_id
+                session_id=session_id,
+                system_prompt=self.system_context
             )
             
-            response = await agent.ainvoke(
-                {
-                    "messages": [
-                        {"role": "system", "content": self.system_context},
-                        {"role": "user", "content": request.content}
-                    ],
-                },
-                config={
-                    "configurable": {
-                        "thread_id": session_id,
-                        "session_id": session_id,
-                        "user_id": user.id,
+            trace = AgentTrace()
+            trace_token = agent_trace_var.set(trace)
+            agent_outcome = "error"
+            try:
+                response = await agent.ainvoke(
+                    # Only the new user message is added to the thread; the system prompt
+                    # is injected per model call by the agent's state modifier
+                    {"messages": [{"role": "user", "content": request.content}]},
+                    config={
+                        "configurable": {
+                            "thread_id": session_id,
+                            "session_id": session_id,
+                            "user_id": user.id,
+                        },
+                        "callbacks": [AgentTraceCallbackHandler(trace)]
                     }
-                }
-            )
+                )
+                agent_outcome = "success"
+            finally:
+                agent_trace_var.reset(trace_token)
+                trace.finish()
+                CHAT_AGENT_DURATION.labels(agent_outcome).observe(trace.finished - trace.started)
             
             answer = response["messages"][-1].content
-            logger.debug(f"Agent response length: {len(answer)} characters")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Agent response length: %s characters", len(answer))
+            
+            # Summarizing older turns is a second model call; it runs after the response is sent
+            chat_manager.schedule_compaction(agent, session_id)
             
             return ChatResponse(
                 response=answer, 
                 session_id=session_id,
-                session_alias=session.alias
+                session_alias=session.alias,
+                trace=trace.summary()
             )
             
         except Exception as e:
             logger.error(f"Agent invocation failed for user {user.id}: {e}")
             raise AgentInvocationFailedError(user.id, str(e))
     
-    async def save_chat_message(self, user_id: int, session_id: str, message: str, response: str) -> None:
-        """Save chat message to database with session ID."""
+    def _delete_thread(self, session_id: str) -> None:
+        """Delete the session's agent checkpoints; the retention sweep retries orphaned threads later."""
+        try:
+            chat_manager.delete_thread(session_id)
+        except Exception as e:
+            logger.warning(f"Failed to delete checkpoints for session {session_id}: {e}")
+    
+    async def save_chat_message(self, user_id: int, session_id: str, message: str, response: str,
+                                trace: Optional[Dict[str, Any]] = None) -> None:
+        """Save chat message to database with session ID and agent trace summary."""
         try:
             chat_message = self.chat_repo.create(
                 user_id=user_id,
                 session_id=session_id,
                 message=message,
-                response=response
+                response=response,
+                trace=trace
             )
-            logger.debug(f"Saved chat message {chat_message.id} to database for user {user_id}, session {session_id}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Saved chat message %s to database for user %s, session %s", chat_message.id, user_id, session_id)
         except Exception as db_error:
             logger.warning(f"Failed to save chat message to database for user {user_id}: {db_error}")
             # Don't fail the request if database save fails
             raise ChatMessageSaveFailedError(user_id, str(db_error))
     
-    def get_chat_history(self, user_id: int, session_id: str, limit: int = 50, offset: int = 0) -> ChatHistoryResponse:
-        """Get chat history for a specific session (session_id is now required)."""
-        logger.debug(f"Retrieving chat history for user {user_id}, session {session_id} (limit: {limit}, offset: {offset})")
+    def get_chat_history(self, user_id: int, session_id: str, limit: int = 50, offset: int = 0,
+                         include_trace: bool = False) -> ChatHistoryResponse:
+        """Get chat history for a specific session, optionally with each turn's agent trace."""
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Retrieving chat history for user %s, session %s (limit: %s, offset: %s)", user_id, session_id, limit, offset)
         
         # Verify session belongs to user, create if it doesn't exist
         session = self.session_repo.find_by_user_and_session(user_id, session_id)
@@ -169,12 +216,14 @@ class AgentChatService(ChatService):
                 message=msg.user_message,
                 response=msg.bot_response or "",
                 session_id=msg.session_id,
-                created_at=msg.created_at
+                created_at=msg.created_at,
+                trace=msg.trace if include_trace else None
             )
             for msg in messages
         ]
         
-        logger.debug(f"Retrieved {len(message_responses)} chat messages for user {user_id} (total: {total_count})")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Retrieved %s chat messages for user %s (total: %s)", len(message_responses), user_id, total_count)
         
         # Get the session info for the alias
         session = self.session_repo.find_by_user_and_session(user_id, session_id)
@@ -188,7 +237,8 @@ class AgentChatService(ChatService):
     
     def clear_chat_history(self, user_id: int, session_id: str) -> Dict[str, Any]:
         """Clear chat history for a specific session (session_id is now required)."""
-        logger.debug(f"Clearing chat history for user {user_id}, session {session_id}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Clearing chat history for user %s, session %s", user_id, session_id)
         
         # Verify session belongs to user, create if it doesn't exist
         session = self.session_repo.find_by_user_and_session(user_id, session_id)
@@ -199,7 +249,10 @@ class AgentChatService(ChatService):
             self.session_repo.create(user_id, session_id, alias)
         
         deleted_count = self.chat_repo.delete_by_user_id_and_session(user_id, session_id)
-        logger.debug(f"Cleared {deleted_count} chat messages for user {user_id}, session {session_id}")
+        # The agent must forget the cleared conversation too
+        self._delete_thread(session_id)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Cleared %s chat messages for user %s, session %s", deleted_count, user_id, session_id)
         
         return {
             "message": f"Successfully cleared {deleted_count} chat messages for session {session_id}",
@@ -207,9 +260,57 @@ class AgentChatService(ChatService):
             "session_id": session_id
         }
     
+    def search_chat_history(self, user_id: int, query: str,
+                            limit: int = ApplicationConstants.DEFAULT_CHAT_SEARCH_RESULTS,
+                            cursor: Optional[str] = None) -> ChatSearchResponse:
+        """
+        Search all of a user's sessions for turns containing every word of query, best match first.
+        Pages are chained with the opaque next_cursor of the previous page.
+        """
+        terms = re.findall(r"\w+", query)
+        if not terms:
+            raise InvalidSearchQueryError(query)
+        after = self._decode_search_cursor(cursor) if cursor else None
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Searching chat history for user %s (terms: %s, limit: %s)", user_id, terms, limit)
+        
+        # One extra hit tells whether there is a next page
+        hits = self.chat_repo.search(user_id, terms, limit=limit + 1, after=after)
+        page = hits[:limit]
+        next_cursor = self._encode_search_cursor(page[-1].rank, page[-1].id) if len(hits) > limit else None
+        
+        return ChatSearchResponse(
+            results=[
+                ChatSearchResult(
+                    message_id=hit.id,
+                    session_id=hit.session_id,
+                    session_alias=hit.session_alias,
+                    created_at=hit.created_at,
+                    message_snippet=hit.message_snippet,
+                    response_snippet=hit.response_snippet
+                )
+                for hit in page
+            ],
+            next_cursor=next_cursor
+        )
+    
+    @staticmethod
+    def _encode_search_cursor(rank: float, message_id: int) -> str:
+        # repr() round-trips the float exactly, so the next page resumes right after this hit
+        return base64.urlsafe_b64encode(f"{rank!r}:{message_id}".encode()).decode()
+    
+    @staticmethod
+    def _decode_search_cursor(cursor: str) -> Tuple[float, int]:
+        try:
+            rank, message_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+            return float(rank), int(message_id)
+        except (binascii.Error, UnicodeError, ValueError):
+            raise InvalidSearchCursorError(cursor)
+    
     async def get_user_sessions(self, user_id: int) -> ChatSessionsResponse:
         """Get all chat sessions for a user."""
-        logger.debug(f"Retrieving sessions for user {user_id}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Retrieving sessions for user %s", user_id)
         
         # Get sessions from database with message counts
         sessions_with_counts = self.session_repo.get_sessions_with_message_count(user_id)
@@ -226,7 +327,8 @@ class AgentChatService(ChatService):
             for session, message_count in sessions_with_counts
         ]
         
-        logger.debug(f"Found {len(session_info)} sessions for user {user_id}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Found %s sessions for user %s", len(session_info), user_id)
         
         return ChatSessionsResponse(
             sessions=session_info,
@@ -235,7 +337,8 @@ class AgentChatService(ChatService):
     
     def delete_session(self, user_id: int, session_id: str) -> DeleteSessionResponse:
         """Delete a specific chat session."""
-        logger.debug(f"Deleting session {session_id} for user {user_id}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Deleting session %s for user %s", session_id, user_id)
         
         # Verify session belongs to user
         session = self.session_repo.find_by_user_and_session(user_id, session_id)
@@ -248,7 +351,11 @@ class AgentChatService(ChatService):
         # Delete the session record
         self.session_repo.delete_by_id(session_id)
         
-        logger.debug(f"Deleted session {session_id} and {deleted_messages} messages for user {user_id}")
+        # Session IDs are derived from the alias, so a re-created session would otherwise resume this thread
+        self._delete_thread(session_id)
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Deleted session %s and %s messages for user %s", session_id, deleted_messages, user_id)
         
         return DeleteSessionResponse(
             message=f"Successfully deleted session {session_id}",
@@ -258,7 +365,8 @@ class AgentChatService(ChatService):
 
     async def create_session(self, user_id: int, request: CreateSessionRequest) -> CreateSessionResponse:
         """Create a new chat session."""
-        logger.debug(f"Creating new session for user {user_id}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Creating new session for user %s", user_id)
         
         # Generate session ID
         session_id = chat_manager.generate_session_id(user_id, request.alias)
@@ -275,7 +383,8 @@ class AgentChatService(ChatService):
         # Create session in database
         session = self.session_repo.create(user_id, session_id, alias)
         
-        logger.debug(f"Created session {session_id} with alias '{alias}' for user {user_id}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Created session %s with alias '%s' for user %s", session_id, alias, user_id)
         
         return CreateSessionResponse(
             session_id=session_id,
@@ -285,14 +394,16 @@ class AgentChatService(ChatService):
 
     def update_session_alias(self, user_id: int, session_id: str, request: UpdateSessionAliasRequest) -> UpdateSessionAliasResponse:
         """Update session alias."""
-        logger.debug(f"Updating alias for session {session_id} of user {user_id}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Updating alias for session %s of user %s", session_id, user_id)
         
         # Verify session belongs to user and update alias
         updated_session = self.session_repo.update_alias(user_id, session_id, request.alias)
         if not updated_session:
             raise ValueError(f"Session {session_id} not found for user {user_id}")
         
-        logger.debug(f"Updated session {session_id} alias to '{request.alias}' for user {user_id}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Updated session %s alias to '%s' for user %s", session_id, request.alias, user_id)
         
         return UpdateSessionAliasResponse(
             session_id=session_id,
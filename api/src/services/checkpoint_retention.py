@@ -0,0 +1,140 @@
+from typing import Any, Callable, Dict, List, Optional
+from pydantic import BaseModel, Field
+from resources.app_resources import app_resources
+from resources.chat import chat_manager
+from resources.checkpoint_store import CheckpointStore
+from resources.logging import get_logger
+from resources.metrics import CHECKPOINT_RETENTION_DURATION, CHECKPOINT_ROWS_DELETED, CHECKPOINT_RECLAIMED_BYTES
+from repository.chat_session import ChatSessionSqliteRepository
+from constants import ApplicationConstants, EnvironmentKeys, get_env_int, get_env_float
+import asyncio
+import time
+
+logger = get_logger("checkpoint_retention")
+
+
+class CheckpointRetentionConfig(BaseModel):
+    """Checkpoint retention configuration with Pydantic validation."""
+    keep_per_thread: int = Field(
+        default_factory=lambda: get_env_int(
+            EnvironmentKeys.CHECKPOINT_KEEP_PER_THREAD,
+            ApplicationConstants.DEFAULT_CHECKPOINT_KEEP_PER_THREAD
+        ),
+        ge=1,
+        description="Latest checkpoints kept for each thread (env: CHECKPOINT_KEEP_PER_THREAD)"
+    )
+    interval_seconds: float = Field(
+        default_factory=lambda: get_env_float(
+            EnvironmentKeys.CHECKPOINT_RETENTION_INTERVAL_SECONDS,
+            ApplicationConstants.DEFAULT_CHECKPOINT_RETENTION_INTERVAL_SECONDS
+        ),
+        gt=0,
+        description="Seconds between retention runs (env: CHECKPOINT_RETENTION_INTERVAL_SECONDS)"
+    )
+    vacuum_pages: int = Field(
+        default_factory=lambda: get_env_int(
+            EnvironmentKeys.CHECKPOINT_VACUUM_PAGES,
+            ApplicationConstants.DEFAULT_CHECKPOINT_VACUUM_PAGES
+        ),
+        description="Free pages returned to the filesystem per run, 0 for all (env: CHECKPOINT_VACUUM_PAGES)"
+    )
+
+
+def _load_live_session_ids() -> List[str]:
+    """Load the IDs of all chat sessions from the application database."""
+    db = app_resources.get_database_session()
+    try:
+        return ChatSessionSqliteRepository(db).find_all_ids()
+    finally:
+        db.close()
+
+
+class CheckpointRetention:
+    """
+    Keeps the agent checkpoint database bounded with a background asyncio task.
+    Each run deletes threads whose chat session is gone, keeps only the latest
+    checkpoints of every other thread and incrementally vacuums the file.
+    The SQLite work runs in a worker thread so the event loop is never blocked.
+    """
+
+    def __init__(
+        self,
+        config: Optional[CheckpointRetentionConfig] = None,
+        store_factory: Optional[Callable[[], CheckpointStore]] = None,
+        live_session_ids_loader: Optional[Callable[[], List[str]]] = None
+    ) -> None:
+        self.config: CheckpointRetentionConfig = config or CheckpointRetentionConfig()
+        self.store_factory = store_factory or (lambda: CheckpointStore(chat_manager.get_checkpoint_db_path()))
+        self.live_session_ids_loader = live_session_ids_loader or _load_live_session_ids
+        self._last_report: Optional[Dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start the background retention task."""
+        if self._task is not None and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._retention_loop(), name="checkpoint-retention")
+        logger.info(f"Checkpoint retention started (every {self.config.interval_seconds}s, "
+                    f"keeping {self.config.keep_per_thread} checkpoints per thread)")
+
+    async def stop(self) -> None:
+        """Stop the background retention task."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.debug("Checkpoint retention stopped")
+
+    def is_running(self) -> bool:
+        """Check if the background retention task is running."""
+        return self._task is not None and not self._task.done()
+
+    def get_last_report(self) -> Optional[Dict[str, Any]]:
+        """Get the report of the latest completed run, if any."""
+        return dict(self._last_report) if self._last_report else None
+
+    async def run_once(self) -> Dict[str, Any]:
+        """Apply retention now and return the report."""
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            store = self.store_factory()
+            report = await asyncio.to_thread(
+                store.apply_retention,
+                self.live_session_ids_loader,
+                self.config.keep_per_thread,
+                self.config.vacuum_pages
+            )
+            outcome = "success"
+        finally:
+            CHECKPOINT_RETENTION_DURATION.labels(outcome).observe(time.perf_counter() - started)
+
+        CHECKPOINT_ROWS_DELETED.labels("orphaned").inc(report["orphaned_checkpoints_deleted"])
+        CHECKPOINT_ROWS_DELETED.labels("pruned").inc(report["checkpoints_pruned"])
+        CHECKPOINT_RECLAIMED_BYTES.inc(report["reclaimed_bytes"])
+        self._last_report = report
+        logger.info(
+            f"Checkpoint retention: deleted {report['orphaned_threads_deleted']} orphaned threads, "
+            f"pruned {report['checkpoints_pruned']} checkpoints, reclaimed {report['reclaimed_bytes']} bytes "
+            f"(file {report['file_bytes_before']} -> {report['file_bytes']} bytes) in {report['duration_ms']}ms"
+        )
+        return report
+
+    async def _retention_loop(self) -> None:
+        """Background loop that applies retention until cancelled."""
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Checkpoint retention run failed: {e}", exc_info=True)
+            await asyncio.sleep(self.config.interval_seconds)
+
+
+# Global instance - Singleton pattern
+checkpoint_retention = CheckpointRetention()
@@ -2,10 +2,19 @@ from abc import ABC, abstractmethod
 from typing import List, Optional
 from fastapi import Depends
 from repository import User, Flight
-from schemas import FlightCreate, FlightResponse, PaginatedResponse
+from schemas import (
+    FlightCreate, FlightResponse, PaginatedResponse, FareCalendarDayResponse, FareCalendarResponse,
+    ItineraryResponse, FlightSearchBatch, FlightSearchBatchResult, FlightSearchDay, FlightSearchResponse,
+    FlightSearchFilters
+)
 from repository import FlightRepository, create_flight_repository
-from resources.logging import get_logger
-from exceptions import InvalidDateFormatError, InvalidFlightTimesError, InvalidFlightPriceError
+from resources.logging import get_logger, lazy
+from resources.route_graph import FlightLeg, RouteGraph, route_graph
+from exceptions import (
+    InvalidDateFormatError, InvalidFlightTimesError, InvalidFlightPriceError, InvalidLayoverWindowError
+)
+from constants import ApplicationConstants
+import datetime
 import math
 
 logger = get_logger("flight_service")
@@ -16,8 +25,18 @@ class FlightService(ABC):
     
     @abstractmethod
     def search_flights(self, origin: Optional[str] = None, destination: Optional[str] = None, 
-                      departure_date: Optional[str] = None, page: int = 1, size: int = 10) -> PaginatedResponse[FlightResponse]:
-        """Search for flights by origin, destination, and departure date with pagination."""
+                      departure_date: Optional[str] = None, page: int = 1, size: int = 10,
+                      flexible_days: int = 0, filters: Optional[FlightSearchFilters] = None) -> FlightSearchResponse:
+        """
+        Search for flights by origin, destination, and departure date with pagination, narrowed and sorted by filters.
+        With flexible_days, flights up to that many days before and after departure_date are included
+        and summarized per day.
+        """
+        pass
+    
+    @abstractmethod
+    def search_flights_batch(self, batch: FlightSearchBatch) -> List[FlightSearchBatchResult]:
+        """Search several routes and dates at once, one result per search in request order."""
         pass
     
     @abstractmethod
@@ -29,17 +48,39 @@ class FlightService(ABC):
     def list_flights(self, page: int = 1, size: int = 10) -> PaginatedResponse[FlightResponse]:
         """Get all flights with pagination."""
         pass
+    
+    @abstractmethod
+    def get_fare_calendar(self, origin: str, destination: str, start_date: Optional[str] = None,
+                          days: int = ApplicationConstants.DEFAULT_FARE_CALENDAR_DAYS) -> FareCalendarResponse:
+        """Get the cheapest fare per day on a route, starting today unless start_date (YYYY-MM-DD) is given."""
+        pass
+    
+    @abstractmethod
+    def search_connections(self, origin: str, destination: str, departure_date: str,
+                           max_stops: int = ApplicationConstants.MAX_CONNECTION_STOPS,
+                           min_layover_minutes: int = ApplicationConstants.DEFAULT_MIN_LAYOVER_MINUTES,
+                           max_layover_minutes: int = ApplicationConstants.DEFAULT_MAX_LAYOVER_MINUTES,
+                           sort_by: str = "price",
+                           limit: int = ApplicationConstants.DEFAULT_CONNECTION_RESULTS) -> List[ItineraryResponse]:
+        """Find direct and connecting itineraries departing on a date (YYYY-MM-DD), cheapest or shortest first."""
+        pass
 
 
 class FlightBusinessService(FlightService):
     """Implementation of FlightService with business logic."""
     
-    def __init__(self, flight_repo: FlightRepository):
+    def __init__(self, flight_repo: FlightRepository, graph: Optional[RouteGraph] = None):
         self.flight_repo = flight_repo
+        self.route_graph = graph or route_graph
     
     def search_flights(self, origin: Optional[str] = None, destination: Optional[str] = None, 
-                      departure_date: Optional[str] = None, page: int = 1, size: int = 10) -> PaginatedResponse[FlightResponse]:
-        """Search for flights by origin, destination, and departure date with pagination."""
+                      departure_date: Optional[str] = None, page: int = 1, size: int = 10,
+                      flexible_days: int = 0, filters: Optional[FlightSearchFilters] = None) -> FlightSearchResponse:
+        """
+        Search for flights by origin, destination, and departure date with pagination, narrowed and sorted by filters.
+        With flexible_days, flights up to that many days before and after departure_date are included
+        and summarized per day.
+        """
         # Log the search parameters
         search_params = []
         if origin:
@@ -48,14 +89,24 @@ class FlightBusinessService(FlightService):
             search_params.append(f"destination: {destination}")
         if departure_date:
             search_params.append(f"departure_date: {departure_date}")
+        if flexible_days and departure_date:
+            search_params.append(f"flexible_days: {flexible_days}")
+        filters = filters or FlightSearchFilters()
+        search_params.extend(f"{name}: {value}" for name, value in filters.model_dump(exclude_defaults=True).items())
         
-        logger.debug(f"Searching flights with filters: {', '.join(search_params) or 'no filters'}, page: {page}, size: {size}")
+        logger.debug("Searching flights with filters: %s, page: %s, size: %s", ', '.join(search_params) or 'no filters', page, size)
         
         try:
-            flights, total = self.flight_repo.search_flights(origin, destination, departure_date, page, size)
+            days = []
+            if flexible_days and departure_date:
+                flights, total, days = self._search_flexible_dates(origin, destination, departure_date, page, size,
+                                                                   flexible_days, filters)
+            else:
+                flights, total = self.flight_repo.search_flights(origin, destination, departure_date, page, size,
+                                                                 **filters.model_dump())
             
             logger.info(f"Found {len(flights)} flights (total: {total}) with filters: {', '.join(search_params) or 'no filters'}")
-            logger.debug(f"Flight IDs found: {[flight.id for flight in flights]}")
+            logger.debug("Flight IDs found: %s", lazy(lambda: [flight.id for flight in flights]))
             
             # Convert Flight models to FlightResponse schemas
             flight_responses = [
@@ -67,27 +118,87 @@ class FlightBusinessService(FlightService):
                     arrival_time=flight.arrival_time,
                     airline=flight.airline,
                     status=flight.status,
-                    price=flight.price
+                    price=flight.price,
+                    seats_available=flight.seats_available
                 ) for flight in flights
             ]
             
             # Calculate total pages
             pages = math.ceil(total / size) if total > 0 else 1
             
-            return PaginatedResponse(
+            return FlightSearchResponse(
                 items=flight_responses,
                 total=total,
                 page=page,
                 size=size,
-                pages=pages
+                pages=pages,
+                days=days
             )
         except ValueError as e:
             logger.warning(f"Invalid date format provided: {departure_date}")
             raise InvalidDateFormatError(departure_date)
     
+    def _search_flexible_dates(self, origin: Optional[str], destination: Optional[str], departure_date: str,
+                               page: int, size: int, flexible_days: int,
+                               filters: FlightSearchFilters) -> tuple[List[Flight], int, List[FlightSearchDay]]:
+        """Search the whole ±flexible_days window at once, then summarize it per day and cut out the page."""
+        center = datetime.datetime.strptime(departure_date, "%Y-%m-%d").date()
+        window = datetime.timedelta(days=flexible_days)
+        flights = self.flight_repo.search_flights_between(origin, destination, center - window, center + window,
+                                                          **filters.model_dump())
+        
+        flights_by_day = {}
+        for flight in flights:
+            flights_by_day.setdefault(flight.departure_time.date(), []).append(flight)
+        days = [
+            FlightSearchDay(date=day, min_price=min(flight.price for flight in day_flights), flight_count=len(day_flights))
+            for day, day_flights in sorted(flights_by_day.items())
+        ]
+        
+        offset = (page - 1) * size
+        return flights[offset:offset + size], len(flights), days
+    
+    def search_flights_batch(self, batch: FlightSearchBatch) -> List[FlightSearchBatchResult]:
+        """Search several routes and dates at once, one result per search in request order."""
+        logger.debug("Searching %s routes in one batch, size: %s", len(batch.searches), batch.size)
+        
+        routes = []
+        for search in batch.searches:
+            try:
+                day = datetime.datetime.strptime(search.departure_date, "%Y-%m-%d").date()
+            except ValueError:
+                logger.warning(f"Invalid date format provided: {search.departure_date}")
+                raise InvalidDateFormatError(search.departure_date)
+            routes.append((search.origin, search.destination, day))
+        
+        matches = self.flight_repo.search_flights_many(routes)
+        logger.info(f"Batch search of {len(routes)} routes found {sum(len(flights) for flights in matches)} flights")
+        
+        return [
+            FlightSearchBatchResult(
+                origin=search.origin,
+                destination=search.destination,
+                departure_date=search.departure_date,
+                items=[
+                    FlightResponse(
+                        id=flight.id,
+                        origin=flight.origin,
+                        destination=flight.destination,
+                        departure_time=flight.departure_time,
+                        arrival_time=flight.arrival_time,
+                        airline=flight.airline,
+                        status=flight.status,
+                        price=flight.price,
+                        seats_available=flight.seats_available
+                    ) for flight in flights[:batch.size]
+                ],
+                total=len(flights)
+            ) for search, flights in zip(batch.searches, matches)
+        ]
+    
     def create_flight(self, user: User, flight: FlightCreate) -> FlightResponse:
         """Create a new flight."""
-        logger.debug(f"Creating flight from {flight.origin} to {flight.destination} by user {user.id}")
+        logger.debug("Creating flight from %s to %s by user %s", flight.origin, flight.destination, user.id)
 
         if flight.departure_time >= flight.arrival_time:
             logger.error(f"Invalid flight times: departure {flight.departure_time} must be before arrival {flight.arrival_time}")
@@ -105,8 +216,10 @@ class FlightBusinessService(FlightService):
             arrival_time=flight.arrival_time,
             airline=flight.airline,
             price=int(flight.price),
-            status=flight.status or "scheduled"
+            status=flight.status or "scheduled",
+            capacity=flight.capacity
         )
+        self.route_graph.upsert(new_flight)
         
         logger.info(f"Successfully created flight {new_flight.id} from {flight.origin} to {flight.destination} by user {user.email}")
         
@@ -119,17 +232,18 @@ class FlightBusinessService(FlightService):
             arrival_time=new_flight.arrival_time,
             airline=new_flight.airline,
             status=new_flight.status,
-            price=new_flight.price
+            price=new_flight.price,
+            seats_available=new_flight.seats_available
         )
     
     def list_flights(self, page: int = 1, size: int = 10) -> PaginatedResponse[FlightResponse]:
         """Get all flights with pagination."""
-        logger.debug(f"Retrieving all flights, page: {page}, size: {size}")
+        logger.debug("Retrieving all flights, page: %s, size: %s", page, size)
         
         flights, total = self.flight_repo.list_all(page, size)
         
         logger.info(f"Successfully retrieved {len(flights)} flights (total: {total})")
-        logger.debug(f"Flight IDs retrieved: {[flight.id for flight in flights]}")
+        logger.debug("Flight IDs retrieved: %s", lazy(lambda: [flight.id for flight in flights]))
         
         # Convert Flight models to FlightResponse schemas
         flight_responses = [
@@ -141,7 +255,8 @@ class FlightBusinessService(FlightService):
                 arrival_time=flight.arrival_time,
                 airline=flight.airline,
                 status=flight.status,
-                price=int(flight.price)
+                price=int(flight.price),
+                seats_available=flight.seats_available
             ) for flight in flights
         ]
         
@@ -156,6 +271,125 @@ class FlightBusinessService(FlightService):
             pages=pages
         )
 
+    
+    def get_fare_calendar(self, origin: str, destination: str, start_date: Optional[str] = None,
+                          days: int = ApplicationConstants.DEFAULT_FARE_CALENDAR_DAYS) -> FareCalendarResponse:
+        """Get the cheapest fare per day on a route, starting today unless start_date (YYYY-MM-DD) is given."""
+        logger.debug("Retrieving fare calendar from %s to %s, start: %s, days: %s", origin, destination, start_date, days)
+        
+        if start_date:
+            try:
+                first_day = datetime.datetime.strptime(start_date, "%Y-%m-%d").date()
+            except ValueError:
+                logger.warning(f"Invalid date format provided: {start_date}")
+                raise InvalidDateFormatError(start_date)
+        else:
+            first_day = datetime.datetime.now(datetime.timezone.utc).date()
+        last_day = first_day + datetime.timedelta(days=days - 1)
+        
+        entries = self.flight_repo.get_fare_calendar(origin, destination, first_day, last_day)
+        logger.info(f"Fare calendar from {origin} to {destination} has {len(entries)} days with flights between {first_day} and {last_day}")
+        
+        return FareCalendarResponse(
+            origin=origin,
+            destination=destination,
+            start_date=first_day,
+            end_date=last_day,
+            days=[
+                FareCalendarDayResponse(date=entry.day, min_price=entry.min_price, flight_count=entry.flight_count)
+                for entry in entries
+            ]
+        )
+
+    
+    def search_connections(self, origin: str, destination: str, departure_date: str,
+                           max_stops: int = ApplicationConstants.MAX_CONNECTION_STOPS,
+                           min_layover_minutes: int = ApplicationConstants.DEFAULT_MIN_LAYOVER_MINUTES,
+                           max_layover_minutes: int = ApplicationConstants.DEFAULT_MAX_LAYOVER_MINUTES,
+                           sort_by: str = "price",
+                           limit: int = ApplicationConstants.DEFAULT_CONNECTION_RESULTS) -> List[ItineraryResponse]:
+        """Find direct and connecting itineraries departing on a date (YYYY-MM-DD), cheapest or shortest first."""
+        logger.debug("Searching connections from %s to %s on %s, max stops: %s, layover: %s-%s min, sort: %s",
+                     origin, destination, departure_date, max_stops, min_layover_minutes, max_layover_minutes, sort_by)
+        
+        try:
+            day = datetime.datetime.strptime(departure_date, "%Y-%m-%d").date()
+        except ValueError:
+            logger.warning(f"Invalid date format provided: {departure_date}")
+            raise InvalidDateFormatError(departure_date)
+        if min_layover_minutes > max_layover_minutes:
+            logger.warning(f"Invalid layover window: {min_layover_minutes}-{max_layover_minutes} min")
+            raise InvalidLayoverWindowError(min_layover_minutes, max_layover_minutes)
+        
+        self.route_graph.refresh(self.flight_repo.get_latest_version(), self._load_route_graph_flights)
+        codes = self.flight_repo.resolve_airport_codes([origin, destination])
+        # Some itineraries found may have sold-out legs, so more are requested until enough are bookable
+        wanted = limit * ApplicationConstants.CONNECTION_OVERFETCH_FACTOR
+        while True:
+            paths = self.route_graph.search(
+                origin, destination,
+                earliest_departure=datetime.datetime.combine(day, datetime.time.min),
+                latest_departure=datetime.datetime.combine(day, datetime.time.max),
+                min_layover=datetime.timedelta(minutes=min_layover_minutes),
+                max_layover=datetime.timedelta(minutes=max_layover_minutes),
+                max_stops=max_stops,
+                sort_by=sort_by,
+                limit=wanted,
+                origin_codes=codes[origin],
+                destination_codes=codes[destination]
+            )
+            itineraries = self._bookable_itineraries(paths)
+            if len(itineraries) >= limit or len(paths) < wanted:
+                break
+            wanted *= 2
+        itineraries = itineraries[:limit]
+        
+        logger.info(f"Found {len(itineraries)} itineraries from {origin} to {destination} on {departure_date}")
+        return itineraries
+    
+    def _bookable_itineraries(self, paths: List[List[FlightLeg]]) -> List[ItineraryResponse]:
+        """Build itineraries from the current flight rows, dropping any with a leg that is no longer bookable."""
+        # The graph can lag writes made since its last refresh, so legs are re-read before they are offered
+        leg_ids = {leg.flight_id for path in paths for leg in path}
+        flights = {flight.id: flight for flight in self.flight_repo.find_available_by_ids(list(leg_ids))}
+        for flight_id in leg_ids - flights.keys():
+            self.route_graph.remove(flight_id)
+        
+        itineraries = []
+        for path in paths:
+            legs = [flights.get(leg.flight_id) for leg in path]
+            if not all(flight and flight.seats_available > 0 for flight in legs):
+                continue
+            itineraries.append(ItineraryResponse(
+                legs=[
+                    FlightResponse(
+                        id=flight.id,
+                        origin=flight.origin,
+                        destination=flight.destination,
+                        departure_time=flight.departure_time,
+                        arrival_time=flight.arrival_time,
+                        airline=flight.airline,
+                        status=flight.status,
+                        price=flight.price,
+                        seats_available=flight.seats_available
+                    ) for flight in legs
+                ],
+                stops=len(legs) - 1,
+                total_price=sum(flight.price for flight in legs),
+                departure_time=legs[0].departure_time,
+                arrival_time=legs[-1].arrival_time,
+                duration_minutes=int((legs[-1].arrival_time - legs[0].departure_time).total_seconds() // 60)
+            ))
+        
+        return itineraries
+    
+    def _load_route_graph_flights(self, version: Optional[int]) -> List[Flight]:
+        """Load the scheduled flights from today onwards for the route graph, or the flights written after version."""
+        if version is not None:
+            return self.flight_repo.find_written_after(version)
+        today = datetime.datetime.now(datetime.timezone.utc).date()
+        return self.flight_repo.find_scheduled_departing_after(datetime.datetime.combine(today, datetime.time.min))
+
 
 def create_flight_service(
     flight_repo: FlightRepository = Depends(create_flight_repository)
@@ -1,9 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any
-import os
-import tempfile
-import subprocess
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Tuple
 from fastapi import Depends
+from pydantic import BaseModel, Field
 from resources.app_resources import app_resources, AppResources
 from resources.dependencies import (
     get_crypto_manager, 
@@ -12,13 +10,20 @@ from resources.dependencies import (
 )
 from resources.database import get_database_session
 from resources.logging import get_logger
-from resources.crypto import CryptoManager
+from resources.crypto import CryptoManager, crypto_manager
+from resources.chat import chat_manager
+from resources.ffmpeg import FfmpegProbe, ffmpeg_probe
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from langchain.chat_models.base import BaseChatModel
 from langgraph.checkpoint.memory import MemorySaver
 from services.speech import SpeechService, create_speech_service
+from constants import ApplicationConstants, EnvironmentKeys, get_env_float
+from concurrent.futures import Future, ThreadPoolExecutor
+import asyncio
 import datetime
+import threading
+import time
 
 logger = get_logger("health_service")
 
@@ -27,7 +32,7 @@ class HealthService(ABC):
     """Abstract base class for Health service operations."""
     
     @abstractmethod
-    def get_health_status(self) -> Dict[str, Any]:
+    def get_health_status(self, deep: bool = False) -> Dict[str, Any]:
         """Get comprehensive health status of all application components."""
         pass
 
@@ -42,7 +47,8 @@ class SystemHealthService(HealthService):
         crypto: CryptoManager,
         chat_model: BaseChatModel,
         chat_memory: MemorySaver,
-        speech_service: SpeechService
+        speech_service: SpeechService,
+        ffmpeg: Optional[FfmpegProbe] = None
     ):
         self.app_res = app_res
         self.db = db
@@ -50,10 +56,14 @@ class SystemHealthService(HealthService):
         self.chat_model = chat_model
         self.chat_memory = chat_memory
         self.speech_service = speech_service
+        self.ffmpeg_probe = ffmpeg or ffmpeg_probe
     
-    def get_health_status(self) -> Dict[str, Any]:
-        """Get comprehensive health status of all application components."""
-        logger.debug("Performing health check")
+    def get_health_status(self, deep: bool = False) -> Dict[str, Any]:
+        """
+        Get comprehensive health status of all application components.
+        Cached probes (ffmpeg) are served from their last snapshot unless deep is True.
+        """
+        logger.debug("Performing health check (deep: %s)", deep)
         
         # Basic health status
         health_status = {
@@ -67,12 +77,8 @@ class SystemHealthService(HealthService):
         
         # Check individual resources if app is initialized
         if self.app_res.is_initialized():
-            self._check_database_health(health_status)
-            self._check_chat_health(health_status)
-            self._check_chat_memory_health(health_status)
-            self._check_crypto_health(health_status)
-            self._check_logging_health(health_status)
-            self._check_speech_health(health_status)
+            for check in self.get_component_checks(deep).values():
+                check(health_status)
         else:
             # App resources not initialized
             health_status["status"] = "starting"
@@ -80,9 +86,23 @@ class SystemHealthService(HealthService):
                 "message": "Application resources not yet initialized"
             }
         
-        logger.debug(f"Health check completed with status: {health_status['status']}")
+        logger.debug("Health check completed with status: %s", health_status['status'])
         return health_status
     
+    def get_component_checks(self, deep: bool = False) -> Dict[str, Callable[[Dict[str, Any]], None]]:
+        """
+        Get the individual component checks keyed by component name.
+        Each check records its result into the health status dict it is given.
+        """
+        return {
+            "database": self._check_database_health,
+            "chat": self._check_chat_health,
+            "chat_memory": self._check_chat_memory_health,
+            "crypto": self._check_crypto_health,
+            "logging": self._check_logging_health,
+            "speech": lambda health_status: self._check_speech_health(health_status, deep),
+        }
+    
     def _check_database_health(self, health_status: Dict[str, Any]) -> None:
         """Check database connectivity and health."""
         try:
@@ -114,7 +134,7 @@ class SystemHealthService(HealthService):
             }
             if not chat_healthy:
                 health_status["status"] = "degraded"
-            logger.debug(f"Chat health check: {'healthy' if chat_healthy else 'not_initialized'}")
+            logger.debug("Chat health check: %s", 'healthy' if chat_healthy else 'not_initialized')
         except Exception as e:
             logger.warning(f"Chat health check failed: {e}")
             health_status["resources"]["details"]["chat"] = {
@@ -136,7 +156,7 @@ class SystemHealthService(HealthService):
             }
             if not memory_healthy:
                 health_status["status"] = "degraded"
-            logger.debug(f"Chat memory health check: {'healthy' if memory_healthy else 'not_initialized'}")
+            logger.debug("Chat memory health check: %s", 'healthy' if memory_healthy else 'not_initialized')
         except Exception as e:
             logger.warning(f"Chat memory health check failed: {e}")
             health_status["resources"]["details"]["chat_memory"] = {
@@ -157,7 +177,7 @@ class SystemHealthService(HealthService):
             }
             if not crypto_healthy:
                 health_status["status"] = "degraded"
-            logger.debug(f"Crypto health check: {'healthy' if crypto_healthy else 'not_initialized'}")
+            logger.debug("Crypto health check: %s", 'healthy' if crypto_healthy else 'not_initialized')
         except Exception as e:
             logger.warning(f"Crypto health check failed: {e}")
             health_status["resources"]["details"]["crypto"] = {
@@ -173,11 +193,12 @@ class SystemHealthService(HealthService):
             logging_healthy = self.app_res.logging.is_initialized()
             health_status["resources"]["details"]["logging"] = {
                 "status": "healthy" if logging_healthy else "not_initialized",
-                "initialized": logging_healthy
+                "initialized": logging_healthy,
+                "dropped_records": self.app_res.logging.get_dropped_count()
             }
             if not logging_healthy:
                 health_status["status"] = "degraded"
-            logger.debug(f"Logging health check: {'healthy' if logging_healthy else 'not_initialized'}")
+            logger.debug("Logging health check: %s", 'healthy' if logging_healthy else 'not_initialized')
         except Exception as e:
             health_status["resources"]["details"]["logging"] = {
                 "status": "unhealthy",
@@ -186,7 +207,7 @@ class SystemHealthService(HealthService):
             }
             health_status["status"] = "degraded"
 
-    def _check_speech_health(self, health_status: Dict[str, Any]) -> None:
+    def _check_speech_health(self, health_status: Dict[str, Any], deep: bool = False) -> None:
         """Check speech service health including environment variables and ffmpeg dependency."""
         try:
             from constants import EnvironmentKeys, get_env_str
@@ -202,8 +223,8 @@ class SystemHealthService(HealthService):
                 "AZURE_SPEECH_ENDPOINT": "set" if azure_speech_endpoint else "not_set"
             }
             
-            # Check ffmpeg availability
-            ffmpeg_status = self._check_ffmpeg_availability()
+            # Check ffmpeg availability (cached unless a deep check was requested)
+            ffmpeg_status = self._check_ffmpeg_availability(force_refresh=deep)
             
             # Check if speech service is available
             speech_service_available = self.speech_service is not None
@@ -233,7 +254,7 @@ class SystemHealthService(HealthService):
             if azure_speech_key and speech_severity == "warning":
                 health_status["status"] = "degraded"
                 
-            logger.debug(f"Speech health check: {speech_status}")
+            logger.debug("Speech health check: %s", speech_status)
             
         except Exception as e:
             logger.warning(f"Speech health check failed: {e}")
@@ -247,50 +268,267 @@ class SystemHealthService(HealthService):
             if get_env_str(EnvironmentKeys.AZURE_SPEECH_KEY, ""):
                 health_status["status"] = "degraded"
 
-    def _check_ffmpeg_availability(self) -> Dict[str, Any]:
-        """Check if ffmpeg is available on the system."""
+    def _check_ffmpeg_availability(self, force_refresh: bool = False) -> Dict[str, Any]:
+        """Get ffmpeg availability from the cached probe, re-probing only when forced."""
+        return self.ffmpeg_probe.get_status(force_refresh=force_refresh)
+
+
+class HealthMonitorConfig(BaseModel):
+    """Readiness snapshot configuration with Pydantic validation."""
+    refresh_interval_seconds: float = Field(
+        default_factory=lambda: get_env_float(
+            EnvironmentKeys.HEALTH_REFRESH_INTERVAL_SECONDS,
+            ApplicationConstants.DEFAULT_HEALTH_REFRESH_INTERVAL_SECONDS
+        ),
+        gt=0,
+        description="Seconds between background readiness refreshes (env: HEALTH_REFRESH_INTERVAL_SECONDS)"
+    )
+    check_timeout_seconds: float = Field(
+        default_factory=lambda: get_env_float(
+            EnvironmentKeys.HEALTH_CHECK_TIMEOUT_SECONDS,
+            ApplicationConstants.DEFAULT_HEALTH_CHECK_TIMEOUT_SECONDS
+        ),
+        gt=0,
+        description="Timeout for each individual component check (env: HEALTH_CHECK_TIMEOUT_SECONDS)"
+    )
+
+
+class HealthMonitor:
+    """
+    Keeps a readiness snapshot refreshed by a background asyncio task.
+    Component checks run concurrently in worker threads with a per-check timeout,
+    so a slow dependency is reported as timed out instead of stalling the endpoint.
+    A thread cannot be interrupted, so a check that is still running from an earlier
+    refresh is skipped instead of started again, and the refresh's database session is
+    closed only once every check thread using it has returned.
+    """
+    
+    def __init__(
+        self,
+        config: Optional[HealthMonitorConfig] = None,
+        service_factory: Optional[Callable[[], Awaitable[SystemHealthService]]] = None
+    ) -> None:
+        self.config: HealthMonitorConfig = config or HealthMonitorConfig()
+        self.service_factory = service_factory or _build_system_health_service
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._snapshot_monotonic: float = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._executor = self._create_executor()
+        self._executor_shut_down = False
+        # Futures of the checks still running, by check name
+        self._running: Dict[str, Future] = {}
+    
+    async def start(self) -> None:
+        """Start the background refresh task."""
+        if self._task is not None and not self._task.done():
+            return
+        if self._executor_shut_down:
+            self._executor = self._create_executor()
+            self._executor_shut_down = False
+        self._task = asyncio.create_task(self._refresh_loop(), name="health-monitor-refresh")
+        logger.info(f"Health monitor started (refresh every {self.config.refresh_interval_seconds}s, "
+                    f"check timeout {self.config.check_timeout_seconds}s)")
+    
+    async def stop(self) -> None:
+        """Stop the background refresh task and shut down the check threads until the next start."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # A hung check cannot be interrupted: do not wait for it, only drop the queued ones
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor_shut_down = True
+        logger.debug("Health monitor stopped")
+    
+    @staticmethod
+    def _create_executor() -> ThreadPoolExecutor:
+        """Create the bounded thread pool the component checks run in."""
+        return ThreadPoolExecutor(
+            max_workers=ApplicationConstants.HEALTH_CHECK_WORKERS, thread_name_prefix="health-check"
+        )
+    
+    def is_running(self) -> bool:
+        """Check if the background refresh task is running."""
+        return self._task is not None and not self._task.done()
+    
+    def get_snapshot(self) -> Dict[str, Any]:
+        """Get the latest readiness snapshot without performing any checks."""
+        if self._snapshot is None:
+            return {
+                "status": "starting",
+                "timestamp": datetime.datetime.now(datetime.UTC).isoformat(),
+                "resources": {
+                    "initialized": False,
+                    "details": {"message": "Readiness snapshot not yet available"}
+                },
+                "checks": {}
+            }
+        
+        snapshot = dict(self._snapshot)
+        snapshot["snapshot_age_seconds"] = round(time.monotonic() - self._snapshot_monotonic, 3)
+        return snapshot
+    
+    async def refresh(self) -> Dict[str, Any]:
+        """Run all component checks now and replace the snapshot."""
+        started = time.perf_counter()
+        service = await self.service_factory()
+        # Check threads that may still be using the service's database session
+        futures: List[Future] = []
         try:
-            # Check for ffmpeg binary
-            result = subprocess.run(
-                ["ffmpeg", "-version"], 
-                capture_output=True, 
-                text=True, 
-                timeout=5
-            )
+            snapshot = {
+                "status": "ok",
+                "timestamp": datetime.datetime.now(datetime.UTC).isoformat(),
+                "resources": {
+                    "initialized": service.app_res.is_initialized(),
+                    "details": {}
+                },
+                "checks": {}
+            }
             
-            if result.returncode == 0:
-                # Extract version info from output
-                version_line = result.stdout.split('\n')[0] if result.stdout else "Unknown version"
-                return {
-                    "available": True,
-                    "version": version_line,
-                    "status": "installed"
-                }
+            if service.app_res.is_initialized():
+                checks = service.get_component_checks()
+                results = await asyncio.gather(
+                    *(self._run_check(name, check, futures) for name, check in checks.items())
+                )
+                for name, partial_status, timing in results:
+                    snapshot["resources"]["details"].update(partial_status["resources"]["details"])
+                    snapshot["checks"][name] = timing
+                    if partial_status["status"] != "ok":
+                        snapshot["status"] = "degraded"
             else:
-                return {
-                    "available": False,
-                    "status": "command_failed",
-                    "error": result.stderr or "Unknown error"
+                snapshot["status"] = "starting"
+                snapshot["resources"]["details"] = {
+                    "message": "Application resources not yet initialized"
                 }
-                
-        except subprocess.TimeoutExpired:
-            return {
-                "available": False,
-                "status": "timeout",
-                "error": "ffmpeg command timed out"
+        finally:
+            close = getattr(service.db, "close", None)
+            if close:
+                self._close_when_done(close, futures)
+        
+        snapshot["refresh_duration_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        self._snapshot = snapshot
+        self._snapshot_monotonic = time.monotonic()
+        logger.debug("Readiness snapshot refreshed with status: %s in %sms", snapshot['status'], snapshot['refresh_duration_ms'])
+        return self.get_snapshot()
+    
+    async def _run_check(
+        self, name: str, check: Callable[[Dict[str, Any]], None], futures: List[Future]
+    ) -> Tuple[str, Dict[str, Any], Dict[str, Any]]:
+        """
+        Run a single component check in a worker thread, bounded by the per-check timeout.
+        The thread's future is appended to futures; a check whose previous run has not finished is skipped.
+        """
+        started = time.perf_counter()
+        previous = self._running.get(name)
+        if previous is not None and not previous.done():
+            logger.warning(f"Health check '{name}' skipped: its previous run has not finished")
+            partial_status = {
+                "status": "degraded",
+                "resources": {"details": {name: {
+                    "status": "timeout",
+                    "initialized": False,
+                    "error": "Previous check is still running"
+                }}}
             }
-        except FileNotFoundError:
-            return {
-                "available": False,
-                "status": "not_found",
-                "error": "ffmpeg command not found"
+            timing = {"outcome": "skipped", "duration_ms": round((time.perf_counter() - started) * 1000, 3)}
+            return name, partial_status, timing
+        
+        partial_status = {"status": "ok", "resources": {"details": {}}}
+        try:
+            future = self._executor.submit(check, partial_status)
+            self._running[name] = future
+            futures.append(future)
+            # Shielded: a timeout stops the wait, while the thread keeps running and stays tracked
+            await asyncio.wait_for(
+                asyncio.shield(asyncio.wrap_future(future)),
+                timeout=self.config.check_timeout_seconds
+            )
+            outcome = "completed"
+        except asyncio.TimeoutError:
+            logger.warning(f"Health check '{name}' timed out after {self.config.check_timeout_seconds}s")
+            partial_status = {
+                "status": "degraded",
+                "resources": {"details": {name: {
+                    "status": "timeout",
+                    "initialized": False,
+                    "error": f"Check exceeded {self.config.check_timeout_seconds}s timeout"
+                }}}
             }
+            outcome = "timeout"
         except Exception as e:
-            return {
-                "available": False,
-                "status": "check_failed",
-                "error": str(e)
+            logger.warning(f"Health check '{name}' failed: {e}")
+            partial_status = {
+                "status": "degraded",
+                "resources": {"details": {name: {
+                    "status": "unhealthy",
+                    "initialized": False,
+                    "error": str(e)
+                }}}
             }
+            outcome = "error"
+        
+        timing = {
+            "outcome": outcome,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 3)
+        }
+        return name, partial_status, timing
+    
+    @staticmethod
+    def _close_when_done(close: Callable[[], None], futures: List[Future]) -> None:
+        """Call close once every future has finished, right away if they all have."""
+        pending = [future for future in futures if not future.done()]
+        if not pending:
+            close()
+            return
+        lock = threading.Lock()
+        remaining = [len(pending)]
+        
+        def on_done(_: Future) -> None:
+            with lock:
+                remaining[0] -= 1
+                is_last = remaining[0] == 0
+            if is_last:
+                close()
+        
+        for future in pending:
+            future.add_done_callback(on_done)
+    
+    async def _refresh_loop(self) -> None:
+        """Background loop that refreshes the snapshot until cancelled."""
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Readiness snapshot refresh failed: {e}", exc_info=True)
+            await asyncio.sleep(self.config.refresh_interval_seconds)
+
+
+async def _build_system_health_service() -> SystemHealthService:
+    """Build a SystemHealthService backed by the global resources and its own database session."""
+    chat_memory = await chat_manager.get_memory() if app_resources.is_initialized() else None
+    return SystemHealthService(
+        app_res=app_resources,
+        db=app_resources.get_database_session(),
+        crypto=crypto_manager,
+        chat_model=chat_manager.response_model,
+        chat_memory=chat_memory,
+        speech_service=create_speech_service(),
+        ffmpeg=app_resources.ffmpeg
+    )
+
+
+# Global instance - Singleton pattern
+health_monitor = HealthMonitor()
+
+
+def get_health_monitor() -> HealthMonitor:
+    """Dependency function to get the health monitor."""
+    return health_monitor
 
 
 def get_app_resources() -> AppResources:
@@ -307,4 +545,4 @@ def create_health_service(
     speech_service: SpeechService = Depends(create_speech_service)
 ) -> HealthService:
     """Dependency injection function to create HealthService instance."""
-    return SystemHealthService(app_res, db, crypto, chat_model, chat_memory, speech_service)
+    return SystemHealthService(app_res, db, crypto, chat_model, chat_memory, speech_service, app_res.ffmpeg)
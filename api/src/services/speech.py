@@ -1,11 +1,13 @@
 from abc import ABC, abstractmethod
 import os
 import tempfile
+import time
 import azure.cognitiveservices.speech as speechsdk
 from fastapi import UploadFile
 from pydub import AudioSegment
 from pydub.exceptions import CouldntDecodeError
 from resources.logging import get_logger
+from resources.metrics import SPEECH_TRANSCODE_DURATION
 from exceptions import (
     SpeechServiceNotConfiguredError,
     InvalidAudioFileError, 
@@ -39,13 +41,12 @@ class AzureSpeechService(SpeechService):
     def _convert_to_wav(self, input_file_path: str, output_file_path: str) -> None:
         """Convert audio file to WAV format using pydub."""
         try:
-            logger.debug(f"Converting audio from {input_file_path} to WAV format")
+            logger.debug("Converting audio from %s to WAV format", input_file_path)
             
             # Load audio file (supports multiple formats including webm)
             audio = AudioSegment.from_file(input_file_path)
             
-            logger.debug(f"Original audio - Duration: {len(audio)}ms, Channels: {audio.channels}, "
-                        f"Frame rate: {audio.frame_rate}Hz")
+            logger.debug("Original audio - Duration: %sms, Channels: %s, Frame rate: %sHz", len(audio), audio.channels, audio.frame_rate)
             
             # Convert to WAV with speech recognition optimized settings
             audio = audio.set_frame_rate(16000)  # 16kHz sample rate for speech
@@ -84,7 +85,7 @@ class AzureSpeechService(SpeechService):
     
     async def speech_to_text(self, audio_file: UploadFile) -> tuple[str, float]:
         """Convert audio file to text using Azure Speech Service."""
-        logger.debug(f"Processing speech-to-text for file: {audio_file.filename} ({audio_file.content_type})")
+        logger.debug("Processing speech-to-text for file: %s (%s)", audio_file.filename, audio_file.content_type)
         
         if not self.speech_key:
             logger.error("Azure Speech key not configured")
@@ -130,8 +131,14 @@ class AzureSpeechService(SpeechService):
                 logger.debug("Input file is already WAV format")
             else:
                 # Convert to WAV
-                logger.debug(f"Converting {audio_file.content_type} to WAV format")
-                self._convert_to_wav(temp_input_path, temp_wav_path)
+                logger.debug("Converting %s to WAV format", audio_file.content_type)
+                transcode_started = time.perf_counter()
+                outcome = "error"
+                try:
+                    self._convert_to_wav(temp_input_path, temp_wav_path)
+                    outcome = "success"
+                finally:
+                    SPEECH_TRANSCODE_DURATION.labels(outcome).observe(time.perf_counter() - transcode_started)
             
             # Configure speech service
             speech_config = speechsdk.SpeechConfig(
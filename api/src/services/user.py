@@ -41,7 +41,7 @@ class UserBusinessService(UserService):
     
     def register(self, user: UserCreate) -> Token:
         """Register a new user."""
-        logger.debug(f"Attempting to register user with email: {user.email}")
+        logger.debug("Attempting to register user with email: %s", user.email)
         
         if self.user_repo.exists_by_email(user.email):
             logger.warning(f"Registration failed: Email {user.email} already exists")
@@ -69,7 +69,7 @@ class UserBusinessService(UserService):
     
     def login(self, user: UserLogin) -> UserResponse:
         """Login a user."""
-        logger.debug(f"Login attempt for email: {user.email}")
+        logger.debug("Login attempt for email: %s", user.email)
 
         if len(user.password) < SecurityConstants.MIN_PASSWORD_LENGTH:
             logger.warning(f"Login failed: Password too short for email {user.email}")
@@ -100,7 +100,7 @@ class UserBusinessService(UserService):
     
     def get_current_user_info(self, user: User, access_token: str) -> UserResponse:
         """Get current user information with existing token."""
-        logger.debug(f"Getting current user info for user ID: {user.id}")
+        logger.debug("Getting current user info for user ID: %s", user.id)
         
         logger.info(f"Retrieved current user info for user: {user.email} (ID: {user.id})")
         return UserResponse(
@@ -0,0 +1,150 @@
+"""
+Per-turn agent tracing.
+
+An AgentTrace collects timed spans for one chat turn: LangGraph node runs,
+model calls (with token counts), tool calls and checkpoint writes. The compact
+summary is stored with the ChatbotMessage so slow turns can be explained later.
+"""
+
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+from langchain_core.callbacks import BaseCallbackHandler
+from resources.metrics import LLM_CALL_DURATION, TOOL_CALL_DURATION, CHECKPOINT_WRITE_DURATION
+
+# Keep stored traces small; the totals still cover every span
+MAX_TRACE_SPANS = 50
+
+# Trace of the agent turn being processed, read by the checkpointer
+agent_trace_var: ContextVar[Optional["AgentTrace"]] = ContextVar("agent_trace", default=None)
+
+
+class AgentTrace:
+    """Timed spans recorded during one agent turn."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self.spans: List[Dict[str, Any]] = []
+
+    def add_span(self, kind: str, name: str, started: float, **fields: Any) -> None:
+        """Record a span that began at `started` (perf_counter) and ends now."""
+        ended = time.perf_counter()
+        span = {
+            "type": kind,
+            "name": name,
+            "start_ms": round((started - self.started) * 1000, 1),
+            "ms": round((ended - started) * 1000, 1),
+        }
+        span.update({key: value for key, value in fields.items() if value is not None})
+        self.spans.append(span)
+
+    def finish(self) -> None:
+        self.finished = time.perf_counter()
+
+    def summary(self) -> Dict[str, Any]:
+        """Build the compact trace stored with the message."""
+        end = self.finished or time.perf_counter()
+        totals: Dict[str, Dict[str, Any]] = {}
+        for span in self.spans:
+            total = totals.setdefault(span["type"], {"count": 0, "ms": 0.0})
+            total["count"] += 1
+            total["ms"] = round(total["ms"] + span["ms"], 1)
+            for key in ("input_tokens", "output_tokens"):
+                if key in span:
+                    total[key] = total.get(key, 0) + span[key]
+        return {
+            "total_ms": round((end - self.started) * 1000, 1),
+            "totals": totals,
+            "spans": self.spans[:MAX_TRACE_SPANS],
+            "truncated": len(self.spans) > MAX_TRACE_SPANS,
+        }
+
+
+def record_checkpoint_write(operation: str, started: float) -> None:
+    """Report a checkpoint write to metrics and to the active trace, if any."""
+    CHECKPOINT_WRITE_DURATION.labels(operation).observe(time.perf_counter() - started)
+    trace = agent_trace_var.get()
+    if trace is not None:
+        trace.add_span("checkpoint", operation, started)
+
+
+def _token_usage(response: Any) -> Tuple[Optional[int], Optional[int]]:
+    """Extract input/output token counts from an LLMResult, if the provider reported them."""
+    try:
+        message = response.generations[0][0].message
+        usage = getattr(message, "usage_metadata", None)
+        if usage:
+            return usage.get("input_tokens"), usage.get("output_tokens")
+    except (AttributeError, IndexError, TypeError):
+        pass
+    token_usage = (getattr(response, "llm_output", None) or {}).get("token_usage") or {}
+    return token_usage.get("prompt_tokens"), token_usage.get("completion_tokens")
+
+
+class AgentTraceCallbackHandler(BaseCallbackHandler):
+    """Record graph node, LLM and tool spans into an AgentTrace and the metrics registry."""
+
+    # Bookkeeping only; no need to hop to an executor thread for each event
+    run_inline = True
+
+    def __init__(self, trace: Optional[AgentTrace] = None) -> None:
+        self.trace = trace or AgentTrace()
+        self._started: Dict[UUID, Tuple[str, str, float]] = {}
+
+    # LangGraph nodes
+    def on_chain_start(self, serialized: Dict[str, Any], inputs: Any, *, run_id: UUID,
+                       metadata: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+        node = (metadata or {}).get("langgraph_node")
+        # Only the node's own run, not every runnable nested inside it
+        if node and kwargs.get("name") == node:
+            self._started[run_id] = ("node", node, time.perf_counter())
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, "success")
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, "error")
+
+    # Model calls
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[Any]], *, run_id: UUID,
+                            metadata: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+        self._started[run_id] = ("llm", self._model_name(serialized, metadata), time.perf_counter())
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], *, run_id: UUID,
+                     metadata: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+        self._started[run_id] = ("llm", self._model_name(serialized, metadata), time.perf_counter())
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        input_tokens, output_tokens = _token_usage(response)
+        self._finish(run_id, "success", input_tokens=input_tokens, output_tokens=output_tokens)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, "error")
+
+    # Tool calls
+    def on_tool_start(self, serialized: Dict[str, Any], input_str: str, *, run_id: UUID, **kwargs: Any) -> None:
+        tool_name = (serialized or {}).get("name") or kwargs.get("name") or "unknown"
+        self._started[run_id] = ("tool", tool_name, time.perf_counter())
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, "success")
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, "error")
+
+    def _model_name(self, serialized: Dict[str, Any], metadata: Optional[Dict[str, Any]]) -> str:
+        return (metadata or {}).get("ls_model_name") or (serialized or {}).get("name") or "llm"
+
+    def _finish(self, run_id: UUID, outcome: str, **fields: Any) -> None:
+        entry = self._started.pop(run_id, None)
+        if entry is None:
+            return
+        kind, name, started = entry
+        elapsed = time.perf_counter() - started
+        if kind == "llm":
+            LLM_CALL_DURATION.labels(outcome).observe(elapsed)
+        elif kind == "tool":
+            TOOL_CALL_DURATION.labels(name, outcome).observe(elapsed)
+        self.trace.add_span(kind, name, started, outcome=outcome if outcome != "success" else None, **fields)
@@ -0,0 +1,148 @@
+"""
+Bounded conversation context for the chat agent.
+
+The checkpointed thread keeps every turn, so without a policy the prompt grows
+with the session. Two mechanisms keep it bounded:
+- A state modifier builds each model call from a single system prompt, the
+  rolling summary and only as much recent history as fits the token budget.
+- After a turn, once the thread passes a token threshold, older turns are folded
+  into the rolling summary and removed from the checkpointed state.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessage, BaseMessage, HumanMessage, RemoveMessage, SystemMessage, ToolMessage, trim_messages
+)
+from langchain_core.messages.utils import count_tokens_approximately
+from langgraph.prebuilt.chat_agent_executor import AgentState
+from typing_extensions import NotRequired
+
+SUMMARY_INSTRUCTIONS = (
+    "You maintain a running summary of a conversation between a user and a flight booking assistant. "
+    "Merge the existing summary with the new turns. Keep facts needed later in the conversation: "
+    "names, flight and booking IDs, routes, dates, prices, decisions and any open requests. "
+    "Write at most {max_words} words of plain text."
+)
+
+# Tool results can be large JSON payloads; the summary only needs their gist
+MAX_SUMMARY_TOOL_OUTPUT_CHARS = 500
+
+
+class ChatAgentState(AgentState):
+    """Agent state with the rolling summary of turns removed from the thread."""
+    summary: NotRequired[str]
+
+
+def count_tokens(messages: Sequence[BaseMessage]) -> int:
+    """Approximate token count; cheap enough to run on every model call."""
+    return count_tokens_approximately(messages)
+
+
+def _last_human_index(messages: Sequence[BaseMessage]) -> Optional[int]:
+    for index in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[index], HumanMessage):
+            return index
+    return None
+
+
+def build_state_modifier(system_prompt: str, max_context_tokens: int) -> Callable[[Dict[str, Any]], List[BaseMessage]]:
+    """
+    Build the agent's state modifier.
+    The current turn (from the latest user message on) is always sent in full;
+    earlier turns are trimmed from the oldest end, cutting only at user messages
+    so tool calls and their results stay paired.
+    """
+    def modify_state(state: Dict[str, Any]) -> List[BaseMessage]:
+        # System messages persisted by older versions would otherwise repeat every turn
+        history = [message for message in state["messages"] if not isinstance(message, SystemMessage)]
+        split = _last_human_index(history)
+        if split is None:
+            split = len(history)
+        earlier, current_turn = history[:split], history[split:]
+
+        remaining = max_context_tokens - count_tokens(current_turn)
+        recent = trim_messages(
+            earlier,
+            max_tokens=remaining,
+            strategy="last",
+            token_counter=count_tokens,
+            start_on="human",
+        ) if earlier and remaining > 0 else []
+
+        prompt = system_prompt
+        summary = state.get("summary")
+        if summary:
+            prompt = f"{prompt}\n\nSummary of the earlier conversation:\n{summary}"
+        return [SystemMessage(content=prompt)] + recent + current_turn
+
+    return modify_state
+
+
+def _compaction_split(messages: Sequence[BaseMessage], keep_tokens: int) -> int:
+    """Index of the earliest user message whose suffix fits in keep_tokens (at least the latest turn)."""
+    best = None
+    total = 0
+    for index in range(len(messages) - 1, -1, -1):
+        total += count_tokens([messages[index]])
+        if total > keep_tokens:
+            break
+        if isinstance(messages[index], HumanMessage):
+            best = index
+    if best is None:
+        best = _last_human_index(messages)
+    return best or 0
+
+
+def _transcript(messages: Sequence[BaseMessage]) -> str:
+    lines = []
+    for message in messages:
+        content = message.content if isinstance(message.content, str) else str(message.content)
+        if isinstance(message, HumanMessage):
+            lines.append(f"User: {content}")
+        elif isinstance(message, ToolMessage):
+            lines.append(f"Tool result ({message.name or 'tool'}): {content[:MAX_SUMMARY_TOOL_OUTPUT_CHARS]}")
+        elif isinstance(message, AIMessage):
+            if content:
+                lines.append(f"Assistant: {content}")
+            for tool_call in message.tool_calls:
+                lines.append(f"Assistant called {tool_call['name']} with {tool_call['args']}")
+    return "\n".join(lines)
+
+
+async def summarize_messages(model: BaseChatModel, previous_summary: Optional[str],
+                             messages: Sequence[BaseMessage], max_words: int) -> str:
+    """Fold messages into the running summary with one model call."""
+    result = await model.ainvoke([
+        SystemMessage(content=SUMMARY_INSTRUCTIONS.format(max_words=max_words)),
+        HumanMessage(content=(
+            f"Existing summary:\n{previous_summary or '(none)'}\n\n"
+            f"New conversation turns:\n{_transcript(messages)}"
+        )),
+    ])
+    return result.content if isinstance(result.content, str) else str(result.content)
+
+
+async def compact_thread(agent: Any, model: BaseChatModel, config: Dict[str, Any], trigger_tokens: int,
+                         keep_tokens: int, max_summary_words: int) -> bool:
+    """
+    Summarize and remove older turns once the checkpointed thread exceeds trigger_tokens.
+    Returns True if the thread was compacted.
+    """
+    snapshot = await agent.aget_state(config)
+    messages = list(snapshot.values.get("messages", []))
+    if count_tokens(messages) <= trigger_tokens:
+        return False
+
+    split = _compaction_split(messages, keep_tokens)
+    older = messages[:split]
+    if not older:
+        return False
+
+    summary = await summarize_messages(model, snapshot.values.get("summary"), older, max_summary_words)
+    await agent.aupdate_state(
+        config,
+        {"messages": [RemoveMessage(id=message.id) for message in older], "summary": summary},
+        as_node="agent",
+    )
+    return True
@@ -14,31 +14,88 @@ from langchain_core.vectorstores import InMemoryVectorStore
 from langchain_openai import OpenAIEmbeddings
 from langchain.tools.retriever import create_retriever_tool
 from resources.logging import get_logger
+from constants import ApplicationConstants
 
 logger = get_logger("chatbot_tools")
 
 
 # Pydantic models for tool arguments
 class FlightSearchArgs(BaseModel):
-    origin: Optional[str] = Field(None, description="Origin airport code or city name (optional)")
-    destination: Optional[str] = Field(None, description="Destination airport code or city name (optional)")
+    origin: Optional[str] = Field(None, description="Origin airport code or full city name, e.g. MAD or Madrid (optional)")
+    destination: Optional[str] = Field(None, description="Destination airport code or full city name, e.g. JFK or New York (optional)")
     departure_date: Optional[str] = Field(None, description="Departure date in YYYY-MM-DD format (optional)")
+    flexible_days: int = Field(
+        0,
+        description=(
+            f"Also search up to {ApplicationConstants.MAX_FLEXIBLE_SEARCH_DAYS} days before and after departure_date "
+            "and show the cheapest price per day (optional, requires departure_date)"
+        )
+    )
+    min_price: Optional[float] = Field(None, description="Lowest price to include (optional)")
+    max_price: Optional[float] = Field(None, description="Highest price to include, e.g. for 'under $300' (optional)")
+    airline: Optional[str] = Field(None, description="Only flights of this airline (optional)")
+    departure_hour_from: Optional[int] = Field(None, description="Earliest departure hour 0-23, e.g. 6 for 'morning' (optional)")
+    departure_hour_to: Optional[int] = Field(None, description="Latest departure hour 0-23, e.g. 11 for 'morning' (optional)")
+    sort_by: str = Field("departure", description="Order results by 'departure', 'price' (cheapest first) or 'duration' (shortest first)")
     page: int = Field(1, description="Page number for pagination")
     size: int = Field(10, description="Number of items per page")
 
 
+class RouteSearchArgs(BaseModel):
+    origin: str = Field(description="Origin airport code or city name")
+    destination: str = Field(description="Destination airport code or city name")
+    departure_date: str = Field(description="Departure date in YYYY-MM-DD format")
+
+
+class FlightSearchBatchArgs(BaseModel):
+    searches: List[RouteSearchArgs] = Field(
+        description=f"Routes and dates to search, at most {ApplicationConstants.MAX_FLIGHT_SEARCH_BATCH_SIZE}"
+    )
+    size: int = Field(
+        ApplicationConstants.DEFAULT_FLIGHT_SEARCH_BATCH_RESULTS,
+        description="Maximum number of flights to show per search"
+    )
+
+
 class FlightListArgs(BaseModel):
     page: int = Field(1, description="Page number for pagination")
     size: int = Field(10, description="Number of items per page")
 
 
+class FareCalendarArgs(BaseModel):
+    origin: str = Field(description="Origin airport code or city name")
+    destination: str = Field(description="Destination airport code or city name")
+    start_date: Optional[str] = Field(None, description="First day in YYYY-MM-DD format (optional, defaults to today)")
+    days: int = Field(
+        ApplicationConstants.DEFAULT_FARE_CALENDAR_DAYS,
+        description=f"Number of days to include, at most {ApplicationConstants.MAX_FARE_CALENDAR_DAYS}"
+    )
+
+
+class ConnectionSearchArgs(BaseModel):
+    origin: str = Field(description="Origin airport code or city name")
+    destination: str = Field(description="Destination airport code or city name")
+    departure_date: str = Field(description="Departure date in YYYY-MM-DD format")
+    max_stops: int = Field(
+        ApplicationConstants.MAX_CONNECTION_STOPS,
+        description=f"Maximum number of connections, from 0 (direct only) to {ApplicationConstants.MAX_CONNECTION_STOPS}"
+    )
+    sort_by: str = Field("price", description="Order itineraries by 'price' or 'duration'")
+
+
 class BookingCreateArgs(BaseModel):
     flight_id: int = Field(description="The ID of the flight to book")
 
 
+class BookingBatchCreateArgs(BaseModel):
+    flight_ids: List[int] = Field(
+        description=f"IDs of the flights to book, at most {ApplicationConstants.MAX_BOOKING_BATCH_SIZE}, without duplicates"
+    )
+
+
 class BookingUpdateArgs(BaseModel):
     booking_id: int = Field(description="The ID of the booking to update")
-    status: str = Field(description="New status for the booking (e.g., 'cancelled')")
+    status: str = Field(description="New status for the booking; only 'cancelled' is supported")
 
 
 class UserBookingsArgs(BaseModel):
@@ -54,6 +111,22 @@ class UserBookingsArgs(BaseModel):
         default=None,
         description="Filter by departure date in YYYY-MM-DD format"
     )
+    booked_from: Optional[str] = Field(
+        default=None,
+        description="Only bookings made on or after this date, YYYY-MM-DD format"
+    )
+    booked_to: Optional[str] = Field(
+        default=None,
+        description="Only bookings made on or before this date, YYYY-MM-DD format"
+    )
+    departure_from: Optional[str] = Field(
+        default=None,
+        description="Only flights departing on or after this date, YYYY-MM-DD format"
+    )
+    departure_to: Optional[str] = Field(
+        default=None,
+        description="Only flights departing on or before this date, YYYY-MM-DD format"
+    )
     page: int = Field(1, description="Page number for pagination")
     size: int = Field(10, description="Number of items per page")
 
@@ -65,7 +138,9 @@ class FlightSearchTool(BaseTool):
     description: str = (
         "Search for available flights. All parameters are optional - you can search by origin only, "
         "destination only, departure date only, or any combination. "
-        "Useful when users ask about flight availability, schedules, or want to find flights."
+        "Useful when users ask about flight availability, schedules, or want to find flights. "
+        "When users have flexible dates, set flexible_days instead of searching each day separately. "
+        "Pass full city names or airport codes rather than fragments, so they match the airport exactly."
     )
     args_schema: type[BaseModel] = FlightSearchArgs
     return_direct: bool = False
@@ -80,6 +155,13 @@ class FlightSearchTool(BaseTool):
         origin: Optional[str] = None,
         destination: Optional[str] = None,
         departure_date: Optional[str] = None,
+        flexible_days: int = 0,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        airline: Optional[str] = None,
+        departure_hour_from: Optional[int] = None,
+        departure_hour_to: Optional[int] = None,
+        sort_by: str = "departure",
         page: int = 1,
         size: int = 10,
         run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
@@ -87,13 +169,23 @@ class FlightSearchTool(BaseTool):
         """Search for flights asynchronously."""
         try:
             # Build search params, only including non-None values
-            params = {"page": page, "size": size}
+            params = {"page": page, "size": size, "sort_by": sort_by}
             if origin:
                 params["origin"] = origin
             if destination:
                 params["destination"] = destination
             if departure_date:
                 params["departure_date"] = departure_date
+                if flexible_days:
+                    params["flexible_days"] = flexible_days
+            optional_filters = {
+                "min_price": min_price,
+                "max_price": max_price,
+                "airline": airline,
+                "departure_hour_from": departure_hour_from,
+                "departure_hour_to": departure_hour_to
+            }
+            params.update({name: value for name, value in optional_filters.items() if value is not None})
             
             async with httpx.AsyncClient() as client:
                 response = await client.get(
@@ -115,7 +207,10 @@ class FlightSearchTool(BaseTool):
                     if destination:
                         search_parts.append(f"to {destination}")
                     if departure_date:
-                        search_parts.append(f"on {departure_date}")
+                        search_parts.append(f"on {departure_date}" + (f" ±{flexible_days} days" if flexible_days else ""))
+                    
+                    if airline:
+                        search_parts.append(f"with {airline}")
                     
                     search_desc = " ".join(search_parts) if search_parts else "all flights"
                     
@@ -123,6 +218,12 @@ class FlightSearchTool(BaseTool):
                         return f"No flights found {search_desc}."
                     
                     result = f"Found {total} flights {search_desc} (showing page {page} of {pages}):\n\n"
+                    days = data.get("days", [])
+                    if days:
+                        result += "Cheapest price per day:\n"
+                        for day in days:
+                            result += f"{day['date']}: from ${day['min_price']} ({day['flight_count']} flights)\n"
+                        result += "\n"
                     for flight in flights:
                         departure_time = datetime.fromisoformat(flight['departure_time'].replace('Z', '+00:00'))
                         arrival_time = datetime.fromisoformat(flight['arrival_time'].replace('Z', '+00:00'))
@@ -151,6 +252,13 @@ class FlightSearchTool(BaseTool):
         origin: Optional[str] = None,
         destination: Optional[str] = None,
         departure_date: Optional[str] = None,
+        flexible_days: int = 0,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        airline: Optional[str] = None,
+        departure_hour_from: Optional[int] = None,
+        departure_hour_to: Optional[int] = None,
+        sort_by: str = "departure",
         page: int = 1,
         size: int = 10,
         run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
@@ -159,6 +267,77 @@ class FlightSearchTool(BaseTool):
         raise NotImplementedError("This tool only supports async execution")
 
 
+class FlightSearchBatchTool(BaseTool):
+    """Tool to search several routes and dates in one request."""
+    
+    name: str = "search_flights_batch"
+    description: str = (
+        "Search available flights for several routes and dates at once, e.g. 'New York to Los Angeles "
+        "or San Francisco, Friday or Saturday'. Every search needs an origin, destination and departure date. "
+        "Use this instead of calling search_flights repeatedly when users compare options."
+    )
+    args_schema: type[BaseModel] = FlightSearchBatchArgs
+    return_direct: bool = False
+    user_token: str
+    api_base_url: str
+
+    def __init__(self, user_token: str, api_base_url: str, **kwargs):
+        super().__init__(user_token=user_token, api_base_url=api_base_url, **kwargs)
+
+    async def _arun(
+        self,
+        searches: List[RouteSearchArgs],
+        size: int = ApplicationConstants.DEFAULT_FLIGHT_SEARCH_BATCH_RESULTS,
+        run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
+    ) -> str:
+        """Search several routes asynchronously."""
+        try:
+            # LangChain passes the parsed argument models through, so serialize them for the request body
+            payload = [search.model_dump() if isinstance(search, BaseModel) else search for search in searches]
+            async with httpx.AsyncClient() as client:
+                response = await client.post(
+                    f"{self.api_base_url}/flights/search/batch",
+                    json={"searches": payload, "size": size},
+                    headers={"Authorization": f"Bearer {self.user_token}"}
+                )
+                
+                if response.status_code == 200:
+                    result = ""
+                    for search in response.json():
+                        search_desc = f"from {search['origin']} to {search['destination']} on {search['departure_date']}"
+                        if not search["items"]:
+                            result += f"No flights found {search_desc}.\n\n"
+                            continue
+                        
+                        result += f"Found {search['total']} flights {search_desc}:\n"
+                        for flight in search["items"]:
+                            departure_time = datetime.fromisoformat(flight['departure_time'].replace('Z', '+00:00'))
+                            arrival_time = datetime.fromisoformat(flight['arrival_time'].replace('Z', '+00:00'))
+                            result += (
+                                f"- Flight ID {flight['id']}: {flight['origin']} → {flight['destination']}, "
+                                f"{flight['airline']}, {departure_time.strftime('%Y-%m-%d %H:%M')} - "
+                                f"{arrival_time.strftime('%H:%M')}, ${flight['price']}\n"
+                            )
+                        if search["total"] > len(search["items"]):
+                            result += f"Use search_flights {search_desc} to see all {search['total']} flights.\n"
+                        result += "\n"
+                    return result
+                else:
+                    error_detail = response.json().get('detail', 'Unknown error') if response.headers.get('content-type', '').startswith('application/json') else response.text
+                    return f"Error searching flights: {error_detail}"
+                    
+        except Exception as e:
+            return f"Error occurred while searching flights: {str(e)}"
+
+    def _run(
+        self,
+        searches: List[RouteSearchArgs],
+        size: int = ApplicationConstants.DEFAULT_FLIGHT_SEARCH_BATCH_RESULTS,
+        run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
+    ) -> str:
+        """Not implemented for sync execution."""
+        raise NotImplementedError("This tool only supports async execution")
+
 class ListFlightsTool(BaseTool):
     """Tool to list all available flights."""
     
@@ -231,6 +410,159 @@ class ListFlightsTool(BaseTool):
         raise NotImplementedError("This tool only supports async execution")
 
 
+class FareCalendarTool(BaseTool):
+    """Tool to get the cheapest fare per day on a route."""
+    
+    name: str = "get_fare_calendar"
+    description: str = (
+        "Get the cheapest price and number of flights with free seats for each day on a route over a range of days. "
+        "Use this when users ask for the cheapest day to fly or want to compare prices across dates, "
+        "instead of searching flights day by day."
+    )
+    args_schema: type[BaseModel] = FareCalendarArgs
+    return_direct: bool = False
+    user_token: str
+    api_base_url: str
+
+    def __init__(self, user_token: str, api_base_url: str, **kwargs):
+        super().__init__(user_token=user_token, api_base_url=api_base_url, **kwargs)
+
+    async def _arun(
+        self,
+        origin: str,
+        destination: str,
+        start_date: Optional[str] = None,
+        days: int = ApplicationConstants.DEFAULT_FARE_CALENDAR_DAYS,
+        run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
+    ) -> str:
+        """Get the fare calendar asynchronously."""
+        try:
+            params = {"origin": origin, "destination": destination, "days": days}
+            if start_date:
+                params["start_date"] = start_date
+            
+            async with httpx.AsyncClient() as client:
+                response = await client.get(
+                    f"{self.api_base_url}/flights/fare-calendar",
+                    params=params,
+                    headers={"Authorization": f"Bearer {self.user_token}"}
+                )
+                
+                if response.status_code == 200:
+                    calendar = response.json()
+                    entries = calendar.get("days", [])
+                    period = f"between {calendar['start_date']} and {calendar['end_date']}"
+                    if not entries:
+                        return f"No flights found from {origin} to {destination} {period}."
+                    
+                    cheapest = min(entries, key=lambda entry: entry["min_price"])
+                    result = (
+                        f"Cheapest day to fly from {origin} to {destination} {period}: "
+                        f"{cheapest['date']} from ${cheapest['min_price']}\n\n"
+                    )
+                    for entry in entries:
+                        result += f"{entry['date']}: from ${entry['min_price']} ({entry['flight_count']} flights)\n"
+                    result += "\nUse search_flights with a departure_date to see the flights on a day."
+                    return result
+                else:
+                    error_detail = response.json().get('detail', 'Unknown error') if response.headers.get('content-type', '').startswith('application/json') else response.text
+                    return f"Error retrieving fare calendar: {error_detail}"
+                    
+        except Exception as e:
+            return f"Error occurred while retrieving fare calendar: {str(e)}"
+
+    def _run(
+        self,
+        origin: str,
+        destination: str,
+        start_date: Optional[str] = None,
+        days: int = ApplicationConstants.DEFAULT_FARE_CALENDAR_DAYS,
+        run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
+    ) -> str:
+        """Not implemented for sync execution."""
+        raise NotImplementedError("This tool only supports async execution")
+
+
+class ConnectionSearchTool(BaseTool):
+    """Tool to find itineraries with connections between two airports."""
+    
+    name: str = "search_connections"
+    description: str = (
+        "Find itineraries from an origin to a destination on a date, including flights with up to two "
+        "connections and a reasonable layover. Use this when there is no direct flight or users ask for "
+        "the cheapest or fastest way to get somewhere."
+    )
+    args_schema: type[BaseModel] = ConnectionSearchArgs
+    return_direct: bool = False
+    user_token: str
+    api_base_url: str
+
+    def __init__(self, user_token: str, api_base_url: str, **kwargs):
+        super().__init__(user_token=user_token, api_base_url=api_base_url, **kwargs)
+
+    async def _arun(
+        self,
+        origin: str,
+        destination: str,
+        departure_date: str,
+        max_stops: int = ApplicationConstants.MAX_CONNECTION_STOPS,
+        sort_by: str = "price",
+        run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
+    ) -> str:
+        """Search connections asynchronously."""
+        try:
+            params = {
+                "origin": origin,
+                "destination": destination,
+                "departure_date": departure_date,
+                "max_stops": max_stops,
+                "sort_by": sort_by
+            }
+            
+            async with httpx.AsyncClient() as client:
+                response = await client.get(
+                    f"{self.api_base_url}/flights/connections",
+                    params=params,
+                    headers={"Authorization": f"Bearer {self.user_token}"}
+                )
+                
+                if response.status_code == 200:
+                    itineraries = response.json()
+                    if not itineraries:
+                        return f"No itineraries found from {origin} to {destination} on {departure_date}."
+                    
+                    result = f"Found {len(itineraries)} itineraries from {origin} to {destination} on {departure_date}:\n\n"
+                    for index, itinerary in enumerate(itineraries, start=1):
+                        stops = "direct" if itinerary["stops"] == 0 else f"{itinerary['stops']} stop(s)"
+                        hours, minutes = divmod(itinerary["duration_minutes"], 60)
+                        result += f"{index}. ${itinerary['total_price']}, {stops}, {hours}h {minutes}m\n"
+                        for leg in itinerary["legs"]:
+                            result += (
+                                f"   - Flight {leg['id']}: {leg['origin']} -> {leg['destination']}, "
+                                f"{leg['airline']}, departs {leg['departure_time']}, arrives {leg['arrival_time']}\n"
+                            )
+                    result += "\nUse book_flights with the flight IDs of an itinerary to book all its legs."
+                    return result
+                else:
+                    error_detail = response.json().get('detail', 'Unknown error') if response.headers.get('content-type', '').startswith('application/json') else response.text
+                    return f"Error searching connections: {error_detail}"
+                    
+        except Exception as e:
+            return f"Error occurred while searching connections: {str(e)}"
+
+    def _run(
+        self,
+        origin: str,
+        destination: str,
+        departure_date: str,
+        max_stops: int = ApplicationConstants.MAX_CONNECTION_STOPS,
+        sort_by: str = "price",
+        run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
+    ) -> str:
+        """Not implemented for sync execution."""
+        raise NotImplementedError("This tool only supports async execution")
+
+
 class CreateBookingTool(BaseTool):
     """Tool to create a new flight booking."""
     
@@ -292,6 +624,67 @@ class CreateBookingTool(BaseTool):
         raise NotImplementedError("This tool only supports async execution")
 
 
+class CreateBookingsTool(BaseTool):
+    """Tool to book several flights in one request."""
+    
+    name: str = "book_flights"
+    description: str = (
+        "Book several flights for the current user at once, e.g. every leg of a trip. "
+        "Either all flights are booked or none is. Requires the flight IDs. "
+        "Use this instead of calling book_flight repeatedly when users want more than one flight."
+    )
+    args_schema: type[BaseModel] = BookingBatchCreateArgs
+    return_direct: bool = False
+    user_token: str
+    api_base_url: str
+
+    def __init__(self, user_token: str, api_base_url: str, **kwargs):
+        super().__init__(user_token=user_token, api_base_url=api_base_url, **kwargs)
+
+    async def _arun(
+        self,
+        flight_ids: List[int],
+        run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
+    ) -> str:
+        """Create bookings asynchronously."""
+        try:
+            async with httpx.AsyncClient() as client:
+                response = await client.post(
+                    f"{self.api_base_url}/bookings/batch",
+                    json={"flight_ids": flight_ids},
+                    headers={"Authorization": f"Bearer {self.user_token}"}
+                )
+                
+                if response.status_code == 200:
+                    bookings = response.json()
+                    result = f"✅ {len(bookings)} flights booked successfully!\n\n"
+                    for booking in bookings:
+                        flight_info = booking['flight']
+                        departure_time = datetime.fromisoformat(flight_info['departure_time'].replace('Z', '+00:00'))
+                        result += (
+                            f"Booking ID: {booking['id']}\n"
+                            f"Flight: {flight_info['origin']} → {flight_info['destination']}\n"
+                            f"Airline: {flight_info['airline']}\n"
+                            f"Departure: {departure_time.strftime('%Y-%m-%d %H:%M')}\n"
+                            f"Price: ${flight_info['price']}\n\n"
+                        )
+                    return result
+                else:
+                    error_detail = response.json().get('detail', 'Unknown error')
+                    return f"❌ Failed to book flights, none were booked: {error_detail}"
+                    
+        except Exception as e:
+            return f"Error occurred while booking flights: {str(e)}"
+
+    def _run(
+        self,
+        flight_ids: List[int],
+        run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
+    ) -> str:
+        """Not implemented for sync execution."""
+        raise NotImplementedError("This tool only supports async execution")
+
+
 class GetUserBookingsTool(BaseTool):
     """Tool to get user's bookings."""
     
@@ -299,6 +692,7 @@ class GetUserBookingsTool(BaseTool):
     description: str = (
         "Get the current user's flight bookings with advanced filtering options. "
         "Can filter by status (booked, cancelled, completed), booking date, departure date, "
+        "booking or departure date ranges (e.g. departure_from/departure_to for 'my bookings next month'), "
         "and supports pagination. Use this when users ask about their reservations, "
         "bookings, travel history, or want to filter their bookings by specific criteria."
     )
@@ -316,6 +710,10 @@ class GetUserBookingsTool(BaseTool):
         status: Optional[str] = None,
         booked_date: Optional[str] = None,
         departure_date: Optional[str] = None,
+        booked_from: Optional[str] = None,
+        booked_to: Optional[str] = None,
+        departure_from: Optional[str] = None,
+        departure_to: Optional[str] = None,
         page: int = 1,
         size: int = 10,
         run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
@@ -330,6 +728,14 @@ class GetUserBookingsTool(BaseTool):
                     params["booked_date"] = booked_date
                 if departure_date:
                     params["departure_date"] = departure_date
+                if booked_from:
+                    params["booked_from"] = booked_from
+                if booked_to:
+                    params["booked_to"] = booked_to
+                if departure_from:
+                    params["departure_from"] = departure_from
+                if departure_to:
+                    params["departure_to"] = departure_to
                     
                 response = await client.get(
                     f"{self.api_base_url}/bookings/user",
@@ -353,6 +759,10 @@ class GetUserBookingsTool(BaseTool):
                         filter_parts.append(f"booked on: {booked_date}")
                     if departure_date:
                         filter_parts.append(f"departing on: {departure_date}")
+                    if booked_from or booked_to:
+                        filter_parts.append(f"booked between: {booked_from or 'any'} and {booked_to or 'any'}")
+                    if departure_from or departure_to:
+                        filter_parts.append(f"departing between: {departure_from or 'any'} and {departure_to or 'any'}")
                     
                     filter_desc = f" ({', '.join(filter_parts)})" if filter_parts else ""
                     
@@ -399,6 +809,10 @@ class GetUserBookingsTool(BaseTool):
         status: Optional[str] = None,
         booked_date: Optional[str] = None,
         departure_date: Optional[str] = None,
+        booked_from: Optional[str] = None,
+        booked_to: Optional[str] = None,
+        departure_from: Optional[str] = None,
+        departure_to: Optional[str] = None,
         page: int = 1,
         size: int = 10,
         run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
@@ -467,14 +881,69 @@ class CancelBookingTool(BaseTool):
         raise NotImplementedError("This tool only supports async execution")
 
 
+class BookingStatusCountsTool(BaseTool):
+    """Tool to summarize the user's bookings by status."""
+    
+    name: str = "get_my_booking_counts"
+    description: str = (
+        "Get how many bookings the current user has in each status (booked, completed, cancelled). "
+        "Use this when users ask how many trips or bookings they have, instead of listing every booking."
+    )
+    return_direct: bool = False
+    user_token: str
+    api_base_url: str
+
+    def __init__(self, user_token: str, api_base_url: str, **kwargs):
+        super().__init__(user_token=user_token, api_base_url=api_base_url, **kwargs)
+
+    async def _arun(
+        self,
+        run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
+    ) -> str:
+        """Get booking counts asynchronously."""
+        try:
+            async with httpx.AsyncClient() as client:
+                response = await client.get(
+                    f"{self.api_base_url}/bookings/user/status-counts",
+                    headers={"Authorization": f"Bearer {self.user_token}"}
+                )
+                
+                if response.status_code == 200:
+                    counts = response.json()
+                    return (
+                        f"You have {counts['total']} bookings in total:\n"
+                        f"Upcoming (booked): {counts['booked']}\n"
+                        f"Completed: {counts['completed']}\n"
+                        f"Cancelled: {counts['cancelled']}"
+                    )
+                else:
+                    error_detail = response.json().get('detail', 'Unknown error') if response.headers.get('content-type', '').startswith('application/json') else response.text
+                    return f"Error retrieving booking counts: {error_detail}"
+                    
+        except Exception as e:
+            return f"Error occurred while retrieving booking counts: {str(e)}"
+
+    def _run(
+        self,
+        run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
+    ) -> str:
+        """Not implemented for sync execution."""
+        raise NotImplementedError("This tool only supports async execution")
+
+
 def create_chatbot_tools(user_token: str, user_id: int, api_base_url: str) -> List[BaseTool]:
     """Create and return a list of chatbot tools for the given user."""
     return [
         FlightSearchTool(user_token=user_token, api_base_url=api_base_url),
+        FlightSearchBatchTool(user_token=user_token, api_base_url=api_base_url),
         ListFlightsTool(user_token=user_token, api_base_url=api_base_url),
         CreateBookingTool(user_token=user_token, api_base_url=api_base_url),
+        CreateBookingsTool(user_token=user_token, api_base_url=api_base_url),
         GetUserBookingsTool(user_token=user_token, user_id=user_id, api_base_url=api_base_url),
         CancelBookingTool(user_token=user_token, api_base_url=api_base_url),
+        BookingStatusCountsTool(user_token=user_token, api_base_url=api_base_url),
+        FareCalendarTool(user_token=user_token, api_base_url=api_base_url),
+        ConnectionSearchTool(user_token=user_token, api_base_url=api_base_url),
     ]
 
 
@@ -22,7 +22,10 @@ def api_exception_to_http_exception(exc: ApiException) -> HTTPException:
         ErrorCode.INVALID_DATE_FORMAT: 400,
         ErrorCode.INVALID_FLIGHT_TIMES: 400,
         ErrorCode.INVALID_FLIGHT_PRICE: 400,
+        ErrorCode.INVALID_LAYOVER_WINDOW: 400,
         ErrorCode.CHAT_MESSAGE_SAVE_FAILED: 400,
+        ErrorCode.INVALID_SEARCH_QUERY: 400,
+        ErrorCode.INVALID_SEARCH_CURSOR: 400,
         
         # 401 Unauthorized - Authentication errors
         ErrorCode.INVALID_CREDENTIALS: 401,
@@ -36,6 +39,9 @@ def api_exception_to_http_exception(exc: ApiException) -> HTTPException:
         ErrorCode.FLIGHT_NOT_AVAILABLE: 404,
         ErrorCode.BOOKING_NOT_FOUND: 404,
         
+        # 409 Conflict - Resource state prevents the request
+        ErrorCode.FLIGHT_SOLD_OUT: 409,
+        
         # 500 Internal Server Error - System errors
         ErrorCode.AGENT_INVOCATION_FAILED: 500,
         ErrorCode.SPEECH_SERVICE_NOT_CONFIGURED: 500,
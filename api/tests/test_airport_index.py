@@ -0,0 +1,100 @@
+"""
+Tests for AirportIndex - Resource Layer
+Builds the autocomplete trie from a few airports in memory.
+"""
+import pytest
+import os
+import sys
+from types import SimpleNamespace
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from resources.airport_index import AirportIndex, AirportEntry
+
+
+def _airport(code, city, country, aliases=()):
+    return SimpleNamespace(code=code, city=city, country=country, aliases=list(aliases))
+
+
+def _codes(entries):
+    return [entry.code for entry in entries]
+
+
+class TestAirportIndex:
+    """Test suite for the airport autocomplete trie."""
+
+    @pytest.fixture
+    def index(self):
+        """Create an index with a few European airports."""
+        index = AirportIndex()
+        index.load([
+            _airport("MAD", "Madrid", "Spain", ["Barajas"]),
+            _airport("MAN", "Manchester", "United Kingdom"),
+            _airport("MUC", "Munich", "Germany", ["München"]),
+            _airport("LIS", "Lisbon", "Portugal", ["Lisboa"]),
+            _airport("LHR", "London", "United Kingdom", ["Heathrow"]),
+        ])
+        return index
+
+    # ===== POSITIVE TESTS =====
+
+    def test_autocomplete_by_code_city_and_alias(self, index):
+        """Test that codes, cities and aliases are all prefixes of an airport."""
+        assert _codes(index.autocomplete("lis")) == ["LIS"]
+        assert _codes(index.autocomplete("Lond")) == ["LHR"]
+        assert _codes(index.autocomplete("heath")) == ["LHR"]
+        assert _codes(index.autocomplete("münch")) == ["MUC"]
+
+    def test_autocomplete_orders_names_alphabetically(self, index):
+        """Test that an exact code comes before longer names sharing the prefix."""
+        assert _codes(index.autocomplete("ma")) == ["MAD", "MAN"]
+        assert _codes(index.autocomplete("m")) == ["MAD", "MAN", "MUC"]
+
+    def test_autocomplete_returns_airport_details(self, index):
+        """Test that suggestions carry the city and country."""
+        assert index.autocomplete("barajas") == [AirportEntry("MAD", "Madrid", "Spain")]
+
+    def test_autocomplete_respects_limit(self, index):
+        """Test that at most limit airports are suggested."""
+        assert _codes(index.autocomplete("m", limit=2)) == ["MAD", "MAN"]
+
+    def test_autocomplete_ignores_case_and_spaces(self, index):
+        """Test that queries are normalized like stored names."""
+        assert _codes(index.autocomplete("  LISB ")) == ["LIS"]
+
+    # ===== NEGATIVE TESTS =====
+
+    def test_autocomplete_unknown_prefix(self, index):
+        """Test that a prefix no name starts with has no suggestions."""
+        assert index.autocomplete("xyz") == []
+
+    def test_autocomplete_empty_query(self, index):
+        """Test that a blank query suggests nothing rather than everything."""
+        assert index.autocomplete("   ") == []
+        assert index.autocomplete("m", limit=0) == []
+
+    # ===== EDGE CASES =====
+
+    def test_ensure_loaded_loads_once(self):
+        """Test that the loader only runs when the index is empty."""
+        index = AirportIndex()
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return [_airport("MAD", "Madrid", "Spain")]
+
+        index.ensure_loaded(loader)
+        index.ensure_loaded(loader)
+
+        assert index.is_loaded()
+        assert calls == [1]
+        assert _codes(index.autocomplete("madrid")) == ["MAD"]
+
+    def test_load_replaces_previous_airports(self, index):
+        """Test that reloading drops airports that are gone."""
+        index.load([_airport("OPO", "Porto", "Portugal")])
+
+        assert index.autocomplete("lis") == []
+        assert _codes(index.autocomplete("por")) == ["OPO"]
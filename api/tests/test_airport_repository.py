@@ -0,0 +1,82 @@
+"""
+Tests for AirportRepository - Repository Layer
+Tests use in-memory SQLite database to ensure data isolation.
+"""
+import pytest
+import os
+import sys
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from models import Base, Airport, AirportAlias
+from repository.airport import AirportSqliteRepository
+
+
+class TestAirportRepository:
+    """Test suite for AirportRepository using in-memory SQLite database."""
+
+    @pytest.fixture
+    def db_session(self):
+        """Create an in-memory SQLite database session with a few airports."""
+        engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+
+        TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        db = TestingSessionLocal()
+        for code, city, country, aliases in [
+            ("JFK", "New York", "United States", ["jfk", "new york", "nyc"]),
+            ("LGA", "New York", "United States", ["lga", "new york"]),
+            ("MAD", "Madrid", "Spain", ["mad", "madrid", "barajas"]),
+        ]:
+            db.add(Airport(code=code, city=city, country=country,
+                           aliases=[AirportAlias(alias=alias) for alias in aliases]))
+        db.commit()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    @pytest.fixture
+    def airport_repo(self, db_session):
+        """Create AirportRepository instance with test database session."""
+        return AirportSqliteRepository(db_session)
+
+    # ===== POSITIVE TESTS =====
+
+    def test_find_all_with_aliases(self, airport_repo):
+        """Test that every airport is returned in code order with its aliases."""
+        airports = airport_repo.find_all()
+
+        assert [airport.code for airport in airports] == ["JFK", "LGA", "MAD"]
+        assert sorted(alias.alias for alias in airports[2].aliases) == ["barajas", "mad", "madrid"]
+
+    def test_find_by_code(self, airport_repo):
+        """Test lookup by code, whatever its case."""
+        assert airport_repo.find_by_code(" mad ").city == "Madrid"
+
+    def test_resolve_codes(self, airport_repo):
+        """Test that codes, cities and aliases resolve to airports, keyed by the name given."""
+        assert airport_repo.resolve_codes(["Barajas", "NEW YORK", " jfk"]) == {
+            "Barajas": ["MAD"],
+            "NEW YORK": ["JFK", "LGA"],
+            " jfk": ["JFK"],
+        }
+
+    # ===== NEGATIVE TESTS =====
+
+    def test_find_by_code_not_found(self, airport_repo):
+        """Test that an unknown code returns None."""
+        assert airport_repo.find_by_code("XXX") is None
+
+    def test_resolve_codes_no_match(self, airport_repo):
+        """Test that partial and unknown names resolve to no airport."""
+        assert airport_repo.resolve_codes(["Madr", "Nowhere"]) == {"Madr": [], "Nowhere": []}
+
+    # ===== EDGE CASES =====
+
+    def test_resolve_codes_empty(self, airport_repo):
+        """Test that resolving no names does not query."""
+        assert airport_repo.resolve_codes([]) == {}
@@ -0,0 +1,77 @@
+"""
+Tests for Airport Router - Router Layer
+Tests mock the service layer to focus on HTTP concerns using FastAPI dependency overrides.
+"""
+import pytest
+import os
+import sys
+from unittest.mock import Mock
+from fastapi.testclient import TestClient
+from fastapi import status, FastAPI
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from routers.airports import router
+from services.airport import AirportService, create_airport_service
+from schemas.airport import AirportResponse
+
+
+class TestAirportRouter:
+    """Test suite for Airport Router with mocked service layer using dependency overrides."""
+
+    @pytest.fixture
+    def mock_airport_service(self):
+        """Create mock AirportService."""
+        return Mock(spec=AirportService)
+
+    @pytest.fixture
+    def client(self, mock_airport_service):
+        """Create test client with dependency overrides."""
+        app = FastAPI()
+        app.include_router(router)
+        app.dependency_overrides[create_airport_service] = lambda: mock_airport_service
+        return TestClient(app)
+
+    # ===== POSITIVE TESTS =====
+
+    def test_autocomplete_success(self, client, mock_airport_service):
+        """Test autocomplete suggestions."""
+        mock_airport_service.autocomplete.return_value = [AirportResponse(code="MAD", city="Madrid", country="Spain")]
+
+        response = client.get("/airports/autocomplete?q=mad&limit=5")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == [{"code": "MAD", "city": "Madrid", "country": "Spain"}]
+        mock_airport_service.autocomplete.assert_called_once_with("mad", 5)
+
+    def test_autocomplete_default_limit(self, client, mock_airport_service):
+        """Test that the default number of suggestions is requested."""
+        mock_airport_service.autocomplete.return_value = []
+
+        response = client.get("/airports/autocomplete?q=l")
+
+        assert response.status_code == status.HTTP_200_OK
+        mock_airport_service.autocomplete.assert_called_once_with("l", 10)
+
+    # ===== NEGATIVE TESTS =====
+
+    def test_autocomplete_missing_query(self, client, mock_airport_service):
+        """Test that a query is required."""
+        assert client.get("/airports/autocomplete").status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert client.get("/airports/autocomplete?q=").status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        mock_airport_service.autocomplete.assert_not_called()
+
+    def test_autocomplete_limit_too_large(self, client, mock_airport_service):
+        """Test that the limit is capped."""
+        response = client.get("/airports/autocomplete?q=m&limit=21")
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_autocomplete_internal_error(self, client, mock_airport_service):
+        """Test that unexpected errors become a 500."""
+        mock_airport_service.autocomplete.side_effect = Exception("boom")
+
+        response = client.get("/airports/autocomplete?q=m")
+
+        assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -0,0 +1,69 @@
+"""
+Tests for AirportService - Service Layer
+Tests mock the repository layer to focus on business logic.
+"""
+import pytest
+import os
+import sys
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from services.airport import AirportBusinessService
+from repository.airport import AirportRepository
+from resources.airport_index import AirportIndex
+from schemas.airport import AirportResponse
+
+
+class TestAirportService:
+    """Test suite for AirportService with mocked dependencies."""
+
+    @pytest.fixture
+    def mock_airport_repo(self):
+        """Create mock AirportRepository returning two airports."""
+        repo = Mock(spec=AirportRepository)
+        repo.find_all.return_value = [
+            SimpleNamespace(code="MAD", city="Madrid", country="Spain", aliases=["Barajas"]),
+            SimpleNamespace(code="MAN", city="Manchester", country="United Kingdom", aliases=[]),
+        ]
+        return repo
+
+    @pytest.fixture
+    def airport_service(self, mock_airport_repo):
+        """Create AirportService with its own index."""
+        return AirportBusinessService(mock_airport_repo, AirportIndex())
+
+    # ===== POSITIVE TESTS =====
+
+    def test_autocomplete(self, airport_service):
+        """Test that suggestions are returned as responses."""
+        assert airport_service.autocomplete("ma") == [
+            AirportResponse(code="MAD", city="Madrid", country="Spain"),
+            AirportResponse(code="MAN", city="Manchester", country="United Kingdom"),
+        ]
+
+    def test_autocomplete_loads_index_once(self, airport_service, mock_airport_repo):
+        """Test that the index is loaded from the repository on first use only."""
+        airport_service.autocomplete("bar")
+        airport_service.autocomplete("man", limit=1)
+
+        mock_airport_repo.find_all.assert_called_once()
+
+    # ===== NEGATIVE TESTS =====
+
+    def test_autocomplete_no_match(self, airport_service):
+        """Test that an unknown prefix has no suggestions."""
+        assert airport_service.autocomplete("zz") == []
+
+    # ===== EDGE CASES =====
+
+    def test_autocomplete_uses_loaded_index(self, mock_airport_repo):
+        """Test that an index loaded at startup is not reloaded."""
+        index = AirportIndex()
+        index.load([SimpleNamespace(code="LIS", city="Lisbon", country="Portugal", aliases=[])])
+        service = AirportBusinessService(mock_airport_repo, index)
+
+        assert [airport.code for airport in service.autocomplete("l")] == ["LIS"]
+        mock_airport_repo.find_all.assert_not_called()
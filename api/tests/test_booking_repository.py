@@ -8,12 +8,19 @@ import os
 from datetime import datetime, timezone, timedelta
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.exc import IntegrityError
+from concurrent.futures import ThreadPoolExecutor
+import threading
 
 # Add src to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from models import Base, Booking, User, Flight
 from repository.booking import BookingSqliteRepository
+from repository.flight import FlightSqliteRepository
+from schemas.booking import BookingUpdate
+from pydantic import ValidationError
+from resources.database import DatabaseManager, DatabaseConfig
 
 
 class TestBookingRepository:
@@ -115,6 +122,19 @@ class TestBookingRepository:
         db_session.refresh(flight)
         return flight
     
+    @pytest.fixture
+    def upcoming_flights(self, db_session):
+        """Create three scheduled flights departing in the future."""
+        departure = datetime.now(timezone.utc) + timedelta(days=10)
+        flights = [
+            Flight(origin="Madrid", destination=destination, departure_time=departure,
+                   arrival_time=departure + timedelta(hours=2), airline="Iberia", price=150, status="scheduled")
+            for destination in ("Lisbon", "Paris", "Rome")
+        ]
+        db_session.add_all(flights)
+        db_session.commit()
+        return flights
+    
     # ===== POSITIVE TESTS =====
     
     def test_create_booking_success(self, booking_repo, sample_user, sample_flight):
@@ -137,6 +157,55 @@ class TestBookingRepository:
         assert booking.user_id == sample_user.id
         assert booking.flight_id == sample_flight.id
     
+    def test_create_if_available_success(self, booking_repo, sample_user, sample_flight):
+        """Test atomic booking of a scheduled flight."""
+        booking = booking_repo.create_if_available(sample_user.id, sample_flight.id)
+        
+        assert booking.id is not None
+        assert booking.user_id == sample_user.id
+        assert booking.status == "booked"
+        assert booking.booked_at is not None
+        assert booking.flight.id == sample_flight.id
+    
+    def test_create_many_if_available_success(self, booking_repo, sample_user, upcoming_flights):
+        """Test booking several flights in one transaction."""
+        flight_ids = [flight.id for flight in upcoming_flights]
+        
+        bookings = booking_repo.create_many_if_available(sample_user.id, flight_ids)
+        
+        assert sorted(b.flight_id for b in bookings) == sorted(flight_ids)
+        assert all(b.status == "booked" and b.flight is not None for b in bookings)
+    
+    def test_cancel_many_if_allowed_success(self, booking_repo, sample_user, upcoming_flights):
+        """Test cancelling several bookings in one update."""
+        bookings = booking_repo.create_many_if_available(sample_user.id, [f.id for f in upcoming_flights])
+        booking_ids = [b.id for b in bookings]
+        
+        cancelled = booking_repo.cancel_many_if_allowed(booking_ids, sample_user.id, datetime.now(timezone.utc))
+        
+        assert sorted(b.id for b in cancelled) == sorted(booking_ids)
+        assert all(b.status == "cancelled" and b.flight.seats_available == 180 for b in cancelled)
+        assert {b.status for b in booking_repo.find_by_ids(booking_ids)} == {"cancelled"}
+    
+    def test_booking_and_cancelling_move_seats(self, booking_repo, sample_user, upcoming_flights):
+        """Test that a booking takes a seat and its cancellation gives it back."""
+        flight = upcoming_flights[0]
+        assert (flight.capacity, flight.seats_available) == (180, 180)
+        
+        booking = booking_repo.create_if_available(sample_user.id, flight.id)
+        assert flight.seats_available == 179
+        
+        booking_repo.cancel_if_allowed(booking.id, sample_user.id, datetime.now(timezone.utc))
+        assert flight.seats_available == 180
+    
+    def test_batch_booking_and_cancelling_move_seats(self, booking_repo, sample_user, upcoming_flights):
+        """Test that batch booking takes a seat on every flight and batch cancelling returns them."""
+        bookings = booking_repo.create_many_if_available(sample_user.id, [f.id for f in upcoming_flights])
+        assert [f.seats_available for f in upcoming_flights] == [179, 179, 179]
+        
+        booking_repo.cancel_many_if_allowed([b.id for b in bookings], sample_user.id, datetime.now(timezone.utc))
+        assert [f.seats_available for f in upcoming_flights] == [180, 180, 180]
+    
     def test_find_by_id_success(self, booking_repo, sample_user, sample_flight):
         """Test finding booking by ID when booking exists."""
         created_booking = booking_repo.create(sample_user.id, sample_flight.id)
@@ -157,6 +226,18 @@ class TestBookingRepository:
         assert existing_booking.id == created_booking.id
         assert existing_booking.status == "booked"
     
+    def test_find_existing_bookings_success(self, booking_repo, sample_user, upcoming_flights):
+        """Test finding the user's active bookings on several flights with one query."""
+        lisbon, paris, rome = upcoming_flights
+        booked = booking_repo.create(sample_user.id, lisbon.id)
+        cancelled = booking_repo.create(sample_user.id, paris.id)
+        booking_repo.update_status(cancelled.id, "cancelled")
+        
+        existing = booking_repo.find_existing_bookings(sample_user.id, [lisbon.id, paris.id, rome.id])
+        
+        assert [booking.id for booking in existing] == [booked.id]
+        assert booking_repo.find_existing_bookings(sample_user.id, []) == []
+    
     def test_update_status_success(self, booking_repo, sample_user, sample_flight):
         """Test successful status update."""
         booking = booking_repo.create(sample_user.id, sample_flight.id)
@@ -182,6 +263,42 @@ class TestBookingRepository:
         assert updated_booking.status == "pending"
         assert updated_booking.cancelled_at is None
     
+    def test_cancel_if_allowed_success(self, booking_repo, db_session, sample_user):
+        """Test cancelling an active booking for an upcoming flight in one update."""
+        departure = datetime.now(timezone.utc) + timedelta(days=3)
+        flight = Flight(origin="Denver", destination="Austin", departure_time=departure,
+                        arrival_time=departure + timedelta(hours=2), airline="Frontier", price=120)
+        db_session.add(flight)
+        db_session.commit()
+        booking = booking_repo.create(sample_user.id, flight.id)
+        cancelled_at = datetime(2026, 1, 1, 12, 0, 0)
+        
+        returned = booking_repo.cancel_if_allowed(booking.id, sample_user.id, cancelled_at)
+        
+        assert (returned.id, returned.status, returned.cancelled_at) == (booking.id, "cancelled", cancelled_at)
+        assert returned.flight.id == flight.id
+        cancelled = booking_repo.find_by_id(booking.id)
+        assert cancelled.status == "cancelled"
+        assert cancelled.cancelled_at == cancelled_at
+    
+    def test_selling_out_updates_fare_calendar(self, booking_repo, db_session, sample_user):
+        """Test that a flight leaves the fare calendar when its last seat is taken and returns when one is released."""
+        flight_repo = FlightSqliteRepository(db_session)
+        departure = datetime.now(timezone.utc) + timedelta(days=5)
+        last_seat = flight_repo.create("Madrid", "Lisbon", departure, departure + timedelta(hours=1), "Iberia", 100,
+                                       capacity=1)
+        flight_repo.create("Madrid", "Lisbon", departure, departure + timedelta(hours=2), "TAP", 200)
+        day = departure.date()
+        
+        def calendar():
+            return [(d.min_price, d.flight_count) for d in flight_repo.get_fare_calendar("Madrid", "Lisbon", day, day)]
+        
+        assert calendar() == [(100, 2)]
+        booking = booking_repo.create_if_available(sample_user.id, last_seat.id)
+        assert calendar() == [(200, 1)]
+        assert booking_repo.cancel_if_allowed(booking.id, sample_user.id, datetime(2026, 1, 1)) is not None
+        assert calendar() == [(100, 2)]
+    
     def test_find_by_user_id_success(self, booking_repo, sample_user, sample_flight, sample_flight_2):
         """Test finding all bookings for a user."""
         booking1 = booking_repo.create(sample_user.id, sample_flight.id)
@@ -220,10 +337,11 @@ class TestBookingRepository:
     
     def test_find_by_user_id_past_filter(self, booking_repo, sample_user, sample_flight, past_flight):
         """Test finding past bookings."""
-        future_booking = booking_repo.create(sample_user.id, sample_flight.id)
-        past_booking = booking_repo.create(sample_user.id, past_flight.id)
+        # Cancelled first: only one active booking per user and flight is allowed
         cancelled_booking = booking_repo.create(sample_user.id, sample_flight.id)
         booking_repo.update_status(cancelled_booking.id, "cancelled")
+        future_booking = booking_repo.create(sample_user.id, sample_flight.id)
+        past_booking = booking_repo.create(sample_user.id, past_flight.id)
         
         past_bookings = booking_repo.find_by_user_id(sample_user.id, "past")
         
@@ -232,6 +350,52 @@ class TestBookingRepository:
         assert past_booking.id in booking_ids
         assert cancelled_booking.id in booking_ids
     
+    def test_find_by_user_id_paginated_departure_date(self, booking_repo, sample_user, sample_flight, sample_flight_2):
+        """Test that a departure date matches the whole day and nothing else."""
+        booking = booking_repo.create(sample_user.id, sample_flight.id)
+        booking_repo.create(sample_user.id, sample_flight_2.id)
+        
+        bookings, total = booking_repo.find_by_user_id_paginated(sample_user.id, departure_date="2025-12-25")
+        
+        assert total == 1
+        assert bookings[0].id == booking.id
+    
+    def test_find_by_user_id_paginated_departure_range(self, booking_repo, sample_user, sample_flight,
+                                                       sample_flight_2, past_flight):
+        """Test that departure_from/departure_to include both boundary days."""
+        booking_repo.create(sample_user.id, sample_flight.id)
+        booking_repo.create(sample_user.id, sample_flight_2.id)
+        booking_repo.create(sample_user.id, past_flight.id)
+        
+        bookings, total = booking_repo.find_by_user_id_paginated(
+            sample_user.id, departure_from="2025-12-25", departure_to="2025-12-26"
+        )
+        open_ended, open_total = booking_repo.find_by_user_id_paginated(sample_user.id, departure_to="2025-12-25")
+        
+        assert total == 2
+        assert {b.flight_id for b in bookings} == {sample_flight.id, sample_flight_2.id}
+        assert open_total == 2
+        assert {b.flight_id for b in open_ended} == {sample_flight.id, past_flight.id}
+    
+    def test_find_by_user_id_paginated_booked_range(self, booking_repo, db_session, sample_user, sample_flight,
+                                                    sample_flight_2):
+        """Test filtering on the booking date range."""
+        old_booking = booking_repo.create(sample_user.id, sample_flight.id)
+        new_booking = booking_repo.create(sample_user.id, sample_flight_2.id)
+        old_booking.booked_at = datetime(2025, 11, 30, 23, 59, 59)
+        new_booking.booked_at = datetime(2025, 12, 1, 0, 0, 0)
+        db_session.commit()
+        
+        bookings, total = booking_repo.find_by_user_id_paginated(
+            sample_user.id, booked_from="2025-12-01", booked_to="2025-12-31"
+        )
+        same_day, same_day_total = booking_repo.find_by_user_id_paginated(sample_user.id, booked_date="2025-11-30")
+        
+        assert total == 1
+        assert bookings[0].id == new_booking.id
+        assert same_day_total == 1
+        assert same_day[0].id == old_booking.id
+    
     def test_delete_by_id_success(self, booking_repo, sample_user, sample_flight):
         """Test successful booking deletion."""
         booking = booking_repo.create(sample_user.id, sample_flight.id)
@@ -243,6 +407,44 @@ class TestBookingRepository:
         deleted_booking = booking_repo.find_by_id(booking.id)
         assert deleted_booking is None
     
+    def test_find_by_user_id_paginated_computed_status(self, booking_repo, db_session, sample_user, past_flight):
+        """Test that the status computed in SQL is loaded and used for filtering."""
+        future_flight = Flight(
+            origin="Denver", destination="Austin",
+            departure_time=datetime.now(timezone.utc) + timedelta(days=30),
+            arrival_time=datetime.now(timezone.utc) + timedelta(days=30, hours=2),
+            airline="Frontier", price=120, status="scheduled"
+        )
+        db_session.add(future_flight)
+        db_session.commit()
+        upcoming = booking_repo.create(sample_user.id, future_flight.id)
+        departed = booking_repo.create(sample_user.id, past_flight.id)
+        cancelled = booking_repo.create(sample_user.id, future_flight.id, status="cancelled")
+        user_id = sample_user.id
+        expected = {upcoming.id: "booked", departed.id: "completed", cancelled.id: "cancelled"}
+        # Start from an empty identity map so rows are loaded by the query under test
+        db_session.expunge_all()
+        
+        bookings, total = booking_repo.find_by_user_id_paginated(user_id)
+        
+        assert total == 3
+        assert {b.id: b.computed_status for b in bookings} == expected
+        for status in ("booked", "completed", "cancelled"):
+            db_session.expunge_all()
+            filtered, filtered_total = booking_repo.find_by_user_id_paginated(user_id, status)
+            assert filtered_total == 1
+            assert filtered[0].computed_status == status
+    
+    def test_count_by_status(self, booking_repo, sample_user, sample_user_2, sample_flight, past_flight):
+        """Test counting bookings per computed status in one query."""
+        booking_repo.create(sample_user.id, past_flight.id)
+        booking_repo.create(sample_user.id, sample_flight.id, status="cancelled")
+        booking_repo.create(sample_user_2.id, past_flight.id)
+        
+        counts = booking_repo.count_by_status(sample_user.id)
+        
+        assert counts == {"booked": 0, "completed": 1, "cancelled": 1}
+    
     # ===== NEGATIVE TESTS =====
     
     def test_find_by_id_not_found(self, booking_repo):
@@ -263,6 +465,106 @@ class TestBookingRepository:
         existing_booking = booking_repo.find_existing_booking(sample_user.id, sample_flight.id)
         assert existing_booking is None
     
+    def test_create_duplicate_active_booking_rejected(self, booking_repo, sample_user, sample_flight):
+        """Test that the unique index allows only one active booking per user and flight."""
+        booking_repo.create(sample_user.id, sample_flight.id)
+        
+        with pytest.raises(IntegrityError):
+            booking_repo.create(sample_user.id, sample_flight.id)
+    
+    def test_active_booking_index_rejects_duplicate_until_cancelled(self, booking_repo, db_session, sample_user,
+                                                                     sample_flight):
+        """Test that the partial unique index rejects a second active booking but not one after a cancellation."""
+        first = booking_repo.create(sample_user.id, sample_flight.id)
+        
+        with pytest.raises(IntegrityError):
+            booking_repo.create(sample_user.id, sample_flight.id)
+        db_session.rollback()
+        
+        booking_repo.update_status(first.id, "cancelled")
+        second = booking_repo.create(sample_user.id, sample_flight.id)
+        
+        statuses = {b.id: b.status for b in booking_repo.find_by_user_id(sample_user.id)}
+        assert statuses == {first.id: "cancelled", second.id: "booked"}
+    
+    def test_create_if_available_flight_not_scheduled(self, booking_repo, sample_user, past_flight):
+        """Test that a flight that is not scheduled is not booked."""
+        assert booking_repo.create_if_available(sample_user.id, past_flight.id) is None
+        assert booking_repo.find_by_user_id(sample_user.id) == []
+    
+    def test_create_if_available_flight_not_found(self, booking_repo, sample_user):
+        """Test that a missing flight is not booked."""
+        assert booking_repo.create_if_available(sample_user.id, 999) is None
+    
+    def test_create_if_available_duplicate(self, booking_repo, sample_user, sample_flight):
+        """Test that a second active booking for the same flight is a no-op."""
+        first = booking_repo.create_if_available(sample_user.id, sample_flight.id)
+        
+        assert booking_repo.create_if_available(sample_user.id, sample_flight.id) is None
+        assert [b.id for b in booking_repo.find_by_user_id(sample_user.id)] == [first.id]
+    
+    def test_create_if_available_sold_out(self, booking_repo, db_session, sample_user, sample_user_2, upcoming_flights):
+        """Test that the last seat can be booked once and a sold-out flight is not booked."""
+        flight = upcoming_flights[0]
+        flight.seats_available = 1
+        db_session.commit()
+        
+        assert booking_repo.create_if_available(sample_user.id, flight.id) is not None
+        assert booking_repo.create_if_available(sample_user_2.id, flight.id) is None
+        assert flight.seats_available == 0
+        assert booking_repo.find_by_user_id(sample_user_2.id) == []
+    
+    def test_create_if_available_duplicate_keeps_seat(self, booking_repo, sample_user, upcoming_flights):
+        """Test that a rejected duplicate booking does not keep the seat it took."""
+        flight = upcoming_flights[0]
+        booking_repo.create_if_available(sample_user.id, flight.id)
+        
+        assert booking_repo.create_if_available(sample_user.id, flight.id) is None
+        assert flight.seats_available == 179
+    
+    def test_create_many_if_available_sold_out_takes_no_seats(self, booking_repo, db_session, sample_user,
+                                                              upcoming_flights):
+        """Test that one sold-out flight books nothing and leaves the other flights' seats alone."""
+        upcoming_flights[2].seats_available = 0
+        db_session.commit()
+        
+        assert booking_repo.create_many_if_available(sample_user.id, [f.id for f in upcoming_flights]) == []
+        assert [f.seats_available for f in upcoming_flights] == [180, 180, 0]
+    
+    def test_cancel_if_allowed_rejections(self, booking_repo, sample_user, sample_user_2, past_flight):
+        """Test that other users, departed flights and cancelled bookings are left unchanged."""
+        departed = booking_repo.create(sample_user.id, past_flight.id)
+        cancelled = booking_repo.create(sample_user.id, past_flight.id, status="cancelled")
+        now = datetime.now(timezone.utc)
+        
+        assert booking_repo.cancel_if_allowed(999, sample_user.id, now) is None
+        assert booking_repo.cancel_if_allowed(departed.id, sample_user_2.id, now) is None
+        assert booking_repo.cancel_if_allowed(departed.id, sample_user.id, now) is None
+        assert booking_repo.cancel_if_allowed(cancelled.id, sample_user.id, now) is None
+        assert booking_repo.find_by_id(departed.id).status == "booked"
+    
+    def test_create_many_if_available_all_or_nothing(self, booking_repo, sample_user, upcoming_flights, past_flight):
+        """Test that one unavailable or already booked flight books nothing."""
+        flight_ids = [flight.id for flight in upcoming_flights]
+        
+        assert booking_repo.create_many_if_available(sample_user.id, flight_ids + [past_flight.id]) == []
+        assert booking_repo.find_by_user_id(sample_user.id) == []
+        
+        booking_repo.create_if_available(sample_user.id, flight_ids[1])
+        assert booking_repo.create_many_if_available(sample_user.id, flight_ids) == []
+        assert len(booking_repo.find_by_user_id(sample_user.id)) == 1
+    
+    def test_cancel_many_if_allowed_all_or_nothing(self, booking_repo, sample_user, sample_user_2, upcoming_flights):
+        """Test that one booking that cannot be cancelled leaves every booking active."""
+        mine = booking_repo.create_many_if_available(sample_user.id, [f.id for f in upcoming_flights[:2]])
+        theirs = booking_repo.create_if_available(sample_user_2.id, upcoming_flights[2].id)
+        booking_ids = [b.id for b in mine] + [theirs.id]
+        
+        assert booking_repo.cancel_many_if_allowed(booking_ids, sample_user.id, datetime.now(timezone.utc)) == []
+        
+        assert {b.status for b in booking_repo.find_by_ids(booking_ids)} == {"booked"}
+        assert [f.seats_available for f in upcoming_flights] == [179, 179, 179]
+    
     def test_update_status_booking_not_found(self, booking_repo):
         """Test updating status of non-existent booking."""
         with pytest.raises(ValueError) as exc_info:
@@ -307,6 +609,53 @@ class TestBookingRepository:
         assert booking1.user_id != booking2.user_id
         assert booking1.flight_id == booking2.flight_id
     
+    def test_rebook_after_cancellation(self, booking_repo, sample_user, sample_flight):
+        """Test that a cancelled booking does not block booking the same flight again."""
+        cancelled = booking_repo.create(sample_user.id, sample_flight.id)
+        booking_repo.update_status(cancelled.id, "cancelled")
+        
+        rebooked = booking_repo.create(sample_user.id, sample_flight.id)
+        
+        assert rebooked.id != cancelled.id
+        assert booking_repo.find_existing_booking(sample_user.id, sample_flight.id).id == rebooked.id
+    
+    def test_create_if_available_after_cancellation(self, booking_repo, sample_user, sample_flight):
+        """Test that a cancelled booking does not block the atomic path."""
+        cancelled = booking_repo.create_if_available(sample_user.id, sample_flight.id)
+        booking_repo.update_status(cancelled.id, "cancelled")
+        
+        rebooked = booking_repo.create_if_available(sample_user.id, sample_flight.id)
+        
+        assert rebooked is not None
+        assert rebooked.id != cancelled.id
+    
+    def test_delete_active_booking_returns_seat(self, booking_repo, sample_user, upcoming_flights):
+        """Test that deleting an active booking gives its seat back and a cancelled one does not."""
+        flight = upcoming_flights[0]
+        active = booking_repo.create_if_available(sample_user.id, flight.id)
+        cancelled = booking_repo.create(sample_user.id, flight.id, status="cancelled")
+        
+        booking_repo.delete_by_id(cancelled.id)
+        assert flight.seats_available == 179
+        booking_repo.delete_by_id(active.id)
+        assert flight.seats_available == 180
+    
+    def test_deleting_booking_on_sold_out_flight_restores_fare_calendar(self, booking_repo, db_session, sample_user):
+        """Test that deleting the only booking of a sold-out flight puts it back in the fare calendar."""
+        flight_repo = FlightSqliteRepository(db_session)
+        departure = datetime.now(timezone.utc) + timedelta(days=5)
+        flight = flight_repo.create("Madrid", "Paris", departure, departure + timedelta(hours=2), "Iberia", 120,
+                                    capacity=1)
+        day = departure.date()
+        
+        [booking] = booking_repo.create_many_if_available(sample_user.id, [flight.id])
+        assert flight_repo.get_fare_calendar("Madrid", "Paris", day, day) == []
+        
+        assert booking_repo.delete_by_id(booking.id) is True
+        assert [(d.min_price, d.flight_count) for d in flight_repo.get_fare_calendar("Madrid", "Paris", day, day)] == [
+            (120, 1)
+        ]
+    
     def test_status_filter_case_sensitivity(self, booking_repo, sample_user, sample_flight):
         """Test status filter case sensitivity."""
         booking_repo.create(sample_user.id, sample_flight.id)
@@ -319,6 +668,26 @@ class TestBookingRepository:
         case_bookings = booking_repo.find_by_user_id(sample_user.id, "BOOKED")
         assert len(case_bookings) == 0
     
+    def test_count_by_status_no_bookings(self, booking_repo, sample_user):
+        """Test that every status is present even when the user has no bookings."""
+        assert booking_repo.count_by_status(sample_user.id) == {"booked": 0, "completed": 0, "cancelled": 0}
+    
+    def test_bulk_methods_with_empty_lists(self, booking_repo, sample_user):
+        """Test that empty batches are no-ops."""
+        assert booking_repo.create_many_if_available(sample_user.id, []) == []
+        assert booking_repo.cancel_many_if_allowed([], sample_user.id, datetime.now(timezone.utc)) == []
+        assert booking_repo.find_by_ids([]) == []
+    
+    def test_find_by_user_id_paginated_invalid_dates_ignored(self, booking_repo, sample_user, sample_flight):
+        """Test that malformed date filters are ignored rather than matching nothing."""
+        booking_repo.create(sample_user.id, sample_flight.id)
+        
+        bookings, total = booking_repo.find_by_user_id_paginated(
+            sample_user.id, departure_date="25-12-2025", departure_from="not-a-date", booked_to="2025-13-01"
+        )
+        
+        assert total == 1
+    
     def test_cancelled_at_precision(self, booking_repo, sample_user, sample_flight):
         """Test cancelled_at timestamp precision."""
         booking = booking_repo.create(sample_user.id, sample_flight.id)
@@ -349,3 +718,133 @@ class TestBookingRepository:
         from repository.booking import BookingSqliteRepository
         assert isinstance(repo, BookingSqliteRepository)
         assert repo.db == mock_db
+
+
+class TestBookingRepositoryConcurrency:
+    """Concurrent booking against a file-backed SQLite database, one session per thread."""
+    
+    THREADS = 16
+    CAPACITY = 5
+    
+    @pytest.fixture
+    def manager(self, tmp_path):
+        """Create a database with users, a large scheduled flight and a small one."""
+        manager = DatabaseManager(DatabaseConfig(database_url=f"sqlite:///{tmp_path / 'flights.db'}"))
+        manager.create_tables()
+        db = manager.get_session()
+        for user_id in range(1, self.THREADS + 1):
+            db.add(User(id=user_id, name=f"User {user_id}", email=f"user{user_id}@example.com", password_hash="hash"))
+        departure = datetime.now(timezone.utc) + timedelta(days=7)
+        db.add(Flight(id=1, origin="MAD", destination="LIS", departure_time=departure,
+                      arrival_time=departure + timedelta(hours=1), airline="Iberia", price=100, status="scheduled"))
+        db.add(Flight(id=2, origin="MAD", destination="OPO", departure_time=departure,
+                      arrival_time=departure + timedelta(hours=1), airline="Iberia", price=100, status="scheduled",
+                      capacity=self.CAPACITY))
+        db.commit()
+        db.close()
+        return manager
+    
+    def _book_concurrently(self, manager, user_ids, flight_id=1):
+        """Book the flight for every user ID at the same time; returns the created booking IDs."""
+        barrier = threading.Barrier(len(user_ids))
+        
+        def book(user_id):
+            db = manager.get_session()
+            try:
+                barrier.wait()
+                booking = BookingSqliteRepository(db).create_if_available(user_id, flight_id)
+                return booking.id if booking else None
+            finally:
+                db.close()
+        
+        with ThreadPoolExecutor(max_workers=len(user_ids)) as executor:
+            return list(executor.map(book, user_ids))
+    
+    def _active_bookings(self, manager, flight_id=1):
+        db = manager.get_session()
+        try:
+            return db.query(Booking).filter(Booking.flight_id == flight_id, Booking.status == "booked").count()
+        finally:
+            db.close()
+    
+    def _seats_available(self, manager, flight_id):
+        db = manager.get_session()
+        try:
+            return db.query(Flight.seats_available).filter(Flight.id == flight_id).scalar()
+        finally:
+            db.close()
+    
+    # ===== EDGE CASES =====
+    
+    def test_concurrent_double_booking_creates_one(self, manager):
+        """Test that simultaneous requests for the same user and flight book it exactly once."""
+        results = self._book_concurrently(manager, [1] * self.THREADS)
+        
+        assert len([booking_id for booking_id in results if booking_id is not None]) == 1
+        assert self._active_bookings(manager) == 1
+    
+    def test_concurrent_bookings_by_different_users(self, manager):
+        """Test that simultaneous requests from different users all succeed."""
+        results = self._book_concurrently(manager, list(range(1, self.THREADS + 1)))
+        
+        assert None not in results
+        assert len(set(results)) == self.THREADS
+        assert self._active_bookings(manager) == self.THREADS
+    
+    def test_concurrent_bookings_never_oversell(self, manager):
+        """Test that more simultaneous requests than seats book exactly the capacity."""
+        results = self._book_concurrently(manager, list(range(1, self.THREADS + 1)), flight_id=2)
+        
+        assert len([booking_id for booking_id in results if booking_id is not None]) == self.CAPACITY
+        assert self._active_bookings(manager, flight_id=2) == self.CAPACITY
+        assert self._seats_available(manager, 2) == 0
+    
+    def test_concurrent_cancellations_and_bookings_keep_seats_consistent(self, manager):
+        """Test that seats freed by concurrent cancellations are rebooked without overselling."""
+        holders = self._book_concurrently(manager, list(range(1, self.CAPACITY + 1)), flight_id=2)
+        waiting = list(range(self.CAPACITY + 1, self.THREADS + 1))
+        barrier = threading.Barrier(len(holders) + len(waiting))
+        
+        def cancel(booking_id, user_id):
+            db = manager.get_session()
+            try:
+                barrier.wait()
+                BookingSqliteRepository(db).cancel_if_allowed(booking_id, user_id, datetime.now(timezone.utc))
+            finally:
+                db.close()
+        
+        def book(user_id):
+            db = manager.get_session()
+            try:
+                barrier.wait()
+                BookingSqliteRepository(db).create_if_available(user_id, 2)
+            finally:
+                db.close()
+        
+        with ThreadPoolExecutor(max_workers=len(holders) + len(waiting)) as executor:
+            futures = [executor.submit(cancel, booking_id, user_id)
+                       for user_id, booking_id in enumerate(holders, start=1)]
+            futures += [executor.submit(book, user_id) for user_id in waiting]
+            for future in futures:
+                future.result()
+        
+        active = self._active_bookings(manager, flight_id=2)
+        assert active <= self.CAPACITY
+        assert active + self._seats_available(manager, 2) == self.CAPACITY
+    
+    def test_cancel_and_rebook_cycles_keep_seats_consistent(self, manager):
+        """Test that cancelling and booking again, repeatedly, never gives back more seats than were taken."""
+        # Reactivating a cancelled booking would skip the seat inventory; rebooking goes through create_if_available
+        with pytest.raises(ValidationError):
+            BookingUpdate(status="booked")
+        
+        db = manager.get_session()
+        try:
+            repo = BookingSqliteRepository(db)
+            for _ in range(4):
+                booking = repo.create_if_available(1, 2)
+                assert self._seats_available(manager, 2) == self.CAPACITY - 1
+                assert repo.cancel_if_allowed(booking.id, 1, datetime.now(timezone.utc)) is not None
+                assert self._seats_available(manager, 2) == self.CAPACITY
+        finally:
+            db.close()
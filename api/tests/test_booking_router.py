@@ -15,7 +15,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from routers.bookings import router
 from services.booking import BookingService, create_booking_service
-from schemas.booking import BookingResponse, BookingCreate, BookingUpdate
+from schemas.booking import BookingResponse, BookingCreate, BookingUpdate, BookingStatusCounts
 from schemas.flight import FlightResponse, PaginatedResponse
 from models import User, Booking, Flight
 from exceptions import (
@@ -200,6 +200,59 @@ class TestBookingRouter:
         response = client.post("/bookings", json=invalid_data)
         assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
     
+    # ===== BATCH BOOKING ENDPOINT TESTS =====
+    
+    def test_create_bookings_batch_success(self, client, mock_booking_service, sample_booking_response):
+        """Test booking several flights in one request."""
+        mock_booking_service.create_bookings.return_value = [sample_booking_response]
+        
+        # Execute
+        response = client.post("/bookings/batch", json={"flight_ids": [1, 2]})
+        
+        # Verify
+        assert response.status_code == status.HTTP_200_OK
+        assert [item["id"] for item in response.json()] == [1]
+        batch = mock_booking_service.create_bookings.call_args[0][1]
+        assert batch.flight_ids == [1, 2]
+    
+    def test_create_bookings_batch_business_error(self, client, mock_booking_service):
+        """Test that a batch failure is reported like a single booking failure."""
+        mock_booking_service.create_bookings.side_effect = FlightNotAvailableError(2)
+        
+        # Execute
+        response = client.post("/bookings/batch", json={"flight_ids": [1, 2]})
+        
+        # Verify
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert response.json()["detail"]["details"]["flight_id"] == 2
+    
+    def test_create_bookings_batch_invalid(self, client, mock_booking_service):
+        """Test that empty, duplicate and oversized batches are rejected."""
+        for flight_ids in ([], [1, 1], list(range(1, 12))):
+            response = client.post("/bookings/batch", json={"flight_ids": flight_ids})
+            assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        mock_booking_service.create_bookings.assert_not_called()
+    
+    def test_cancel_bookings_batch_success(self, client, mock_booking_service, sample_booking_response):
+        """Test cancelling several bookings in one request."""
+        mock_booking_service.cancel_bookings.return_value = [sample_booking_response]
+        
+        # Execute
+        response = client.patch("/bookings/batch", json={"booking_ids": [1], "status": "cancelled"})
+        
+        # Verify
+        assert response.status_code == status.HTTP_200_OK
+        batch = mock_booking_service.cancel_bookings.call_args[0][1]
+        assert batch.booking_ids == [1]
+        mock_booking_service.update_booking.assert_not_called()
+    
+    def test_cancel_bookings_batch_only_cancellation(self, client, mock_booking_service):
+        """Test that bulk updates to other statuses are rejected."""
+        response = client.patch("/bookings/batch", json={"booking_ids": [1], "status": "booked"})
+        
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        mock_booking_service.cancel_bookings.assert_not_called()
+    
     # ===== UPDATE BOOKING ENDPOINT TESTS =====
     
     def test_update_booking_success(self, client, mock_booking_service, sample_booking_update_data, sample_cancelled_booking_response):
@@ -290,6 +343,13 @@ class TestBookingRouter:
         data = response.json()
         assert "Error updating booking" in data["detail"]
     
+    def test_update_booking_cannot_reactivate(self, client, mock_booking_service):
+        """Test that a cancelled booking cannot be set back to booked, which would skip the seat inventory."""
+        response = client.patch("/bookings/1", json={"status": "booked"})
+        
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        mock_booking_service.update_booking.assert_not_called()
+    
     def test_update_booking_missing_status(self, client):
         """Test booking update with missing status."""
         invalid_data = {}
@@ -477,6 +537,20 @@ class TestBookingRouter:
         # Verify service was called
         mock_booking_service.get_user_bookings.assert_called_once()
     
+    def test_get_booking_status_counts(self, client, mock_booking_service):
+        """Test retrieval of booking counts per status."""
+        mock_booking_service.get_booking_status_counts.return_value = BookingStatusCounts(
+            booked=2, completed=1, cancelled=0, total=3
+        )
+        
+        # Execute
+        response = client.get("/bookings/user/status-counts")
+        
+        # Verify
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"booked": 2, "completed": 1, "cancelled": 0, "total": 3}
+        mock_booking_service.get_booking_status_counts.assert_called_once()
+    
     def test_get_user_bookings_upcoming_filter(self, client, mock_booking_service, sample_booking_list):
         """Test retrieval of upcoming bookings."""
         # Filter to only upcoming bookings
@@ -505,6 +579,23 @@ class TestBookingRouter:
         # Verify service was called with filter
         mock_booking_service.get_user_bookings.assert_called_once()
     
+    def test_get_user_bookings_date_range_filter(self, client, mock_booking_service, sample_booking_list):
+        """Test that date range query parameters are passed to the service."""
+        mock_booking_service.get_user_bookings.return_value = PaginatedResponse(
+            items=sample_booking_list, total=len(sample_booking_list), page=1, size=10, pages=1
+        )
+        
+        # Execute
+        response = client.get("/bookings/user?departure_from=2025-12-01&departure_to=2025-12-31&booked_from=2025-11-01")
+        
+        # Verify
+        assert response.status_code == status.HTTP_200_OK
+        call_kwargs = mock_booking_service.get_user_bookings.call_args[1]
+        assert call_kwargs["departure_from"] == "2025-12-01"
+        assert call_kwargs["departure_to"] == "2025-12-31"
+        assert call_kwargs["booked_from"] == "2025-11-01"
+        assert call_kwargs["booked_to"] is None
+    
     def test_get_user_bookings_past_filter(self, client, mock_booking_service, sample_booking_list):
         """Test retrieval of past bookings."""
         # Filter to cancelled bookings (representing past)
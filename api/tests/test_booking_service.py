@@ -6,6 +6,7 @@ import pytest
 import sys
 import os
 from unittest.mock import Mock, MagicMock
+from pydantic import ValidationError
 from datetime import datetime, timezone, timedelta
 
 # Add src to path
@@ -15,10 +16,11 @@ from services.booking import BookingBusinessService
 from repository.booking import BookingRepository
 from repository.flight import FlightRepository
 from models import Booking, User, Flight
-from schemas.booking import BookingCreate, BookingUpdate, BookingResponse
+from schemas.booking import BookingCreate, BookingUpdate, BookingBatchCreate, BookingBatchUpdate, BookingResponse
 from schemas.flight import PaginatedResponse
 from exceptions import (
     FlightNotAvailableError, 
+    FlightSoldOutError,
     BookingAlreadyExistsError, 
     BookingNotFoundError,
     AccessDeniedError,
@@ -33,7 +35,10 @@ class TestBookingService:
     @pytest.fixture
     def mock_booking_repo(self):
         """Create a mock BookingRepository."""
-        return Mock(spec=BookingRepository)
+        repo = Mock(spec=BookingRepository)
+        # Conditional cancellation matches nothing unless a test says otherwise
+        repo.cancel_if_allowed.return_value = None
+        return repo
     
     @pytest.fixture
     def mock_flight_repo(self):
@@ -77,11 +82,6 @@ class TestBookingService:
         """Create sample booking update data for cancellation."""
         return BookingUpdate(status="cancelled")
     
-    @pytest.fixture
-    def sample_booking_update_pending(self):
-        """Create sample booking update data for pending status."""
-        return BookingUpdate(status="pending")
-    
     @pytest.fixture
     def sample_future_flight(self):
         """Create a sample future flight."""
@@ -93,7 +93,9 @@ class TestBookingService:
             arrival_time=datetime(2025, 12, 25, 13, 30, 0, tzinfo=timezone.utc),
             airline="American Airlines",
             price=299,
-            status="scheduled"
+            status="scheduled",
+            capacity=180,
+            seats_available=120
         )
     
     @pytest.fixture
@@ -107,7 +109,9 @@ class TestBookingService:
             arrival_time=datetime(2023, 1, 1, 13, 30, 0, tzinfo=timezone.utc),
             airline="Delta Airlines",
             price=350,
-            status="completed"
+            status="completed",
+            capacity=180,
+            seats_available=120
         )
     
     @pytest.fixture
@@ -173,9 +177,7 @@ class TestBookingService:
                                   sample_user, sample_booking_create, sample_future_flight, sample_db_booking):
         """Test successful booking creation."""
         # Setup mocks
-        mock_flight_repo.find_available_by_id.return_value = sample_future_flight
-        mock_booking_repo.find_existing_booking.return_value = None
-        mock_booking_repo.create.return_value = sample_db_booking
+        mock_booking_repo.create_if_available.return_value = sample_db_booking
         
         # Execute
         result = booking_service.create_booking(sample_user, sample_booking_create)
@@ -189,15 +191,15 @@ class TestBookingService:
         assert result.flight.origin == "New York"
         assert result.flight.destination == "Los Angeles"
         
-        # Verify repository calls
-        mock_flight_repo.find_available_by_id.assert_called_once_with(1)
-        mock_booking_repo.find_existing_booking.assert_called_once_with(sample_user.id, 1)
-        mock_booking_repo.create.assert_called_once_with(sample_user.id, 1)
+        # Verify repository calls - a successful booking needs no availability probe
+        mock_booking_repo.create_if_available.assert_called_once_with(sample_user.id, 1)
+        mock_flight_repo.find_available_by_id.assert_not_called()
     
-    def test_create_booking_flight_not_available(self, booking_service, mock_flight_repo, 
+    def test_create_booking_flight_not_available(self, booking_service, mock_booking_repo, mock_flight_repo, 
                                                sample_user, sample_booking_create):
         """Test booking creation when flight is not available."""
         # Setup mock
+        mock_booking_repo.create_if_available.return_value = None
         mock_flight_repo.find_available_by_id.return_value = None
         
         # Execute and verify exception
@@ -211,12 +213,26 @@ class TestBookingService:
         # Verify repository calls
         mock_flight_repo.find_available_by_id.assert_called_once_with(1)
     
+    def test_create_booking_sold_out(self, booking_service, mock_booking_repo, mock_flight_repo,
+                                     sample_user, sample_booking_create, sample_future_flight):
+        """Test booking creation when the flight has no seats left."""
+        mock_booking_repo.create_if_available.return_value = None
+        sample_future_flight.seats_available = 0
+        mock_flight_repo.find_available_by_id.return_value = sample_future_flight
+        
+        with pytest.raises(FlightSoldOutError) as exc_info:
+            booking_service.create_booking(sample_user, sample_booking_create)
+        
+        assert exc_info.value.error_code.value == "FLIGHT_SOLD_OUT"
+        assert exc_info.value.details["flight_id"] == 1
+        mock_booking_repo.find_existing_booking.assert_not_called()
+    
     def test_create_booking_already_exists(self, booking_service, mock_booking_repo, mock_flight_repo,
                                          sample_user, sample_booking_create, sample_future_flight, sample_db_booking):
         """Test booking creation when user already has booking for flight."""
         # Setup mocks
+        mock_booking_repo.create_if_available.return_value = None
         mock_flight_repo.find_available_by_id.return_value = sample_future_flight
-        mock_booking_repo.find_existing_booking.return_value = sample_db_booking
         
         # Execute and verify exception
         with pytest.raises(BookingAlreadyExistsError) as exc_info:
@@ -228,19 +244,14 @@ class TestBookingService:
         assert exc_info.value.details["flight_id"] == 1
         
         # Verify repository calls
+        mock_booking_repo.create_if_available.assert_called_once_with(sample_user.id, 1)
         mock_flight_repo.find_available_by_id.assert_called_once_with(1)
-        mock_booking_repo.find_existing_booking.assert_called_once_with(sample_user.id, 1)
-        mock_booking_repo.create.assert_not_called()
     
     # ===== UPDATE BOOKING TESTS =====
     
     def test_update_booking_cancel_success(self, booking_service, mock_booking_repo, mock_flight_repo,
                                          sample_user, sample_booking_update_cancel, sample_db_booking, sample_future_flight):
         """Test successful booking cancellation."""
-        # Setup mocks
-        mock_booking_repo.find_by_id.return_value = sample_db_booking
-        mock_flight_repo.find_by_id.return_value = sample_future_flight
-        
         # Create updated booking without using **__dict__ which includes SQLAlchemy internal attributes
         updated_booking = Booking(
             id=sample_db_booking.id,
@@ -252,7 +263,7 @@ class TestBookingService:
             user=sample_db_booking.user,
             flight=sample_db_booking.flight
         )
-        mock_booking_repo.update_status.return_value = updated_booking
+        mock_booking_repo.cancel_if_allowed.return_value = updated_booking
         
         # Execute
         result = booking_service.update_booking(sample_user, 1, sample_booking_update_cancel)
@@ -262,10 +273,12 @@ class TestBookingService:
         assert result.status == "cancelled"
         assert result.cancelled_at is not None
         
-        # Verify repository calls
-        mock_booking_repo.find_by_id.assert_called_once_with(1)
-        mock_flight_repo.find_by_id.assert_called_once_with(sample_db_booking.flight_id)
-        mock_booking_repo.update_status.assert_called_once()
+        # Verify repository calls - the conditional update returns the booking, so nothing is read back
+        mock_booking_repo.cancel_if_allowed.assert_called_once()
+        assert mock_booking_repo.cancel_if_allowed.call_args[0][:2] == (1, sample_user.id)
+        mock_booking_repo.find_by_id.assert_not_called()
+        mock_flight_repo.find_by_id.assert_not_called()
+        mock_booking_repo.update_status.assert_not_called()
     
     def test_update_booking_not_found(self, booking_service, mock_booking_repo, sample_user, sample_booking_update_cancel):
         """Test updating non-existent booking."""
@@ -330,36 +343,11 @@ class TestBookingService:
         assert exc_info.value.details["booking_id"] == 1
         assert exc_info.value.details["flight_id"] == sample_past_flight.id
     
-    def test_update_booking_non_cancel_status(self, booking_service, mock_booking_repo,
-                                            sample_user, sample_booking_update_pending, sample_db_booking):
-        """Test updating booking to non-cancel status."""
-        # Setup mocks
-        mock_booking_repo.find_by_id.return_value = sample_db_booking
-        
-        # Create updated booking without using **__dict__
-        updated_booking = Booking(
-            id=sample_db_booking.id,
-            user_id=sample_db_booking.user_id,
-            flight_id=sample_db_booking.flight_id,
-            status="pending",
-            booked_at=sample_db_booking.booked_at,
-            cancelled_at=sample_db_booking.cancelled_at,
-            user=sample_db_booking.user,
-            flight=sample_db_booking.flight
-        )
-        mock_booking_repo.update_status.return_value = updated_booking
-        
-        # Execute
-        result = booking_service.update_booking(sample_user, 1, sample_booking_update_pending)
-        
-        # Verify - now expecting BookingResponse object
-        # Note: The computed status logic will convert "pending" to "booked" for future flights
-        assert isinstance(result, BookingResponse)
-        assert result.status == "booked"  # Updated to match computed status logic
-        
-        # Verify repository calls
-        mock_booking_repo.find_by_id.assert_called_once_with(1)
-        mock_booking_repo.update_status.assert_called_once_with(1, "pending")
+    def test_update_booking_only_cancellation(self):
+        """Test that a booking cannot be updated to any status other than cancelled."""
+        for status in ("booked", "pending"):
+            with pytest.raises(ValidationError):
+                BookingUpdate(status=status)
     
     # ===== DELETE BOOKING TESTS =====
     
@@ -367,9 +355,7 @@ class TestBookingService:
                                   sample_user, sample_db_booking, sample_future_flight):
         """Test successful booking deletion."""
         # Setup mocks
-        mock_booking_repo.find_by_id.return_value = sample_db_booking
-        mock_flight_repo.find_by_id.return_value = sample_future_flight
-        mock_booking_repo.update_status.return_value = sample_db_booking
+        mock_booking_repo.cancel_if_allowed.return_value = sample_db_booking
         
         # Execute
         result = booking_service.delete_booking(sample_user, 1)
@@ -377,10 +363,10 @@ class TestBookingService:
         # Verify
         assert result == {"message": "Booking cancelled successfully"}
         
-        # Verify repository calls
-        mock_booking_repo.find_by_id.assert_called_once_with(1)
-        mock_flight_repo.find_by_id.assert_called_once_with(sample_db_booking.flight_id)
-        mock_booking_repo.update_status.assert_called_once()
+        # Verify repository calls - a successful cancellation is a single statement
+        mock_booking_repo.cancel_if_allowed.assert_called_once()
+        mock_booking_repo.find_by_id.assert_not_called()
+        mock_flight_repo.find_by_id.assert_not_called()
     
     def test_delete_booking_not_found(self, booking_service, mock_booking_repo, sample_user):
         """Test deleting non-existent booking."""
@@ -452,6 +438,91 @@ class TestBookingService:
         assert exc_info.value.details["booking_id"] == 1
         assert exc_info.value.details["flight_id"] == sample_past_flight.id
     
+    # ===== BATCH BOOKING TESTS =====
+    
+    def _booking(self, booking_id, user, flight, status="booked"):
+        return Booking(id=booking_id, user_id=user.id, flight_id=flight.id, status=status,
+                       booked_at=datetime.now(timezone.utc), user=user, flight=flight)
+    
+    def test_create_bookings_success(self, booking_service, mock_booking_repo, mock_flight_repo,
+                                     sample_user, sample_future_flight, sample_past_flight):
+        """Test that batch bookings are created in one call and returned in request order."""
+        mock_booking_repo.create_many_if_available.return_value = [
+            self._booking(1, sample_user, sample_future_flight),
+            self._booking(2, sample_user, sample_past_flight),
+        ]
+        
+        result = booking_service.create_bookings(sample_user, BookingBatchCreate(flight_ids=[2, 1]))
+        
+        assert [booking.flight_id for booking in result] == [2, 1]
+        mock_booking_repo.create_many_if_available.assert_called_once_with(sample_user.id, [2, 1])
+        mock_flight_repo.find_available_by_ids.assert_not_called()
+    
+    def test_create_bookings_flight_not_available(self, booking_service, mock_booking_repo, mock_flight_repo,
+                                                  sample_user, sample_future_flight):
+        """Test that the first unavailable flight is reported when nothing was booked."""
+        mock_booking_repo.create_many_if_available.return_value = []
+        mock_flight_repo.find_available_by_ids.return_value = [sample_future_flight]
+        
+        with pytest.raises(FlightNotAvailableError) as exc_info:
+            booking_service.create_bookings(sample_user, BookingBatchCreate(flight_ids=[1, 7, 8]))
+        
+        assert exc_info.value.details["flight_id"] == 7
+        mock_flight_repo.find_available_by_ids.assert_called_once_with([1, 7, 8])
+    
+    def test_create_bookings_sold_out(self, booking_service, mock_booking_repo, mock_flight_repo,
+                                      sample_user, sample_future_flight, sample_past_flight):
+        """Test that a sold-out flight in the batch is reported when nothing was booked."""
+        mock_booking_repo.create_many_if_available.return_value = []
+        sample_past_flight.seats_available = 0
+        mock_flight_repo.find_available_by_ids.return_value = [sample_future_flight, sample_past_flight]
+        
+        with pytest.raises(FlightSoldOutError) as exc_info:
+            booking_service.create_bookings(sample_user, BookingBatchCreate(flight_ids=[1, 2]))
+        
+        assert exc_info.value.details["flight_id"] == 2
+    
+    def test_create_bookings_already_exists(self, booking_service, mock_booking_repo, mock_flight_repo,
+                                            sample_user, sample_future_flight, sample_past_flight):
+        """Test that an existing booking is reported when every flight is available."""
+        mock_booking_repo.create_many_if_available.return_value = []
+        mock_flight_repo.find_available_by_ids.return_value = [sample_future_flight, sample_past_flight]
+        mock_booking_repo.find_existing_bookings.return_value = [self._booking(1, sample_user, sample_past_flight)]
+        
+        with pytest.raises(BookingAlreadyExistsError) as exc_info:
+            booking_service.create_bookings(sample_user, BookingBatchCreate(flight_ids=[1, 2]))
+        
+        assert exc_info.value.details["flight_id"] == 2
+        mock_booking_repo.find_existing_bookings.assert_called_once_with(sample_user.id, [1, 2])
+        mock_booking_repo.find_existing_booking.assert_not_called()
+    
+    def test_cancel_bookings_success(self, booking_service, mock_booking_repo, sample_user, sample_future_flight):
+        """Test that batch cancellation returns the cancelled bookings."""
+        mock_booking_repo.cancel_many_if_allowed.return_value = [
+            self._booking(booking_id, sample_user, sample_future_flight, status="cancelled") for booking_id in (3, 4)
+        ]
+        
+        result = booking_service.cancel_bookings(sample_user, BookingBatchUpdate(booking_ids=[4, 3]))
+        
+        assert [booking.id for booking in result] == [4, 3]
+        assert {booking.status for booking in result} == {"cancelled"}
+        assert mock_booking_repo.cancel_many_if_allowed.call_args[0][:2] == ([4, 3], sample_user.id)
+        mock_booking_repo.find_by_ids.assert_not_called()
+    
+    def test_cancel_bookings_reports_first_failure(self, booking_service, mock_booking_repo, sample_user,
+                                                   sample_user_2, sample_future_flight):
+        """Test that a failed batch raises the error of the first booking that cannot be cancelled."""
+        mock_booking_repo.cancel_many_if_allowed.return_value = []
+        mock_booking_repo.find_by_ids.return_value = [
+            self._booking(3, sample_user, sample_future_flight, status="cancelled"),
+            self._booking(4, sample_user_2, sample_future_flight),
+        ]
+        
+        with pytest.raises(AccessDeniedError):
+            booking_service.cancel_bookings(sample_user, BookingBatchUpdate(booking_ids=[4, 3]))
+        with pytest.raises(BookingNotFoundError):
+            booking_service.cancel_bookings(sample_user, BookingBatchUpdate(booking_ids=[9, 3]))
+    
     # ===== GET USER BOOKINGS TESTS =====
     
     def test_get_user_bookings_success(self, booking_service, mock_booking_repo, sample_user, sample_booking_list):
@@ -477,7 +548,10 @@ class TestBookingService:
         assert result.items[1].status == "cancelled"
         
         # Verify repository calls
-        mock_booking_repo.find_by_user_id_paginated.assert_called_once_with(sample_user.id, None, None, None, 1, 10)
+        mock_booking_repo.find_by_user_id_paginated.assert_called_once_with(
+            sample_user.id, None, None, None, 1, 10,
+            booked_from=None, booked_to=None, departure_from=None, departure_to=None
+        )
     
     def test_get_user_bookings_with_status_filter(self, booking_service, mock_booking_repo, sample_user, sample_booking_list):
         """Test retrieval of user bookings with status filter."""
@@ -498,7 +572,10 @@ class TestBookingService:
         assert result.items[0].status == "booked"
         
         # Verify repository calls
-        mock_booking_repo.find_by_user_id_paginated.assert_called_once_with(sample_user.id, "booked", None, None, 1, 10)
+        mock_booking_repo.find_by_user_id_paginated.assert_called_once_with(
+            sample_user.id, "booked", None, None, 1, 10,
+            booked_from=None, booked_to=None, departure_from=None, departure_to=None
+        )
     
     def test_get_user_bookings_empty(self, booking_service, mock_booking_repo, sample_user):
         """Test retrieval of user bookings when user has no bookings."""
@@ -514,7 +591,31 @@ class TestBookingService:
         assert len(result.items) == 0
         
         # Verify repository calls
-        mock_booking_repo.find_by_user_id_paginated.assert_called_once_with(sample_user.id, None, None, None, 1, 10)
+        mock_booking_repo.find_by_user_id_paginated.assert_called_once_with(
+            sample_user.id, None, None, None, 1, 10,
+            booked_from=None, booked_to=None, departure_from=None, departure_to=None
+        )
+    
+    def test_get_user_bookings_uses_query_computed_status(self, booking_service, mock_booking_repo, sample_user, sample_db_booking):
+        """Test that a status computed by the query takes precedence over the Python fallback."""
+        sample_db_booking.computed_status = "completed"
+        mock_booking_repo.find_by_user_id_paginated.return_value = ([sample_db_booking], 1)
+        
+        result = booking_service.get_user_bookings(sample_user)
+        
+        assert result.items[0].status == "completed"
+    
+    def test_get_booking_status_counts(self, booking_service, mock_booking_repo, sample_user):
+        """Test that status counts are returned with their total."""
+        mock_booking_repo.count_by_status.return_value = {"booked": 2, "completed": 1, "cancelled": 3}
+        
+        result = booking_service.get_booking_status_counts(sample_user)
+        
+        assert result.booked == 2
+        assert result.completed == 1
+        assert result.cancelled == 3
+        assert result.total == 6
+        mock_booking_repo.count_by_status.assert_called_once_with(sample_user.id)
     
     def test_get_user_bookings_upcoming_filter(self, booking_service, mock_booking_repo, sample_user, sample_booking_list):
         """Test retrieval of upcoming bookings."""
@@ -534,7 +635,10 @@ class TestBookingService:
         assert isinstance(result.items[0], BookingResponse)
         
         # Verify repository calls
-        mock_booking_repo.find_by_user_id_paginated.assert_called_once_with(sample_user.id, "upcoming", None, None, 1, 10)
+        mock_booking_repo.find_by_user_id_paginated.assert_called_once_with(
+            sample_user.id, "upcoming", None, None, 1, 10,
+            booked_from=None, booked_to=None, departure_from=None, departure_to=None
+        )
     
     # ===== EDGE CASES =====
     
@@ -542,9 +646,7 @@ class TestBookingService:
                                            sample_user, sample_booking_create, sample_future_flight):
         """Test booking creation with repository error."""
         # Setup mocks
-        mock_flight_repo.find_available_by_id.return_value = sample_future_flight
-        mock_booking_repo.find_existing_booking.return_value = None
-        mock_booking_repo.create.side_effect = Exception("Database connection failed")
+        mock_booking_repo.create_if_available.side_effect = Exception("Database connection failed")
         
         # Execute and verify exception
         with pytest.raises(Exception) as exc_info:
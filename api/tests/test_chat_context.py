@@ -0,0 +1,160 @@
+"""
+Tests for bounded chat context - Utils Layer
+Runs a real react agent with an in-memory checkpointer and a recording fake model.
+"""
+import pytest
+from typing import Any, List
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.prebuilt import create_react_agent
+
+# Add src to path
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.chat_context import ChatAgentState, build_state_modifier, compact_thread, count_tokens
+
+
+class RecordingChatModel(BaseChatModel):
+    """Fake model that records every prompt and replies with a fixed-size answer."""
+
+    prompts: List[List[BaseMessage]] = []
+    reply_words: int = 40
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self.prompts.append(list(messages))
+        content = " ".join(["word"] * self.reply_words)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "RecordingChatModel":
+        return self
+
+    @property
+    def _llm_type(self) -> str:
+        return "recording"
+
+
+def _turn(index: int) -> List[BaseMessage]:
+    return [HumanMessage(content=f"question {index} " + "x " * 50), AIMessage(content=f"answer {index} " + "y " * 50)]
+
+
+class TestStateModifier:
+    """Test suite for the per-call context window."""
+
+    # ===== POSITIVE TESTS =====
+
+    def test_prompt_is_bounded(self):
+        """Test that long histories are trimmed to the token budget."""
+        history = [message for index in range(50) for message in _turn(index)]
+        modify = build_state_modifier("system prompt", max_context_tokens=500)
+
+        messages = modify({"messages": history + [HumanMessage(content="latest")]})
+
+        assert count_tokens(messages) <= 500 + count_tokens([SystemMessage(content="system prompt")])
+        assert isinstance(messages[0], SystemMessage)
+        assert messages[-1].content == "latest"
+        assert isinstance(messages[1], HumanMessage)  # Never starts mid-turn
+
+    def test_summary_included_in_system_prompt(self):
+        """Test that the rolling summary is appended to the single system message."""
+        modify = build_state_modifier("system prompt", max_context_tokens=500)
+
+        messages = modify({"messages": [HumanMessage(content="hi")], "summary": "User booked flight 7"})
+
+        assert messages[0].content.startswith("system prompt")
+        assert "User booked flight 7" in messages[0].content
+        assert sum(isinstance(message, SystemMessage) for message in messages) == 1
+
+    def test_persisted_system_messages_dropped(self):
+        """Test that system messages stored by older threads are not repeated."""
+        history = [SystemMessage(content="old prompt"), HumanMessage(content="hi"),
+                   AIMessage(content="hello"), SystemMessage(content="old prompt"), HumanMessage(content="again")]
+        modify = build_state_modifier("system prompt", max_context_tokens=500)
+
+        messages = modify({"messages": history})
+
+        assert [message.content for message in messages] == ["system prompt", "hi", "hello", "again"]
+
+    # ===== EDGE CASES =====
+
+    def test_current_turn_kept_when_over_budget(self):
+        """Test that the in-progress turn (including tool results) is sent even if it exceeds the budget."""
+        current_turn = [
+            HumanMessage(content="find flights"),
+            AIMessage(content="", tool_calls=[{"name": "search_flights", "args": {}, "id": "call_1"}]),
+            ToolMessage(content="z " * 2000, tool_call_id="call_1", name="search_flights"),
+        ]
+        modify = build_state_modifier("system prompt", max_context_tokens=100)
+
+        messages = modify({"messages": _turn(1) + current_turn})
+
+        assert messages[1:] == current_turn
+
+
+class TestCompactThread:
+    """Test suite for rolling summarization of the checkpointed thread."""
+
+    @pytest.fixture
+    def model(self):
+        """Create a recording fake model."""
+        return RecordingChatModel(prompts=[])
+
+    @pytest.fixture
+    def agent(self, model):
+        """Create a react agent with bounded context over an in-memory checkpointer."""
+        return create_react_agent(
+            model, tools=[], checkpointer=MemorySaver(), state_schema=ChatAgentState,
+            state_modifier=build_state_modifier("system prompt", max_context_tokens=400)
+        )
+
+    # ===== POSITIVE TESTS =====
+
+    @pytest.mark.asyncio
+    async def test_compacts_long_thread(self, agent, model):
+        """Test that older turns are summarized and removed once the thread passes the trigger."""
+        config = {"configurable": {"thread_id": "session"}}
+        for index in range(20):
+            await agent.ainvoke({"messages": [{"role": "user", "content": f"question {index} " + "x " * 30}]}, config)
+
+        compacted = await compact_thread(agent, model, config, trigger_tokens=1000, keep_tokens=300,
+                                         max_summary_words=50)
+
+        state = (await agent.aget_state(config)).values
+        assert compacted is True
+        assert state["summary"].startswith("word")  # The fake model's reply
+        assert count_tokens(state["messages"]) <= 300
+        assert isinstance(state["messages"][0], HumanMessage)
+        assert "question 19" in state["messages"][-2].content
+
+        # The next turn sees the summary in its system prompt
+        await agent.ainvoke({"messages": [{"role": "user", "content": "and now?"}]}, config)
+        assert state["summary"] in model.prompts[-1][0].content
+
+    @pytest.mark.asyncio
+    async def test_prompt_stays_flat_over_many_turns(self, agent, model):
+        """Test that prompt size stops growing with the number of turns."""
+        config = {"configurable": {"thread_id": "session"}}
+        for index in range(40):
+            await agent.ainvoke({"messages": [{"role": "user", "content": f"question {index}"}]}, config)
+            await compact_thread(agent, model, config, trigger_tokens=1000, keep_tokens=300, max_summary_words=50)
+
+        turn_prompts = [prompt for prompt in model.prompts if "Existing summary" not in str(prompt[-1].content)]
+        assert max(count_tokens(prompt) for prompt in turn_prompts[-10:]) <= 500
+
+    # ===== EDGE CASES =====
+
+    @pytest.mark.asyncio
+    async def test_small_thread_untouched(self, agent, model):
+        """Test that threads under the trigger are not summarized."""
+        config = {"configurable": {"thread_id": "session"}}
+        await agent.ainvoke({"messages": [{"role": "user", "content": "hi"}]}, config)
+
+        compacted = await compact_thread(agent, model, config, trigger_tokens=1000, keep_tokens=300,
+                                         max_summary_words=50)
+
+        assert compacted is False
+        assert len(model.prompts) == 1  # Only the agent turn, no summary call
+        assert "summary" not in (await agent.aget_state(config)).values
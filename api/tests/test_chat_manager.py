@@ -0,0 +1,160 @@
+"""
+Tests for ChatManager - Resource Layer
+Session listing runs against a temporary SQLite application database.
+"""
+import pytest
+import asyncio
+import datetime
+from unittest.mock import patch, AsyncMock, Mock
+from sqlalchemy import text
+
+# Add src to path
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from resources.database import DatabaseManager, DatabaseConfig
+from resources.chat import ChatManager
+from models import ChatSession
+
+
+class TestChatManagerSessions:
+    """Test suite for listing a user's chat sessions."""
+
+    @pytest.fixture
+    def database(self, tmp_path):
+        """Create an application database with sessions for two users."""
+        manager = DatabaseManager(DatabaseConfig(database_url=f"sqlite:///{tmp_path / 'flights.db'}"))
+        manager.create_tables()
+        base = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+        db = manager.get_session()
+        for user_id, session_id, hours in [(1, "1_old", 1), (1, "1_new", 5), (2, "2_other", 3), (1, "1_mid", 3)]:
+            updated = base + datetime.timedelta(hours=hours)
+            db.add(ChatSession(id=session_id, user_id=user_id, alias=session_id, created_at=base, updated_at=updated))
+        db.commit()
+        db.close()
+        with patch("resources.chat.db_manager", manager):
+            yield manager
+
+    # ===== POSITIVE TESTS =====
+
+    @pytest.mark.asyncio
+    async def test_get_user_sessions_most_recent_first(self, database):
+        """Test that only the user's sessions are returned, most recently updated first."""
+        sessions = await ChatManager().get_user_sessions(1)
+
+        assert sessions == ["1_new", "1_mid", "1_old"]
+
+    @pytest.mark.asyncio
+    async def test_get_user_sessions_runs_off_event_loop(self, database):
+        """Test that the blocking session query runs in a worker thread."""
+        manager = ChatManager()
+
+        with patch("resources.chat.asyncio.to_thread", wraps=asyncio.to_thread) as to_thread:
+            sessions = await manager.get_user_sessions(1)
+
+        to_thread.assert_called_once_with(manager._query_user_sessions, 1)
+        assert sessions == ["1_new", "1_mid", "1_old"]
+
+    def test_session_listing_uses_index(self, database):
+        """Test that listing sessions is an index lookup, not a table scan."""
+        db = database.get_session()
+        try:
+            query = db.query(ChatSession.id).filter(ChatSession.user_id == 1).order_by(ChatSession.updated_at.desc())
+            statement = str(query.statement.compile(compile_kwargs={"literal_binds": True}))
+            plan = " ".join(row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {statement}")))
+        finally:
+            db.close()
+
+        assert "USING INDEX ix_chat_sessions_user_id_updated_at" in plan
+        assert "TEMP B-TREE" not in plan
+
+    # ===== EDGE CASES =====
+
+    @pytest.mark.asyncio
+    async def test_get_user_sessions_unknown_user(self, database):
+        """Test that a user without sessions gets an empty list."""
+        assert await ChatManager().get_user_sessions(99) == []
+
+
+class TestChatManagerCompaction:
+    """Test suite for summarizing session context in the background."""
+
+    # ===== POSITIVE TESTS =====
+
+    @pytest.mark.asyncio
+    async def test_schedule_compaction_returns_before_summary(self):
+        """Test that scheduling returns at once and the summary completes in the background."""
+        manager = ChatManager()
+        release = asyncio.Event()
+
+        async def summarize(agent, session_id):
+            await release.wait()
+            return True
+
+        with patch.object(manager, "compact_context", AsyncMock(side_effect=summarize)) as compact:
+            manager.schedule_compaction(Mock(), "1_trip")
+            await asyncio.sleep(0)
+            assert "1_trip" in manager._compactions
+
+            release.set()
+            await manager.wait_for_compaction("1_trip")
+
+        compact.assert_awaited_once()
+        await asyncio.sleep(0)
+        assert manager._compactions == {}
+
+    @pytest.mark.asyncio
+    async def test_schedule_compaction_once_per_session(self):
+        """Test that a session with a pending summary does not start a second one."""
+        manager = ChatManager()
+        release = asyncio.Event()
+
+        async def summarize(agent, session_id):
+            await release.wait()
+            return True
+
+        with patch.object(manager, "compact_context", AsyncMock(side_effect=summarize)) as compact:
+            manager.schedule_compaction(Mock(), "1_trip")
+            manager.schedule_compaction(Mock(), "1_trip")
+            manager.schedule_compaction(Mock(), "1_other")
+            release.set()
+            await manager.wait_for_compaction("1_trip")
+            await manager.wait_for_compaction("1_other")
+
+        assert compact.await_count == 2
+
+    # ===== NEGATIVE TESTS =====
+
+    @pytest.mark.asyncio
+    async def test_background_compaction_error_is_swallowed(self):
+        """Test that a failed summary is logged and does not surface to the next turn."""
+        manager = ChatManager()
+
+        with patch.object(manager, "compact_context", AsyncMock(side_effect=Exception("Summary error"))):
+            manager.schedule_compaction(Mock(), "1_trip")
+            await manager.wait_for_compaction("1_trip")
+
+    # ===== EDGE CASES =====
+
+    @pytest.mark.asyncio
+    async def test_wait_for_compaction_without_pending_summary(self):
+        """Test that waiting on a session with no summary in progress returns immediately."""
+        await ChatManager().wait_for_compaction("1_trip")
+
+    @pytest.mark.asyncio
+    async def test_cleanup_cancels_pending_compaction(self):
+        """Test that cleanup cancels summaries still in progress."""
+        manager = ChatManager()
+
+        async def summarize(agent, session_id):
+            await asyncio.Event().wait()
+
+        with patch.object(manager, "compact_context", AsyncMock(side_effect=summarize)):
+            manager.schedule_compaction(Mock(), "1_trip")
+            task = manager._compactions["1_trip"]
+            await asyncio.sleep(0)
+            await manager.cleanup()
+
+        assert task.cancelled()
+        assert manager._compactions == {}
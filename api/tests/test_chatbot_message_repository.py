@@ -13,7 +13,7 @@ from sqlalchemy.orm import sessionmaker
 # Add src to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from models import Base, ChatbotMessage, User
+from models import Base, ChatbotMessage, ChatSession, User
 from repository.chatbot_message import ChatbotMessageSqliteRepository
 
 
@@ -77,6 +77,23 @@ class TestChatbotMessageRepository:
         assert message.created_at is not None
         assert message.session_id == "test_session"
 
+    def test_create_message_with_trace(self, message_repo, sample_user, sample_message_data, db_session):
+        """Test that the agent trace summary round-trips through the JSON column."""
+        trace = {"total_ms": 812.4, "totals": {"llm": {"count": 1, "ms": 700.2}}, "spans": [], "truncated": False}
+
+        message = message_repo.create(
+            user_id=sample_user.id,
+            session_id="test_session",
+            message=sample_message_data["message"],
+            response=sample_message_data["response"],
+            trace=trace
+        )
+        db_session.expire_all()
+
+        stored = message_repo.find_by_user_id_and_session(sample_user.id, "test_session")[0]
+        assert stored.id == message.id
+        assert stored.trace == trace
+
     def test_find_by_user_id_success(self, message_repo, sample_user, sample_message_data):
         """Test finding messages by user ID."""
         # Create multiple messages
@@ -288,6 +305,104 @@ class TestChatbotMessageRepository:
         deleted_count = message_repo.delete_by_user_id_and_session(sample_user.id, "nonexistent_session")
         assert deleted_count == 0
 
+    # ===== SEARCH TESTS =====
+    
+    def test_search_ranks_matches_across_sessions(self, message_repo, db_session, sample_user):
+        """Test that search finds turns in every session, best match first, with highlighted snippets."""
+        db_session.add(ChatSession(id="trip_a", user_id=sample_user.id, alias="Madrid trip"))
+        db_session.commit()
+        weak = message_repo.create(sample_user.id, "trip_a", "Any flights next week?", "Yes, one to Madrid on Monday and more")
+        strong = message_repo.create(sample_user.id, "trip_b", "Madrid flights to Madrid", "Madrid: 3 flights")
+        message_repo.create(sample_user.id, "trip_b", "Cancel my booking", "Done")
+        
+        hits = message_repo.search(sample_user.id, ["madrid"])
+        
+        assert [hit.id for hit in hits] == [strong.id, weak.id]
+        assert hits[0].message_snippet == "**Madrid** flights to **Madrid**"
+        assert hits[1].response_snippet == "Yes, one to **Madrid** on Monday and more"
+        assert (hits[1].session_id, hits[1].session_alias) == ("trip_a", "Madrid trip")
+        assert hits[0].session_alias is None
+        assert hits[0].rank <= hits[1].rank
+    
+    def test_search_requires_every_word(self, message_repo, sample_user):
+        """Test that all terms must match as whole words, ignoring case and accents."""
+        paulo = message_repo.create(sample_user.id, "s", "Flights to São Paulo", "Here they are")
+        message_repo.create(sample_user.id, "s", "Flights to Lisbon", "Here they are")
+        
+        assert [hit.id for hit in message_repo.search(sample_user.id, ["flights", "sao"])] == [paulo.id]
+        assert [hit.id for hit in message_repo.search(sample_user.id, ["FLIGHTS", "PAULO"])] == [paulo.id]
+        assert message_repo.search(sample_user.id, ["flights", "pau"]) == []
+    
+    def test_search_keyset_pagination(self, message_repo, sample_user):
+        """Test that pages chained on the last (rank, id) cover every hit once, ties included."""
+        created = [message_repo.create(sample_user.id, "s", f"Madrid option {i}", "Ok") for i in range(7)]
+        
+        seen, after = [], None
+        while True:
+            page = message_repo.search(sample_user.id, ["madrid"], limit=3, after=after)
+            if not page:
+                break
+            seen.extend(hit.id for hit in page)
+            after = (page[-1].rank, page[-1].id)
+        
+        assert sorted(seen) == [message.id for message in created]
+        assert len(seen) == len(set(seen))
+    
+    def test_search_pagination_across_other_users_inserts(self, message_repo, db_session, sample_user):
+        """Test that pages cover every hit once while another user's inserts shift every rank between pages."""
+        other = User(name="Other", email="other@example.com", password_hash="hashed_password")
+        db_session.add(other)
+        db_session.commit()
+        # Same length, different term counts: their order holds while the ranks move
+        created = [
+            message_repo.create(sample_user.id, "s", "Madrid " * (1 + i % 4) + "option " * (3 - i % 4), "Ok")
+            for i in range(40)
+        ]
+        
+        seen, after = [], None
+        while True:
+            page = message_repo.search(sample_user.id, ["madrid"], limit=10, after=after)
+            if not page:
+                break
+            seen.extend(hit.id for hit in page)
+            after = (page[-1].rank, page[-1].id)
+            for i in range(20):
+                message_repo.create(other.id, "s", "Madrid", "Madrid flights " + "with a long answer " * i)
+        
+        assert sorted(seen) == [message.id for message in created]
+        assert len(seen) == len(set(seen))
+    
+    def test_search_follows_updates_and_deletes(self, message_repo, db_session, sample_user):
+        """Test that the triggers keep the index in step with edited and deleted messages."""
+        message = message_repo.create(sample_user.id, "s", "Book Madrid", "Booked")
+        message.user_message = "Book Lisbon"
+        db_session.commit()
+        
+        assert message_repo.search(sample_user.id, ["madrid"]) == []
+        assert [hit.id for hit in message_repo.search(sample_user.id, ["Lisbon"])] == [message.id]
+        
+        message_repo.delete_by_user_id_and_session(sample_user.id, "s")
+        assert message_repo.search(sample_user.id, ["lisbon"]) == []
+    
+    def test_search_scoped_to_user(self, message_repo, db_session, sample_user):
+        """Test that another user's messages are never returned."""
+        other = User(name="Other", email="other@example.com", password_hash="hashed_password")
+        db_session.add(other)
+        db_session.commit()
+        message_repo.create(other.id, "s", "Flight to Madrid", "Ok")
+        
+        assert message_repo.search(sample_user.id, ["madrid"]) == []
+        assert len(message_repo.search(other.id, ["madrid"])) == 1
+    
+    def test_search_terms_are_not_query_syntax(self, message_repo, sample_user):
+        """Test that FTS5 operators and quotes in terms are searched as text instead of failing."""
+        message_repo.create(sample_user.id, "s", "Madrid OR Lisbon", "Ok")
+        
+        assert len(message_repo.search(sample_user.id, ['"madrid'])) == 1
+        assert len(message_repo.search(sample_user.id, ["OR", "lisbon"])) == 1
+        assert message_repo.search(sample_user.id, ["NEAR", "lisbon"]) == []
+        assert message_repo.search(sample_user.id, []) == []
+    
     # ===== EDGE CASES =====
 
     def test_create_message_long_content(self, message_repo, sample_user):
@@ -15,8 +15,8 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from routers.chat import router
 from services.chat import ChatService, create_chat_service
-from schemas.chat import ChatResponse, ChatHistoryResponse, ChatMessageResponse
-from exceptions import AgentInvocationFailedError, ChatMessageSaveFailedError
+from schemas.chat import ChatResponse, ChatHistoryResponse, ChatMessageResponse, ChatSearchResponse, ChatSearchResult
+from exceptions import AgentInvocationFailedError, ChatMessageSaveFailedError, InvalidSearchCursorError
 from resources.dependencies import get_current_user
 from datetime import datetime, timezone
 
@@ -135,7 +135,9 @@ class TestChatRouter:
         assert data["total_count"] == 1
         assert len(data["messages"]) == 1
         assert data["messages"][0]["message"] == "test message"
-        mock_chat_service.get_chat_history.assert_called_once_with(1, session_id="test_session_123", limit=50, offset=0)
+        mock_chat_service.get_chat_history.assert_called_once_with(
+            1, session_id="test_session_123", limit=50, offset=0, include_trace=False
+        )
 
     def test_get_chat_history_with_pagination(self, client, mock_chat_service):
         """Test chat history retrieval with pagination parameters."""
@@ -144,7 +146,35 @@ class TestChatRouter:
 
         # Verify
         assert response.status_code == status.HTTP_200_OK
-        mock_chat_service.get_chat_history.assert_called_once_with(1, session_id="test_session_123", limit=10, offset=20)
+        mock_chat_service.get_chat_history.assert_called_once_with(
+            1, session_id="test_session_123", limit=10, offset=20, include_trace=False
+        )
+
+    def test_get_chat_history_with_trace(self, client, mock_chat_service):
+        """Test chat history retrieval with agent traces included."""
+        trace = {"total_ms": 1200.0, "totals": {"llm": {"count": 1, "ms": 900.0}}, "spans": [], "truncated": False}
+        mock_chat_service.get_chat_history.return_value = ChatHistoryResponse(
+            messages=[
+                ChatMessageResponse(
+                    id=1,
+                    message="test message",
+                    response="test response",
+                    session_id="test_session_123",
+                    created_at=datetime.now(timezone.utc),
+                    trace=trace
+                )
+            ],
+            total_count=1,
+            session_alias="Test Session"
+        )
+
+        response = client.get("/chat/history?session_id=test_session_123&include_trace=true")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["messages"][0]["trace"] == trace
+        mock_chat_service.get_chat_history.assert_called_once_with(
+            1, session_id="test_session_123", limit=50, offset=0, include_trace=True
+        )
 
     def test_get_chat_history_with_invalid_limit(self, client, mock_chat_service):
         """Test chat history retrieval with invalid limit parameter."""
@@ -211,6 +241,69 @@ class TestChatRouter:
         data = response.json()
         assert "Error clearing chat history" in data["detail"]
 
+    # ===== CHAT SEARCH ENDPOINT TESTS =====
+
+    def test_search_chat_history_success(self, client, mock_chat_service):
+        """Test searching chat history returns ranked snippets and the next cursor."""
+        mock_chat_service.search_chat_history.return_value = ChatSearchResponse(
+            results=[
+                ChatSearchResult(
+                    message_id=7,
+                    session_id="test_session_123",
+                    session_alias="Madrid trip",
+                    created_at=datetime.now(timezone.utc),
+                    message_snippet="Flights to **Madrid**",
+                    response_snippet="I found 3 flights to **Madrid**"
+                )
+            ],
+            next_cursor="LTEuNTo3"
+        )
+
+        response = client.get("/chat/search?q=madrid&limit=1")
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["next_cursor"] == "LTEuNTo3"
+        assert data["results"][0]["message_id"] == 7
+        assert data["results"][0]["message_snippet"] == "Flights to **Madrid**"
+        mock_chat_service.search_chat_history.assert_called_once_with(1, "madrid", limit=1, cursor=None)
+
+    def test_search_chat_history_passes_cursor(self, client, mock_chat_service):
+        """Test that the cursor of the previous page is handed to the service."""
+        mock_chat_service.search_chat_history.return_value = ChatSearchResponse(results=[])
+
+        response = client.get("/chat/search?q=madrid&cursor=LTEuNTo3")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"results": [], "next_cursor": None}
+        mock_chat_service.search_chat_history.assert_called_once_with(1, "madrid", limit=20, cursor="LTEuNTo3")
+
+    def test_search_chat_history_invalid_cursor(self, client, mock_chat_service):
+        """Test that a rejected cursor is a 400 with the error code."""
+        mock_chat_service.search_chat_history.side_effect = InvalidSearchCursorError("bogus")
+
+        response = client.get("/chat/search?q=madrid&cursor=bogus")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["detail"]["error_code"] == "INVALID_SEARCH_CURSOR"
+
+    @pytest.mark.parametrize("query", ["/chat/search", "/chat/search?q=", "/chat/search?q=madrid&limit=101"])
+    def test_search_chat_history_invalid_params(self, client, mock_chat_service, query):
+        """Test that a missing query or an out-of-range limit is rejected."""
+        response = client.get(query)
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        mock_chat_service.search_chat_history.assert_not_called()
+
+    def test_search_chat_history_error(self, client, mock_chat_service):
+        """Test searching chat history when an error occurs."""
+        mock_chat_service.search_chat_history.side_effect = Exception("Database error")
+
+        response = client.get("/chat/search?q=madrid")
+
+        assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+        assert "Error searching chat history" in response.json()["detail"]
+
     # ===== SESSION MANAGEMENT ENDPOINT TESTS =====
 
     def test_get_user_sessions_success(self, client, mock_chat_service):
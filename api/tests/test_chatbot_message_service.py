@@ -12,9 +12,17 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from services.chat import AgentChatService
+from resources.metrics import LLM_CALL_DURATION, TOOL_CALL_DURATION
+from utils.agent_tracing import (
+    AgentTrace, AgentTraceCallbackHandler, agent_trace_var, record_checkpoint_write, MAX_TRACE_SPANS
+)
+import time
+import uuid
 from schemas.chat import ChatRequest, ChatResponse, ChatMessageResponse, ChatHistoryResponse
-from exceptions import AgentInvocationFailedError, ChatMessageSaveFailedError
-from repository.chatbot_message import ChatbotMessageRepository
+from exceptions import (
+    AgentInvocationFailedError, ChatMessageSaveFailedError, InvalidSearchQueryError, InvalidSearchCursorError
+)
+from repository.chatbot_message import ChatbotMessageRepository, ChatMessageSearchHit
 
 class TestChatService:
     """Test suite for ChatService."""
@@ -60,6 +68,8 @@ class TestChatService:
         }
         # Make create_agent an async mock that returns the mock_agent
         mock_chat_manager.create_agent = AsyncMock(return_value=mock_agent)
+        mock_chat_manager.compact_context = AsyncMock(return_value=False)
+        mock_chat_manager.wait_for_compaction = AsyncMock()
         mock_chat_manager.generate_session_id.return_value = "test_session_123"
         
         # Create mock session repository
@@ -119,7 +129,8 @@ class TestChatService:
         chat_service._mock_chat_manager.create_agent.assert_called_once_with(
             user_token=jwt_token,
             user_id=sample_user.id,
-            session_id="test_session_123"
+            session_id="test_session_123",
+            system_prompt="test context"
         )
         
         # Verify agent was called correctly
@@ -127,15 +138,22 @@ class TestChatService:
         call_args = chat_service._mock_agent.ainvoke.call_args[0][0]  # Get the first positional argument
         call_kwargs = chat_service._mock_agent.ainvoke.call_args[1]  # Get keyword arguments
         
-        # Verify message structure
-        assert len(call_args["messages"]) == 2  # System context + user message
-        assert call_args["messages"][0]["role"] == "system"
-        assert call_args["messages"][0]["content"] == "test context"  # Verify system context
-        assert call_args["messages"][1]["role"] == "user"
-        assert call_args["messages"][1]["content"] == "Hello bot"  # Verify user message
+        # Verify message structure: only the user message is added to the thread,
+        # the system context is passed to the agent as its prompt
+        assert len(call_args["messages"]) == 1
+        assert call_args["messages"][0]["role"] == "user"
+        assert call_args["messages"][0]["content"] == "Hello bot"  # Verify user message
         
         # Verify session configuration
         assert call_kwargs["config"]["configurable"]["thread_id"] == "test_session_123"
+        assert any(isinstance(cb, AgentTraceCallbackHandler) for cb in call_kwargs["config"]["callbacks"])
+        assert response.trace["total_ms"] >= 0
+        chat_service._mock_chat_manager.wait_for_compaction.assert_awaited_once_with("test_session_123")
+        # Compaction is handed off to the background, not awaited within the turn
+        chat_service._mock_chat_manager.schedule_compaction.assert_called_once_with(
+            chat_service._mock_agent, "test_session_123"
+        )
+        chat_service._mock_chat_manager.compact_context.assert_not_awaited()
 
     @pytest.mark.asyncio
     async def test_save_chat_message_success(self, chat_service):
@@ -151,9 +169,19 @@ class TestChatService:
             user_id=1,
             session_id="test_session_123",
             message="test message",
-            response="test response"
+            response="test response",
+            trace=None
         )
 
+    @pytest.mark.asyncio
+    async def test_save_chat_message_with_trace(self, chat_service):
+        """Test that the agent trace summary is passed to the repository."""
+        trace = {"total_ms": 10.0, "totals": {}, "spans": [], "truncated": False}
+
+        await chat_service.save_chat_message(1, "test_session_123", "test message", "test response", trace=trace)
+
+        assert chat_service.chat_repo.create.call_args.kwargs["trace"] == trace
+
     def test_get_chat_history_success(self, chat_service, mock_chat_repo):
         """Test successful chat history retrieval."""
         # Configure mock to return test data
@@ -182,6 +210,27 @@ class TestChatService:
         assert history.total_count == 2
         mock_chat_repo.find_by_user_id_and_session.assert_called_once_with(1, "test_session_123", limit=10, offset=0)
 
+    def test_get_chat_history_include_trace(self, chat_service, mock_chat_repo):
+        """Test that traces are returned only when requested."""
+        trace = {"total_ms": 10.0, "totals": {}, "spans": [], "truncated": False}
+        mock_chat_repo.find_by_user_id_and_session.return_value = [
+            Mock(
+                id=1,
+                user_message="message 1",
+                bot_response="response 1",
+                session_id="test_session_123",
+                created_at=datetime.now(timezone.utc),
+                trace=trace
+            )
+        ]
+        mock_chat_repo.count_by_user_id_and_session.return_value = 1
+
+        with_trace = chat_service.get_chat_history(user_id=1, session_id="test_session_123", include_trace=True)
+        without_trace = chat_service.get_chat_history(user_id=1, session_id="test_session_123")
+
+        assert with_trace.messages[0].trace == trace
+        assert without_trace.messages[0].trace is None
+
     def test_clear_chat_history_success(self, chat_service, mock_chat_repo):
         """Test successful chat history clearing."""
         mock_chat_repo.delete_by_user_id_and_session.return_value = 5
@@ -191,9 +240,57 @@ class TestChatService:
         assert result["deleted_count"] == 5
         assert "Successfully cleared 5 chat messages" in result["message"]
         mock_chat_repo.delete_by_user_id_and_session.assert_called_once_with(1, "test_session_123")
+        chat_service._mock_chat_manager.delete_thread.assert_called_once_with("test_session_123")
+
+    def test_delete_session_deletes_agent_thread(self, chat_service, mock_chat_repo):
+        """Test that deleting a session also deletes its agent checkpoints."""
+        mock_chat_repo.delete_by_user_id_and_session.return_value = 2
+
+        result = chat_service.delete_session(user_id=1, session_id="test_session_123")
+
+        assert result.deleted_count == 2
+        chat_service.session_repo.delete_by_id.assert_called_once_with("test_session_123")
+        chat_service._mock_chat_manager.delete_thread.assert_called_once_with("test_session_123")
+
+    def test_search_chat_history_pages_with_cursor(self, chat_service, mock_chat_repo):
+        """Test that search asks for one extra hit and returns a cursor that resumes after the last one."""
+        hits = [
+            ChatMessageSearchHit(i, "s", "Trip", datetime.now(timezone.utc), -1.5 + i * 1e-9, f"**Madrid** {i}", "")
+            for i in range(1, 4)
+        ]
+        mock_chat_repo.search.return_value = hits
+
+        page = chat_service.search_chat_history(user_id=1, query="  Madrid, flights! ", limit=2)
+
+        mock_chat_repo.search.assert_called_once_with(1, ["Madrid", "flights"], limit=3, after=None)
+        assert [result.message_id for result in page.results] == [1, 2]
+        assert page.results[0].message_snippet == "**Madrid** 1"
+        assert page.next_cursor is not None
+
+        mock_chat_repo.search.return_value = hits[2:]
+        last_page = chat_service.search_chat_history(user_id=1, query="Madrid flights", limit=2, cursor=page.next_cursor)
+
+        assert mock_chat_repo.search.call_args.kwargs["after"] == (hits[1].rank, 2)
+        assert [result.message_id for result in last_page.results] == [3]
+        assert last_page.next_cursor is None
 
     # ===== NEGATIVE TESTS =====
 
+    def test_search_chat_history_without_words(self, chat_service, mock_chat_repo):
+        """Test that a query with nothing to search for is rejected before touching the index."""
+        with pytest.raises(InvalidSearchQueryError):
+            chat_service.search_chat_history(user_id=1, query=" ?! ")
+
+        mock_chat_repo.search.assert_not_called()
+
+    @pytest.mark.parametrize("cursor", ["not base64!", "bm90LWEtY3Vyc29y", "Zm9vOmJhcg=="])
+    def test_search_chat_history_invalid_cursor(self, chat_service, mock_chat_repo, cursor):
+        """Test that a cursor not issued by a previous page is rejected."""
+        with pytest.raises(InvalidSearchCursorError):
+            chat_service.search_chat_history(user_id=1, query="madrid", cursor=cursor)
+
+        mock_chat_repo.search.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_process_chat_request_agent_error(self, chat_service, sample_user):
         """Test chat request processing when agent fails."""
@@ -210,6 +307,21 @@ class TestChatService:
         assert str(exc_info.value.details["user_id"]) == "1"
         assert "Agent error" in str(exc_info.value.details["error_details"])
 
+    @pytest.mark.asyncio
+    async def test_process_chat_request_waits_for_pending_compaction(self, chat_service, sample_user):
+        """Test that a turn waits for the previous turn's summary before invoking the agent."""
+        request = ChatRequest(content="Hello bot", session_id="test_session_123")
+        calls = []
+        chat_service._mock_chat_manager.wait_for_compaction.side_effect = lambda session_id: calls.append("wait")
+        chat_service._mock_agent.ainvoke.side_effect = lambda *args, **kwargs: calls.append("invoke") or {
+            "messages": [Mock(content="mock response")]
+        }
+
+        response = await chat_service.process_chat_request(sample_user, request, "test_jwt_token")
+
+        assert response.response == "mock response"
+        assert calls == ["wait", "invoke"]
+
     @pytest.mark.asyncio
     async def test_save_chat_message_db_error(self, chat_service, mock_chat_repo):
         """Test chat message saving when database fails."""
@@ -296,4 +408,111 @@ class TestChatService:
         result = chat_service.clear_chat_history(user_id=1, session_id="test_session_123")
 
         assert result["deleted_count"] == 0
-        assert "Successfully cleared 0 chat messages" in result["message"]
\ No newline at end of file
+        assert "Successfully cleared 0 chat messages" in result["message"]
+
+
+class TestAgentTraceCallbackHandler:
+    """Test suite for per-turn agent tracing callbacks."""
+
+    # ===== POSITIVE TESTS =====
+
+    def test_records_llm_span_with_token_counts(self):
+        """Test that model calls are traced with token usage and observed in metrics."""
+        handler = AgentTraceCallbackHandler()
+        series = LLM_CALL_DURATION.labels("success")
+        before = series.get()["count"]
+        run_id = uuid.uuid4()
+        result = Mock()
+        result.generations = [[Mock(message=Mock(usage_metadata={"input_tokens": 120, "output_tokens": 30}))]]
+
+        handler.on_chat_model_start({}, [[]], run_id=run_id, metadata={"ls_model_name": "gpt-4.1"})
+        handler.on_llm_end(result, run_id=run_id)
+
+        span = handler.trace.spans[0]
+        assert span["type"] == "llm"
+        assert span["name"] == "gpt-4.1"
+        assert span["input_tokens"] == 120
+        assert span["output_tokens"] == 30
+        assert series.get()["count"] == before + 1
+
+    def test_records_tool_and_node_spans(self):
+        """Test that tool errors and LangGraph node runs are traced."""
+        handler = AgentTraceCallbackHandler()
+        tool_series = TOOL_CALL_DURATION.labels("search_flights", "error")
+        before = tool_series.get()["count"]
+        node_run, tool_run = uuid.uuid4(), uuid.uuid4()
+
+        handler.on_chain_start({}, {}, run_id=node_run, metadata={"langgraph_node": "tools"}, name="tools")
+        handler.on_tool_start({"name": "search_flights"}, "{}", run_id=tool_run)
+        handler.on_tool_error(RuntimeError("boom"), run_id=tool_run)
+        handler.on_chain_end({}, run_id=node_run)
+
+        assert [(span["type"], span["name"]) for span in handler.trace.spans] == [
+            ("tool", "search_flights"), ("node", "tools")
+        ]
+        assert handler.trace.spans[0]["outcome"] == "error"
+        assert tool_series.get()["count"] == before + 1
+
+    def test_summary_totals_spans_by_type(self):
+        """Test that the summary aggregates counts, time and tokens per span type."""
+        trace = AgentTrace()
+        started = time.perf_counter()
+        trace.add_span("llm", "gpt-4.1", started, input_tokens=100, output_tokens=10)
+        trace.add_span("llm", "gpt-4.1", started, input_tokens=50, output_tokens=5)
+        trace.add_span("checkpoint", "put", started)
+        trace.finish()
+
+        summary = trace.summary()
+
+        assert summary["totals"]["llm"]["count"] == 2
+        assert summary["totals"]["llm"]["input_tokens"] == 150
+        assert summary["totals"]["checkpoint"]["count"] == 1
+        assert summary["total_ms"] >= 0
+        assert summary["truncated"] is False
+
+    def test_checkpoint_writes_are_recorded_on_active_trace(self):
+        """Test that checkpoint writes land on the trace bound to the current context."""
+        trace = AgentTrace()
+        token = agent_trace_var.set(trace)
+        try:
+            record_checkpoint_write("put", time.perf_counter())
+        finally:
+            agent_trace_var.reset(token)
+        record_checkpoint_write("put", time.perf_counter())
+
+        assert [(span["type"], span["name"]) for span in trace.spans] == [("checkpoint", "put")]
+
+    # ===== EDGE CASES =====
+
+    def test_unmatched_end_event_is_ignored(self):
+        """Test that an end event without a start records nothing."""
+        handler = AgentTraceCallbackHandler()
+        series = LLM_CALL_DURATION.labels("success")
+        before = series.get()["count"]
+
+        handler.on_llm_end(Mock(), run_id=uuid.uuid4())
+
+        assert series.get()["count"] == before
+        assert handler.trace.spans == []
+
+    def test_nested_runnables_inside_node_are_not_traced(self):
+        """Test that only the node's own run becomes a node span."""
+        handler = AgentTraceCallbackHandler()
+        run_id = uuid.uuid4()
+
+        handler.on_chain_start({}, {}, run_id=run_id, metadata={"langgraph_node": "agent"}, name="RunnableSequence")
+        handler.on_chain_end({}, run_id=run_id)
+
+        assert handler.trace.spans == []
+
+    def test_summary_truncates_long_traces(self):
+        """Test that stored spans are capped while totals still count every span."""
+        trace = AgentTrace()
+        for _ in range(MAX_TRACE_SPANS + 5):
+            trace.add_span("tool", "search_flights", time.perf_counter())
+
+        summary = trace.summary()
+
+        assert len(summary["spans"]) == MAX_TRACE_SPANS
+        assert summary["totals"]["tool"]["count"] == MAX_TRACE_SPANS + 5
+        assert summary["truncated"] is True
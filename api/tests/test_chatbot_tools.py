@@ -0,0 +1,71 @@
+"""
+Tests for chatbot tools - Utils Layer
+Tests invoke tools through LangChain and mock the HTTP client to focus on request building and formatting.
+"""
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+# Add src to path
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.chatbot_tools import FlightSearchBatchTool
+
+
+class TestFlightSearchBatchTool:
+    """Test suite for FlightSearchBatchTool with a mocked HTTP client."""
+
+    @pytest.fixture
+    def tool(self):
+        """Create a batch search tool for a test user."""
+        return FlightSearchBatchTool(user_token="token", api_base_url="http://api")
+
+    @pytest.fixture
+    def batch_response(self):
+        """Mock a successful batch search response with one hit and one empty route."""
+        response = Mock(status_code=200)
+        response.json.return_value = [
+            {
+                "origin": "MAD", "destination": "JFK", "departure_date": "2026-06-01", "total": 1,
+                "items": [{
+                    "id": 7, "origin": "MAD", "destination": "JFK", "airline": "Iberia", "price": 450,
+                    "departure_time": "2026-06-01T10:00:00Z", "arrival_time": "2026-06-01T13:30:00Z"
+                }]
+            },
+            {"origin": "MAD", "destination": "LAX", "departure_date": "2026-06-01", "total": 0, "items": []}
+        ]
+        return response
+
+    # ===== POSITIVE TESTS =====
+
+    @pytest.mark.asyncio
+    async def test_ainvoke_posts_parsed_searches_as_json(self, tool, batch_response):
+        """Test that the searches parsed by LangChain are serialized into the request body."""
+        searches = [
+            {"origin": "MAD", "destination": "JFK", "departure_date": "2026-06-01"},
+            {"origin": "MAD", "destination": "LAX", "departure_date": "2026-06-01"}
+        ]
+        with patch("utils.chatbot_tools.httpx.AsyncClient.post", new_callable=AsyncMock,
+                   return_value=batch_response) as mock_post:
+            result = await tool.ainvoke({"searches": searches, "size": 3})
+
+        assert mock_post.call_args.kwargs["json"] == {"searches": searches, "size": 3}
+        assert mock_post.call_args.kwargs["headers"] == {"Authorization": "Bearer token"}
+        assert "Found 1 flights from MAD to JFK on 2026-06-01" in result
+        assert "Flight ID 7" in result
+        assert "No flights found from MAD to LAX on 2026-06-01" in result
+
+    # ===== NEGATIVE TESTS =====
+
+    @pytest.mark.asyncio
+    async def test_ainvoke_reports_api_error(self, tool):
+        """Test that an API error is returned as a message instead of raised."""
+        response = Mock(status_code=400, headers={"content-type": "application/json"})
+        response.json.return_value = {"detail": "Too many searches"}
+        with patch("utils.chatbot_tools.httpx.AsyncClient.post", new_callable=AsyncMock, return_value=response):
+            result = await tool.ainvoke({
+                "searches": [{"origin": "MAD", "destination": "JFK", "departure_date": "2026-06-01"}]
+            })
+
+        assert result == "Error searching flights: Too many searches"
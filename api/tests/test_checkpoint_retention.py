@@ -0,0 +1,225 @@
+"""
+Tests for CheckpointStore and CheckpointRetention - Resource and Service Layers
+Uses real SQLite checkpoint files created with the LangGraph saver's schema.
+"""
+import pytest
+import asyncio
+import os
+import sqlite3
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+# Add src to path
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from resources.checkpoint_store import CheckpointStore
+from resources.metrics import CHECKPOINT_RECLAIMED_BYTES
+from services.checkpoint_retention import CheckpointRetention, CheckpointRetentionConfig
+
+PAYLOAD = b"x" * 4096
+
+
+def _create_checkpoint_db(path: str, threads: dict) -> None:
+    """Create a checkpoint database with `count` checkpoints (each with one write) per thread."""
+    conn = sqlite3.connect(path, check_same_thread=False)
+    SqliteSaver(conn).setup()
+    for thread_id, count in threads.items():
+        for index in range(count):
+            checkpoint_id = f"{index:08d}"
+            conn.execute(
+                "INSERT INTO checkpoints (thread_id, checkpoint_ns, checkpoint_id, type, checkpoint, metadata) "
+                "VALUES (?, '', ?, 'msgpack', ?, ?)",
+                (thread_id, checkpoint_id, PAYLOAD, b"{}")
+            )
+            conn.execute(
+                "INSERT INTO writes (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, type, value) "
+                "VALUES (?, '', ?, 'task', 0, 'messages', 'msgpack', ?)",
+                (thread_id, checkpoint_id, PAYLOAD)
+            )
+    conn.commit()
+    conn.close()
+
+
+def _checkpoint_ids(path: str, thread_id: str) -> list:
+    with sqlite3.connect(path) as conn:
+        rows = conn.execute(
+            "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? ORDER BY checkpoint_id", (thread_id,)
+        ).fetchall()
+    return [row[0] for row in rows]
+
+
+def _write_count(path: str) -> int:
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM writes").fetchone()[0]
+
+
+class TestCheckpointStore:
+    """Test suite for checkpoint retention operations."""
+
+    @pytest.fixture
+    def db_path(self, tmp_path):
+        """Create a checkpoint database with two threads."""
+        path = str(tmp_path / "checkpoints.db")
+        _create_checkpoint_db(path, {"1_trip": 30, "2_work": 3})
+        return path
+
+    # ===== POSITIVE TESTS =====
+
+    def test_prune_keeps_latest_per_thread(self, db_path):
+        """Test that only the newest checkpoints and their writes are kept."""
+        result = CheckpointStore(db_path).prune(keep_per_thread=5)
+
+        assert result == {"checkpoints": 25, "writes": 25}
+        assert _checkpoint_ids(db_path, "1_trip") == [f"{index:08d}" for index in range(25, 30)]
+        assert len(_checkpoint_ids(db_path, "2_work")) == 3
+        assert _write_count(db_path) == 8
+
+    def test_delete_thread(self, db_path):
+        """Test that deleting a thread removes its checkpoints and writes only."""
+        deleted = CheckpointStore(db_path).delete_thread("1_trip")
+
+        assert deleted == 30
+        assert _checkpoint_ids(db_path, "1_trip") == []
+        assert len(_checkpoint_ids(db_path, "2_work")) == 3
+        assert _write_count(db_path) == 3
+
+    def test_apply_retention_deletes_orphans_and_reclaims_space(self, db_path):
+        """Test a full run: orphaned threads deleted, others pruned, file shrinks."""
+        store = CheckpointStore(db_path)
+        size_before = store.file_bytes()
+
+        report = store.apply_retention(lambda: ["2_work"], keep_per_thread=2, vacuum_pages=0)
+
+        assert report["orphaned_threads_deleted"] == 1
+        assert report["orphaned_checkpoints_deleted"] == 30
+        assert report["checkpoints_pruned"] == 1
+        assert report["threads"] == 1
+        assert report["reclaimed_bytes"] > 30 * len(PAYLOAD)
+        assert report["file_bytes"] < size_before
+        assert store.list_thread_ids() == {"2_work"}
+
+    def test_incremental_vacuum_after_conversion(self, db_path):
+        """Test that later runs use incremental vacuum and keep the file bounded."""
+        store = CheckpointStore(db_path)
+        store.apply_retention(lambda: ["1_trip", "2_work"], keep_per_thread=2, vacuum_pages=0)
+        with sqlite3.connect(db_path) as conn:
+            assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2  # INCREMENTAL
+
+        sizes = []
+        for round_index in range(3):
+            _create_checkpoint_db(db_path, {f"3_round{round_index}": 20})
+            report = store.apply_retention(
+                lambda: ["1_trip", "2_work", f"3_round{round_index}"], keep_per_thread=2, vacuum_pages=0
+            )
+            assert report["reclaimed_bytes"] > 0
+            sizes.append(report["file_bytes"])
+
+        assert max(sizes) - min(sizes) <= 4 * len(PAYLOAD) * 2
+
+    # ===== EDGE CASES =====
+
+    def test_missing_database(self, tmp_path):
+        """Test that a database the saver has not created yet is left alone."""
+        path = str(tmp_path / "missing.db")
+        store = CheckpointStore(path)
+
+        report = store.apply_retention(lambda: [], keep_per_thread=2, vacuum_pages=0)
+
+        assert report["orphaned_threads_deleted"] == 0
+        assert report["reclaimed_bytes"] == 0
+        assert store.delete_thread("1_trip") == 0
+        assert not os.path.exists(path)
+
+    def test_live_sessions_not_loaded_without_threads(self, tmp_path):
+        """Test that the application database is not queried when there are no threads."""
+        path = str(tmp_path / "empty.db")
+        _create_checkpoint_db(path, {})
+
+        def loader():
+            raise AssertionError("should not be called")
+
+        report = CheckpointStore(path).apply_retention(loader, keep_per_thread=2, vacuum_pages=0)
+
+        assert report["threads"] == 0
+
+
+class TestCheckpointRetention:
+    """Test suite for the scheduled retention service."""
+
+    @pytest.fixture
+    def db_path(self, tmp_path):
+        """Create a checkpoint database with a live and an orphaned thread."""
+        path = str(tmp_path / "checkpoints.db")
+        _create_checkpoint_db(path, {"1_trip": 10, "2_deleted": 10})
+        return path
+
+    @pytest.fixture
+    def retention(self, db_path):
+        """Create a retention service over the test database."""
+        return CheckpointRetention(
+            config=CheckpointRetentionConfig(keep_per_thread=3, interval_seconds=0.05, vacuum_pages=0),
+            store_factory=lambda: CheckpointStore(db_path),
+            live_session_ids_loader=lambda: ["1_trip"]
+        )
+
+    # ===== POSITIVE TESTS =====
+
+    @pytest.mark.asyncio
+    async def test_run_once_reports(self, retention, db_path):
+        """Test that a run applies retention, reports and counts reclaimed bytes."""
+        reclaimed_before = CHECKPOINT_RECLAIMED_BYTES.labels().get()
+
+        report = await retention.run_once()
+
+        assert report["orphaned_threads_deleted"] == 1
+        assert report["checkpoints_pruned"] == 7
+        assert retention.get_last_report() == report
+        assert CHECKPOINT_RECLAIMED_BYTES.labels().get() - reclaimed_before == report["reclaimed_bytes"]
+        assert len(_checkpoint_ids(db_path, "1_trip")) == 3
+
+    @pytest.mark.asyncio
+    async def test_start_and_stop(self, retention):
+        """Test that the background task runs retention and stops cleanly."""
+        await retention.start()
+        for _ in range(50):
+            if retention.get_last_report():
+                break
+            await asyncio.sleep(0.02)
+
+        assert retention.is_running()
+        assert retention.get_last_report()["orphaned_threads_deleted"] == 1
+
+        await retention.stop()
+        assert not retention.is_running()
+
+    def test_config_reads_fractional_interval_from_env(self, monkeypatch):
+        """Test that a sub-second retention interval from the environment is kept."""
+        monkeypatch.setenv("CHECKPOINT_RETENTION_INTERVAL_SECONDS", "0.5")
+
+        assert CheckpointRetentionConfig().interval_seconds == 0.5
+
+    # ===== NEGATIVE TESTS =====
+
+    @pytest.mark.asyncio
+    async def test_loop_survives_failed_run(self, db_path):
+        """Test that a failing run is logged and the loop keeps going."""
+        calls = []
+
+        def loader():
+            calls.append(1)
+            raise RuntimeError("database unavailable")
+
+        retention = CheckpointRetention(
+            config=CheckpointRetentionConfig(keep_per_thread=3, interval_seconds=0.01, vacuum_pages=0),
+            store_factory=lambda: CheckpointStore(db_path),
+            live_session_ids_loader=loader
+        )
+        await retention.start()
+        for _ in range(50):
+            if len(calls) >= 2:
+                break
+            await asyncio.sleep(0.02)
+        await retention.stop()
+
+        assert len(calls) >= 2
+        assert retention.get_last_report() is None
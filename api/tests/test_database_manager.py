@@ -0,0 +1,248 @@
+"""
+Tests for DatabaseManager - Resource Layer
+Tests use temporary SQLite files to exercise table creation against existing schemas.
+"""
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+# Add src to path
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from resources.database import DatabaseManager, DatabaseConfig
+
+
+class TestDatabaseManager:
+    """Test suite for DatabaseManager schema management."""
+
+    @pytest.fixture
+    def database_url(self, tmp_path):
+        """Create a temporary SQLite database URL."""
+        return f"sqlite:///{tmp_path / 'flights.db'}"
+
+    def test_create_tables_adds_missing_nullable_columns(self, database_url):
+        """Test that columns added to a model are added to an existing table."""
+        engine = create_engine(database_url)
+        with engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE chatbot_messages (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, "
+                "session_id VARCHAR NOT NULL, user_message TEXT NOT NULL, bot_response TEXT, created_at DATETIME)"
+            ))
+            conn.execute(text(
+                "INSERT INTO chatbot_messages (user_id, session_id, user_message) VALUES (1, 's1', 'hello')"
+            ))
+        engine.dispose()
+
+        manager = DatabaseManager(DatabaseConfig(database_url=database_url))
+        manager.create_tables()
+
+        columns = {column["name"] for column in inspect(manager.engine).get_columns("chatbot_messages")}
+        assert "trace" in columns
+        with manager.engine.connect() as conn:
+            assert conn.execute(text("SELECT user_message, trace FROM chatbot_messages")).one() == ("hello", None)
+
+    def test_create_tables_is_idempotent(self, database_url):
+        """Test that creating tables twice leaves the schema unchanged."""
+        manager = DatabaseManager(DatabaseConfig(database_url=database_url))
+        manager.create_tables()
+        before = inspect(manager.engine).get_columns("chatbot_messages")
+
+        manager.create_tables()
+
+        assert [c["name"] for c in inspect(manager.engine).get_columns("chatbot_messages")] == [c["name"] for c in before]
+
+    def test_create_tables_adds_missing_indexes(self, database_url):
+        """Test that indexes added to a model are created on an existing table."""
+        engine = create_engine(database_url)
+        with engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE chat_sessions (id VARCHAR PRIMARY KEY, user_id INTEGER NOT NULL, "
+                "alias VARCHAR NOT NULL, created_at DATETIME, updated_at DATETIME)"
+            ))
+        engine.dispose()
+
+        manager = DatabaseManager(DatabaseConfig(database_url=database_url))
+        manager.create_tables()
+
+        indexes = {index["name"] for index in inspect(manager.engine).get_indexes("chat_sessions")}
+        assert "ix_chat_sessions_user_id_updated_at" in indexes
+
+    def test_create_tables_survives_unique_index_conflict(self, database_url):
+        """Test that existing duplicate rows do not stop startup when a unique index is added."""
+        engine = create_engine(database_url)
+        with engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE bookings (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, flight_id INTEGER NOT NULL, "
+                "status VARCHAR, booked_at DATETIME, cancelled_at DATETIME)"
+            ))
+            conn.execute(text(
+                "INSERT INTO bookings (user_id, flight_id, status) VALUES (1, 1, 'booked'), (1, 1, 'booked')"
+            ))
+        engine.dispose()
+
+        manager = DatabaseManager(DatabaseConfig(database_url=database_url))
+        manager.create_tables()
+
+        indexes = {index["name"] for index in inspect(manager.engine).get_indexes("bookings")}
+        assert "ix_bookings_user_id_booked_at" in indexes
+        assert "uq_bookings_user_id_flight_id_booked" not in indexes
+
+    def test_create_tables_backfills_seat_inventory(self, database_url):
+        """Test that flights from before seat tracking get a capacity minus their active bookings."""
+        engine = create_engine(database_url)
+        with engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE flights (id INTEGER PRIMARY KEY, origin VARCHAR NOT NULL, destination VARCHAR NOT NULL, "
+                "departure_time DATETIME NOT NULL, arrival_time DATETIME NOT NULL, airline VARCHAR NOT NULL, "
+                "status VARCHAR, price INTEGER NOT NULL)"
+            ))
+            conn.execute(text(
+                "INSERT INTO flights (id, origin, destination, departure_time, arrival_time, airline, status, price) "
+                "VALUES (1, 'MAD', 'LIS', '2026-06-01', '2026-06-01', 'Iberia', 'scheduled', 100), "
+                "(2, 'MAD', 'OPO', '2026-06-01', '2026-06-01', 'Iberia', 'scheduled', 100)"
+            ))
+            conn.execute(text(
+                "CREATE TABLE bookings (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, flight_id INTEGER NOT NULL, "
+                "status VARCHAR, booked_at DATETIME, cancelled_at DATETIME)"
+            ))
+            conn.execute(text(
+                "INSERT INTO bookings (user_id, flight_id, status) "
+                "VALUES (1, 1, 'booked'), (2, 1, 'booked'), (3, 1, 'cancelled')"
+            ))
+        engine.dispose()
+
+        manager = DatabaseManager(DatabaseConfig(database_url=database_url))
+        manager.create_tables()
+        manager.create_tables()
+
+        with manager.engine.connect() as conn:
+            rows = conn.execute(text("SELECT id, capacity, seats_available FROM flights ORDER BY id")).all()
+        assert rows == [(1, 180, 178), (2, 180, 180)]
+
+    def test_create_tables_backfills_fare_calendar(self, database_url):
+        """Test that an empty fare calendar is filled from existing scheduled flights."""
+        engine = create_engine(database_url)
+        with engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE flights (id INTEGER PRIMARY KEY, origin VARCHAR NOT NULL, destination VARCHAR NOT NULL, "
+                "departure_time DATETIME NOT NULL, arrival_time DATETIME NOT NULL, airline VARCHAR NOT NULL, "
+                "status VARCHAR, price INTEGER NOT NULL)"
+            ))
+            conn.execute(text(
+                "INSERT INTO flights (origin, destination, departure_time, arrival_time, airline, status, price) VALUES "
+                "('MAD', 'LIS', '2026-06-01 08:00:00.000000', '2026-06-01 09:00:00.000000', 'Iberia', 'scheduled', 120), "
+                "('mad', 'lis', '2026-06-01 18:00:00.000000', '2026-06-01 19:00:00.000000', 'TAP', 'scheduled', 90), "
+                "('MAD', 'LIS', '2026-06-01 12:00:00.000000', '2026-06-01 13:00:00.000000', 'Iberia', 'cancelled', 50), "
+                "('MAD', 'LIS', '2026-06-02 08:00:00.000000', '2026-06-02 09:00:00.000000', 'Iberia', 'scheduled', 150)"
+            ))
+        engine.dispose()
+
+        manager = DatabaseManager(DatabaseConfig(database_url=database_url))
+        manager.create_tables()
+        manager.create_tables()
+
+        with manager.engine.connect() as conn:
+            rows = conn.execute(text(
+                "SELECT day, min_price, flight_count FROM fare_calendar WHERE origin = 'Mad' AND destination = 'Lis' ORDER BY day"
+            )).all()
+        assert rows == [("2026-06-01", 90, 2), ("2026-06-02", 150, 1)]
+
+    def test_fare_calendar_backfill_skips_sold_out_flights(self, database_url):
+        """Test that the backfilled fare calendar only counts flights with free seats, as search does."""
+        manager = DatabaseManager(DatabaseConfig(database_url=database_url))
+        manager.create_tables()
+        with manager.engine.begin() as conn:
+            conn.execute(text(
+                "INSERT INTO flights (origin, destination, departure_time, arrival_time, airline, status, price, "
+                "capacity, seats_available) VALUES "
+                "('MAD', 'LIS', '2026-06-01 08:00:00.000000', '2026-06-01 09:00:00.000000', 'Iberia', 'scheduled', 90, 180, 0), "
+                "('MAD', 'LIS', '2026-06-01 18:00:00.000000', '2026-06-01 19:00:00.000000', 'TAP', 'scheduled', 120, 180, 3), "
+                "('MAD', 'LIS', '2026-06-02 08:00:00.000000', '2026-06-02 09:00:00.000000', 'Iberia', 'scheduled', 150, 180, 0)"
+            ))
+
+        manager.create_tables()
+
+        with manager.engine.connect() as conn:
+            rows = conn.execute(text("SELECT day, min_price, flight_count FROM fare_calendar ORDER BY day")).all()
+        assert rows == [("2026-06-01", 120, 1)]
+
+    def test_airport_code_backfill_rekeys_fare_calendar(self, database_url):
+        """Test that flights gaining airport codes have the fare calendar rebuilt under those codes."""
+        manager = DatabaseManager(DatabaseConfig(database_url=database_url))
+        manager.create_tables()
+        with manager.engine.begin() as conn:
+            conn.execute(text(
+                "INSERT INTO flights (origin, destination, departure_time, arrival_time, airline, status, price, "
+                "capacity, seats_available) VALUES "
+                "('Madrid', 'Lisbon', '2026-06-01 08:00:00.000000', '2026-06-01 09:00:00.000000', 'Iberia', 'scheduled', 90, 180, 180)"
+            ))
+            conn.execute(text(
+                "INSERT INTO fare_calendar (origin, destination, day, min_price, flight_count) "
+                "VALUES ('Madrid', 'Lisbon', '2026-06-01', 90, 1)"
+            ))
+
+        manager.create_tables()
+
+        with manager.engine.connect() as conn:
+            rows = conn.execute(text("SELECT origin, destination, day, min_price, flight_count FROM fare_calendar")).all()
+        assert rows == [("MAD", "LIS", "2026-06-01", 90, 1)]
+
+    def test_create_tables_indexes_existing_chat_messages(self, database_url):
+        """Test that the chat search index is built over messages written before it existed, and kept up after."""
+        engine = create_engine(database_url)
+        with engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE chatbot_messages (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, "
+                "session_id VARCHAR NOT NULL, user_message TEXT NOT NULL, bot_response TEXT, created_at DATETIME)"
+            ))
+            conn.execute(text(
+                "INSERT INTO chatbot_messages (user_id, session_id, user_message, bot_response) VALUES "
+                "(1, 's1', 'Flights to Madrid', 'Three flights'), (2, 's2', 'Hello', 'Madrid is sunny')"
+            ))
+        engine.dispose()
+
+        manager = DatabaseManager(DatabaseConfig(database_url=database_url))
+        manager.create_tables()
+        manager.create_tables()
+
+        search = text("SELECT rowid FROM chatbot_messages_fts WHERE chatbot_messages_fts MATCH :match ORDER BY rowid")
+        with manager.engine.begin() as conn:
+            assert conn.execute(search, {"match": "madrid"}).scalars().all() == [1, 2]
+            conn.execute(text("INSERT INTO chatbot_messages (user_id, session_id, user_message) VALUES (1, 's1', 'Madrid again')"))
+            assert conn.execute(search, {"match": 'user_id:"1" AND madrid'}).scalars().all() == [1, 3]
+            conn.execute(text("INSERT INTO chatbot_messages_fts(chatbot_messages_fts, rank) VALUES ('integrity-check', 1)"))
+
+    def test_create_tables_seeds_reference_airports(self, database_url):
+        """Test that reference airports and their lookup names are inserted once."""
+        manager = DatabaseManager(DatabaseConfig(database_url=database_url))
+        manager.create_tables()
+        manager.create_tables()
+
+        with manager.engine.connect() as conn:
+            assert conn.execute(text("SELECT city, country FROM airports WHERE code = 'MAD'")).one() == ("Madrid", "Spain")
+            aliases = conn.execute(text("SELECT alias FROM airport_aliases WHERE code = 'MAD' ORDER BY alias")).scalars().all()
+        assert aliases == ["barajas", "mad", "madrid"]
+
+    def test_create_tables_backfills_airport_codes(self, database_url):
+        """Test that flights naming one airport get its code and other flights keep none."""
+        engine = create_engine(database_url)
+        with engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE flights (id INTEGER PRIMARY KEY, origin VARCHAR NOT NULL, destination VARCHAR NOT NULL, "
+                "departure_time DATETIME NOT NULL, arrival_time DATETIME NOT NULL, airline VARCHAR NOT NULL, "
+                "status VARCHAR, price INTEGER NOT NULL)"
+            ))
+            conn.execute(text(
+                "INSERT INTO flights (origin, destination, departure_time, arrival_time, airline, status, price) VALUES "
+                "('MAD', 'Lisboa', '2026-06-01 08:00:00.000000', '2026-06-01 09:00:00.000000', 'Iberia', 'scheduled', 120), "
+                "(' madrid ', 'Atlantis', '2026-06-01 18:00:00.000000', '2026-06-01 19:00:00.000000', 'TAP', 'scheduled', 90)"
+            ))
+        engine.dispose()
+
+        manager = DatabaseManager(DatabaseConfig(database_url=database_url))
+        manager.create_tables()
+
+        with manager.engine.connect() as conn:
+            rows = conn.execute(text("SELECT origin_code, destination_code FROM flights ORDER BY id")).all()
+        assert rows == [("MAD", "LIS"), ("MAD", None)]
@@ -20,6 +20,7 @@ from exceptions import (
     UserNotFoundError,
     FlightNotFoundError,
     BookingNotFoundError,
+    FlightSoldOutError,
     AgentInvocationFailedError,
     InvalidAudioFileError
 )
@@ -76,6 +77,13 @@ class TestErrorHandlers:
         assert http_exc.status_code == 404
         assert http_exc.detail["error_code"] == "BOOKING_NOT_FOUND"
     
+    def test_api_exception_to_http_exception_conflict(self):
+        """Test conversion of a sold-out flight to a 409 HTTPException."""
+        http_exc = api_exception_to_http_exception(FlightSoldOutError(456))
+        assert http_exc.status_code == 409
+        assert http_exc.detail["error_code"] == "FLIGHT_SOLD_OUT"
+        assert http_exc.detail["details"]["flight_id"] == 456
+    
     def test_api_exception_to_http_exception_internal_server_error(self):
         """Test conversion of internal server errors to HTTPException."""
         api_exc = AgentInvocationFailedError(123, "Chat agent failed")
@@ -0,0 +1,159 @@
+"""
+Tests for FfmpegProbe - Resource Layer
+Tests mock subprocess execution to focus on caching and refresh behavior.
+"""
+import pytest
+import subprocess
+import threading
+from unittest.mock import Mock, patch
+
+# Add src to path
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from resources.ffmpeg import FfmpegProbe, FfmpegConfig
+
+
+class TestFfmpegProbe:
+    """Test suite for FfmpegProbe with mocked subprocess calls."""
+
+    @pytest.fixture
+    def probe(self):
+        """Create an ffmpeg probe with a long refresh interval."""
+        probe = FfmpegProbe(FfmpegConfig(refresh_interval_seconds=3600))
+        yield probe
+        probe.shutdown()
+
+    @pytest.fixture
+    def ffmpeg_ok(self):
+        """Mock a successful ffmpeg -version call."""
+        return Mock(returncode=0, stdout="ffmpeg version 6.0\nbuilt with gcc", stderr="")
+
+    # ===== POSITIVE TESTS =====
+
+    def test_initialize_probes_once(self, probe, ffmpeg_ok):
+        """Test that initialization runs a single probe."""
+        with patch("resources.ffmpeg.subprocess.run", return_value=ffmpeg_ok) as mock_run:
+            probe.initialize()
+
+            assert probe.is_initialized() is True
+            assert mock_run.call_count == 1
+
+    def test_get_status_serves_cached_snapshot(self, probe, ffmpeg_ok):
+        """Test that repeated status reads do not spawn new processes."""
+        with patch("resources.ffmpeg.subprocess.run", return_value=ffmpeg_ok) as mock_run:
+            probe.initialize()
+
+            for _ in range(10):
+                status = probe.get_status()
+
+            assert mock_run.call_count == 1
+            assert status["available"] is True
+            assert status["version"] == "ffmpeg version 6.0"
+            assert "checked_at" in status
+
+    def test_get_status_force_refresh_probes_again(self, ffmpeg_ok):
+        """Test that a forced refresh runs a fresh probe once the minimum interval has passed."""
+        probe = FfmpegProbe(FfmpegConfig(refresh_interval_seconds=3600, min_forced_interval_seconds=0))
+        try:
+            with patch("resources.ffmpeg.subprocess.run", return_value=ffmpeg_ok) as mock_run:
+                probe.initialize()
+                probe.get_status(force_refresh=True)
+
+                assert mock_run.call_count == 2
+        finally:
+            probe.shutdown()
+
+    def test_get_status_probes_lazily_when_not_initialized(self, probe, ffmpeg_ok):
+        """Test that reading status before initialization still probes once."""
+        with patch("resources.ffmpeg.subprocess.run", return_value=ffmpeg_ok) as mock_run:
+            probe.get_status()
+            probe.get_status()
+
+            assert mock_run.call_count == 1
+
+    def test_background_refresh_updates_snapshot(self, ffmpeg_ok):
+        """Test that the background thread refreshes the cached status."""
+        probe = FfmpegProbe(FfmpegConfig(refresh_interval_seconds=1))
+        try:
+            with patch("resources.ffmpeg.subprocess.run", return_value=ffmpeg_ok) as mock_run:
+                probe.initialize()
+                probe._stop_event.wait(1.5)
+
+                assert mock_run.call_count >= 2
+        finally:
+            probe.shutdown()
+
+    def test_config_reads_min_forced_interval_from_env(self, monkeypatch):
+        """Test that the forced probe interval is read from the environment."""
+        monkeypatch.setenv("FFMPEG_PROBE_MIN_FORCED_INTERVAL_SECONDS", "2.5")
+
+        assert FfmpegConfig().min_forced_interval_seconds == 2.5
+
+    # ===== NEGATIVE TESTS =====
+
+    def test_forced_refresh_within_interval_serves_cache(self, probe, ffmpeg_ok):
+        """Test that repeated forced refreshes cannot spawn a process per request."""
+        with patch("resources.ffmpeg.subprocess.run", return_value=ffmpeg_ok) as mock_run:
+            probe.initialize()
+
+            for _ in range(10):
+                status = probe.get_status(force_refresh=True)
+
+            assert mock_run.call_count == 1
+            assert status["available"] is True
+
+    def test_concurrent_forced_refreshes_share_one_probe(self, ffmpeg_ok):
+        """Test that a burst of forced refreshes after the interval runs a single probe."""
+        probe = FfmpegProbe(FfmpegConfig(refresh_interval_seconds=3600, min_forced_interval_seconds=60))
+        with patch("resources.ffmpeg.subprocess.run", return_value=ffmpeg_ok) as mock_run:
+            probe.refresh()
+            probe._probed_monotonic -= 60
+            threads = [threading.Thread(target=probe.get_status, kwargs={"force_refresh": True}) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            assert mock_run.call_count == 2
+
+    def test_probe_ffmpeg_not_found(self, probe):
+        """Test status when the ffmpeg binary is missing."""
+        with patch("resources.ffmpeg.subprocess.run", side_effect=FileNotFoundError()):
+            status = probe.get_status()
+
+            assert status["available"] is False
+            assert status["status"] == "not_found"
+
+    def test_probe_ffmpeg_timeout(self, probe):
+        """Test status when the ffmpeg probe times out."""
+        with patch("resources.ffmpeg.subprocess.run", side_effect=subprocess.TimeoutExpired("ffmpeg", 5)):
+            status = probe.get_status()
+
+            assert status["available"] is False
+            assert status["status"] == "timeout"
+
+    def test_probe_ffmpeg_command_failed(self, probe):
+        """Test status when ffmpeg exits with an error."""
+        failed = Mock(returncode=1, stdout="", stderr="boom")
+        with patch("resources.ffmpeg.subprocess.run", return_value=failed):
+            status = probe.get_status()
+
+            assert status["available"] is False
+            assert status["status"] == "command_failed"
+            assert status["error"] == "boom"
+
+    # ===== EDGE CASES =====
+
+    def test_shutdown_stops_refresh_thread(self, ffmpeg_ok):
+        """Test that shutdown stops the background thread."""
+        probe = FfmpegProbe(FfmpegConfig(refresh_interval_seconds=3600))
+        with patch("resources.ffmpeg.subprocess.run", return_value=ffmpeg_ok):
+            probe.initialize()
+            thread = probe._refresh_thread
+            probe.shutdown()
+
+            assert thread is not None
+            assert not thread.is_alive()
+            assert probe.is_initialized() is False
@@ -0,0 +1,221 @@
+"""
+Tests for FlightCatalog - Resource Layer
+Checks that the in-memory catalog answers flight search and listing exactly like the
+SQLite repository, before and after incremental refreshes.
+"""
+import pytest
+import os
+import sys
+import random
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from models import Base, Flight, User, Airport, AirportAlias
+from repository.flight import FlightSqliteRepository, FlightCatalogSqliteRepository, create_flight_repository
+from repository.booking import BookingSqliteRepository
+from resources.flight_catalog import FlightCatalog, FlightCatalogConfig
+
+DAY = datetime(2026, 6, 1)
+CITIES = ["New York", "new york city", "Los Angeles", "São Paulo", "SÃO PAULO", "Chicago", "Miami", "Ho_Chi Minh"]
+AIRLINES = ["American Airlines", "Delta", "delta connection", "United"]
+STATUSES = ["scheduled"] * 6 + ["cancelled", "delayed"]
+
+SEARCHES = [
+    {},
+    {"origin": "new"},
+    {"origin": "NEW YORK", "destination": "a"},
+    {"origin": "são"},
+    {"origin": "SÃO"},
+    {"destination": "ho_"},
+    {"destination": "o%a"},
+    {"airline": "DELTA"},
+    {"departure_date": "2026-06-02"},
+    {"departure_date": "2026-06-09"},
+    {"departure_date": "2026-06-03", "origin": "i"},
+    {"min_price": 150, "max_price": 400},
+    {"max_price": 99},
+    {"departure_hour_from": 6, "departure_hour_to": 11},
+    {"departure_hour_from": 22, "departure_hour_to": 4},
+    {"departure_hour_to": 2},
+    {"sort_by": "price"},
+    {"sort_by": "price", "origin": "chicago", "page": 2, "size": 3},
+    {"sort_by": "duration"},
+    {"sort_by": "duration", "departure_date": "2026-06-04", "min_price": 200},
+    {"page": 3, "size": 7},
+    {"page": 100, "size": 10},
+]
+
+
+class TestFlightCatalog:
+    """Parity test suite for the flight catalog against FlightSqliteRepository."""
+
+    @pytest.fixture
+    def db_session(self):
+        """Create an in-memory SQLite database session."""
+        engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+
+        TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    @pytest.fixture
+    def sqlite_repo(self, db_session):
+        """Create the SQLite flight repository, seeded with random flights over a week."""
+        repo = FlightSqliteRepository(db_session)
+        rng = random.Random(48)
+        for _ in range(120):
+            departure = DAY + timedelta(days=rng.randrange(7), minutes=rng.randrange(0, 24 * 60, 15))
+            repo.create(
+                origin=rng.choice(CITIES), destination=rng.choice(CITIES),
+                departure_time=departure, arrival_time=departure + timedelta(minutes=rng.randrange(60, 900, 30)),
+                airline=rng.choice(AIRLINES), price=rng.randrange(50, 600, 25), status=rng.choice(STATUSES)
+            )
+        db_session.execute(update(Flight).where(Flight.id % 9 == 0).values(seats_available=0))
+        db_session.commit()
+        return repo
+
+    @pytest.fixture
+    def catalog_repo(self, db_session):
+        """Create the catalog-backed repository with its own catalog."""
+        return FlightCatalogSqliteRepository(db_session, FlightCatalog(FlightCatalogConfig(enabled=True)))
+
+    def _assert_parity(self, sqlite_repo, catalog_repo):
+        for search in SEARCHES:
+            expected, expected_total = sqlite_repo.search_flights(**search)
+            actual, actual_total = catalog_repo.search_flights(**search)
+
+            assert actual_total == expected_total, search
+            if search.get("sort_by") == "duration":
+                # Durations are compared as julianday floats in SQL, so equal durations may tie either way
+                assert [f.arrival_time - f.departure_time for f in actual] == \
+                       [f.arrival_time - f.departure_time for f in expected], search
+            else:
+                assert [f.id for f in actual] == [f.id for f in expected], search
+        for page in (1, 2, 13):
+            expected, expected_total = sqlite_repo.list_all(page=page, size=10)
+            actual, actual_total = catalog_repo.list_all(page=page, size=10)
+            assert actual_total == expected_total
+            assert [f.id for f in actual] == [f.id for f in expected]
+
+    # ===== POSITIVE TESTS =====
+
+    def test_search_parity(self, sqlite_repo, catalog_repo):
+        """Test that every search returns the same flights, totals and order as SQLite."""
+        self._assert_parity(sqlite_repo, catalog_repo)
+
+    def test_snapshot_fields(self, sqlite_repo, catalog_repo):
+        """Test that catalog rows carry the same values as the flight rows."""
+        flights, _ = catalog_repo.list_all(page=1, size=5)
+
+        for flight in flights:
+            row = sqlite_repo.find_by_id(flight.id)
+            assert (flight.origin, flight.destination, flight.departure_time, flight.arrival_time,
+                    flight.airline, flight.status, flight.price, flight.seats_available) == \
+                   (row.origin, row.destination, row.departure_time, row.arrival_time,
+                    row.airline, row.status, row.price, row.seats_available)
+
+    def test_parity_after_writes(self, db_session, sqlite_repo, catalog_repo):
+        """Test that status changes, bookings and new flights are picked up by the next search."""
+        self._assert_parity(sqlite_repo, catalog_repo)
+
+        user = User(name="catalog", email="catalog@example.com", password_hash="x")
+        db_session.add(user)
+        db_session.commit()
+        bookings = BookingSqliteRepository(db_session)
+        scheduled = db_session.query(Flight).filter(Flight.status == "scheduled", Flight.seats_available > 0).limit(3).all()
+        for flight in scheduled:
+            db_session.execute(update(Flight).where(Flight.id == flight.id).values(seats_available=1))
+        db_session.commit()
+        assert bookings.create_if_available(user.id, scheduled[0].id) is not None
+        db_session.execute(update(Flight).where(Flight.id == scheduled[1].id).values(status="cancelled"))
+        db_session.commit()
+        sqlite_repo.create(origin="Chicago", destination="Miami", departure_time=DAY + timedelta(hours=3),
+                           arrival_time=DAY + timedelta(hours=6), airline="United", price=55)
+
+        self._assert_parity(sqlite_repo, catalog_repo)
+
+    def test_parity_after_reschedule(self, db_session, sqlite_repo, catalog_repo):
+        """Test that a flight moved to another departure time is re-sorted."""
+        self._assert_parity(sqlite_repo, catalog_repo)
+
+        flight = db_session.query(Flight).order_by(Flight.departure_time.desc()).first()
+        flight.departure_time = DAY - timedelta(hours=1)
+        db_session.commit()
+
+        self._assert_parity(sqlite_repo, catalog_repo)
+        flights, _ = catalog_repo.list_all(page=1, size=200)
+        assert {f.id: f.departure_time for f in flights}[flight.id] == DAY - timedelta(hours=1)
+
+    def test_refresh_fetches_only_changed_flights(self, db_session, sqlite_repo, catalog_repo):
+        """Test that a refresh after a write loads only the rows with a newer version."""
+        catalog_repo.search_flights()
+        version = catalog_repo.catalog.version()
+        loaded = []
+        original = catalog_repo._flights_written_after
+        catalog_repo._flights_written_after = lambda after: loaded.append(after) or original(after)
+
+        catalog_repo.search_flights()
+        assert loaded == []
+
+        db_session.execute(update(Flight).where(Flight.id == 1).values(status="delayed"))
+        db_session.commit()
+        catalog_repo.search_flights()
+        assert loaded == [version]
+        assert catalog_repo.catalog.version() > version
+
+    def test_create_flight_repository_uses_config(self, db_session, monkeypatch):
+        """Test that the catalog repository is only selected when enabled."""
+        from repository import flight as flight_module
+        monkeypatch.setattr(flight_module, "flight_catalog", FlightCatalog(FlightCatalogConfig(enabled=False)))
+        assert type(create_flight_repository(db_session)) is FlightSqliteRepository
+
+        monkeypatch.setattr(flight_module, "flight_catalog", FlightCatalog(FlightCatalogConfig(enabled=True)))
+        assert type(create_flight_repository(db_session)) is FlightCatalogSqliteRepository
+
+    def test_config_reads_environment(self, monkeypatch):
+        """Test the FLIGHT_CATALOG_ENABLED switch."""
+        monkeypatch.setenv("FLIGHT_CATALOG_ENABLED", "true")
+        assert FlightCatalogConfig().enabled is True
+        monkeypatch.setenv("FLIGHT_CATALOG_ENABLED", "0")
+        assert FlightCatalogConfig().enabled is False
+
+    def test_parity_with_airport_codes(self, db_session, catalog_repo):
+        """Test that names resolving to airports are matched by code, like the SQLite search."""
+        for code, city, aliases in [("JFK", "New York", ["jfk", "new york", "nyc"]), ("LAX", "Los Angeles", ["lax", "los angeles"])]:
+            db_session.add(Airport(code=code, city=city, country="United States",
+                                   aliases=[AirportAlias(alias=alias) for alias in aliases]))
+        db_session.commit()
+        sqlite_repo = FlightSqliteRepository(db_session)
+        for hour, origin, destination in [(8, "JFK", "LAX"), (9, "nyc", "Los Angeles"), (10, "New York City", "LA"),
+                                          (11, "Los Angeles", "New York")]:
+            sqlite_repo.create(origin=origin, destination=destination, departure_time=DAY + timedelta(hours=hour),
+                               arrival_time=DAY + timedelta(hours=hour + 5), airline="Delta", price=300)
+
+        for origin, destination in [("New York", None), ("NYC", "lax"), ("york", None), (None, "los angeles"), (None, "la")]:
+            expected, expected_total = sqlite_repo.search_flights(origin, destination)
+            actual, actual_total = catalog_repo.search_flights(origin, destination)
+            assert ([f.id for f in actual], actual_total) == ([f.id for f in expected], expected_total)
+        assert catalog_repo.search_flights("New York")[1] == 2
+
+    # ===== NEGATIVE TESTS =====
+
+    def test_invalid_date(self, sqlite_repo, catalog_repo):
+        """Test that a malformed date is rejected like the SQLite search rejects it."""
+        with pytest.raises(ValueError, match="Invalid date format"):
+            catalog_repo.search_flights(departure_date="2026/06/01")
+
+    # ===== EDGE CASES =====
+
+    def test_empty_catalog(self, db_session, catalog_repo):
+        """Test searching before any flight exists."""
+        assert catalog_repo.search_flights(origin="New York") == ([], 0)
+        assert catalog_repo.list_all() == ([], 0)
+        assert catalog_repo.catalog.is_loaded()
@@ -5,14 +5,14 @@ Tests use in-memory SQLite database to ensure data isolation.
 import pytest
 import os
 import sys
-from datetime import datetime, timezone, timedelta
+from datetime import date, datetime, timezone, timedelta
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 # Add src to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from models import Base, Flight
+from models import Base, Flight, Airport, AirportAlias
 from repository.flight import FlightSqliteRepository
 
 
@@ -37,6 +37,19 @@ class TestFlightRepository:
         """Create FlightRepository instance with test database session."""
         return FlightSqliteRepository(db_session)
     
+    @pytest.fixture
+    def airports(self, db_session):
+        """Add New York (two airports), Los Angeles and Chicago to the airports table."""
+        for code, city, aliases in [
+            ("JFK", "New York", ["jfk", "new york", "kennedy"]),
+            ("LGA", "New York", ["lga", "new york"]),
+            ("LAX", "Los Angeles", ["lax", "los angeles", "la"]),
+            ("ORD", "Chicago", ["ord", "chicago"]),
+        ]:
+            db_session.add(Airport(code=code, city=city, country="United States",
+                                   aliases=[AirportAlias(alias=alias) for alias in aliases]))
+        db_session.commit()
+    
     @pytest.fixture
     def sample_flight_data(self):
         """Sample flight data for testing."""
@@ -177,6 +190,40 @@ class TestFlightRepository:
         assert flights[0].id == scheduled_flight.id
         assert flights[0].status == "scheduled"
     
+    def test_search_flights_excludes_sold_out(self, flight_repo, db_session, sample_flight_data):
+        """Test that search skips flights without seats left."""
+        available = flight_repo.create(**sample_flight_data)
+        sold_out = flight_repo.create(**sample_flight_data, capacity=2)
+        sold_out.seats_available = 0
+        db_session.commit()
+        
+        flights, total = flight_repo.search_flights("New York", "Los Angeles", "2025-12-25")
+        
+        assert [flight.id for flight in flights] == [available.id]
+        assert total == 1
+    
+    def test_create_flight_seat_inventory(self, flight_repo, sample_flight_data):
+        """Test that a new flight starts with every seat available."""
+        default = flight_repo.create(**sample_flight_data)
+        small = flight_repo.create(**sample_flight_data, capacity=50)
+        
+        assert (default.capacity, default.seats_available) == (180, 180)
+        assert (small.capacity, small.seats_available) == (50, 50)
+    
+    def test_create_flight_updates_fare_calendar(self, flight_repo, sample_flight_data):
+        """Test that each new scheduled flight updates its route's cheapest fare for the day."""
+        flight_repo.create(**sample_flight_data)
+        flight_repo.create(**{**sample_flight_data, "price": 199})
+        flight_repo.create(**{**sample_flight_data, "price": 99, "status": "cancelled"})
+        flight_repo.create(**{**sample_flight_data, "departure_time": datetime(2025, 12, 27, 10, 0, 0, tzinfo=timezone.utc)})
+        
+        calendar = flight_repo.get_fare_calendar("new york", "LOS ANGELES", date(2025, 12, 1), date(2025, 12, 31))
+        
+        assert [(day.day, day.min_price, day.flight_count) for day in calendar] == [
+            (date(2025, 12, 25), 199, 2),
+            (date(2025, 12, 27), 299, 1),
+        ]
+    
     def test_find_available_by_id_success(self, flight_repo, sample_flight_data):
         """Test finding available (scheduled) flight by ID."""
         created_flight = flight_repo.create(**sample_flight_data)
@@ -186,6 +233,102 @@ class TestFlightRepository:
         assert found_flight.id == created_flight.id
         assert found_flight.status == "scheduled"
     
+    def test_find_available_by_ids(self, flight_repo, sample_flight_data, sample_flight_data_2):
+        """Test that only scheduled flights among the IDs are returned."""
+        scheduled = flight_repo.create(**sample_flight_data)
+        sample_flight_data_2["status"] = "cancelled"
+        cancelled = flight_repo.create(**sample_flight_data_2)
+        
+        found = flight_repo.find_available_by_ids([scheduled.id, cancelled.id, 999])
+        
+        assert [flight.id for flight in found] == [scheduled.id]
+        assert flight_repo.find_available_by_ids([]) == []
+    
+    def test_search_flights_filters(self, flight_repo, sample_flight_data):
+        """Test the price range, airline and departure hour filters."""
+        def create(hour, price, airline="American Airlines"):
+            departure = datetime(2025, 12, 25, hour, 0, 0, tzinfo=timezone.utc)
+            return flight_repo.create(**{**sample_flight_data, "departure_time": departure,
+                                         "arrival_time": departure + timedelta(hours=3), "price": price, "airline": airline})
+        morning, noon, night = create(7, 150), create(12, 300, "Delta Air Lines"), create(23, 450)
+        
+        def ids(**filters):
+            flights, total = flight_repo.search_flights(departure_date="2025-12-25", **filters)
+            assert total == len(flights)
+            return [flight.id for flight in flights]
+        
+        assert ids(min_price=200) == [noon.id, night.id]
+        assert ids(max_price=300) == [morning.id, noon.id]
+        assert ids(min_price=200, max_price=400) == [noon.id]
+        assert ids(airline="delta") == [noon.id]
+        assert ids(departure_hour_from=6, departure_hour_to=12) == [morning.id, noon.id]
+        assert ids(departure_hour_from=22, departure_hour_to=8) == [morning.id, night.id]
+        assert ids(departure_hour_from=20) == [night.id]
+    
+    def test_search_flights_sort_orders(self, flight_repo, sample_flight_data):
+        """Test sorting by departure, price and duration, with pagination following the order."""
+        def create(hour, price, hours):
+            departure = datetime(2025, 12, 25, hour, 0, 0, tzinfo=timezone.utc)
+            return flight_repo.create(**{**sample_flight_data, "departure_time": departure,
+                                         "arrival_time": departure + timedelta(hours=hours), "price": price})
+        first = create(6, 400, 5)
+        second = create(9, 200, 2)
+        third = create(15, 100, 7)
+        
+        def ids(sort_by, page=1, size=10):
+            return [flight.id for flight in flight_repo.search_flights(page=page, size=size, sort_by=sort_by)[0]]
+        
+        assert ids("departure") == [first.id, second.id, third.id]
+        assert ids("price") == [third.id, second.id, first.id]
+        assert ids("duration") == [second.id, first.id, third.id]
+        assert ids("price", page=2, size=2) == [first.id]
+    
+    def test_search_flights_between(self, flight_repo, sample_flight_data, sample_flight_data_2):
+        """Test that a day window returns matching flights from every day in it, earliest first."""
+        late = flight_repo.create(**{**sample_flight_data, "departure_time": datetime(2025, 12, 27, 23, 0, 0, tzinfo=timezone.utc),
+                                     "arrival_time": datetime(2025, 12, 28, 2, 0, 0, tzinfo=timezone.utc)})
+        early = flight_repo.create(**sample_flight_data)
+        flight_repo.create(**{**sample_flight_data, "departure_time": datetime(2025, 12, 28, 0, 0, 0, tzinfo=timezone.utc),
+                              "arrival_time": datetime(2025, 12, 28, 3, 0, 0, tzinfo=timezone.utc)})
+        miami = flight_repo.create(**sample_flight_data_2)
+        
+        found = flight_repo.search_flights_between("new york", None, date(2025, 12, 24), date(2025, 12, 27))
+        
+        assert [flight.id for flight in found] == [early.id, late.id]
+        everything = flight_repo.search_flights_between(None, None, date(2025, 12, 25), date(2025, 12, 26))
+        assert [flight.id for flight in everything] == [early.id, miami.id]
+    
+    def test_search_flights_many(self, flight_repo, sample_flight_data, sample_flight_data_2):
+        """Test that one query answers several routes, each with its own matches in departure order."""
+        late = flight_repo.create(**{**sample_flight_data, "departure_time": datetime(2025, 12, 25, 18, 0, 0, tzinfo=timezone.utc),
+                                     "arrival_time": datetime(2025, 12, 25, 21, 0, 0, tzinfo=timezone.utc)})
+        early = flight_repo.create(**sample_flight_data)
+        miami = flight_repo.create(**sample_flight_data_2)
+        flight_repo.create(**{**sample_flight_data, "status": "cancelled"})
+        
+        results = flight_repo.search_flights_many([
+            ("new york", "los", date(2025, 12, 25)),
+            ("Chicago", "Miami", date(2025, 12, 26)),
+            ("Chicago", "Miami", date(2025, 12, 25)),
+            ("York", "Angeles", date(2025, 12, 25)),
+        ])
+        
+        assert [[flight.id for flight in flights] for flights in results] == [
+            [early.id, late.id], [miami.id], [], [early.id, late.id]
+        ]
+        assert flight_repo.search_flights_many([]) == []
+    
+    def test_find_scheduled_departing_after(self, flight_repo, sample_flight_data, sample_flight_data_2):
+        """Test that only scheduled flights from the given time are returned, earliest first."""
+        later = flight_repo.create(**sample_flight_data_2)
+        earlier = flight_repo.create(**sample_flight_data)
+        flight_repo.create(**{**sample_flight_data, "status": "cancelled"})
+        
+        found = flight_repo.find_scheduled_departing_after(datetime(2025, 12, 25))
+        
+        assert [flight.id for flight in found] == [earlier.id, later.id]
+        assert [flight.id for flight in flight_repo.find_scheduled_departing_after(datetime(2025, 12, 26))] == [later.id]
+    
     def test_search_flights_date_range(self, flight_repo, sample_flight_data, sample_flight_data_2):
         """Test that search includes all flights within the specified date."""
         # Create flights at different times on same date
@@ -205,6 +348,63 @@ class TestFlightRepository:
         assert flight1.id in flight_ids
         assert flight2.id in flight_ids
     
+    def test_create_flight_resolves_airport_codes(self, flight_repo, airports, sample_flight_data):
+        """Test that a name of exactly one airport gets its code and an ambiguous or unknown one none."""
+        flight = flight_repo.create(**{**sample_flight_data, "origin": "LAX", "destination": "Chicago"})
+        assert (flight.origin_code, flight.destination_code) == ("LAX", "ORD")
+        
+        flight = flight_repo.create(**sample_flight_data)
+        assert (flight.origin_code, flight.destination_code) == (None, "LAX")
+        
+        flight = flight_repo.create(**{**sample_flight_data, "origin": "Boston"})
+        assert flight.origin_code is None
+    
+    def test_search_flights_by_airport_name(self, flight_repo, airports, sample_flight_data):
+        """Test that codes, cities and aliases match by airport code and other text by substring."""
+        by_code = flight_repo.create(**{**sample_flight_data, "origin": "JFK", "destination": "LAX"})
+        by_city = flight_repo.create(**{**sample_flight_data, "origin": "Kennedy", "destination": "Los Angeles"})
+        # Names no single airport: kept as text only
+        by_text = flight_repo.create(**{**sample_flight_data, "origin": "New York", "destination": "Los Angeles Intl"})
+        
+        def ids(origin=None, destination=None):
+            return sorted(flight.id for flight in flight_repo.search_flights(origin, destination)[0])
+        
+        assert ids("jfk") == [by_code.id, by_city.id]
+        assert ids("Kennedy", "LA") == [by_code.id, by_city.id]
+        assert ids("New York") == [by_code.id, by_city.id]
+        assert ids("York") == [by_text.id]
+        assert ids(destination="angeles") == [by_city.id, by_text.id]
+    
+    def test_search_flights_many_by_airport_name(self, flight_repo, airports, sample_flight_data):
+        """Test that batch routes resolve airport names the same way."""
+        jfk = flight_repo.create(**{**sample_flight_data, "origin": "JFK"})
+        
+        results = flight_repo.search_flights_many([
+            ("kennedy", "Los Angeles", date(2025, 12, 25)),
+            ("Chicago", "Los Angeles", date(2025, 12, 25)),
+        ])
+        
+        assert [[flight.id for flight in flights] for flights in results] == [[jfk.id], []]
+    
+    def test_get_fare_calendar_by_airport_name(self, flight_repo, airports, sample_flight_data):
+        """Test that the calendar is keyed on airport codes and looked up by code, city or alias."""
+        flight_repo.create(**{**sample_flight_data, "origin": "JFK", "destination": "LAX"})
+        flight_repo.create(**{**sample_flight_data, "origin": "Kennedy", "destination": "Los Angeles", "price": 249})
+        flight_repo.create(**{**sample_flight_data, "origin": "LGA", "destination": "la", "price": 199})
+        # "New York" names two airports, so this flight is kept under its text
+        flight_repo.create(**{**sample_flight_data, "destination": "LAX", "price": 150})
+        day = date(2025, 12, 25)
+        
+        def calendar(origin, destination):
+            return [(d.min_price, d.flight_count) for d in flight_repo.get_fare_calendar(origin, destination, day, day)]
+        
+        assert calendar("jfk", "Los Angeles") == [(249, 2)]
+        assert calendar("Kennedy", "LA") == [(249, 2)]
+        assert calendar("LGA", "LAX") == [(199, 1)]
+        # Both New York airports and the flight without a code, merged into one day
+        assert calendar("New York", "Los Angeles") == [(150, 4)]
+        assert calendar("Chicago", "Los Angeles") == []
+    
     # ===== NEGATIVE TESTS =====
     
     def test_find_by_id_not_found(self, flight_repo):
@@ -253,6 +453,14 @@ class TestFlightRepository:
         found_flight = flight_repo.find_available_by_id(999)
         assert found_flight is None
     
+    def test_get_fare_calendar_other_route_and_range(self, flight_repo, sample_flight_data, sample_flight_data_2):
+        """Test that the calendar only returns the requested route and days."""
+        flight_repo.create(**sample_flight_data)
+        flight_repo.create(**sample_flight_data_2)
+        
+        assert flight_repo.get_fare_calendar("Los Angeles", "New York", date(2025, 12, 1), date(2025, 12, 31)) == []
+        assert flight_repo.get_fare_calendar("New York", "Los Angeles", date(2025, 12, 26), date(2025, 12, 31)) == []
+    
     def test_list_all_empty(self, flight_repo):
         """Test listing flights when no flights exist."""
         all_flights, total = flight_repo.list_all()
@@ -15,9 +15,12 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from routers.flights import router
 from services.flight import FlightService, create_flight_service
-from schemas.flight import FlightResponse, FlightCreate, PaginatedResponse
+from schemas.flight import (
+    FlightResponse, FlightCreate, PaginatedResponse, FareCalendarResponse, FareCalendarDayResponse, ItineraryResponse,
+    FlightSearchBatchResult, FlightSearchResponse, FlightSearchDay, FlightSearchFilters
+)
 from models import User, Flight
-from exceptions import InvalidDateFormatError
+from exceptions import InvalidDateFormatError, InvalidLayoverWindowError
 from resources.dependencies import get_current_user
 
 
@@ -141,7 +144,7 @@ class TestFlightRouter:
         assert data["items"][1]["origin"] == "Chicago"
         
         # Verify service was called with new signature
-        mock_flight_service.search_flights.assert_called_once_with("New York", "Los Angeles", "2025-12-25", 1, 10)
+        mock_flight_service.search_flights.assert_called_once_with("New York", "Los Angeles", "2025-12-25", 1, 10, 0, FlightSearchFilters())
     
     def test_search_flights_empty_result(self, client, mock_flight_service):
         """Test flight search with no results."""
@@ -165,7 +168,7 @@ class TestFlightRouter:
         assert len(data["items"]) == 0
         
         # Verify service was called with new signature
-        mock_flight_service.search_flights.assert_called_once_with("Boston", "Seattle", "2025-12-25", 1, 10)
+        mock_flight_service.search_flights.assert_called_once_with("Boston", "Seattle", "2025-12-25", 1, 10, 0, FlightSearchFilters())
     
     def test_search_flights_invalid_date_format(self, client, mock_flight_service):
         """Test flight search with invalid date format."""
@@ -215,7 +218,7 @@ class TestFlightRouter:
         assert len(data["items"]) == 0
         
         # Verify service was called with None values
-        mock_flight_service.search_flights.assert_called_once_with(None, None, None, 1, 10)
+        mock_flight_service.search_flights.assert_called_once_with(None, None, None, 1, 10, 0, FlightSearchFilters())
     
     def test_search_flights_special_characters(self, client, mock_flight_service, sample_flight_list):
         """Test flight search with special characters in city names."""
@@ -239,7 +242,7 @@ class TestFlightRouter:
         assert response.status_code == status.HTTP_200_OK
 
         # Verify service was called with decoded characters and pagination parameters
-        mock_flight_service.search_flights.assert_called_once_with("São Paulo", "México City", "2025-12-25", 1, 10)    # ===== CREATE FLIGHT ENDPOINT TESTS =====
+        mock_flight_service.search_flights.assert_called_once_with("São Paulo", "México City", "2025-12-25", 1, 10, 0, FlightSearchFilters())    # ===== CREATE FLIGHT ENDPOINT TESTS =====
     
     def test_create_flight_success(self, client, mock_flight_service, sample_flight_create_data, sample_flight_response):
         """Test successful flight creation."""
@@ -312,6 +315,91 @@ class TestFlightRouter:
         response = client.post("/flights", json=invalid_data)
         assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
     
+    def test_search_flights_flexible_dates(self, client, mock_flight_service, sample_flight_list):
+        """Test a flexible-date search returning the per-day summary."""
+        mock_flight_service.search_flights.return_value = FlightSearchResponse(
+            items=sample_flight_list, total=2, page=1, size=10, pages=1,
+            days=[FlightSearchDay(date=datetime(2025, 12, 25).date(), min_price=299.99, flight_count=1),
+                  FlightSearchDay(date=datetime(2025, 12, 26).date(), min_price=399.5, flight_count=1)]
+        )
+        
+        response = client.get("/flights/search?origin=New York&departure_date=2025-12-25&flexible_days=3")
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["days"] == [
+            {"date": "2025-12-25", "min_price": 299.99, "flight_count": 1},
+            {"date": "2025-12-26", "min_price": 399.5, "flight_count": 1},
+        ]
+        mock_flight_service.search_flights.assert_called_once_with("New York", None, "2025-12-25", 1, 10, 3, FlightSearchFilters())
+    
+    def test_search_flights_with_filters(self, client, mock_flight_service):
+        """Test that price, airline, hour and sort parameters reach the service."""
+        mock_flight_service.search_flights.return_value = PaginatedResponse(items=[], total=0, page=1, size=10, pages=1)
+        
+        response = client.get("/flights/search?origin=New York&min_price=100&max_price=300&airline=Delta"
+                              "&departure_hour_from=22&departure_hour_to=5&sort_by=price")
+        
+        assert response.status_code == status.HTTP_200_OK
+        mock_flight_service.search_flights.assert_called_once_with("New York", None, None, 1, 10, 0, FlightSearchFilters(
+            min_price=100, max_price=300, airline="Delta", departure_hour_from=22, departure_hour_to=5, sort_by="price"
+        ))
+    
+    def test_search_flights_filters_validated(self, client, mock_flight_service):
+        """Test that unknown sort orders, hours and negative prices are rejected."""
+        assert client.get("/flights/search?sort_by=airline").status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert client.get("/flights/search?departure_hour_from=24").status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert client.get("/flights/search?min_price=-1").status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        mock_flight_service.search_flights.assert_not_called()
+    
+    def test_search_flights_flexible_days_bounded(self, client, mock_flight_service):
+        """Test that the flexible window is bounded."""
+        response = client.get("/flights/search?departure_date=2025-12-25&flexible_days=4")
+        
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        mock_flight_service.search_flights.assert_not_called()
+    
+    def test_search_flights_batch_success(self, client, mock_flight_service, sample_flight_response):
+        """Test searching several routes in one request."""
+        mock_flight_service.search_flights_batch.return_value = [
+            FlightSearchBatchResult(origin="New York", destination="Los Angeles", departure_date="2025-12-25",
+                                    items=[sample_flight_response], total=1),
+            FlightSearchBatchResult(origin="New York", destination="San Francisco", departure_date="2025-12-25",
+                                    items=[], total=0),
+        ]
+        searches = [
+            {"origin": "New York", "destination": "Los Angeles", "departure_date": "2025-12-25"},
+            {"origin": "New York", "destination": "San Francisco", "departure_date": "2025-12-25"},
+        ]
+        
+        response = client.post("/flights/search/batch", json={"searches": searches, "size": 5})
+        
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert [(r["destination"], r["total"]) for r in data] == [("Los Angeles", 1), ("San Francisco", 0)]
+        assert data[0]["items"][0]["id"] == sample_flight_response.id
+        batch = mock_flight_service.search_flights_batch.call_args[0][0]
+        assert ([s.destination for s in batch.searches], batch.size) == (["Los Angeles", "San Francisco"], 5)
+    
+    def test_search_flights_batch_invalid_date(self, client, mock_flight_service):
+        """Test a batch with a malformed date."""
+        mock_flight_service.search_flights_batch.side_effect = InvalidDateFormatError("12/25/2025")
+        
+        response = client.post("/flights/search/batch", json={"searches": [
+            {"origin": "New York", "destination": "Los Angeles", "departure_date": "12/25/2025"}
+        ]})
+        
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["detail"]["error_code"] == "INVALID_DATE_FORMAT"
+    
+    def test_search_flights_batch_validates_size(self, client, mock_flight_service):
+        """Test that empty, oversized and incomplete batches are rejected."""
+        search = {"origin": "New York", "destination": "Los Angeles", "departure_date": "2025-12-25"}
+        
+        assert client.post("/flights/search/batch", json={"searches": []}).status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert client.post("/flights/search/batch", json={"searches": [search] * 11}).status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert client.post("/flights/search/batch", json={"searches": [{"origin": "New York"}]}).status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        mock_flight_service.search_flights_batch.assert_not_called()
+    
     # ===== LIST FLIGHTS ENDPOINT TESTS =====
     
     def test_list_flights_success(self, client, mock_flight_service, sample_flight_list):
@@ -379,6 +467,73 @@ class TestFlightRouter:
         data = response.json()
         assert "Error retrieving flights" in data["detail"]
     
+    # ===== FARE CALENDAR AND FLIGHT STATUS ENDPOINT TESTS =====
+    
+    def test_get_fare_calendar_success(self, client, mock_flight_service):
+        """Test the fare calendar of a route."""
+        mock_flight_service.get_fare_calendar.return_value = FareCalendarResponse(
+            origin="MAD", destination="LIS",
+            start_date=datetime(2026, 6, 1).date(), end_date=datetime(2026, 6, 7).date(),
+            days=[FareCalendarDayResponse(date=datetime(2026, 6, 3).date(), min_price=90, flight_count=2)]
+        )
+        
+        response = client.get("/flights/fare-calendar?origin=MAD&destination=LIS&start_date=2026-06-01&days=7")
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["days"] == [{"date": "2026-06-03", "min_price": 90.0, "flight_count": 2}]
+        mock_flight_service.get_fare_calendar.assert_called_once_with("MAD", "LIS", "2026-06-01", 7)
+    
+    def test_get_fare_calendar_invalid_date(self, client, mock_flight_service):
+        """Test the fare calendar with a malformed start date."""
+        mock_flight_service.get_fare_calendar.side_effect = InvalidDateFormatError("2026/06/01")
+        
+        response = client.get("/flights/fare-calendar?origin=MAD&destination=LIS&start_date=2026/06/01")
+        
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["detail"]["error_code"] == "INVALID_DATE_FORMAT"
+    
+    def test_get_fare_calendar_validates_parameters(self, client, mock_flight_service):
+        """Test that the route is required and the window is bounded."""
+        assert client.get("/flights/fare-calendar?origin=MAD").status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert client.get("/flights/fare-calendar?origin=MAD&destination=LIS&days=0").status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert client.get("/flights/fare-calendar?origin=MAD&destination=LIS&days=93").status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        mock_flight_service.get_fare_calendar.assert_not_called()
+    
+    def test_search_connections_success(self, client, mock_flight_service, sample_flight_response):
+        """Test searching itineraries with connections."""
+        mock_flight_service.search_connections.return_value = [ItineraryResponse(
+            legs=[sample_flight_response], stops=0, total_price=sample_flight_response.price,
+            departure_time=sample_flight_response.departure_time, arrival_time=sample_flight_response.arrival_time,
+            duration_minutes=210
+        )]
+        
+        response = client.get("/flights/connections?origin=MAD&destination=JFK&departure_date=2026-06-01&max_stops=1&sort_by=duration")
+        
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert len(data) == 1
+        assert data[0]["legs"][0]["id"] == sample_flight_response.id
+        assert data[0]["duration_minutes"] == 210
+        mock_flight_service.search_connections.assert_called_once_with("MAD", "JFK", "2026-06-01", 1, 45, 360, "duration", 10)
+    
+    def test_search_connections_invalid_layover_window(self, client, mock_flight_service):
+        """Test a minimum layover above the maximum."""
+        mock_flight_service.search_connections.side_effect = InvalidLayoverWindowError(120, 60)
+        
+        response = client.get("/flights/connections?origin=MAD&destination=JFK&departure_date=2026-06-01"
+                              "&min_layover_minutes=120&max_layover_minutes=60")
+        
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["detail"]["error_code"] == "INVALID_LAYOVER_WINDOW"
+    
+    def test_search_connections_validates_parameters(self, client, mock_flight_service):
+        """Test that the route and date are required and stops and sorting are bounded."""
+        base = "/flights/connections?origin=MAD&destination=JFK"
+        assert client.get(base).status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert client.get(f"{base}&departure_date=2026-06-01&max_stops=3").status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert client.get(f"{base}&departure_date=2026-06-01&sort_by=airline").status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        mock_flight_service.search_connections.assert_not_called()
+    
     # ===== AUTHENTICATION TESTS =====
     
     def test_create_flight_without_authentication(self):
@@ -432,7 +587,7 @@ class TestFlightRouter:
         assert response.status_code == status.HTTP_200_OK
         
         # Verify service was called with long names and pagination defaults
-        mock_flight_service.search_flights.assert_called_once_with(long_origin, long_destination, "2025-12-25", 1, 10)
+        mock_flight_service.search_flights.assert_called_once_with(long_origin, long_destination, "2025-12-25", 1, 10, 0, FlightSearchFilters())
     
     def test_create_flight_extreme_price(self, client, mock_flight_service, sample_flight_response):
         """Test flight creation with extreme price."""
@@ -476,4 +631,4 @@ class TestFlightRouter:
         assert response.status_code == status.HTTP_200_OK
         
         # Verify service was called with pagination defaults
-        mock_flight_service.search_flights.assert_called_once_with("Mars", "Earth", "2099-12-31", 1, 10)
+        mock_flight_service.search_flights.assert_called_once_with("Mars", "Earth", "2099-12-31", 1, 10, 0, FlightSearchFilters())
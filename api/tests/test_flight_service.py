@@ -12,10 +12,20 @@ from datetime import datetime, timezone, timedelta
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from services.flight import FlightBusinessService
+from resources.route_graph import RouteGraph
 from repository.flight import FlightRepository
-from models import Flight, User
-from schemas.flight import FlightCreate, FlightSearch, FlightResponse, PaginatedResponse
-from exceptions import InvalidDateFormatError, InvalidFlightTimesError, InvalidFlightPriceError, ErrorCode
+from models import Flight, User, FareCalendarDay
+from schemas.flight import (
+    FlightCreate, FlightSearch, FlightResponse, PaginatedResponse, FlightSearchBatch, RouteSearch,
+    FlightSearchFilters
+)
+from exceptions import (
+    InvalidDateFormatError, InvalidFlightTimesError, InvalidFlightPriceError, FlightNotFoundError, ErrorCode,
+    InvalidLayoverWindowError
+)
+
+# Repository keyword arguments of a search without filters
+NO_FILTERS = FlightSearchFilters().model_dump()
 
 
 class TestFlightService:
@@ -77,6 +87,7 @@ class TestFlightService:
         flight.airline = "American Airlines"
         flight.price = 299
         flight.status = "scheduled"
+        flight.seats_available = 180
         return flight
     
     @pytest.fixture
@@ -91,6 +102,7 @@ class TestFlightService:
         flight1.airline = "American Airlines"
         flight1.status = "scheduled"
         flight1.price = 299
+        flight1.seats_available = 42
         
         flight2 = Mock(spec=Flight)
         flight2.id = 2
@@ -101,6 +113,7 @@ class TestFlightService:
         flight2.airline = "Delta Airlines"
         flight2.status = "scheduled"
         flight2.price = 399
+        flight2.seats_available = 1
         
         return [flight1, flight2]
     
@@ -131,7 +144,7 @@ class TestFlightService:
         assert result.items[1].destination == "Miami"
         
         # Verify repository call
-        mock_flight_repo.search_flights.assert_called_once_with("New York", "Los Angeles", "2025-12-25", 1, 10)
+        mock_flight_repo.search_flights.assert_called_once_with("New York", "Los Angeles", "2025-12-25", 1, 10, **NO_FILTERS)
     
     def test_search_flights_empty_result(self, flight_service, mock_flight_repo):
         """Test flight search with no results."""
@@ -150,7 +163,7 @@ class TestFlightService:
         assert result.pages == 1
         
         # Verify repository call
-        mock_flight_repo.search_flights.assert_called_once_with("Boston", "Seattle", "2025-12-25", 1, 10)
+        mock_flight_repo.search_flights.assert_called_once_with("Boston", "Seattle", "2025-12-25", 1, 10, **NO_FILTERS)
     
     def test_search_flights_invalid_date_format(self, flight_service, mock_flight_repo):
         """Test flight search with invalid date format."""
@@ -166,7 +179,7 @@ class TestFlightService:
         assert exc_info.value.details["provided_date"] == "2025/12/25"
         
         # Verify repository call
-        mock_flight_repo.search_flights.assert_called_once_with("New York", "Los Angeles", "2025/12/25", 1, 10)
+        mock_flight_repo.search_flights.assert_called_once_with("New York", "Los Angeles", "2025/12/25", 1, 10, **NO_FILTERS)
     
     def test_search_flights_case_handling(self, flight_service, mock_flight_repo, sample_flight_list):
         """Test flight search with different case inputs."""
@@ -182,7 +195,88 @@ class TestFlightService:
         assert isinstance(result.items[0], FlightResponse)
         
         # Verify repository call preserves original case
-        mock_flight_repo.search_flights.assert_called_once_with("new york", "LOS ANGELES", "2025-12-25", 1, 10)
+        mock_flight_repo.search_flights.assert_called_once_with("new york", "LOS ANGELES", "2025-12-25", 1, 10, **NO_FILTERS)
+    
+    def test_search_flights_flexible_dates(self, flight_service, mock_flight_repo, sample_flight_list):
+        """Test that a flexible search reads the window once and summarizes it per day."""
+        cheaper = Mock(spec=Flight)
+        cheaper.id, cheaper.origin, cheaper.destination = 3, "New York", "Los Angeles"
+        cheaper.departure_time = datetime(2025, 12, 25, 18, 0, 0, tzinfo=timezone.utc)
+        cheaper.arrival_time = datetime(2025, 12, 25, 21, 0, 0, tzinfo=timezone.utc)
+        cheaper.airline, cheaper.status, cheaper.price, cheaper.seats_available = "JetBlue", "scheduled", 199, 5
+        flights = [sample_flight_list[0], cheaper, sample_flight_list[1]]
+        mock_flight_repo.search_flights_between.return_value = flights
+        
+        result = flight_service.search_flights(None, None, "2025-12-25", page=2, size=2, flexible_days=2)
+        
+        assert [(str(day.date), day.min_price, day.flight_count) for day in result.days] == [
+            ("2025-12-25", 199, 2), ("2025-12-26", 399, 1)
+        ]
+        assert (result.total, result.pages, [flight.id for flight in result.items]) == (3, 2, [2])
+        mock_flight_repo.search_flights_between.assert_called_once_with(
+            None, None, datetime(2025, 12, 23).date(), datetime(2025, 12, 27).date(), **NO_FILTERS
+        )
+        mock_flight_repo.search_flights.assert_not_called()
+    
+    def test_search_flights_with_filters(self, flight_service, mock_flight_repo):
+        """Test that filters and sort order are passed through to the repository."""
+        mock_flight_repo.search_flights.return_value = ([], 0)
+        filters = FlightSearchFilters(max_price=300, airline="Delta", departure_hour_from=6, sort_by="price")
+        
+        flight_service.search_flights("New York", page=2, size=5, filters=filters)
+        
+        mock_flight_repo.search_flights.assert_called_once_with(
+            "New York", None, None, 2, 5, min_price=None, max_price=300, airline="Delta",
+            departure_hour_from=6, departure_hour_to=None, sort_by="price"
+        )
+    
+    def test_search_flights_flexible_dates_invalid_date(self, flight_service, mock_flight_repo):
+        """Test that a flexible search with a malformed date is rejected before querying."""
+        with pytest.raises(InvalidDateFormatError):
+            flight_service.search_flights("New York", "Los Angeles", "2025/12/25", flexible_days=1)
+        
+        mock_flight_repo.search_flights_between.assert_not_called()
+    
+    def test_search_flights_flexible_days_without_date(self, flight_service, mock_flight_repo):
+        """Test that flexible_days is ignored when there is no date to center the window on."""
+        mock_flight_repo.search_flights.return_value = ([], 0)
+        
+        result = flight_service.search_flights("New York", flexible_days=3)
+        
+        assert result.days == []
+        mock_flight_repo.search_flights.assert_called_once_with("New York", None, None, 1, 10, **NO_FILTERS)
+    
+    def test_search_flights_batch_success(self, flight_service, mock_flight_repo, sample_flight_list):
+        """Test that every search gets its own result in request order, capped at size."""
+        mock_flight_repo.search_flights_many.return_value = [sample_flight_list, []]
+        batch = FlightSearchBatch(searches=[
+            RouteSearch(origin="New York", destination="Los Angeles", departure_date="2025-12-25"),
+            RouteSearch(origin="New York", destination="San Francisco", departure_date="2025-12-26"),
+        ], size=1)
+        
+        result = flight_service.search_flights_batch(batch)
+        
+        assert [(r.destination, r.departure_date, r.total) for r in result] == [
+            ("Los Angeles", "2025-12-25", 2), ("San Francisco", "2025-12-26", 0)
+        ]
+        assert [flight.id for flight in result[0].items] == [1]
+        assert result[1].items == []
+        mock_flight_repo.search_flights_many.assert_called_once_with([
+            ("New York", "Los Angeles", datetime(2025, 12, 25).date()),
+            ("New York", "San Francisco", datetime(2025, 12, 26).date()),
+        ])
+    
+    def test_search_flights_batch_invalid_date(self, flight_service, mock_flight_repo):
+        """Test that one malformed date rejects the batch before querying."""
+        batch = FlightSearchBatch(searches=[
+            RouteSearch(origin="New York", destination="Los Angeles", departure_date="2025-12-25"),
+            RouteSearch(origin="New York", destination="San Francisco", departure_date="12/26/2025"),
+        ])
+        
+        with pytest.raises(InvalidDateFormatError):
+            flight_service.search_flights_batch(batch)
+        
+        mock_flight_repo.search_flights_many.assert_not_called()
     
     # ===== CREATE FLIGHT TESTS =====
     
@@ -211,7 +305,8 @@ class TestFlightService:
             arrival_time=sample_flight_create.arrival_time,
             airline="American Airlines",
             price=299,  # Should be converted to int
-            status="scheduled"
+            status="scheduled",
+            capacity=None
         )
     
     def test_create_flight_without_status(self, flight_service, mock_flight_repo, sample_user, sample_flight_create_no_status, sample_db_flight):
@@ -236,7 +331,8 @@ class TestFlightService:
             arrival_time=sample_flight_create_no_status.arrival_time,
             airline="Delta Airlines",
             price=399,  # Should be converted to int
-            status="scheduled"  # Default status
+            status="scheduled",  # Default status
+            capacity=None
         )
     
     def test_create_flight_price_conversion(self, flight_service, mock_flight_repo, sample_user, sample_db_flight):
@@ -266,7 +362,8 @@ class TestFlightService:
             arrival_time=flight_create.arrival_time,
             airline="Alaska Airlines",
             price=450,  # Should be converted to int (truncated)
-            status="scheduled"
+            status="scheduled",
+            capacity=None
         )
     
     def test_create_flight_repository_error(self, flight_service, mock_flight_repo, sample_user, sample_flight_create):
@@ -339,6 +436,171 @@ class TestFlightService:
         # Verify repository was called
         mock_flight_repo.list_all.assert_called_once_with(1, 10)
     
+    # ===== FARE CALENDAR TESTS =====
+    
+    def test_get_fare_calendar_success(self, flight_service, mock_flight_repo):
+        """Test that the calendar covers the requested days and maps the rollup rows."""
+        mock_flight_repo.get_fare_calendar.return_value = [
+            FareCalendarDay(origin="MAD", destination="LIS", day=datetime(2026, 6, 3).date(), min_price=90, flight_count=2)
+        ]
+        
+        result = flight_service.get_fare_calendar("MAD", "LIS", "2026-06-01", 30)
+        
+        assert str(result.start_date) == "2026-06-01"
+        assert str(result.end_date) == "2026-06-30"
+        assert [(str(day.date), day.min_price, day.flight_count) for day in result.days] == [("2026-06-03", 90, 2)]
+        mock_flight_repo.get_fare_calendar.assert_called_once_with(
+            "MAD", "LIS", datetime(2026, 6, 1).date(), datetime(2026, 6, 30).date()
+        )
+    
+    def test_get_fare_calendar_defaults_to_today(self, flight_service, mock_flight_repo):
+        """Test that the calendar starts today when no start date is given."""
+        mock_flight_repo.get_fare_calendar.return_value = []
+        
+        result = flight_service.get_fare_calendar("MAD", "LIS", days=7)
+        
+        today = datetime.now(timezone.utc).date()
+        assert (result.start_date, result.end_date, result.days) == (today, today + timedelta(days=6), [])
+    
+    def test_get_fare_calendar_invalid_date(self, flight_service, mock_flight_repo):
+        """Test that a malformed start date is rejected before querying."""
+        with pytest.raises(InvalidDateFormatError):
+            flight_service.get_fare_calendar("MAD", "LIS", "06/01/2026")
+        
+        mock_flight_repo.get_fare_calendar.assert_not_called()
+    
+    # ===== CONNECTION SEARCH TESTS =====
+    
+    @pytest.fixture
+    def connection_flights(self):
+        """Create a direct flight and a one-stop connection from Madrid to New York."""
+        def flight(flight_id, origin, destination, departs, arrives, price):
+            return Flight(
+                id=flight_id, origin=origin, destination=destination,
+                departure_time=datetime(2026, 6, 1, departs), arrival_time=datetime(2026, 6, 1, arrives),
+                airline="Iberia", status="scheduled", price=price, seats_available=10
+            )
+        return [
+            flight(1, "Madrid", "New York", 9, 17, 900),
+            flight(2, "Madrid", "London", 7, 9, 100),
+            flight(3, "London", "New York", 11, 19, 400),
+        ]
+    
+    @pytest.fixture
+    def connection_service(self, mock_flight_repo, connection_flights):
+        """Create a FlightService with its own route graph over the connection flights."""
+        mock_flight_repo.find_scheduled_departing_after.return_value = connection_flights
+        mock_flight_repo.find_available_by_ids.side_effect = lambda ids: [
+            f for f in connection_flights if f.id in ids and f.status == "scheduled"
+        ]
+        mock_flight_repo.get_latest_version.return_value = 0
+        mock_flight_repo.resolve_airport_codes.side_effect = lambda names: {name: [] for name in names}
+        return FlightBusinessService(mock_flight_repo, RouteGraph())
+    
+    def test_search_connections_success(self, connection_service, mock_flight_repo):
+        """Test that itineraries are built from the current flight rows, cheapest first."""
+        result = connection_service.search_connections("Madrid", "New York", "2026-06-01")
+        
+        assert [[leg.id for leg in itinerary.legs] for itinerary in result] == [[2, 3], [1]]
+        assert (result[0].stops, result[0].total_price, result[0].duration_minutes) == (1, 500, 720)
+        assert result[0].departure_time == datetime(2026, 6, 1, 7)
+        assert result[0].arrival_time == datetime(2026, 6, 1, 19)
+        mock_flight_repo.find_scheduled_departing_after.assert_called_once()
+    
+    def test_search_connections_loads_graph_once(self, connection_service, mock_flight_repo):
+        """Test that the route graph is loaded on the first search only."""
+        connection_service.search_connections("Madrid", "New York", "2026-06-01")
+        connection_service.search_connections("Madrid", "New York", "2026-06-01", sort_by="duration")
+        
+        mock_flight_repo.find_scheduled_departing_after.assert_called_once()
+    
+    def test_search_connections_skips_unavailable_legs(self, connection_service, connection_flights, mock_flight_repo):
+        """Test that itineraries with sold-out or no longer scheduled legs are dropped."""
+        connection_flights[2].seats_available = 0
+        mock_flight_repo.find_available_by_ids.side_effect = lambda ids: [f for f in connection_flights if f.id in ids and f.id != 1]
+        
+        assert connection_service.search_connections("Madrid", "New York", "2026-06-01") == []
+        # The cancelled flight is dropped from the graph, the sold-out one may get seats back
+        assert [leg.flight_id for path in connection_service.route_graph.search(
+            "Madrid", "New York", datetime(2026, 6, 1), datetime(2026, 6, 2), timedelta(0), timedelta(hours=6)
+        ) for leg in path] == [2, 3]
+    
+    def test_search_connections_sees_flights_written_elsewhere(self, connection_service, connection_flights,
+                                                               mock_flight_repo):
+        """Test that flights created or cancelled by other workers reach the graph through the flight version."""
+        connection_service.search_connections("Madrid", "New York", "2026-06-01", max_stops=0)
+        new_flight = Flight(
+            id=4, origin="Madrid", destination="New York", departure_time=datetime(2026, 6, 1, 12),
+            arrival_time=datetime(2026, 6, 1, 20), airline="Iberia", status="scheduled", price=300,
+            seats_available=10, version=5
+        )
+        connection_flights.append(new_flight)
+        connection_flights[0].status, connection_flights[0].version = "cancelled", 6
+        mock_flight_repo.get_latest_version.return_value = 6
+        mock_flight_repo.find_written_after.return_value = [new_flight, connection_flights[0]]
+        
+        result = connection_service.search_connections("Madrid", "New York", "2026-06-01", max_stops=0)
+        
+        assert [itinerary.legs[0].id for itinerary in result] == [4]
+        mock_flight_repo.find_written_after.assert_called_once_with(0)
+        assert connection_service.route_graph.version() == 6
+    
+    def test_search_connections_by_city_name(self, connection_service, connection_flights, mock_flight_repo):
+        """Test that a city name finds flights stored under its airport codes."""
+        connection_flights.append(Flight(
+            id=4, origin="MAD", destination="CDG", origin_code="MAD", destination_code="CDG",
+            departure_time=datetime(2026, 6, 1, 8), arrival_time=datetime(2026, 6, 1, 10), airline="Iberia",
+            status="scheduled", price=120, seats_available=10
+        ))
+        mock_flight_repo.resolve_airport_codes.side_effect = lambda names: {
+            "Madrid": ["MAD"], "Paris": ["CDG", "ORY"]
+        }
+        
+        result = connection_service.search_connections("Madrid", "Paris", "2026-06-01")
+        
+        assert [[leg.id for leg in itinerary.legs] for itinerary in result] == [[4]]
+        mock_flight_repo.resolve_airport_codes.assert_called_once_with(["Madrid", "Paris"])
+    
+    def test_search_connections_fills_limit_past_sold_out_itineraries(self, connection_service, connection_flights):
+        """Test that an itinerary with a sold-out leg does not take one of the requested results."""
+        connection_flights[2].seats_available = 0
+        
+        result = connection_service.search_connections("Madrid", "New York", "2026-06-01", limit=1)
+        
+        assert [[leg.id for leg in itinerary.legs] for itinerary in result] == [[1]]
+    
+    def test_create_flight_updates_route_graph(self, connection_service, mock_flight_repo, sample_user, connection_flights):
+        """Test that a created flight is reflected in the next search."""
+        connection_service.search_connections("Madrid", "New York", "2026-06-01")
+        new_flight = Flight(
+            id=4, origin="Madrid", destination="New York", departure_time=datetime(2026, 6, 1, 12),
+            arrival_time=datetime(2026, 6, 1, 20), airline="Iberia", status="scheduled", price=300, seats_available=10
+        )
+        connection_flights.append(new_flight)
+        mock_flight_repo.create.return_value = new_flight
+        connection_service.create_flight(sample_user, FlightCreate(
+            origin="Madrid", destination="New York", departure_time=new_flight.departure_time,
+            arrival_time=new_flight.arrival_time, airline="Iberia", price=300
+        ))
+        
+        result = connection_service.search_connections("Madrid", "New York", "2026-06-01", max_stops=0)
+        assert [itinerary.legs[0].id for itinerary in result] == [4, 1]
+    
+    def test_search_connections_invalid_date(self, connection_service, mock_flight_repo):
+        """Test that a malformed date is rejected before the graph is loaded."""
+        with pytest.raises(InvalidDateFormatError):
+            connection_service.search_connections("Madrid", "New York", "06/01/2026")
+        
+        mock_flight_repo.find_scheduled_departing_after.assert_not_called()
+    
+    def test_search_connections_invalid_layover_window(self, connection_service):
+        """Test that a minimum layover above the maximum is rejected."""
+        with pytest.raises(InvalidLayoverWindowError) as exc_info:
+            connection_service.search_connections("Madrid", "New York", "2026-06-01",
+                                                  min_layover_minutes=120, max_layover_minutes=60)
+        
+        assert exc_info.value.error_code == ErrorCode.INVALID_LAYOVER_WINDOW
+    
     # ===== EDGE CASES =====
     
     def test_search_flights_with_special_characters(self, flight_service, mock_flight_repo, sample_flight_list):
@@ -355,7 +617,7 @@ class TestFlightService:
         assert isinstance(result.items[0], FlightResponse)
         
         # Verify repository call preserves special characters
-        mock_flight_repo.search_flights.assert_called_once_with("São Paulo", "México City", "2025-12-25", 1, 10)
+        mock_flight_repo.search_flights.assert_called_once_with("São Paulo", "México City", "2025-12-25", 1, 10, **NO_FILTERS)
     
     def test_create_flight_extreme_dates(self, flight_service, mock_flight_repo, sample_user, sample_db_flight):
         """Test flight creation with extreme future dates."""
@@ -384,5 +646,6 @@ class TestFlightService:
             arrival_time=future_flight.arrival_time,
             airline="SpaceX",
             price=999999,  # Converted to int
-            status="scheduled"
+            status="scheduled",
+            capacity=None
         )
\ No newline at end of file
@@ -14,7 +14,7 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from routers.health_check import router
-from services.health import HealthService, create_health_service
+from services.health import HealthService, create_health_service, HealthMonitor, get_health_monitor
 
 
 class TestHealthCheckRouter:
@@ -27,13 +27,20 @@ class TestHealthCheckRouter:
         return mock
     
     @pytest.fixture
-    def app(self, mock_health_service):
+    def mock_health_monitor(self):
+        """Create mock health monitor."""
+        mock = Mock(spec=HealthMonitor)
+        return mock
+    
+    @pytest.fixture
+    def app(self, mock_health_service, mock_health_monitor):
         """Create FastAPI app with mocked dependencies."""
         app = FastAPI()
         app.include_router(router)
         
         # Override dependency
         app.dependency_overrides[create_health_service] = lambda: mock_health_service
+        app.dependency_overrides[get_health_monitor] = lambda: mock_health_monitor
         
         return app
     
@@ -259,6 +266,52 @@ class TestHealthCheckRouter:
         # Should not return 401 or 403
         mock_health_service.get_health_status.assert_called_once()
     
+    def test_health_check_defaults_to_cached_probes(self, client, mock_health_service, healthy_status_response):
+        """Test that a plain health check does not request a deep probe."""
+        mock_health_service.get_health_status.return_value = healthy_status_response
+        
+        client.get("/health")
+        
+        mock_health_service.get_health_status.assert_called_once_with(deep=False)
+    
+    def test_health_check_deep_forces_fresh_probes(self, client, mock_health_service, healthy_status_response):
+        """Test that deep=true is forwarded to the health service."""
+        mock_health_service.get_health_status.return_value = healthy_status_response
+        
+        response = client.get("/health?deep=true")
+        
+        assert response.status_code == status.HTTP_200_OK
+        mock_health_service.get_health_status.assert_called_once_with(deep=True)
+    
+    def test_liveness_does_not_touch_dependencies(self, client, mock_health_service, mock_health_monitor):
+        """Test that the liveness probe answers without calling any health checks."""
+        response = client.get("/health/live")
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["status"] == "alive"
+        mock_health_service.get_health_status.assert_not_called()
+        mock_health_monitor.get_snapshot.assert_not_called()
+    
+    def test_readiness_serves_snapshot(self, client, mock_health_service, mock_health_monitor, healthy_status_response):
+        """Test that the readiness probe returns the cached snapshot."""
+        mock_health_monitor.get_snapshot.return_value = {**healthy_status_response, "checks": {}}
+        
+        response = client.get("/health/ready")
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["status"] == "ok"
+        mock_health_monitor.get_snapshot.assert_called_once()
+        mock_health_service.get_health_status.assert_not_called()
+    
+    def test_readiness_degraded_snapshot(self, client, mock_health_monitor, degraded_status_response):
+        """Test that a degraded snapshot makes the readiness probe fail."""
+        mock_health_monitor.get_snapshot.return_value = degraded_status_response
+        
+        response = client.get("/health/ready")
+        
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.json()["status"] == "degraded"
+    
     # ===== EDGE CASES =====
     
     def test_health_check_malformed_response(self, client, mock_health_service):
@@ -0,0 +1,260 @@
+"""
+Tests for HealthMonitor - Service Layer
+Tests inject a mocked health service factory to focus on snapshot refresh logic.
+"""
+import pytest
+import asyncio
+import threading
+import time
+from unittest.mock import Mock
+
+# Add src to path
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from services.health import SystemHealthService, HealthMonitor, HealthMonitorConfig
+
+
+class TestHealthMonitor:
+    """Test suite for HealthMonitor with mocked component checks."""
+
+    @pytest.fixture
+    def mock_app_resources(self):
+        """Create mock app resources."""
+        mock = Mock()
+        mock.is_initialized.return_value = True
+        mock.logging = Mock()
+        mock.logging.is_initialized.return_value = True
+        return mock
+
+    @pytest.fixture
+    def health_service(self, mock_app_resources):
+        """Create a health service with mocked dependencies."""
+        mock_crypto = Mock()
+        mock_crypto.is_initialized.return_value = True
+        mock_ffmpeg = Mock()
+        mock_ffmpeg.get_status.return_value = {"available": True, "status": "installed"}
+        return SystemHealthService(
+            app_res=mock_app_resources,
+            db=Mock(),
+            crypto=mock_crypto,
+            chat_model=Mock(),
+            chat_memory=Mock(),
+            speech_service=Mock(),
+            ffmpeg=mock_ffmpeg
+        )
+
+    @pytest.fixture
+    def monitor_factory(self, health_service):
+        """Create monitors that build the mocked health service."""
+        def factory(timeout: float = 0.5, interval: float = 3600):
+            async def build_service():
+                return health_service
+            return HealthMonitor(
+                HealthMonitorConfig(refresh_interval_seconds=interval, check_timeout_seconds=timeout),
+                service_factory=build_service
+            )
+        return factory
+
+    # ===== POSITIVE TESTS =====
+
+    @pytest.mark.asyncio
+    async def test_refresh_builds_snapshot_with_check_timings(self, monitor_factory):
+        """Test that a refresh records every component and its timing."""
+        monitor = monitor_factory()
+
+        snapshot = await monitor.refresh()
+
+        assert snapshot["status"] == "ok"
+        assert set(snapshot["checks"].keys()) == {"database", "chat", "chat_memory", "crypto", "logging", "speech"}
+        for timing in snapshot["checks"].values():
+            assert timing["outcome"] == "completed"
+            assert timing["duration_ms"] >= 0
+        assert snapshot["resources"]["details"]["database"]["status"] == "healthy"
+        assert "refresh_duration_ms" in snapshot
+
+    @pytest.mark.asyncio
+    async def test_get_snapshot_does_not_run_checks(self, monitor_factory, health_service):
+        """Test that reading the snapshot performs no I/O."""
+        monitor = monitor_factory()
+        await monitor.refresh()
+        health_service.db.execute.reset_mock()
+
+        for _ in range(5):
+            snapshot = monitor.get_snapshot()
+
+        health_service.db.execute.assert_not_called()
+        assert snapshot["snapshot_age_seconds"] >= 0
+
+    @pytest.mark.asyncio
+    async def test_start_refreshes_in_background(self, monitor_factory):
+        """Test that starting the monitor produces a snapshot without an explicit refresh."""
+        monitor = monitor_factory()
+
+        await monitor.start()
+        try:
+            for _ in range(50):
+                if monitor.get_snapshot()["status"] != "starting":
+                    break
+                await asyncio.sleep(0.01)
+
+            assert monitor.is_running() is True
+            assert monitor.get_snapshot()["status"] == "ok"
+        finally:
+            await monitor.stop()
+
+        assert monitor.is_running() is False
+
+    @pytest.mark.asyncio
+    async def test_stop_shuts_down_check_threads_without_waiting(self, monitor_factory, health_service):
+        """Test that stopping releases the check executor even while a check thread is hung."""
+        release = threading.Event()
+        health_service.db.execute.side_effect = lambda *args, **kwargs: release.wait(5)
+        monitor = monitor_factory(timeout=0.1)
+        await monitor.refresh()
+
+        started = time.perf_counter()
+        await monitor.stop()
+        elapsed = time.perf_counter() - started
+        release.set()
+
+        assert elapsed < 1
+        with pytest.raises(RuntimeError):
+            monitor._executor.submit(lambda: None)
+
+    @pytest.mark.asyncio
+    async def test_restart_after_stop_runs_checks_again(self, monitor_factory):
+        """Test that a stop/start cycle gives the refresh loop a working executor."""
+        monitor = monitor_factory()
+        await monitor.start()
+        await monitor.stop()
+
+        await monitor.start()
+        try:
+            snapshot = await monitor.refresh()
+        finally:
+            await monitor.stop()
+
+        assert snapshot["status"] == "ok"
+        assert all(timing["outcome"] == "completed" for timing in snapshot["checks"].values())
+
+    def test_config_reads_fractional_seconds_from_env(self, monkeypatch):
+        """Test that sub-second intervals and timeouts from the environment are kept."""
+        monkeypatch.setenv("HEALTH_REFRESH_INTERVAL_SECONDS", "2.5")
+        monkeypatch.setenv("HEALTH_CHECK_TIMEOUT_SECONDS", "0.5")
+
+        config = HealthMonitorConfig()
+
+        assert config.refresh_interval_seconds == 2.5
+        assert config.check_timeout_seconds == 0.5
+
+    # ===== NEGATIVE TESTS =====
+
+    @pytest.mark.asyncio
+    async def test_slow_check_times_out_without_blocking_refresh(self, monitor_factory, health_service):
+        """Test that one slow dependency is reported as a timeout and does not stall the refresh."""
+        health_service.db.execute.side_effect = lambda *args, **kwargs: time.sleep(1)
+        monitor = monitor_factory(timeout=0.1)
+
+        started = time.perf_counter()
+        snapshot = await monitor.refresh()
+        elapsed = time.perf_counter() - started
+
+        assert elapsed < 0.9
+        assert snapshot["status"] == "degraded"
+        assert snapshot["checks"]["database"]["outcome"] == "timeout"
+        assert snapshot["resources"]["details"]["database"]["status"] == "timeout"
+        assert snapshot["checks"]["crypto"]["outcome"] == "completed"
+
+    @pytest.mark.asyncio
+    async def test_hung_check_is_not_started_again(self, monitor_factory, health_service):
+        """Test that a check still running from the previous refresh is skipped instead of taking another thread."""
+        release = threading.Event()
+        health_service.db.execute.side_effect = lambda *args, **kwargs: release.wait(5)
+        monitor = monitor_factory(timeout=0.1)
+
+        first = await monitor.refresh()
+        second = await monitor.refresh()
+
+        assert first["checks"]["database"]["outcome"] == "timeout"
+        assert second["checks"]["database"]["outcome"] == "skipped"
+        assert second["resources"]["details"]["database"]["status"] == "timeout"
+        assert second["checks"]["crypto"]["outcome"] == "completed"
+        assert health_service.db.execute.call_count == 1
+
+        release.set()
+        await asyncio.sleep(0.1)
+        third = await monitor.refresh()
+        assert third["checks"]["database"]["outcome"] == "completed"
+
+    @pytest.mark.asyncio
+    async def test_failed_check_marks_snapshot_degraded(self, monitor_factory, health_service):
+        """Test that a failing component degrades the snapshot."""
+        health_service.db.execute.side_effect = Exception("Connection failed")
+        monitor = monitor_factory()
+
+        snapshot = await monitor.refresh()
+
+        assert snapshot["status"] == "degraded"
+        assert snapshot["resources"]["details"]["database"]["status"] == "unhealthy"
+
+    @pytest.mark.asyncio
+    async def test_refresh_when_app_not_initialized(self, monitor_factory, mock_app_resources):
+        """Test that the snapshot reports starting when resources are not initialized."""
+        mock_app_resources.is_initialized.return_value = False
+        monitor = monitor_factory()
+
+        snapshot = await monitor.refresh()
+
+        assert snapshot["status"] == "starting"
+        assert snapshot["checks"] == {}
+
+    # ===== EDGE CASES =====
+
+    @pytest.mark.asyncio
+    async def test_refresh_after_stop_reports_checks_unhealthy(self, monitor_factory):
+        """Test that a refresh with the executor shut down degrades the snapshot instead of raising."""
+        monitor = monitor_factory()
+        await monitor.stop()
+
+        snapshot = await monitor.refresh()
+
+        assert snapshot["status"] == "degraded"
+        assert all(timing["outcome"] == "error" for timing in snapshot["checks"].values())
+        assert snapshot["resources"]["details"]["database"]["status"] == "unhealthy"
+
+    def test_get_snapshot_before_first_refresh(self, monitor_factory):
+        """Test that the snapshot reports starting before any refresh has completed."""
+        monitor = monitor_factory()
+
+        snapshot = monitor.get_snapshot()
+
+        assert snapshot["status"] == "starting"
+        assert snapshot["checks"] == {}
+
+    @pytest.mark.asyncio
+    async def test_refresh_closes_database_session(self, monitor_factory, health_service):
+        """Test that the per-refresh database session is closed."""
+        monitor = monitor_factory()
+
+        await monitor.refresh()
+
+        health_service.db.close.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_session_closed_after_timed_out_check_returns(self, monitor_factory, health_service):
+        """Test that the session stays open while a timed-out check is still using it."""
+        release = threading.Event()
+        health_service.db.execute.side_effect = lambda *args, **kwargs: release.wait(5)
+        monitor = monitor_factory(timeout=0.1)
+
+        await monitor.refresh()
+        health_service.db.close.assert_not_called()
+
+        release.set()
+        for _ in range(50):
+            if health_service.db.close.called:
+                break
+            await asyncio.sleep(0.01)
+        health_service.db.close.assert_called_once()
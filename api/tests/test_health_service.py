@@ -217,6 +217,27 @@ class TestHealthService:
         
         assert result["resources"]["details"]["speech"]["status"] == "not_configured"
     
+    def test_speech_health_uses_cached_ffmpeg_probe(self, health_service, mock_app_resources):
+        """Test that a regular health check reads the cached ffmpeg snapshot."""
+        mock_probe = Mock()
+        mock_probe.get_status.return_value = {"available": True, "status": "installed"}
+        health_service.ffmpeg_probe = mock_probe
+        
+        result = health_service.get_health_status()
+        
+        mock_probe.get_status.assert_called_once_with(force_refresh=False)
+        assert result["resources"]["details"]["speech"]["ffmpeg"]["status"] == "installed"
+    
+    def test_deep_health_check_forces_ffmpeg_probe(self, health_service, mock_app_resources):
+        """Test that a deep health check forces a fresh ffmpeg probe."""
+        mock_probe = Mock()
+        mock_probe.get_status.return_value = {"available": True, "status": "installed"}
+        health_service.ffmpeg_probe = mock_probe
+        
+        health_service.get_health_status(deep=True)
+        
+        mock_probe.get_status.assert_called_once_with(force_refresh=True)
+    
     # ===== EDGE CASES =====
     
     def test_health_status_exception_handling(self, health_service, mock_app_resources):
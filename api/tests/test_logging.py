@@ -0,0 +1,446 @@
+"""
+Tests for LoggingManager - Resource Layer
+Tests the queue-based logging pipeline with temporary log files.
+"""
+import pytest
+import ast
+import json
+import logging
+import queue
+import threading
+from unittest.mock import Mock
+from pathlib import Path
+
+# Add src to path
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from resources.logging import (
+    LoggingManager, LoggingConfig, OverloadSheddingQueueHandler, BatchingQueueListener, lazy,
+    JsonFormatter, CorrelationIdFilter, correlation_id_var
+)
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+
+def _record(level: int, message: str = "message") -> logging.LogRecord:
+    """Build a log record at the given level."""
+    return logging.LogRecord("test", level, __file__, 1, message, None, None)
+
+
+class _CollectingHandler(logging.Handler):
+    """Handler that remembers emitted records and flush calls."""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self.flushes = 0
+
+    def emit(self, record):
+        self.records.append(record)
+
+    def flush(self):
+        self.flushes += 1
+
+
+class TestOverloadSheddingQueueHandler:
+    """Test suite for the non-blocking queue handler."""
+
+    # ===== POSITIVE TESTS =====
+
+    def test_enqueue_below_threshold_keeps_all_records(self):
+        """Test that records are kept while the queue has room."""
+        handler = OverloadSheddingQueueHandler(queue.Queue(maxsize=100), overload_threshold=0.8, sample_rate=10)
+
+        for _ in range(50):
+            handler.enqueue(_record(logging.INFO))
+
+        assert handler.queue.qsize() == 50
+        assert handler.dropped_count == 0
+
+    def test_enqueue_samples_low_severity_over_threshold(self):
+        """Test that INFO records are sampled once the queue passes the overload threshold."""
+        handler = OverloadSheddingQueueHandler(queue.Queue(maxsize=100), overload_threshold=0.5, sample_rate=10)
+        for _ in range(50):
+            handler.enqueue(_record(logging.INFO))
+
+        for _ in range(20):
+            handler.enqueue(_record(logging.INFO))
+
+        assert handler.queue.qsize() == 52
+        assert handler.dropped_count == 18
+
+    def test_enqueue_never_samples_warnings(self):
+        """Test that WARNING records bypass sampling."""
+        handler = OverloadSheddingQueueHandler(queue.Queue(maxsize=100), overload_threshold=0.5, sample_rate=10)
+        for _ in range(50):
+            handler.enqueue(_record(logging.INFO))
+
+        for _ in range(20):
+            handler.enqueue(_record(logging.WARNING))
+
+        assert handler.queue.qsize() == 70
+        assert handler.dropped_count == 0
+
+    # ===== NEGATIVE TESTS =====
+
+    def test_enqueue_full_queue_drops_without_blocking(self):
+        """Test that a full queue drops records instead of blocking or raising."""
+        handler = OverloadSheddingQueueHandler(queue.Queue(maxsize=2), overload_threshold=1.0, sample_rate=1)
+
+        for _ in range(5):
+            handler.enqueue(_record(logging.WARNING))
+        handler.enqueue(_record(logging.ERROR))
+
+        assert handler.queue.qsize() == 2
+        assert handler.dropped_count == 4
+
+    def test_drop_count_is_exact_across_threads(self):
+        """Test that records shed by many threads at once are all counted."""
+        handler = OverloadSheddingQueueHandler(queue.Queue(maxsize=1), overload_threshold=1.0, sample_rate=1)
+        handler.enqueue(_record(logging.INFO))
+
+        def shed():
+            for _ in range(2000):
+                handler.enqueue(_record(logging.INFO))
+
+        threads = [threading.Thread(target=shed) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert handler.dropped_count == 8 * 2000
+
+
+class TestBatchingQueueListener:
+    """Test suite for the batching queue listener."""
+
+    def test_listener_delivers_and_flushes_per_batch(self):
+        """Test that queued records are delivered and flushed once per batch."""
+        log_queue = queue.Queue()
+        target = _CollectingHandler()
+        for i in range(10):
+            log_queue.put(_record(logging.INFO, f"message {i}"))
+
+        listener = BatchingQueueListener(log_queue, target, batch_size=100)
+        listener.start()
+        listener.stop()
+
+        assert [r.getMessage() for r in target.records] == [f"message {i}" for i in range(10)]
+        assert target.flushes <= 2
+
+    def test_listener_respects_handler_level(self):
+        """Test that handler levels are honoured by the listener."""
+        log_queue = queue.Queue()
+        target = _CollectingHandler()
+        target.setLevel(logging.ERROR)
+        log_queue.put(_record(logging.INFO))
+        log_queue.put(_record(logging.ERROR))
+
+        listener = BatchingQueueListener(log_queue, target)
+        listener.start()
+        listener.stop()
+
+        assert [r.levelno for r in target.records] == [logging.ERROR]
+
+    def test_stop_waits_for_room_in_full_queue(self):
+        """Test that stopping with a full bounded queue waits for the listener instead of raising queue.Full."""
+        log_queue = queue.Queue(maxsize=2)
+        release = threading.Event()
+        target = _CollectingHandler()
+        target.emit = lambda record: (release.wait(5), target.records.append(record))
+        log_queue.put(_record(logging.INFO, "message 0"))
+        listener = BatchingQueueListener(log_queue, target, batch_size=1)
+        listener.start()
+        for i in (1, 2):
+            log_queue.put(_record(logging.INFO, f"message {i}"))
+
+        threading.Timer(0.1, release.set).start()
+        listener.stop()
+
+        assert [r.getMessage() for r in target.records] == ["message 0", "message 1", "message 2"]
+        assert listener._thread is None
+
+    def test_stop_gives_up_when_queue_is_never_drained(self):
+        """Test that the sentinel wait is bounded when no listener thread drains the queue."""
+        log_queue = queue.Queue(maxsize=1)
+        log_queue.put(_record(logging.INFO))
+        listener = BatchingQueueListener(log_queue, _CollectingHandler(), stop_timeout=0.05)
+
+        with pytest.raises(queue.Full):
+            listener.enqueue_sentinel()
+
+
+class TestJsonFormatter:
+    """Test suite for the structured JSON formatter."""
+
+    # ===== POSITIVE TESTS =====
+
+    def test_format_emits_valid_json_for_quoted_messages(self):
+        """Test that quotes and newlines in messages still produce one valid JSON line."""
+        record = _record(logging.INFO, 'Created session with alias "my \\trip"\nsecond line')
+
+        line = JsonFormatter().format(record)
+
+        assert "\n" not in line
+        payload = json.loads(line)
+        assert payload["message"] == 'Created session with alias "my \\trip"\nsecond line'
+        assert payload["level"] == "INFO"
+        assert payload["logger"] == "test"
+
+    def test_format_includes_correlation_id_and_extra_fields(self):
+        """Test that the correlation id and `extra=` fields are included."""
+        record = _record(logging.INFO)
+        record.correlation_id = "req-123"
+        record.duration_ms = 12.5
+
+        payload = json.loads(JsonFormatter().format(record))
+
+        assert payload["correlation_id"] == "req-123"
+        assert payload["duration_ms"] == 12.5
+
+    def test_format_includes_exception(self):
+        """Test that exception tracebacks are serialized."""
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.LogRecord("test", logging.ERROR, __file__, 1, "failed", None, sys.exc_info())
+
+        payload = json.loads(JsonFormatter().format(record))
+
+        assert "ValueError: boom" in payload["exception"]
+
+    def test_correlation_filter_stamps_current_context(self):
+        """Test that the filter copies the context var onto the record."""
+        record = _record(logging.INFO)
+        token = correlation_id_var.set("req-456")
+        try:
+            CorrelationIdFilter().filter(record)
+        finally:
+            correlation_id_var.reset(token)
+
+        assert record.correlation_id == "req-456"
+
+    # ===== EDGE CASES =====
+
+    def test_correlation_filter_keeps_existing_id(self):
+        """Test that a record stamped on the logging thread is not overwritten by the listener."""
+        record = _record(logging.INFO)
+        record.correlation_id = "req-789"
+
+        CorrelationIdFilter().filter(record)
+
+        assert record.correlation_id == "req-789"
+
+    def test_format_serializes_unknown_extra_types(self):
+        """Test that non-JSON extra values fall back to their string form."""
+        record = _record(logging.INFO)
+        record.path = Path("/tmp/x")
+
+        payload = json.loads(JsonFormatter().format(record))
+
+        assert payload["path"] == "/tmp/x"
+        assert "correlation_id" not in payload
+
+
+class TestLoggingManager:
+    """Test suite for LoggingManager initialization modes."""
+
+    @pytest.fixture(autouse=True)
+    def restore_root_handlers(self):
+        """Restore the root logger handlers after each test."""
+        root = logging.getLogger()
+        handlers, level = list(root.handlers), root.level
+        yield
+        root.handlers[:] = handlers
+        root.setLevel(level)
+
+    def _config(self, tmp_path, async_logging: bool) -> LoggingConfig:
+        return LoggingConfig(
+            log_level="INFO",
+            log_file=str(tmp_path / "app.log"),
+            error_log_file=str(tmp_path / "errors.log"),
+            console_colors=False,
+            json_format=False,
+            async_logging=async_logging
+        )
+
+    def test_async_logging_routes_through_queue(self, tmp_path):
+        """Test that async mode installs only the queue handler on the root logger."""
+        manager = LoggingManager(self._config(tmp_path, async_logging=True))
+        manager.initialize()
+        try:
+            root_handlers = logging.getLogger().handlers
+            assert len(root_handlers) == 1
+            assert isinstance(root_handlers[0], OverloadSheddingQueueHandler)
+
+            manager.get_logger("test").info("queued message")
+        finally:
+            manager.shutdown()
+
+        assert "queued message" in (tmp_path / "app.log").read_text()
+
+    def test_shutdown_falls_back_to_synchronous_handlers(self, tmp_path):
+        """Test that records logged after shutdown are still written."""
+        manager = LoggingManager(self._config(tmp_path, async_logging=True))
+        manager.initialize()
+        manager.shutdown()
+
+        manager.get_logger("test").error("late message")
+        for handler in logging.getLogger().handlers:
+            handler.flush()
+
+        assert "late message" in (tmp_path / "errors.log").read_text()
+        assert not any(isinstance(h, OverloadSheddingQueueHandler) for h in logging.getLogger().handlers)
+
+    def test_shutdown_keeps_queue_handler_when_listener_cannot_stop(self, tmp_path, capsys):
+        """Test that a listener stuck on a full queue leaves the queue handler attached instead of raising."""
+        manager = LoggingManager(self._config(tmp_path, async_logging=True))
+        manager.initialize()
+        listener = manager.listener
+        listener.stop = Mock(side_effect=queue.Full)
+
+        manager.shutdown()
+
+        assert manager.listener is listener
+        assert logging.getLogger().handlers == [manager.queue_handler]
+        assert "did not stop" in capsys.readouterr().err
+
+        del listener.stop
+        manager.shutdown()
+        assert manager.listener is None
+
+    def test_json_format_writes_correlated_json_lines(self, tmp_path):
+        """Test that JSON mode writes parseable lines carrying the correlation id."""
+        config = self._config(tmp_path, async_logging=True)
+        config.json_format = True
+        manager = LoggingManager(config)
+        manager.initialize()
+        token = correlation_id_var.set("req-abc")
+        try:
+            manager.get_logger("test").info('message with "quotes"')
+        finally:
+            correlation_id_var.reset(token)
+            manager.shutdown()
+
+        lines = [json.loads(line) for line in (tmp_path / "app.log").read_text().splitlines()]
+        record = next(line for line in lines if line["message"] == 'message with "quotes"')
+        assert record["correlation_id"] == "req-abc"
+
+    def test_sync_logging_attaches_handlers_directly(self, tmp_path):
+        """Test that sync mode keeps the handlers on the root logger."""
+        manager = LoggingManager(self._config(tmp_path, async_logging=False))
+        manager.initialize()
+
+        assert len(logging.getLogger().handlers) >= 4
+        assert manager.listener is None
+        assert manager.get_dropped_count() == 0
+
+
+class TestLazyLogging:
+    """Test suite for lazy log arguments and the eager debug logging lint."""
+
+    @staticmethod
+    def _eager_debug_calls(source: str) -> list:
+        """Return line numbers of debug calls whose message is formatted before the call."""
+        offenders = []
+        for node in ast.walk(ast.parse(source)):
+            if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                    and node.func.attr == "debug" and node.args):
+                continue
+            message = node.args[0]
+            eager = (
+                isinstance(message, ast.JoinedStr)
+                or (isinstance(message, ast.BinOp) and isinstance(message.op, (ast.Mod, ast.Add)))
+                or (isinstance(message, ast.Call) and isinstance(message.func, ast.Attribute)
+                    and message.func.attr == "format")
+            )
+            if eager:
+                offenders.append(node.lineno)
+        return offenders
+
+    @staticmethod
+    def _unguarded_debug_calls(source: str) -> list:
+        """Return line numbers of debug calls that are not inside an isEnabledFor(...) check."""
+        guarded = set()
+        tree = ast.parse(source)
+        for node in ast.walk(tree):
+            if (isinstance(node, ast.If) and isinstance(node.test, ast.Call)
+                    and isinstance(node.test.func, ast.Attribute) and node.test.func.attr == "isEnabledFor"):
+                for child in node.body:
+                    guarded.update(id(inner) for inner in ast.walk(child))
+        return [
+            node.lineno for node in ast.walk(tree)
+            if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+            and node.func.attr == "debug" and id(node) not in guarded
+        ]
+
+    # ===== POSITIVE TESTS =====
+
+    def test_lazy_argument_is_not_evaluated_when_level_disabled(self):
+        """Test that a lazy argument is skipped when DEBUG is off."""
+        logger = logging.getLogger("test.lazy.disabled")
+        logger.setLevel(logging.INFO)
+        compute = Mock(return_value=[1, 2, 3])
+
+        logger.debug("IDs: %s", lazy(compute))
+
+        compute.assert_not_called()
+
+    def test_lazy_argument_is_evaluated_when_emitted(self):
+        """Test that a lazy argument is rendered into the message when emitted."""
+        logger = logging.getLogger("test.lazy.enabled")
+        logger.setLevel(logging.DEBUG)
+        logger.propagate = False
+        target = _CollectingHandler()
+        logger.addHandler(target)
+        try:
+            logger.debug("IDs: %s", lazy(lambda ids: [i * 2 for i in ids], [1, 2]))
+        finally:
+            logger.removeHandler(target)
+
+        assert target.records[0].getMessage() == "IDs: [2, 4]"
+
+    def test_src_has_no_eager_debug_logs(self):
+        """Test that no debug log in api/src formats its message eagerly."""
+        offenders = []
+        for path in sorted(SRC_DIR.rglob("*.py")):
+            for lineno in self._eager_debug_calls(path.read_text()):
+                offenders.append(f"{path.relative_to(SRC_DIR)}:{lineno}")
+
+        assert offenders == [], f"Use %-style arguments or lazy() for debug logs: {offenders}"
+
+    def test_hot_paths_guard_debug_logs(self):
+        """Test that debug logs on the middleware, chat and booking hot paths check the level first."""
+        offenders = []
+        for name in ("middleware/auth.py", "services/chat.py", "services/booking.py"):
+            for lineno in self._unguarded_debug_calls((SRC_DIR / name).read_text()):
+                offenders.append(f"{name}:{lineno}")
+
+        assert offenders == [], f"Wrap hot-path debug logs in logger.isEnabledFor(logging.DEBUG): {offenders}"
+
+    # ===== NEGATIVE TESTS =====
+
+    def test_lint_detects_eager_debug_messages(self):
+        """Test that the lint flags f-strings, %-formatting and str.format in debug calls."""
+        source = (
+            'logger.debug(f"user {user_id}")\n'
+            'logger.debug("user %s" % user_id)\n'
+            'logger.debug("user {}".format(user_id))\n'
+            'logger.debug("user %s", user_id)\n'
+            'logger.info(f"user {user_id}")\n'
+        )
+
+        assert self._eager_debug_calls(source) == [1, 2, 3]
+
+    def test_lint_detects_unguarded_debug_calls(self):
+        """Test that the guard lint only accepts debug calls inside an isEnabledFor check."""
+        source = (
+            'if logger.isEnabledFor(logging.DEBUG):\n'
+            '    logger.debug("user %s", user_id)\n'
+            'logger.debug("user %s", user_id)\n'
+        )
+
+        assert self._unguarded_debug_calls(source) == [3]
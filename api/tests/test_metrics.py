@@ -0,0 +1,162 @@
+"""
+Tests for MetricsRegistry - Resource Layer
+Tests use private registries so results do not depend on other tests' traffic.
+"""
+import pytest
+import threading
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+# Add src to path
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from resources.metrics import (
+    MetricsRegistry, RequestDbStats, request_db_stats_var, instrument_engine, DB_QUERY_DURATION
+)
+from routers.metrics import router
+
+
+class TestMetricsRegistry:
+    """Test suite for counters, histograms and text rendering."""
+
+    @pytest.fixture
+    def registry(self):
+        """Create an empty registry."""
+        return MetricsRegistry()
+
+    # ===== POSITIVE TESTS =====
+
+    def test_counter_renders_labelled_series(self, registry):
+        """Test that counter increments are summed per label set."""
+        counter = registry.counter("auth_requests_total", "Auth outcomes", ("result",))
+        counter.labels("authenticated").inc()
+        counter.labels("authenticated").inc(2)
+        counter.labels("invalid_token").inc()
+
+        output = registry.render()
+
+        assert "# TYPE auth_requests_total counter" in output
+        assert 'auth_requests_total{result="authenticated"} 3' in output
+        assert 'auth_requests_total{result="invalid_token"} 1' in output
+
+    def test_histogram_renders_cumulative_buckets(self, registry):
+        """Test that histogram buckets are cumulative with sum and count."""
+        histogram = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 5.0):
+            histogram.labels("/flights").observe(value)
+
+        output = registry.render()
+
+        assert 'latency_seconds_bucket{route="/flights",le="0.1"} 1' in output
+        assert 'latency_seconds_bucket{route="/flights",le="1"} 3' in output
+        assert 'latency_seconds_bucket{route="/flights",le="+Inf"} 4' in output
+        assert 'latency_seconds_sum{route="/flights"} 6.05' in output
+        assert 'latency_seconds_count{route="/flights"} 4' in output
+
+    def test_observations_from_many_threads_are_all_counted(self, registry):
+        """Test that per-thread shards add up to every observation."""
+        histogram = registry.histogram("work_seconds", "Work", buckets=(1.0,))
+
+        def worker():
+            for _ in range(1000):
+                histogram.observe(0.5)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert histogram.labels().get()["count"] == 8000
+
+    def test_register_same_metric_returns_existing(self, registry):
+        """Test that registering a metric twice returns the same family."""
+        first = registry.counter("events_total", "Events")
+        second = registry.counter("events_total", "Events")
+
+        assert first is second
+
+    # ===== NEGATIVE TESTS =====
+
+    def test_wrong_label_count_raises(self, registry):
+        """Test that label values must match the declared label names."""
+        counter = registry.counter("events_total", "Events", ("kind",))
+
+        with pytest.raises(ValueError):
+            counter.labels("a", "b")
+
+    def test_register_conflicting_shape_raises(self, registry):
+        """Test that a name cannot be reused with different labels or type."""
+        registry.counter("events_total", "Events", ("kind",))
+
+        with pytest.raises(ValueError):
+            registry.histogram("events_total", "Events", ("kind",))
+
+    # ===== EDGE CASES =====
+
+    def test_label_values_are_escaped(self, registry):
+        """Test that quotes, backslashes and newlines in label values are escaped."""
+        counter = registry.counter("tool_calls_total", "Tool calls", ("tool",))
+        counter.labels('a"b\\c\nd').inc()
+
+        assert 'tool_calls_total{tool="a\\"b\\\\c\\nd"} 1' in registry.render()
+
+    def test_empty_family_renders_headers_only(self, registry):
+        """Test that a family with no series still renders HELP and TYPE."""
+        registry.histogram("idle_seconds", "Idle")
+
+        assert registry.render() == "# HELP idle_seconds Idle\n# TYPE idle_seconds histogram\n"
+
+
+class TestEngineInstrumentation:
+    """Test suite for SQLAlchemy query timing."""
+
+    def test_queries_are_attributed_to_current_request(self):
+        """Test that statements are counted against the request stats in context."""
+        engine = create_engine("sqlite:///:memory:")
+        instrument_engine(engine)
+        stats = RequestDbStats()
+        before = DB_QUERY_DURATION.labels().get()["count"]
+
+        token = request_db_stats_var.set(stats)
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                conn.execute(text("SELECT 2"))
+        finally:
+            request_db_stats_var.reset(token)
+
+        assert stats.queries == 2
+        assert stats.seconds > 0
+        assert DB_QUERY_DURATION.labels().get()["count"] == before + 2
+
+    def test_failed_query_does_not_skew_later_timings(self):
+        """Test that a failing statement leaves no dangling start time."""
+        engine = create_engine("sqlite:///:memory:")
+        instrument_engine(engine)
+
+        with engine.connect() as conn:
+            with pytest.raises(Exception):
+                conn.execute(text("SELECT * FROM missing_table"))
+            conn.execute(text("SELECT 1"))
+
+            assert conn.info.get("metrics_query_start") == []
+
+
+class TestMetricsRouter:
+    """Test suite for the /metrics endpoint."""
+
+    def test_metrics_endpoint_serves_text_format(self):
+        """Test that /metrics returns the Prometheus text format."""
+        app = FastAPI()
+        app.include_router(router)
+        client = TestClient(app)
+
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert "# TYPE http_request_duration_seconds histogram" in response.text
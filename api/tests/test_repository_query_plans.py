@@ -0,0 +1,231 @@
+"""
+Query plan tests for all SQLite repositories - Repository Layer
+Every public repository method is run against a real SQLite database; each statement
+it issues is checked with EXPLAIN QUERY PLAN so that no query falls back to a table scan.
+"""
+import pytest
+import datetime
+import inspect as pyinspect
+import re
+from sqlalchemy import event
+
+# Add src to path
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from resources.database import DatabaseManager, DatabaseConfig
+from models import Base, User, Flight, Booking, ChatSession, ChatbotMessage
+from repository.user import UserSqliteRepository
+from repository.flight import FlightSqliteRepository, SEARCH_ORDERS
+from repository.booking import BookingSqliteRepository
+from repository.chat_session import ChatSessionSqliteRepository
+from repository.chatbot_message import ChatbotMessageSqliteRepository
+from repository.airport import AirportSqliteRepository
+
+NOW = datetime.datetime(2026, 6, 1, 12, 0)
+
+# Each scenario calls one public repository method with realistic arguments
+SCENARIOS = {
+    UserSqliteRepository: {
+        "create": lambda repo: repo.create("New User", "new@example.com", "hash"),
+        "find_by_email": lambda repo: repo.find_by_email("user1@example.com"),
+        "find_by_id": lambda repo: repo.find_by_id(1),
+        "update_token_expiration": lambda repo: repo.update_token_expiration(1, NOW),
+        "exists_by_email": lambda repo: repo.exists_by_email("user1@example.com"),
+        "find_expired_tokens": lambda repo: repo.find_expired_tokens(),
+    },
+    FlightSqliteRepository: {
+        "create": lambda repo: repo.create("MAD", "LIS", NOW, NOW + datetime.timedelta(hours=1), "Iberia", 120),
+        "find_by_id": lambda repo: repo.find_by_id(1),
+        "search_flights": lambda repo: [
+            repo.search_flights("MAD", "LIS", "2026-06-02"),
+            repo.search_flights("MAD", "LIS", "2026-06-02", min_price=50, max_price=200, airline="Iberia",
+                                departure_hour_from=22, departure_hour_to=6, sort_by="duration"),
+        ] + [repo.search_flights(size=5, sort_by=sort_by) for sort_by in SEARCH_ORDERS],
+        "search_flights_between": lambda repo: [
+            repo.search_flights_between("MAD", "LIS", NOW.date(), NOW.date() + datetime.timedelta(days=6)),
+            repo.search_flights_between(None, None, NOW.date(), NOW.date() + datetime.timedelta(days=6)),
+        ],
+        "search_flights_many": lambda repo: repo.search_flights_many([
+            ("MAD", "LIS", NOW.date() + datetime.timedelta(days=1)), ("MAD", "OPO", NOW.date() + datetime.timedelta(days=2))
+        ]),
+        "list_all": lambda repo: repo.list_all(),
+        "find_available_by_id": lambda repo: repo.find_available_by_id(1),
+        "find_available_by_ids": lambda repo: repo.find_available_by_ids([1, 2, 3]),
+        "find_scheduled_departing_after": lambda repo: repo.find_scheduled_departing_after(NOW),
+        "resolve_airport_codes": lambda repo: repo.resolve_airport_codes(["Madrid", "LIS"]),
+        "get_latest_version": lambda repo: repo.get_latest_version(),
+        "find_written_after": lambda repo: repo.find_written_after(2),
+        "get_fare_calendar": lambda repo: repo.get_fare_calendar("MAD", "LIS", NOW.date(), NOW.date() + datetime.timedelta(days=30)),
+    },
+    BookingSqliteRepository: {
+        "create": lambda repo: repo.create(2, 5),
+        "create_if_available": lambda repo: repo.create_if_available(2, 4),
+        "create_many_if_available": lambda repo: repo.create_many_if_available(2, [4, 5]),
+        "find_by_id": lambda repo: repo.find_by_id(1),
+        "find_by_ids": lambda repo: repo.find_by_ids([1, 2]),
+        "find_existing_booking": lambda repo: repo.find_existing_booking(1, 1),
+        "find_existing_bookings": lambda repo: repo.find_existing_bookings(1, [1, 2]),
+        "update_status": lambda repo: repo.update_status(1, "cancelled", NOW),
+        "cancel_if_allowed": lambda repo: repo.cancel_if_allowed(1, 1, NOW),
+        "cancel_many_if_allowed": lambda repo: repo.cancel_many_if_allowed([1, 2], 1, NOW),
+        "find_by_user_id": lambda repo: [repo.find_by_user_id(1, status) for status in (None, "upcoming", "past", "booked")],
+        "find_by_user_id_paginated": lambda repo: [
+            repo.find_by_user_id_paginated(1, status, booked_date="2026-05-01", departure_date="2026-06-02")
+            for status in (None, "booked", "completed", "cancelled")
+        ] + [
+            repo.find_by_user_id_paginated(1, departure_from="2026-06-01", departure_to="2026-06-30",
+                                           booked_from="2026-05-01", booked_to="2026-05-31")
+        ],
+        "count_by_status": lambda repo: repo.count_by_status(1),
+        "delete_by_id": lambda repo: repo.delete_by_id(2),
+    },
+    ChatSessionSqliteRepository: {
+        "create": lambda repo: repo.create(1, "1_new", "New"),
+        "find_by_id": lambda repo: repo.find_by_id("1_trip"),
+        "find_by_user_id": lambda repo: repo.find_by_user_id(1),
+        "find_all_ids": lambda repo: repo.find_all_ids(),
+        "find_by_user_and_session": lambda repo: repo.find_by_user_and_session(1, "1_trip"),
+        "update_alias": lambda repo: repo.update_alias(1, "1_trip", "Renamed"),
+        "delete_by_id": lambda repo: repo.delete_by_id("1_work"),
+        "get_sessions_with_message_count": lambda repo: repo.get_sessions_with_message_count(1),
+    },
+    ChatbotMessageSqliteRepository: {
+        "create": lambda repo: repo.create(1, "1_trip", "hello", "hi"),
+        "find_by_user_id": lambda repo: repo.find_by_user_id(1),
+        "find_by_user_id_and_session": lambda repo: repo.find_by_user_id_and_session(1, "1_trip"),
+        "count_by_user_id": lambda repo: repo.count_by_user_id(1),
+        "count_by_user_id_and_session": lambda repo: repo.count_by_user_id_and_session(1, "1_trip"),
+        "delete_by_user_id": lambda repo: repo.delete_by_user_id(2),
+        "delete_by_user_id_and_session": lambda repo: repo.delete_by_user_id_and_session(1, "1_work"),
+        "get_user_sessions": lambda repo: repo.get_user_sessions(1),
+        "search": lambda repo: repo.search(1, ["madrid", "flights"], limit=5, after=(-1.0, 3)),
+    },
+    AirportSqliteRepository: {
+        "find_all": lambda repo: repo.find_all(),
+        "find_by_code": lambda repo: repo.find_by_code("mad"),
+        "resolve_codes": lambda repo: repo.resolve_codes(["Madrid", "LIS", "Nowhere"]),
+    },
+}
+
+# Methods that return a whole table by design, so a scan is the right plan
+FULL_LISTINGS = {
+    (FlightSqliteRepository, "list_all"),
+    (ChatSessionSqliteRepository, "find_all_ids"),
+    (AirportSqliteRepository, "find_all"),
+}
+
+TABLES = set(Base.metadata.tables)
+SCAN_PATTERN = re.compile(r"^SCAN (\w+)")
+
+
+def _public_methods(repo_class):
+    return {
+        name for name, _ in pyinspect.getmembers(repo_class, pyinspect.isfunction)
+        if not name.startswith("_")
+    }
+
+
+def _scenario_params():
+    return [
+        pytest.param(repo_class, method, id=f"{repo_class.__name__}.{method}")
+        for repo_class, methods in SCENARIOS.items()
+        for method in methods
+    ]
+
+
+class TestRepositoryQueryPlans:
+    """Test suite asserting that repository queries are served by indexes."""
+
+    @pytest.fixture
+    def manager(self, tmp_path):
+        """Create an application database with a few rows in every table."""
+        manager = DatabaseManager(DatabaseConfig(database_url=f"sqlite:///{tmp_path / 'flights.db'}"))
+        manager.create_tables()
+        db = manager.get_session()
+        for user_id in (1, 2):
+            db.add(User(id=user_id, name=f"User {user_id}", email=f"user{user_id}@example.com",
+                        password_hash="hash", token_expiration=NOW))
+        for flight_id in range(1, 6):
+            departure = NOW + datetime.timedelta(days=flight_id)
+            db.add(Flight(id=flight_id, origin="MAD", destination="LIS", departure_time=departure,
+                          arrival_time=departure + datetime.timedelta(hours=1), airline="Iberia", price=100))
+        for booking_id, (user_id, flight_id) in enumerate([(1, 1), (1, 2), (2, 3)], start=1):
+            db.add(Booking(id=booking_id, user_id=user_id, flight_id=flight_id, booked_at=NOW))
+        for session_id, user_id in [("1_trip", 1), ("1_work", 1), ("2_trip", 2)]:
+            db.add(ChatSession(id=session_id, user_id=user_id, alias=session_id, updated_at=NOW))
+            db.add(ChatbotMessage(user_id=user_id, session_id=session_id, user_message="hi", created_at=NOW))
+        db.commit()
+        db.close()
+        return manager
+
+    def _record_statements(self, manager, call):
+        """Run call(db) and return the SELECT/UPDATE/DELETE statements it executed."""
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().split(" ", 1)[0].upper() in ("SELECT", "UPDATE", "DELETE"):
+                # An executemany plans the same way for every parameter set
+                statements.append((statement, parameters[0] if executemany else parameters))
+
+        event.listen(manager.engine, "before_cursor_execute", before_cursor_execute)
+        db = manager.get_session()
+        try:
+            call(db)
+        finally:
+            event.remove(manager.engine, "before_cursor_execute", before_cursor_execute)
+            db.close()
+        return statements
+
+    def _table_scans(self, manager, statement, parameters):
+        with manager.engine.connect() as conn:
+            plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+        scans = []
+        for row in plan:
+            match = SCAN_PATTERN.match(row[-1])
+            if match and match.group(1) in TABLES:
+                scans.append(row[-1])
+        return scans
+
+    # ===== POSITIVE TESTS =====
+
+    @pytest.mark.parametrize("repo_class, method", _scenario_params())
+    def test_repository_method_uses_indexes(self, manager, repo_class, method):
+        """Test that no statement issued by a repository method scans a table."""
+        scenario = SCENARIOS[repo_class][method]
+        statements = self._record_statements(manager, lambda db: scenario(repo_class(db)))
+
+        assert statements
+        if (repo_class, method) in FULL_LISTINGS:
+            return
+        for statement, parameters in statements:
+            scans = self._table_scans(manager, statement, parameters)
+            assert not scans, f"{repo_class.__name__}.{method} scans {scans}:\n{statement}"
+
+    @pytest.mark.parametrize("sort_by", list(SEARCH_ORDERS))
+    def test_sorted_search_reads_index_in_order(self, manager, sort_by):
+        """Test that the first page of a sorted search comes off an index without a sort step."""
+        statements = self._record_statements(
+            manager, lambda db: FlightSqliteRepository(db).search_flights(size=5, sort_by=sort_by)
+        )
+        statement, parameters = statements[-1]
+
+        with manager.engine.connect() as conn:
+            plan = [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+        assert "LIMIT" in statement
+        assert any(step.startswith("SEARCH flights USING INDEX") for step in plan), plan
+        assert not any("TEMP B-TREE" in step for step in plan), plan
+
+    # ===== EDGE CASES =====
+
+    @pytest.mark.parametrize("repo_class", list(SCENARIOS), ids=lambda cls: cls.__name__)
+    def test_every_repository_method_is_covered(self, repo_class):
+        """Test that new repository methods get a query plan scenario."""
+        assert _public_methods(repo_class) == set(SCENARIOS[repo_class])
+
+    def test_scan_detection(self, manager):
+        """Test that an unindexed filter is reported as a table scan."""
+        scans = self._table_scans(manager, "SELECT * FROM flights WHERE airline = ?", ("Iberia",))
+
+        assert scans == ["SCAN flights"]
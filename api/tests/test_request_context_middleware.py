@@ -0,0 +1,124 @@
+"""
+Tests for RequestContextMiddleware - Middleware Layer
+Tests run a minimal FastAPI app to focus on correlation ids and request timing.
+"""
+import pytest
+import logging
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# Add src to path
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from middleware.request_context import RequestContextMiddleware
+from resources.logging import correlation_id_var, CorrelationIdFilter
+from resources.metrics import HTTP_REQUEST_DURATION
+
+
+class _CollectingHandler(logging.Handler):
+    """Handler that remembers emitted records."""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class TestRequestContextMiddleware:
+    """Test suite for RequestContextMiddleware."""
+
+    @pytest.fixture
+    def request_records(self):
+        """Capture records from the request logger."""
+        logger = logging.getLogger("flights_chatbot.request")
+        handler = _CollectingHandler()
+        handler.addFilter(CorrelationIdFilter())
+        logger.addHandler(handler)
+        yield handler.records
+        logger.removeHandler(handler)
+
+    @pytest.fixture
+    def client(self):
+        """Create a test client for an app that echoes the current correlation id."""
+        app = FastAPI()
+
+        @app.get("/echo")
+        async def echo():
+            return {"correlation_id": correlation_id_var.get()}
+
+        @app.get("/items/{item_id}")
+        async def item(item_id: int):
+            return {"item_id": item_id}
+
+        @app.get("/boom")
+        async def boom():
+            raise RuntimeError("boom")
+
+        app.add_middleware(RequestContextMiddleware)
+        return TestClient(app, raise_server_exceptions=False)
+
+    # ===== POSITIVE TESTS =====
+
+    def test_generates_correlation_id(self, client):
+        """Test that a correlation id is generated, visible to handlers and echoed back."""
+        response = client.get("/echo")
+
+        assert response.status_code == 200
+        correlation_id = response.headers["X-Request-ID"]
+        assert len(correlation_id) == 32
+        assert response.json()["correlation_id"] == correlation_id
+
+    def test_reuses_incoming_request_id(self, client):
+        """Test that a caller-supplied request id is propagated."""
+        response = client.get("/echo", headers={"X-Request-ID": "upstream-42"})
+
+        assert response.headers["X-Request-ID"] == "upstream-42"
+        assert response.json()["correlation_id"] == "upstream-42"
+
+    def test_logs_request_duration(self, client, request_records):
+        """Test that the completion record carries the request duration and status."""
+        response = client.get("/echo")
+
+        record = request_records[-1]
+        assert record.status_code == 200
+        assert record.path == "/echo"
+        assert record.duration_ms >= 0
+        assert record.correlation_id == response.headers["X-Request-ID"]
+
+    def test_records_latency_by_route_template(self, client):
+        """Test that latency is recorded under the route template, not the raw path."""
+        series = HTTP_REQUEST_DURATION.labels("GET", "/items/{item_id}", 200)
+        before = series.get()["count"]
+
+        client.get("/items/1")
+        client.get("/items/2")
+
+        assert series.get()["count"] == before + 2
+
+    # ===== NEGATIVE TESTS =====
+
+    def test_rejects_unsafe_incoming_request_id(self, client):
+        """Test that a request id that could break log lines is replaced."""
+        response = client.get("/echo", headers={"X-Request-ID": 'bad "id" with spaces'})
+
+        assert response.headers["X-Request-ID"] != 'bad "id" with spaces'
+        assert len(response.headers["X-Request-ID"]) == 32
+
+    def test_logs_failed_request_as_server_error(self, client, request_records):
+        """Test that an unhandled error is still logged with its duration."""
+        response = client.get("/boom")
+
+        assert response.status_code == 500
+        assert request_records[-1].status_code == 500
+
+    # ===== EDGE CASES =====
+
+    def test_context_is_reset_after_request(self, client):
+        """Test that the correlation id does not leak outside the request."""
+        client.get("/echo")
+
+        assert correlation_id_var.get() is None
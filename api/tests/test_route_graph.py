@@ -0,0 +1,184 @@
+"""
+Tests for RouteGraph - Resource Layer
+Builds small flight networks in memory to check the connection search.
+"""
+import pytest
+import os
+import sys
+from types import SimpleNamespace
+from datetime import datetime, timedelta
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from resources.route_graph import RouteGraph
+
+DAY = datetime(2026, 6, 1)
+MIN_LAYOVER = timedelta(minutes=45)
+MAX_LAYOVER = timedelta(hours=6)
+
+
+def _flight(flight_id, origin, destination, departs, arrives, price, status="scheduled", version=None,
+            origin_code=None, destination_code=None):
+    """Create a flight departing and arriving at the given hours of DAY."""
+    return SimpleNamespace(
+        id=flight_id, origin=origin, destination=destination, origin_code=origin_code,
+        destination_code=destination_code, departure_time=DAY + timedelta(hours=departs),
+        arrival_time=DAY + timedelta(hours=arrives), price=price, status=status, version=version
+    )
+
+
+def _ids(paths):
+    return [[leg.flight_id for leg in path] for path in paths]
+
+
+class TestRouteGraph:
+    """Test suite for the in-memory route graph."""
+
+    @pytest.fixture
+    def graph(self):
+        """Create a graph with a direct flight, one-stop and two-stop connections MAD -> JFK."""
+        graph = RouteGraph()
+        graph.load([
+            _flight(1, "MAD", "JFK", 9, 17, 900),
+            _flight(2, "MAD", "LHR", 7, 9, 100),
+            _flight(3, "LHR", "JFK", 11, 19, 400),
+            _flight(4, "MAD", "LIS", 6, 7, 50),
+            _flight(5, "LIS", "BOS", 8, 15, 200),
+            _flight(6, "BOS", "JFK", 16, 17, 60),
+            _flight(7, "LHR", "JFK", 9, 17, 100),    # Leaves before the 45 minute layover is over
+            _flight(8, "LHR", "JFK", 20, 23, 50),    # Leaves 11 hours after arriving, beyond the 6 hour layover
+            _flight(9, "LHR", "MAD", 10, 12, 10),    # Would revisit MAD
+        ])
+        return graph
+
+    def _search(self, graph, origin="MAD", destination="JFK", **kwargs):
+        return graph.search(origin, destination, DAY, DAY + timedelta(hours=23, minutes=59),
+                            kwargs.pop("min_layover", MIN_LAYOVER), kwargs.pop("max_layover", MAX_LAYOVER), **kwargs)
+
+    # ===== POSITIVE TESTS =====
+
+    def test_search_orders_by_price(self, graph):
+        """Test that direct, one-stop and two-stop itineraries come cheapest first."""
+        assert _ids(self._search(graph)) == [[4, 5, 6], [2, 3], [1]]
+
+    def test_search_orders_by_duration(self, graph):
+        """Test that itineraries come shortest first when sorting by duration."""
+        assert _ids(self._search(graph, sort_by="duration")) == [[1], [4, 5, 6], [2, 3]]
+
+    def test_search_limits_stops(self, graph):
+        """Test that max_stops bounds the number of legs."""
+        assert _ids(self._search(graph, max_stops=0)) == [[1]]
+        assert _ids(self._search(graph, max_stops=1)) == [[2, 3], [1]]
+
+    def test_search_respects_limit(self, graph):
+        """Test that the search stops after `limit` itineraries."""
+        assert _ids(self._search(graph, limit=1)) == [[4, 5, 6]]
+
+    def test_search_respects_layover_window(self, graph):
+        """Test that connections outside the layover window are skipped."""
+        paths = self._search(graph, max_stops=1, max_layover=timedelta(hours=12))
+
+        assert _ids(paths) == [[2, 8], [2, 3], [1]]
+        for path in paths:
+            for previous, leg in zip(path, path[1:]):
+                assert leg.departure_time - previous.arrival_time >= MIN_LAYOVER
+
+    def test_search_matches_airports_case_insensitively(self, graph):
+        """Test that airport names are matched like the flight search matches them."""
+        assert _ids(self._search(graph, origin=" mad", destination="jfk ", max_stops=0)) == [[1]]
+
+    def test_search_by_city_matches_airport_codes(self):
+        """Test that legs are keyed on airport codes, so a city finds its airports and other names their text."""
+        graph = RouteGraph()
+        graph.load([
+            _flight(1, "Madrid", "Paris CDG", 9, 11, 100, origin_code="MAD", destination_code="CDG"),
+            _flight(2, "MAD", "ORY", 10, 12, 80, origin_code="MAD", destination_code="ORY"),
+            _flight(3, "Madrid", "Paris", 13, 15, 90),
+        ])
+
+        paths = graph.search("Madrid", "Paris", DAY, DAY + timedelta(days=1), MIN_LAYOVER, MAX_LAYOVER,
+                             origin_codes=["MAD"], destination_codes=["CDG", "ORY"])
+
+        assert _ids(paths) == [[2], [3], [1]]
+        # Without resolved codes only the text of flights without codes matches
+        assert _ids(self._search(graph, "Madrid", "Paris")) == [[3]]
+
+    def test_upsert_adds_and_removes_flights(self, graph):
+        """Test incremental updates after flight writes."""
+        graph.upsert(_flight(10, "MAD", "JFK", 12, 20, 80))
+        assert _ids(self._search(graph, max_stops=0)) == [[10], [1]]
+
+        graph.upsert(_flight(10, "MAD", "JFK", 12, 20, 80, status="cancelled"))
+        graph.remove(1)
+        assert _ids(self._search(graph, max_stops=0)) == []
+
+    def test_upsert_moves_rescheduled_flight(self, graph):
+        """Test that a flight written again replaces its previous leg."""
+        graph.upsert(_flight(1, "MAD", "JFK", 13, 21, 900))
+
+        paths = self._search(graph, max_stops=0)
+        assert _ids(paths) == [[1]]
+        assert paths[0][0].departure_time == DAY + timedelta(hours=13)
+
+    # ===== NEGATIVE TESTS =====
+
+    def test_refresh_applies_flights_written_after_loaded_version(self):
+        """Test that refresh loads once, then applies only the flights written since the version it reached."""
+        graph = RouteGraph()
+        calls = []
+
+        def load_flights(version):
+            calls.append(version)
+            if version is None:
+                return [_flight(1, "MAD", "JFK", 9, 17, 900, version=3)]
+            return [_flight(1, "MAD", "JFK", 9, 17, 900, status="cancelled", version=4),
+                    _flight(2, "MAD", "JFK", 12, 20, 300, version=5)]
+
+        graph.refresh(3, load_flights)
+        assert _ids(self._search(graph)) == [[1]]
+
+        graph.refresh(3, load_flights)
+        graph.refresh(5, load_flights)
+
+        assert calls == [None, 3]
+        assert graph.version() == 5
+        assert _ids(self._search(graph)) == [[2]]
+
+    def test_search_unknown_airport(self, graph):
+        """Test that an airport without flights has no itineraries."""
+        assert self._search(graph, origin="CDG") == []
+
+    def test_search_same_origin_and_destination(self, graph):
+        """Test that a round trip to the origin is not an itinerary."""
+        assert self._search(graph, destination="MAD") == []
+
+    def test_search_outside_departure_window(self, graph):
+        """Test that only first legs departing in the window are used."""
+        next_day = DAY + timedelta(days=1)
+
+        assert graph.search("MAD", "JFK", next_day, next_day + timedelta(hours=23), MIN_LAYOVER, MAX_LAYOVER) == []
+
+    # ===== EDGE CASES =====
+
+    def test_search_never_revisits_an_airport(self, graph):
+        """Test that itineraries do not loop back through an airport."""
+        for path in self._search(graph, limit=50):
+            airports = [leg.origin for leg in path] + [path[-1].destination]
+            assert len(airports) == len(set(airports))
+
+    def test_upsert_before_load_is_ignored(self):
+        """Test that writes before the first load do not build a partial index."""
+        graph = RouteGraph()
+        graph.upsert(_flight(1, "MAD", "JFK", 9, 17, 900))
+
+        assert not graph.is_loaded()
+        graph.refresh(0, lambda version: [])
+        assert graph.is_loaded()
+        assert self._search(graph) == []
+
+    def test_expansion_cap(self, graph):
+        """Test that a search stops expanding once the cap is reached."""
+        graph.max_expansions = 1
+
+        assert self._search(graph) == []